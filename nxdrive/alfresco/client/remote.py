@@ -9,15 +9,19 @@
 from contextlib import suppress
 from logging import getLogger
 from pathlib import Path
-from typing import TYPE_CHECKING, Any, Callable, Dict, List, Optional, Tuple
+from typing import TYPE_CHECKING, Any, Callable, Dict, List, Optional, Set, Tuple
 
+import requests
 from alfresco import Alfresco
 from alfresco.auth import BasicAuth, OAuth2Auth, TicketAuth
 from alfresco.exceptions import AlfrescoError, ConflictError, CorruptedFile
 from alfresco.models.node import Node
+from alfresco.models.search import SearchResult
 
 from nxdrive.alfresco.auth.refresh import RefreshingOAuth2Auth
 from nxdrive.alfresco.sync_filters import is_top_folder_excluded
+from nxdrive.drive.client.bandwidth import DOWNLOAD, UPLOAD, is_interactive, throttle
+from nxdrive.drive.client.pool import mount_pooled_adapters
 from nxdrive.drive.constants import TransferStatus
 from nxdrive.drive.engine.activity import UploadAction
 from nxdrive.drive.exceptions import (
@@ -29,7 +33,7 @@
     UploadPaused,
 )
 from nxdrive.drive.metrics.utils import user_agent
-from nxdrive.drive.objects import Download, RemoteFileInfo, Upload
+from nxdrive.drive.objects import DocPair, Download, RemoteFileInfo, Upload
 from nxdrive.drive.options import Options
 from nxdrive.drive.qt.imports import QApplication
 from nxdrive.drive.utils import compute_digest
@@ -46,6 +50,9 @@
 UPLOAD_PROGRESS_INTERVAL = 1.0
 UPLOAD_PROGRESS_PERCENT_STEP = 1.0
 
+# Search API endpoint, relative to the client base URL
+SEARCH_API_PATH = "/alfresco/api/-default-/public/search/versions/1/search"
+
 
 class AlfrescoRemote:
     """Remote client for Alfresco Content Services.
@@ -74,6 +81,7 @@ def __init__(
         verify: bool = True,
         cert: Tuple[str] = None,
         on_token_refreshed: Optional[Callable[[Dict[str, Any]], None]] = None,
+        max_processors: int = 0,
     ) -> None:
         self.server_url = url
         self.user_id = user_id
@@ -135,10 +143,15 @@ def __init__(
             base_url = base_url[: -len("/alfresco")]
 
         # Build the Alfresco client
+        # Share keep-alive connections between processors and Direct Download workers
+        session = mount_pooled_adapters(
+            requests.Session(), max_processors=max_processors
+        )
         self.client = Alfresco(
             url=base_url,
             auth=auth,
             timeout=self.timeout,
+            session=session,
         )
 
         # Set custom headers on the session
@@ -161,6 +174,11 @@ def __repr__(self) -> str:
             f"user_id={self.user_id!r}>"
         )
 
+    @property
+    def http_session(self) -> requests.Session:
+        """The HTTP session used for all requests to the server."""
+        return self.client.session
+
     # -- Authentication / validation -----------------------------------------
 
     def check_credentials(self) -> Dict[str, Any]:
@@ -485,6 +503,43 @@ def get_fs_info(
                     info.digest_algorithm = "md5"
         return info
 
+    def get_unchanged_refs(self, pairs: List[DocPair], /) -> Set[str]:
+        """Return node ids of *pairs* not modified since ``last_remote_updated``.
+
+        Mirrors the per-node check of ``AlfrescoProcessor._remote_has_drifted()``
+        for all *pairs* with one AFTS search on their ``ID``.  The search is
+        run against the database (transactional consistency): the index lags
+        behind changes and would report modified nodes as unchanged.  A server
+        that cannot run it that way fails the request, and every pair is then
+        checked with ``get_fs_info()``, as are nodes missing from the results.
+        """
+        by_id = {pair.remote_ref: pair for pair in pairs if pair.remote_ref}
+        if not by_id:
+            return set()
+
+        query = " OR ".join(f'ID:"workspace://SpacesStore/{uid}"' for uid in by_id)
+        body = {
+            "query": {"query": query, "language": "afts"},
+            "paging": {"skipCount": 0, "maxItems": len(by_id)},
+            "queryConsistency": "TRANSACTIONAL",
+        }
+        # The client search API has no parameter for the query consistency
+        url = self.client.base_url + SEARCH_API_PATH
+        resp = self.client.session.post(url, json=body, timeout=self.timeout)
+        resp.raise_for_status()
+        nodes = SearchResult.from_json(resp.json()).entries
+
+        unchanged = set()
+        for node in nodes:
+            pair = by_id.get(node.id)
+            if not pair or not node.modified_at:
+                continue
+            # Same format as ``last_remote_updated`` in the database
+            remote_ts = node.modified_at.strftime("%Y-%m-%d %H:%M:%S")
+            if remote_ts == str(pair.last_remote_updated or "")[:19]:
+                unchanged.add(node.id)
+        return unchanged
+
     def stream_content(
         self,
         fs_item_id: str,
@@ -544,7 +599,20 @@ def stream_content(
                 )
                 download = dao.get_download(path=file_path)
 
+        last_written = 0
+
         def _on_progress(written: int, total: Optional[int]) -> None:
+            nonlocal last_written
+
+            # Respect the bandwidth limits
+            throttle(
+                DOWNLOAD,
+                written - last_written,
+                engine_uid=engine_uid or "",
+                interactive=is_interactive(total or 0),
+            )
+            last_written = written
+
             if dao is None or download is None or download.uid is None:
                 return
             # Capture the real file size the first time the server sends
@@ -658,6 +726,14 @@ def on_progress(bytes_read: int, total_bytes: int) -> None:
                 self.upload_callback()
 
             retry_reset = bytes_read < last_bytes
+
+            # Respect the bandwidth limits
+            throttle(
+                UPLOAD,
+                bytes_read - (0 if retry_reset else last_bytes),
+                engine_uid=action.engine,
+                interactive=is_interactive(filesize),
+            )
             percent = (bytes_read * 100.0 / total_bytes) if total_bytes else 100.0
             now = time.monotonic()
 
@@ -189,6 +189,7 @@ def init_remote(self) -> AlfrescoRemote:
             proxy=self.manager.proxy,
             upload_callback=self.suspend_client,
             on_token_refreshed=self._on_remote_token_refreshed,
+            max_processors=self._proc_count,
         )
 
         return remote
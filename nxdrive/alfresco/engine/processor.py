@@ -23,6 +23,7 @@
     TransferStatus,
 )
 from nxdrive.drive.engine.processor import Processor as _ProcessorBase
+from nxdrive.drive.engine.transfer_scheduler import SYNC, transfers
 from nxdrive.drive.exceptions import (
     DownloadPaused,
     NotFound,
@@ -34,6 +35,7 @@
 )
 from nxdrive.drive.objects import DocPair, RemoteFileInfo
 from nxdrive.drive.utils import (
+    clone_file,
     is_generated_tmp_file,
     lock_path,
     safe_filename,
@@ -74,9 +76,6 @@ def __init__(self, engine: "AlfrescoEngine", item_getter: Callable, /) -> None:
 
     # -- helpers -------------------------------------------------------------
 
-    def _get_normal_state_from_remote_ref(self, ref: str, /) -> Optional[DocPair]:
-        return self.dao.get_normal_state_from_remote(ref)
-
     def _postpone_pair(
         self,
         doc_pair: DocPair,
@@ -97,7 +96,10 @@ def increase_error(
     ) -> None:
         details = str(exception) if exception else None
         self.dao.increase_error(doc_pair, error, details=details)
-        self._postpone_pair(doc_pair, error, exception=exception)
+        # Postponed like in _postpone_pair(), but counted as a failure
+        log.debug(f"Postpone action on document({error}): {doc_pair!r}")
+        doc_pair.error_count = 1
+        self.engine.queue_manager.push_error(doc_pair, exception=exception, failed=True)
 
     def giveup_error(
         self, doc_pair: DocPair, error: str, /, *, exception: Exception = None
@@ -109,7 +111,7 @@ def giveup_error(
             details=details,
             incr=self.engine.queue_manager.get_error_threshold() + 1,
         )
-        self.engine.queue_manager.push_error(doc_pair, exception=exception)
+        self.engine.queue_manager.push_error(doc_pair, exception=exception, failed=True)
 
     def _refresh_local_state(self, doc_pair: DocPair, local_info: FileInfo, /) -> None:
         self.dao.update_local_state(doc_pair, local_info, versioned=False, queue=False)
@@ -126,8 +128,17 @@ def _remote_has_drifted(self, doc_pair: DocPair, /) -> bool:
         comparison instead).  Returns ``False`` if the remote can't be
         reached — the caller falls through and the normal error path
         handles connectivity issues.
+
+        Nodes of queued pairs are checked in bulk first, see
+        ``FreshnessCache``: only the ones that may have drifted are
+        fetched here.
         """
-        if not doc_pair.remote_ref:
+        # Folder renames on the server also count as drift, but folder
+        # renames are handled by the watcher path already; scope this
+        # check to files.
+        if not doc_pair.remote_ref or doc_pair.folderish:
+            return False
+        if self.engine.queue_manager.freshness.is_fresh(doc_pair):
             return False
         try:
             remote_info = self.remote.get_fs_info(doc_pair.remote_ref)
@@ -144,11 +155,6 @@ def _remote_has_drifted(self, doc_pair: DocPair, /) -> bool:
             return False
         remote_ts = _fmt_remote_ts(remote_info.last_modification_time)
         db_ts = str(doc_pair.last_remote_updated or "")[:19]
-        # Folder renames on the server also count as drift, but folder
-        # renames are handled by the watcher path already; scope this
-        # check to files.
-        if doc_pair.folderish:
-            return False
         return bool(remote_ts) and remote_ts != db_ts
 
     def _mark_conflicted(self, doc_pair: DocPair, /) -> None:
@@ -246,7 +252,8 @@ def _execute(self) -> None:
                     "start_ns": monotonic_ns(),
                 }
 
-                self._handle_doc_pair_sync(doc_pair, sync_handler)
+                with transfers.slot(self.engine.uid, SYNC, interrupt=self._interact):
+                    self._handle_doc_pair_sync(doc_pair, sync_handler)
 
             except ThreadInterrupt:
                 self.engine.queue_manager.push(doc_pair)
@@ -298,6 +305,7 @@ def _execute(self) -> None:
                 # ``NuxeoProcessor._execute``).
                 self.dao.release_state(self.thread_id)
                 self._current_doc_pair = None
+                self._parents.clear()
 
     def _handle_doc_pair_sync(
         self, doc_pair: DocPair, sync_handler: Callable, /
@@ -315,30 +323,22 @@ def _handle_doc_pair_sync(
                 self._postpone_pair(doc_pair, "Finder using file", interval=3)
                 return
 
+        preflight = self._preflight(doc_pair)
+
         parent_path = doc_pair.local_parent_path
         if parent_path and not self.local.exists(parent_path):
-            parent_pair = self._get_normal_state_from_remote_ref(
-                doc_pair.remote_parent_ref
-            )
+            parent_pair = preflight.parent
             if not parent_pair or doc_pair.local_parent_path == parent_pair.local_path:
                 self.dao.remove_state(doc_pair)
                 return
             doc_pair.local_parent_path = parent_pair.local_path
 
         # Skip paused transfers
-        download = self.engine.dao.get_download(doc_pair=doc_pair.id)
-        if download and download.status not in (
-            TransferStatus.ONGOING,
-            TransferStatus.DONE,
-        ):
+        if preflight.is_paused(preflight.download):
             log.info(f"Download is paused for {doc_pair!r}")
             return
 
-        upload = self.engine.dao.get_upload(doc_pair=doc_pair.id)
-        if upload and upload.status not in (
-            TransferStatus.ONGOING,
-            TransferStatus.DONE,
-        ):
+        if preflight.is_paused(preflight.upload):
             log.info(f"Upload is paused for {doc_pair!r}")
             return
 
@@ -480,10 +480,12 @@ def _download_content(self, doc_pair: DocPair, file_path: Path, /) -> Path:
             if pair:
                 locker = unlock_path(file_out)
                 try:
-                    shutil.copyfile(self.local.abspath(pair.local_path), file_out)
+                    path = self.local.abspath(pair.local_path)
+                    method = clone_file(path, file_out)
                 except (FileNotFoundError, IsADirectoryError):
                     pass
                 else:
+                    log.debug(f"Reused local duplicate {pair.local_path!r} ({method})")
                     return file_out
                 finally:
                     lock_path(file_out, locker)
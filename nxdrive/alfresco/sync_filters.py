@@ -41,9 +41,11 @@
 wins (safer default — the administrator explicitly said "don't sync").
 """
 
+from functools import lru_cache
 from typing import Iterable, Tuple
 
 from nxdrive.drive.options import Options
+from nxdrive.drive.path_trie import PathTrie
 
 __all__ = (
     "HARDCODED_EXCLUDED_TOP_FOLDERS",
@@ -98,6 +100,21 @@ def _parse_paths(value: str) -> Tuple[str, ...]:
     return tuple(_normalise(entry) for entry in value.split(",") if entry.strip())
 
 
+@lru_cache(maxsize=16)
+def _trie(prefixes: Tuple[str, ...]) -> PathTrie:
+    """Build once the trie matching a tuple of prefixes: the hard-coded
+    list and the parsed ``config.ini`` values do not change between
+    calls, while paths of every remote node are checked against them.
+    """
+    return PathTrie((prefix for prefix in prefixes if prefix), casefold=True)
+
+
+@lru_cache(maxsize=16)
+def _option_trie(value: str) -> PathTrie:
+    """Trie of the paths listed in a ``config.ini`` value."""
+    return _trie(_parse_paths(value))
+
+
 def _covered_by(path: str, prefixes: Iterable[str]) -> bool:
     """Return ``True`` if ``path`` equals or is a descendant of any
     prefix in ``prefixes``.
@@ -109,17 +126,13 @@ def _covered_by(path: str, prefixes: Iterable[str]) -> bool:
     case-sensitive at the storage layer, but the exclusion list
     should match either spelling so admins do not have to hand-tune
     it per server.
+
+    Prefixes are matched segment by segment with a ``PathTrie``, so the
+    cost depends on the depth of ``path``, not on the number of prefixes.
     """
     if not path:
         return False
-    normalised = path.rstrip("/").casefold()
-    for prefix in prefixes:
-        if not prefix:
-            continue
-        lowered = prefix.casefold()
-        if normalised == lowered or normalised.startswith(lowered + "/"):
-            return True
-    return False
+    return _trie(tuple(prefixes)).covers(path)
 
 
 def is_top_folder_excluded(path: str, /) -> bool:
@@ -131,15 +144,15 @@ def is_top_folder_excluded(path: str, /) -> bool:
     if not path:
         return False
 
-    force_sync = _parse_paths(Options.alfresco_force_sync_top_folders or "")
-    extra_excluded = _parse_paths(Options.alfresco_excluded_top_folders or "")
+    force_sync = _option_trie(Options.alfresco_force_sync_top_folders or "")
+    extra_excluded = _option_trie(Options.alfresco_excluded_top_folders or "")
 
     # Extra admin-defined exclusions always win.
-    if _covered_by(path, extra_excluded):
+    if extra_excluded.covers(path):
         return True
 
     # Hard-coded exclusions apply unless the admin re-enabled them.
-    if _covered_by(path, HARDCODED_EXCLUDED_TOP_FOLDERS):
-        return not _covered_by(path, force_sync)
+    if _trie(HARDCODED_EXCLUDED_TOP_FOLDERS).covers(path):
+        return not force_sync.covers(path)
 
     return False
@@ -0,0 +1,261 @@
+"""
+Bandwidth shaping for uploads and downloads.
+
+Transfers call :func:`throttle` after each chunk they send or receive. The
+amount of data is taken from token buckets, and the calling thread sleeps
+when the buckets are empty.
+
+There are two levels of limits, for each direction:
+
+    - the global limit, from the `bandwidth-download-limit` and
+      `bandwidth-upload-limit` options, applied to all engines;
+    - an optional limit per engine, see :meth:`BandwidthLimiter.set_limit`.
+
+Limits are expressed in KiB/s and 0 means unlimited. They can be changed at
+runtime, and restricted to a daily time window with the `bandwidth-schedule`
+option (e.g. "08:00-18:00"): outside of that window, transfers are not limited.
+
+A part of the global limit (`bandwidth-interactive-share`, in percent) is
+reserved for interactive transfers so that a big Direct Transfer cannot starve
+them. Both backends classify transfers with :func:`is_interactive`.
+"""
+
+from datetime import datetime
+from datetime import time as dtime
+from logging import getLogger
+from threading import Lock
+from time import monotonic, sleep
+from typing import Dict, List, Optional, Tuple
+
+from ..options import Options
+
+__all__ = (
+    "DOWNLOAD",
+    "UPLOAD",
+    "BandwidthLimiter",
+    "TokenBucket",
+    "is_interactive",
+    "limiter",
+    "throttle",
+)
+
+log = getLogger(__name__)
+
+DOWNLOAD = "download"
+UPLOAD = "upload"
+
+# Longest sleep between two checks of the limits, to apply changes quickly
+MAX_SLEEP = 1.0
+
+
+class TokenBucket:
+    """
+    Thread-safe token bucket, 1 token = 1 byte.
+    The bucket holds at most 1 second of data, and it can go in debt: a chunk bigger
+    than the bucket is allowed, the next callers will wait for the debt to be repaid.
+    """
+
+    def __init__(self, rate: int = 0, /) -> None:
+        self._lock = Lock()
+        self.rate = rate  # bytes per second, 0 means unlimited
+        self._tokens = float(rate)
+        self._last = monotonic()
+        # Bytes taken so far, the mark of a caller is the total once its bytes taken
+        self._taken = 0.0
+
+    def __repr__(self) -> str:
+        return f"<{type(self).__name__} rate={self.rate}, tokens={self._tokens:.0f}>"
+
+    def set_rate(self, rate: int, /) -> None:
+        with self._lock:
+            self._refill()
+            was_unlimited = not self.rate
+            self.rate = max(0, int(rate))
+            if was_unlimited:
+                # Allow the burst right away
+                self._tokens = float(self.rate)
+            else:
+                self._tokens = min(self._tokens, float(self.rate))
+
+    def _refill(self) -> None:
+        now = monotonic()
+        self._tokens = min(
+            float(self.rate), self._tokens + (now - self._last) * self.rate
+        )
+        self._last = now
+
+    def reserve(self, nbytes: int, /) -> float:
+        """Take *nbytes* and return how long to wait before they can be sent."""
+        return self.wait_time(self.take(nbytes))
+
+    def take(self, nbytes: int, /) -> float:
+        """Take *nbytes*, return the mark to give to :meth:`wait_time`."""
+        with self._lock:
+            if self.rate:
+                self._refill()
+                self._tokens -= nbytes
+                self._taken += nbytes
+            return self._taken
+
+    def wait_time(self, mark: float, /) -> float:
+        """Return how long to wait, at the current rate, before the *mark* is repaid."""
+        with self._lock:
+            if not self.rate:
+                return 0.0
+            self._refill()
+            debt = mark - self._taken - self._tokens
+            return debt / self.rate if debt > 0 else 0.0
+
+    def try_take(self, nbytes: int, /) -> bool:
+        """Take *nbytes* only if they are available right now."""
+        with self._lock:
+            if not self.rate:
+                return True
+            self._refill()
+            if self._tokens < nbytes:
+                return False
+            self._tokens -= nbytes
+            return True
+
+
+def _in_schedule(schedule: str, /, *, now: Optional[datetime] = None) -> bool:
+    """Return True if *now* is in the "HH:MM-HH:MM" *schedule* (always True when empty)."""
+    if not schedule:
+        return True
+    start, end = (
+        dtime(*(int(part) for part in moment.split(":")))
+        for moment in schedule.split("-")
+    )
+    current = (now or datetime.now()).time()
+    if start <= end:
+        return start <= current < end
+    # The window spans midnight
+    return current >= start or current < end
+
+
+def is_interactive(size: int, /, *, bulk: bool = False) -> bool:
+    """
+    Return True for transfers of the synchronization and Direct Edit of files up
+    to `chunk-limit` MiB. Direct Transfer and Direct Download are *bulk* ones,
+    and so are files of unknown *size*.
+    """
+    return not bulk and 0 < size <= Options.chunk_limit * 1024 * 1024
+
+
+class BandwidthLimiter:
+    """Global and per-engine token buckets for both transfer directions."""
+
+    def __init__(self) -> None:
+        self._lock = Lock()
+
+        # Global buckets: bulk transfers only get the non-reserved part of the
+        # limit, interactive ones use their reserved part first.
+        self._bulk = {UPLOAD: TokenBucket(), DOWNLOAD: TokenBucket()}
+        self._interactive = {UPLOAD: TokenBucket(), DOWNLOAD: TokenBucket()}
+        self._global_limits: Dict[str, Tuple[int, int]] = {}
+
+        # Per-engine buckets, keyed by (engine UID, direction)
+        self._engines: Dict[Tuple[str, str], TokenBucket] = {}
+
+    def _sync_global_limits(self, direction: str, /) -> None:
+        """Apply changes of the options to the global buckets."""
+        limit = Options.bandwidth_upload_limit
+        if direction == DOWNLOAD:
+            limit = Options.bandwidth_download_limit
+        key = (limit, Options.bandwidth_interactive_share)
+        if self._global_limits.get(direction) == key:
+            return
+
+        with self._lock:
+            rate = limit * 1024
+            reserved = rate * key[1] // 100
+            self._bulk[direction].set_rate(rate - reserved)
+            self._interactive[direction].set_rate(reserved)
+            self._global_limits[direction] = key
+        log.info(f"Global {direction} bandwidth limit set to {limit} KiB/s")
+
+    def set_limit(self, direction: str, limit: int, /, *, engine_uid: str) -> None:
+        """Set the *limit*, in KiB/s, of the given *engine_uid*. 0 means unlimited."""
+        limit = max(0, int(limit))
+        with self._lock:
+            if limit:
+                bucket = self._engines.setdefault(
+                    (engine_uid, direction), TokenBucket()
+                )
+                bucket.set_rate(limit * 1024)
+            elif bucket := self._engines.pop((engine_uid, direction), None):
+                # Release the transfers waiting for it
+                bucket.set_rate(0)
+        log.info(
+            f"Engine {engine_uid!r} {direction} bandwidth limit set to {limit} KiB/s"
+        )
+
+    def get_limit(self, direction: str, /, *, engine_uid: str) -> int:
+        """Return the limit, in KiB/s, of the given *engine_uid*."""
+        bucket = self._engines.get((engine_uid, direction))
+        return bucket.rate // 1024 if bucket else 0
+
+    def forget(self, engine_uid: str, /) -> None:
+        """Drop limits of a removed engine."""
+        with self._lock:
+            for direction in (UPLOAD, DOWNLOAD):
+                if bucket := self._engines.pop((engine_uid, direction), None):
+                    bucket.set_rate(0)
+
+    def throttle(
+        self,
+        direction: str,
+        nbytes: int,
+        /,
+        *,
+        engine_uid: str = "",
+        interactive: bool = False,
+    ) -> float:
+        """
+        Account *nbytes* transferred in the given *direction* and sleep
+        as long as needed to respect limits. Return the time slept.
+        """
+        if nbytes <= 0 or not _in_schedule(Options.bandwidth_schedule):
+            return 0.0
+
+        self._sync_global_limits(direction)
+
+        marks: List[Tuple[TokenBucket, float]] = []
+        if not (interactive and self._interactive[direction].try_take(nbytes)):
+            bulk = self._bulk[direction]
+            marks.append((bulk, bulk.take(nbytes)))
+        if engine_bucket := self._engines.get((engine_uid, direction)):
+            marks.append((engine_bucket, engine_bucket.take(nbytes)))
+
+        # The remaining delay is computed again after each slice, at the current rates
+        slept = 0.0
+        while (delay := self._wait_time(direction, marks)) > 0:
+            delay = min(delay, MAX_SLEEP)
+            sleep(delay)
+            slept += delay
+        return slept
+
+    def _wait_time(
+        self, direction: str, marks: List[Tuple[TokenBucket, float]], /
+    ) -> float:
+        """Return how long to wait for the taken bytes, see :meth:`throttle`."""
+        self._sync_global_limits(direction)
+        return max((bucket.wait_time(mark) for bucket, mark in marks), default=0.0)
+
+
+# The process-wide limiter
+limiter = BandwidthLimiter()
+
+
+def throttle(
+    direction: str,
+    nbytes: int,
+    /,
+    *,
+    engine_uid: str = "",
+    interactive: bool = False,
+) -> float:
+    """Shortcut to :meth:`BandwidthLimiter.throttle` of the process-wide limiter."""
+    return limiter.throttle(
+        direction, nbytes, engine_uid=engine_uid, interactive=interactive
+    )
@@ -0,0 +1,146 @@
+"""
+Shared HTTP connection pooling.
+
+Remote clients, Direct Download workers (through the engine's remote) and the
+updater all send their requests through ``requests`` sessions whose adapters
+come from here. Pools are sized for the real concurrency of the application so
+that every processor and every Direct Download worker can keep its own
+keep-alive connection to the server.
+
+Pools are blocking: when every connection of a host is busy, a new request
+waits for one to be released instead of opening an extra connection (and TLS
+handshake) that would be discarded right after use.
+"""
+
+from logging import getLogger
+from threading import Lock
+from typing import Any, Dict, Optional
+
+import requests
+from nuxeo.tcp import TCPKeepAliveHTTPSAdapter
+from requests.adapters import DEFAULT_POOLSIZE, HTTPAdapter
+
+from ..metrics.utils import user_agent
+from ..options import Options
+
+__all__ = (
+    "PooledHTTPAdapter",
+    "PooledHTTPSAdapter",
+    "connection_metrics",
+    "mount_pooled_adapters",
+    "pool_size",
+    "shared_session",
+)
+
+log = getLogger(__name__)
+
+# Connections reserved for the traffic that is not driven by processors nor
+# Direct Download workers: the 4 dedicated queue processors, the remote watcher,
+# metrics polling and Direct Edit.
+POOL_HEADROOM = 8
+
+# Number of distinct hosts to keep a pool for (server, S3 redirects, ...)
+POOL_HOSTS = DEFAULT_POOLSIZE
+
+_SHARED_SESSION: Optional[requests.Session] = None
+_SHARED_SESSION_LOCK = Lock()
+
+
+def pool_size(*, max_processors: int = 0) -> int:
+    """
+    Return the number of connections to keep per host.
+    It is derived from the number of file processors of an engine and the number
+    of Direct Download workers, which are the two sources of concurrent transfers.
+    """
+    workers = max(1, int(Options.direct_download_max_workers or 1))
+    return max(DEFAULT_POOLSIZE, max(0, max_processors) + workers + POOL_HEADROOM)
+
+
+class PooledHTTPAdapter(HTTPAdapter):
+    """HTTP adapter with a blocking, sized, connection pool."""
+
+    def __init__(self, *, pool_maxsize: int, max_retries: Any = 0) -> None:
+        super().__init__(
+            pool_connections=POOL_HOSTS,
+            pool_maxsize=pool_maxsize,
+            max_retries=max_retries,
+            pool_block=True,
+        )
+
+
+class PooledHTTPSAdapter(TCPKeepAliveHTTPSAdapter):
+    """HTTPS adapter with TCP keep-alive probes and a blocking, sized, connection pool."""
+
+    def __init__(self, *, pool_maxsize: int, max_retries: Any = 0) -> None:
+        super().__init__(
+            pool_connections=POOL_HOSTS,
+            pool_maxsize=pool_maxsize,
+            max_retries=max_retries,
+            pool_block=True,
+        )
+
+
+def mount_pooled_adapters(
+    session: requests.Session,
+    /,
+    *,
+    max_processors: int = 0,
+    max_retries: Any = 0,
+) -> requests.Session:
+    """Replace the default adapters of *session* with pooled ones."""
+    maxsize = pool_size(max_processors=max_processors)
+    session.mount(
+        "https://", PooledHTTPSAdapter(pool_maxsize=maxsize, max_retries=max_retries)
+    )
+    session.mount(
+        "http://", PooledHTTPAdapter(pool_maxsize=maxsize, max_retries=max_retries)
+    )
+    log.debug(f"Mounted pooled HTTP adapters with {maxsize} connections per host")
+    return session
+
+
+def shared_session() -> requests.Session:
+    """
+    Return the process-wide session used for requests that are not bound
+    to an engine (updater, ...).
+    """
+    global _SHARED_SESSION
+
+    with _SHARED_SESSION_LOCK:
+        if _SHARED_SESSION is None:
+            session = requests.Session()
+            session.headers["User-Agent"] = user_agent()
+            _SHARED_SESSION = mount_pooled_adapters(session)
+        return _SHARED_SESSION
+
+
+def connection_metrics(session: Any, /) -> Dict[str, int]:
+    """
+    Return connection reuse metrics of all pools of *session*.
+
+    - http_pool_size: maximum connections kept per host
+    - http_connections: connections opened since the start
+    - http_requests: requests sent since the start
+    - http_reused: requests served by an already opened connection
+    """
+    size = connections = requests_count = 0
+
+    if isinstance(session, requests.Session):
+        for adapter in session.adapters.values():
+            if not isinstance(adapter, HTTPAdapter):
+                continue
+            size = max(size, adapter._pool_maxsize)
+            pools = adapter.poolmanager.pools
+            for key in pools.keys():
+                pool = pools.get(key)
+                if pool is None:
+                    continue
+                connections += pool.num_connections
+                requests_count += pool.num_requests
+
+    return {
+        "http_pool_size": size,
+        "http_connections": connections,
+        "http_requests": requests_count,
+        "http_reused": max(0, requests_count - connections),
+    }
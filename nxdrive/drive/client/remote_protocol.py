@@ -6,11 +6,11 @@
 """
 
 from pathlib import Path
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, List, Optional, Set
 
 from typing_extensions import Protocol, runtime_checkable
 
-from nxdrive.drive.objects import RemoteFileInfo
+from nxdrive.drive.objects import DocPair, RemoteFileInfo
 
 
 @runtime_checkable
@@ -33,6 +33,10 @@ def get_fs_info(
         """Return info for a single remote item."""
         ...
 
+    def get_unchanged_refs(self, pairs: List[DocPair], /) -> Set[str]:
+        """Return refs of *pairs* whose remote state matches the recorded one."""
+        ...
+
     def get_info(
         self,
         ref: str,
@@ -53,12 +53,74 @@ def set_app_version(version: str) -> None:
 # time, the server will finish way before that timeout.
 TX_TIMEOUT = 60 * 60 * 6  # 6 hours
 
+# Idle read connections kept per database, for threads to reuse them
+DB_POOL_SIZE = 8
+
+# Prepared statements cached per database connection
+DB_CACHED_STATEMENTS = 256
+
+# Page cache (in KiB) and memory-mapped I/O size (in bytes) of database connections
+DB_CACHE_SIZE = 8 * 1024
+DB_MMAP_SIZE = 64 * 1024 * 1024
+
+# Database backups: generations kept, pages copied per step and pause between steps
+DB_BACKUP_GENERATIONS = 5
+DB_BACKUP_PAGES = 1024
+DB_BACKUP_PAUSE = 0.05
+
+# Database maintenance: rows removed and pages vacuumed per step, and pause between steps
+DB_MAINTENANCE_BATCH = 500
+DB_MAINTENANCE_PAUSE = 0.01
+DB_VACUUM_PAGES = 256
+
+# Database integrity check: size (bytes) under which it is done at startup, else in the
+# background with seconds of checks between pauses, and pause
+DB_CHECK_SYNC_SIZE = 8 * 1024 * 1024
+DB_CHECK_BUDGET = 0.1
+DB_CHECK_PAUSE = 0.05
+
+# Pairs to handle queued at once at startup, the next ones when the queues run low
+QUEUE_REBUILD_PAGE = 500
+
 # Number of transfers displayed in the Direct Transfer window, onto the monitoring tab
 DT_MONITORING_MAX_ITEMS = 20
 
 # Number of sessions displayed in the Direct Transfer window, onto the active sessions tab
 DT_ACTIVE_SESSIONS_MAX_ITEMS = 15
 
+# Number of conflicts, errors or unsynchronized items loaded at once in the conflicts window
+FILES_PAGE_SIZE = 100
+
+# Age, in seconds, after which cached children of a remote folder are refreshed in folder pickers
+FOLDERS_CACHE_TTL = 60 * 5
+
+# Trees of the folder pickers cache, see the "cache_kind" of folder tree providers
+FOLDERS_CACHE_KINDS = ("folders", "documents")
+
+# Number of subfolders whose children are fetched in advance when a remote folder is expanded
+FOLDERS_PREFETCH_MAX = 20
+
+# Remote states of queued locally changed pairs checked at once, and seconds they are trusted
+FRESHNESS_BATCH = 100
+FRESHNESS_TTL = 10
+
+# Longest delay (seconds) before retrying an item in error, and the spread of retries
+RETRY_BACKOFF_MAX = 3600
+RETRY_JITTER = 0.1
+
+# File processors autoscaling: seconds between decisions, error rate and throughput
+# drop (after an increase) leading to a decrease, and the decrease factor
+AUTOSCALE_INTERVAL = 5
+AUTOSCALE_ERROR_RATE = 0.2
+AUTOSCALE_TOLERANCE = 0.1
+AUTOSCALE_DECREASE = 0.5
+
+# Processors creating folders concurrently, per direction (local and remote)
+FOLDER_PROCESSORS = 4
+
+# Engines started at once, each one checking its local folder, transfers and conflicts
+ENGINE_START_WORKERS = 4
+
 # List of chars that cannot be used in filenames (either OS or Nuxeo restrictions)
 INVALID_CHARS = r'/:\\|*><?"'
 
@@ -15,5 +15,5 @@
     "5.3.0": 22,
     "5.4.0": 23,
     "7.0.0": 23,
-    "7.1.0": 24,
+    "7.1.0": 28,
 }
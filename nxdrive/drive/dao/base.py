@@ -8,17 +8,30 @@
 from pathlib import Path
 from sqlite3 import Connection, Cursor, DatabaseError, OperationalError, Row, connect
 from threading import RLock, local
+from time import sleep
 from typing import Any, Iterable, List, Optional, Type
 
-from ..constants import NO_SPACE_ERRORS
-from ..objects import DocPair
+from ..constants import (
+    DB_CACHE_SIZE,
+    DB_CACHED_STATEMENTS,
+    DB_CHECK_SYNC_SIZE,
+    DB_MAINTENANCE_PAUSE,
+    DB_MMAP_SIZE,
+    DB_VACUUM_PAGES,
+    NO_SPACE_ERRORS,
+)
+from ..objects import DocPair, Metrics
 from ..qt.imports import QObject
 from ..utils import current_thread_id
 from . import SCHEMA_VERSION
-from .utils import fix_db, restore_backup, save_backup
+from .pool import ConnectionPool
+from .utils import fix_db, is_readable, quick_check, restore_backup, save_backup
 
 log = getLogger(__name__)
 
+# Value of PRAGMA auto_vacuum when free pages are reclaimed on demand
+AUTO_VACUUM_INCREMENTAL = 2
+
 
 class AutoRetryCursor(Cursor):
     def execute(self, sql: str, parameters: Iterable[Any] = ()) -> Cursor:
@@ -54,16 +67,28 @@ def __init__(self, db: Path, /) -> None:
 
         log.info(f"Create {type(self).__name__} on {self.db!r}")
 
+        # Sidecar files: the database was closed properly, or it has to be repaired
+        self._clean_marker = self.db.with_name(f"{self.db.name}-clean")
+        self._repair_marker = self.db.with_name(f"{self.db.name}-repair")
+        # Large databases are checked in the background, see check_integrity()
+        self._check_pending = False
+
         exists = self.db.is_file()
         if exists:
-            # Fix potential file corruption
-            try:
-                fix_db(self.db)
-            except DatabaseError:
-                # The file is too damaged, we'll try and restore a backup.
-                exists = self.restore_backup()
-                if not exists:
-                    self.db.unlink(missing_ok=True)
+            large = self.db.stat().st_size >= DB_CHECK_SYNC_SIZE
+            if self._repair_marker.is_file():
+                log.info(f"{self.db!r} was found corrupted, repairing it")
+                exists = self._repair()
+                self._repair_marker.unlink(missing_ok=True)
+            elif self._clean_marker.is_file():
+                log.debug(f"{self.db!r} was closed properly, skipping the check")
+            elif large and is_readable(self.db):
+                self._check_pending = True
+            else:
+                # Checked in no time, or too damaged to be opened
+                exists = self._repair()
+        # Until the next dispose()
+        self._clean_marker.unlink(missing_ok=True)
 
         self._engine_uid = self.db.stem
         from nxdrive.drive import server_type as _st
@@ -74,6 +99,7 @@ def __init__(self, db: Path, /) -> None:
         self._tx_lock = RLock()
         self.conn: Optional[Connection] = None
         self._conns = local()
+        self._pool = ConnectionPool(self._create_read_conn)
         self.conn = self._create_main_conn()
         if not self.conn:
             raise RuntimeError("Unable to connect to database.")
@@ -93,6 +119,18 @@ def __init__(self, db: Path, /) -> None:
         else:
             self.migration_success = True
 
+    def _repair(self) -> bool:
+        """Fix potential file corruption. Return False if the database is gone."""
+        try:
+            fix_db(self.db)
+        except DatabaseError:
+            # The file is too damaged, we'll try and restore a backup.
+            if self.restore_backup():
+                return True
+            self.db.unlink(missing_ok=True)
+            return False
+        return True
+
     def __repr__(self) -> str:
         return f"<{type(self).__name__} db={self.db!r}, exists={self.db.exists()}>"
 
@@ -114,6 +152,42 @@ def force_commit(self) -> None:
             c = self._get_write_connection().cursor()
             c.execute("PRAGMA wal_checkpoint(PASSIVE)")
 
+    def incremental_vacuum(self, *, pages: int = DB_VACUUM_PAGES) -> int:
+        """
+        Give free pages back to the file system, *pages* at a time: the lock is
+        released between steps so that the synchronization is never blocked.
+        Return the number of reclaimed pages.
+        """
+        with self.lock:
+            c = self._get_write_connection().cursor()
+            auto_vacuum = c.execute("PRAGMA auto_vacuum").fetchone()[0]
+            if auto_vacuum != AUTO_VACUUM_INCREMENTAL:
+                # Databases created before incremental vacuum, the one-off switch
+                # also gives all free pages back
+                log.info(f"Enabling incremental vacuum on {self.db!r}")
+                c.execute("PRAGMA auto_vacuum = INCREMENTAL")
+                c.execute("VACUUM")
+                return 0
+
+        reclaimed = 0
+        while True:
+            with self.lock:
+                c = self._get_write_connection().cursor()
+                free = c.execute("PRAGMA freelist_count").fetchone()[0]
+                if not free:
+                    break
+                # Each row is one reclaimed page, it has to be fully stepped
+                c.execute(f"PRAGMA incremental_vacuum({pages})").fetchall()
+                done = free - c.execute("PRAGMA freelist_count").fetchone()[0]
+            if done <= 0:
+                break
+            reclaimed += done
+            sleep(DB_MAINTENANCE_PAUSE)
+
+        if reclaimed:
+            log.info(f"Reclaimed {reclaimed} free pages of {self.db!r}")
+        return reclaimed
+
     def restore_backup(self) -> bool:
         try:
             with self.lock:
@@ -131,9 +205,9 @@ def restore_backup(self) -> bool:
         return False
 
     def save_backup(self) -> bool:
+        # Online backup: writes are not blocked while it runs
         try:
-            with self.lock:
-                return save_backup(self.db)
+            return save_backup(self.db)
         except OSError as exc:
             if exc.errno in NO_SPACE_ERRORS:
                 # Not being able to create a backup is critical,
@@ -207,6 +281,10 @@ def _get_columns(self, cursor: Cursor, table: str, /) -> List[Any]:
         ]
 
     def _init_db(self, cursor: Cursor, /) -> None:
+        # Free pages can then be reclaimed in small steps, see incremental_vacuum().
+        # It only applies to new databases: existing ones need a full VACUUM to switch,
+        # it is done by the first incremental_vacuum() call, in the background.
+        cursor.execute("PRAGMA auto_vacuum = INCREMENTAL")
         cursor.execute(f"PRAGMA journal_mode = {self._journal_mode}")
         cursor.execute("PRAGMA temp_store = MEMORY")
 
@@ -225,30 +303,76 @@ def _create_main_conn(self) -> Connection:
             f"(dir_exists={self.db.parent.exists()}, "
             f"file_exists={self.db.exists()})"
         )
+        return self._connect()
+
+    def _create_read_conn(self) -> Connection:
+        conn = self._connect()
+        # Writes go through the main connection, guarded by the lock
+        conn.execute("PRAGMA query_only = ON")
+        return conn
+
+    def _connect(self) -> Connection:
         conn = connect(
             str(self.db),
             check_same_thread=False,  # Don't check same thread for closing purpose
             factory=AutoRetryConnection,
             isolation_level=None,  # Autocommit mode
             timeout=10,
+            cached_statements=DB_CACHED_STATEMENTS,
         )
         conn.row_factory = self._state_factory
+        conn.execute(f"PRAGMA cache_size = -{DB_CACHE_SIZE}")
+        conn.execute(f"PRAGMA mmap_size = {DB_MMAP_SIZE}")
         return conn
 
     def dispose(self) -> None:
         log.info(f"Disposing SQLite database {self.db!r}")
+        self._pool.close()
         if hasattr(self._conns, "conn"):
             self._conns.conn.close()
             del self._conns.conn
+        with suppress(AttributeError):
+            del self._conns.lease
         if self.conn:
             self.conn.close()
+        # Without it, the database is checked again at the next start
+        if not self._check_pending:
+            with suppress(OSError):
+                self._clean_marker.touch()
+
+    def check_integrity(self) -> bool:
+        """
+        Quick check of a database that was not closed properly, while it is in use.
+        A corrupted database is repaired at the next start. Return False if it is,
+        until then.
+        """
+        if self._repair_marker.is_file():
+            return False
+        if not self._check_pending:
+            return True
+
+        try:
+            healthy = quick_check(self.db)
+        except OperationalError:
+            log.warning(f"Cannot check {self.db!r}, will retry", exc_info=True)
+            return True
+
+        self._check_pending = False
+        if not healthy:
+            log.error(
+                f"{self.db!r} is corrupted, it will be repaired at the next start"
+            )
+            self._repair_marker.touch()
+        return healthy
+
+    def get_metrics(self) -> Metrics:
+        """Usage metrics of read connections, see ConnectionPool.metrics()."""
+        return self._pool.metrics()
 
     def _get_write_connection(self) -> Connection:
-        if self.in_tx:
-            if self.conn is None:
-                self.conn = self._create_main_conn()
-            return self.conn
-        return self._get_read_connection()
+        if self.conn is None:
+            self.conn = self._create_main_conn()
+        return self.conn
 
     def _get_read_connection(self) -> Connection:
         # If in transaction
@@ -264,14 +388,11 @@ def _get_read_connection(self) -> Connection:
                 pass
 
         if not hasattr(self._conns, "conn"):
-            self._conns.conn = connect(
-                str(self.db),
-                check_same_thread=False,  # Don't check same thread for closing purpose
-                factory=AutoRetryConnection,
-                isolation_level=None,  # Autocommit mode
-                timeout=10,
-            )
-            self._conns.conn.row_factory = self._state_factory
+            # The connection goes back to the pool when the thread ends
+            lease = self._pool.lease()
+            lease.connection.row_factory = self._state_factory
+            self._conns.lease = lease
+            self._conns.conn = lease.connection
 
         return self._conns.conn  # type: ignore
 
@@ -0,0 +1,94 @@
+"""
+Materialized counters of the States table.
+
+Counting conflicts, errors or synced files used to be a full scan of the States
+table, for each refresh of the GUI and of the metrics. Counters are now stored in
+the single row of the StatesCounters table, and triggers on States keep them up
+to date on each insert, update and delete.
+"""
+
+from sqlite3 import Cursor
+from typing import Dict
+
+__all__ = (
+    "COUNTERS_ERROR_THRESHOLD",
+    "STATES_COUNTERS",
+    "compute_counters",
+    "create_triggers",
+    "store_counters",
+)
+
+# Errors threshold of the "errors" and "syncing" counters
+COUNTERS_ERROR_THRESHOLD = 3
+
+# SQL expressions evaluated on each {row} of the States table, and summed up
+STATES_COUNTERS: Dict[str, str] = {
+    "conflicted": "{row}.pair_state = 'conflicted'",
+    "unsynchronized": "{row}.pair_state = 'unsynchronized'",
+    "errors": f"{{row}}.error_count > {COUNTERS_ERROR_THRESHOLD}",
+    "syncing": (
+        "{row}.pair_state NOT IN ('synchronized', 'conflicted', 'unsynchronized')"
+        f" AND {{row}}.error_count < {COUNTERS_ERROR_THRESHOLD}"
+    ),
+    "synced": "{row}.pair_state = 'synchronized'",
+    "synced_files": "{row}.pair_state = 'synchronized' AND {row}.folderish = 0",
+    "synced_folders": "{row}.pair_state = 'synchronized' AND {row}.folderish = 1",
+    "synced_size": (
+        "({row}.pair_state = 'synchronized' AND {row}.folderish = 0) * {row}.size"
+    ),
+    "direct": "{row}.local_state = 'direct'",
+}
+
+
+def _counter(row: str, name: str, /) -> str:
+    return f"IFNULL({STATES_COUNTERS[name].format(row=row)}, 0)"
+
+
+def create_triggers(cursor: Cursor, /) -> None:
+    """Create the StatesCounters table and triggers maintaining it, if needed."""
+    columns = ", ".join(
+        f"{name} INTEGER NOT NULL DEFAULT (0)" for name in STATES_COUNTERS
+    )
+    cursor.execute(f"CREATE TABLE IF NOT EXISTS StatesCounters ({columns})")
+
+    added = ", ".join(
+        f"{name} = {name} + {_counter('NEW', name)}" for name in STATES_COUNTERS
+    )
+    removed = ", ".join(
+        f"{name} = {name} - {_counter('OLD', name)}" for name in STATES_COUNTERS
+    )
+    updated = ", ".join(
+        f"{name} = {name} + {_counter('NEW', name)} - {_counter('OLD', name)}"
+        for name in STATES_COUNTERS
+    )
+    cursor.execute(
+        "CREATE TRIGGER IF NOT EXISTS StatesCountersInsert AFTER INSERT ON States"
+        f" BEGIN UPDATE StatesCounters SET {added}; END"
+    )
+    cursor.execute(
+        "CREATE TRIGGER IF NOT EXISTS StatesCountersDelete AFTER DELETE ON States"
+        f" BEGIN UPDATE StatesCounters SET {removed}; END"
+    )
+    cursor.execute(
+        "CREATE TRIGGER IF NOT EXISTS StatesCountersUpdate"
+        " AFTER UPDATE OF pair_state, local_state, error_count, folderish, size"
+        f" ON States BEGIN UPDATE StatesCounters SET {updated}; END"
+    )
+
+
+def compute_counters(cursor: Cursor, /) -> Dict[str, int]:
+    """Compute counters from the States table, this is a full table scan."""
+    columns = ", ".join(f"SUM({_counter('States', name)})" for name in STATES_COUNTERS)
+    row = cursor.execute(f"SELECT {columns} FROM States").fetchone()
+    return {name: value or 0 for name, value in zip(STATES_COUNTERS, row)}
+
+
+def store_counters(cursor: Cursor, counters: Dict[str, int], /) -> None:
+    """Replace stored counters."""
+    columns = ", ".join(STATES_COUNTERS)
+    values = ", ".join("?" * len(STATES_COUNTERS))
+    cursor.execute("DELETE FROM StatesCounters")
+    cursor.execute(
+        f"INSERT INTO StatesCounters ({columns}) VALUES ({values})",
+        [counters[name] for name in STATES_COUNTERS],
+    )
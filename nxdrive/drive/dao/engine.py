@@ -10,15 +10,18 @@
 from logging import getLogger
 from os.path import basename
 from pathlib import Path
-from sqlite3 import Cursor, IntegrityError, OperationalError
+from sqlite3 import Cursor, IntegrityError, OperationalError, sqlite_version_info
+from time import sleep, time
 from typing import (
     TYPE_CHECKING,
     Any,
     Callable,
     Dict,
     Generator,
+    Iterable,
     List,
     Optional,
+    Set,
     Tuple,
     Union,
 )
@@ -26,6 +29,10 @@
 from ..client.local import FileInfo
 from ..constants import (
     APP_VERSION,
+    DB_MAINTENANCE_BATCH,
+    DB_MAINTENANCE_PAUSE,
+    FOLDERS_CACHE_KINDS,
+    QUEUE_REBUILD_PAGE,
     ROOT,
     UNACCESSIBLE_HASH,
     WINDOWS,
@@ -39,22 +46,76 @@
     DocPairs,
     Download,
     Filters,
+    Preflight,
+    QueueItem,
     RemoteFileInfo,
     Session,
+    TransferChange,
     Upload,
 )
 from ..options import Options
+from ..path_trie import PathTrie
 from ..qt.imports import pyqtSignal
 from ..utils import get_digest_algorithm, is_large_file
 from . import SCHEMA_VERSION, versions_history
 from .adapters import adapt_path
 from .base import BaseDAO
+from .counters import (
+    COUNTERS_ERROR_THRESHOLD,
+    STATES_COUNTERS,
+    compute_counters,
+    store_counters,
+)
 
 if TYPE_CHECKING:
     from ..engine.queue_manager import QueueManager  # noqa
 
 log = getLogger(__name__)
 
+# UPDATE ... RETURNING is available since SQLite 3.35.0
+_RETURNING = sqlite_version_info >= (3, 35, 0)
+
+
+def _queue_item(_: Cursor, row: Tuple[Any, ...], /) -> QueueItem:
+    """Row factory of the "id, folderish, pair_state" projection."""
+    return QueueItem(*row)
+
+
+def _transfer_status(value: Optional[int], /) -> Optional[TransferStatus]:
+    if value is None:
+        return None
+    try:
+        return TransferStatus(value)
+    except ValueError:
+        # Most likely a NXDRIVE-1901 case
+        return TransferStatus.DONE
+
+
+# Finished transfers history, and the condition for a row to expire.
+# The optional parameter is the age limit, as a SQLite date modifier.
+_FINISHED = f"{TransferStatus.DONE.value}, {TransferStatus.CANCELLED.value}"
+_EXPIRED_SESSIONS = (
+    f"SELECT uid FROM Sessions WHERE status IN ({_FINISHED})"
+    " AND completed_on < datetime('now', ?)"
+)
+_ORPHAN_TRANSFERS = (
+    f"status IN ({_FINISHED})"
+    " AND (doc_pair IS NULL OR doc_pair NOT IN (SELECT id FROM States))"
+)
+HISTORY_RETENTION: Tuple[Tuple[str, str], ...] = (
+    ("SessionItems", f"session_id IN ({_EXPIRED_SESSIONS})"),
+    ("Sessions", f"uid IN ({_EXPIRED_SESSIONS})"),
+    (
+        "DirectDownloads",
+        "status IN ("
+        f"{DirectDownloadStatus.COMPLETED.value}, {DirectDownloadStatus.FAILED.value},"
+        f" {DirectDownloadStatus.CANCELLED.value})"
+        " AND COALESCE(completed_at, created_at) < datetime('now', ?)",
+    ),
+    ("Downloads", _ORPHAN_TRANSFERS),
+    ("Uploads", _ORPHAN_TRANSFERS),
+)
+
 # Summary status from last known pair of states
 # (local_state, remote_state)
 PAIR_STATES: Dict[Tuple[str, str], str] = {
@@ -113,8 +174,7 @@
 class EngineDAO(BaseDAO):
     old_migrations_max_schema_version = 21
     newConflict = pyqtSignal(object)
-    transferUpdated = pyqtSignal()
-    directTransferUpdated = pyqtSignal()
+    transferChanged = pyqtSignal(object)
     directDownloadUpdated = pyqtSignal()
     sessionUpdated = pyqtSignal(bool)
 
@@ -122,9 +182,12 @@ def __init__(self, db: Path, /) -> None:
         super().__init__(db)
 
         self.queue_manager: Optional["QueueManager"] = None
+        # Startup queue rebuild: last (local_path, id) queued, and queued folders
+        self._rebuild_after: Optional[Tuple[Optional[str], int]] = None
+        self._rebuild_folders: Set[str] = set()
         self._items_count = 0
         self.get_syncing_count()
-        self._filters = self.get_filters()
+        self._filters = PathTrie(self.get_filters())
         self.reinit_processors()
 
     def _migrate_state(self, cursor: Cursor, /) -> None:
@@ -399,7 +462,8 @@ def _migrate_db_old(self, cursor: Cursor, version: int, /) -> None:
                 "States",
                 ("session", "INTEGER", "DEFAULT", "0"),
             )
-            dt_count = self.get_dt_items_count()
+            # Counters are not materialized yet during migrations
+            dt_count = self.get_count("local_state = 'direct'")
             if dt_count > 0:
                 cursor.execute(
                     "INSERT INTO Sessions (total, status) " "VALUES (?, ?)",
@@ -674,7 +738,21 @@ def _append_to_table(
     def acquire_state(
         self, thread_id: Optional[int], row_id: int, /
     ) -> Optional[DocPair]:
-        if thread_id is not None and self.acquire_processor(thread_id, row_id):
+        if thread_id is not None and _RETURNING:
+            # Take the pair and read it back in a single statement
+            with self.lock:
+                c = self._get_write_connection().cursor()
+                rows: DocPairs = c.execute(
+                    "UPDATE States"
+                    "   SET processor = ?"
+                    " WHERE id = ?"
+                    "   AND processor IN (0, ?)"
+                    " RETURNING *",
+                    (thread_id, row_id, thread_id),
+                ).fetchall()
+            if rows:
+                return rows[0]
+        elif thread_id is not None and self.acquire_processor(thread_id, row_id):
             # Avoid any lock for this call by using the write connection
             try:
                 return self.get_state_from_id(row_id, from_write=True)
@@ -713,6 +791,40 @@ def acquire_processor(self, thread_id: int, row_id: int, /) -> bool:
             )
             return bool(c.rowcount == 1)
 
+    def get_counters(self) -> Dict[str, int]:
+        """Return materialized counters of the States table, see STATES_COUNTERS."""
+        c = self._get_read_connection().cursor()
+        row = c.execute("SELECT * FROM StatesCounters").fetchone()
+        return {name: row[name] if row else 0 for name in STATES_COUNTERS}
+
+    def check_counters(self) -> bool:
+        """
+        Compare materialized counters with the actual content of the States table,
+        and fix them when they differ. Return True if they were consistent.
+        The full scan runs on a read connection, writers are not blocked meanwhile.
+        """
+        c = self._get_read_connection().cursor()
+        # Counters and the States table are read from the same snapshot
+        c.execute("BEGIN")
+        try:
+            actual = compute_counters(c)
+            counters = self.get_counters()
+        finally:
+            c.execute("COMMIT")
+        if counters == actual:
+            return True
+
+        # Triggers applied later changes to both, the drift did not change since
+        drift = {name: counters[name] - actual[name] for name in STATES_COUNTERS}
+        with self.lock:
+            current = self.get_counters()
+            store_counters(
+                self._get_write_connection().cursor(),
+                {name: current[name] - drift[name] for name in STATES_COUNTERS},
+            )
+        log.warning(f"Inconsistent States counters {counters}, fixed to {actual}")
+        return False
+
     def _reinit_states(self, cursor: Cursor, /) -> None:
         # Clear all state rows without dropping the table so that columns
         # added by later migrations (e.g. doc_type from migration 22) remain
@@ -943,35 +1055,72 @@ def _get_to_sync_condition(self) -> str:
         return "pair_state NOT IN ('synchronized', 'unsynchronized')"
 
     def register_queue_manager(self, manager: "QueueManager", /) -> None:
-        """Register the queue manager and add all *pairs* to handle into the queue."""
-
+        """
+        Register the queue manager and add the first *pairs* to handle into the queue.
+        The queue manager pulls the next ones with queue_pairs_to_sync().
+        """
         with self.lock:
             self.queue_manager = manager
+            self._rebuild_after = None
+            self._rebuild_folders = set()
+        manager.set_rebuilding(self.queue_pairs_to_sync())
 
+    def queue_pairs_to_sync(self, *, limit: int = QUEUE_REBUILD_PAGE) -> bool:
+        """
+        Add the next page of *pairs* to handle into the queue.
+        Return False once all of them are queued.
+        """
+        if not self.queue_manager:
+            return False
+
+        with self.lock:
             c = self._get_write_connection().cursor()
 
-            # Order by path to be sure to process parents before children.
+            # Order by path to be sure to process parents before children, pages are
+            # read from the last queued (path, id) to use the StatesToSync index.
             # Note: filter out Direct Transfer pairs when the associated session is not ongoing
             #       (it will generate potentially a lot of work for nothing as such pairs
             #        will be skipped in the Processor then)
+            # Only the needed columns are selected, as plain tuples: the queue can
+            # be rebuilt from millions of rows, paths are compared as stored.
+            c.row_factory = None
+            after = self._rebuild_after
+            args: List[Any] = [TransferStatus.ONGOING.value]
+            if after is None:
+                keyset = ""
+            elif after[0] is None:
+                # NULL paths come first
+                keyset = "AND (local_path IS NOT NULL OR id > ?)"
+                args.append(after[1])
+            else:
+                keyset = "AND local_path >= ? AND (local_path > ? OR id > ?)"
+                args.extend((after[0], after[0], after[1]))
             query = (
-                "SELECT * FROM States"
-                f"   WHERE {self._get_to_sync_condition()}"
-                "      AND (session = 0"  # Pure synchronization transfers
-                "           OR session IN (SELECT uid FROM Sessions WHERE status = ?))"
-                " ORDER BY local_path ASC"
+                "SELECT id, folderish, pair_state, local_path, local_parent_path"
+                "  FROM States"
+                f" WHERE {self._get_to_sync_condition()}"
+                "   AND (session = 0"  # Pure synchronization transfers
+                "        OR session IN (SELECT uid FROM Sessions WHERE status = ?))"
+                f"  {keyset}"
+                " ORDER BY local_path ASC, id ASC"
+                " LIMIT ?"
             )
-            pairs = c.execute(query, (TransferStatus.ONGOING.value,)).fetchall()
+            pairs = c.execute(query, (*args, limit)).fetchall()
 
-            folders = {}
-            for pair in pairs:
+            folders = self._rebuild_folders
+            for row_id, folderish, pair_state, local_path, local_parent_path in pairs:
                 # Add all the folders
-                if pair.folderish:
-                    folders[pair.local_path] = True
-                if pair.local_parent_path not in folders:
-                    self.queue_manager.push_ref(
-                        pair.id, pair.folderish, pair.pair_state
-                    )
+                if folderish:
+                    folders.add(local_path)
+                if local_parent_path not in folders:
+                    self.queue_manager.push_ref(row_id, folderish, pair_state)
+
+            if pairs:
+                self._rebuild_after = (pairs[-1][3], pairs[-1][0])
+            if len(pairs) < limit:
+                self._rebuild_folders = set()
+                return False
+            return True
 
     def _queue_pair_state(
         self, row_id: int, folderish: bool, pair_state: str, /, *, pair: DocPair = None
@@ -1128,21 +1277,26 @@ def get_new_remote_children(self, ref: str, /) -> DocPairs:
         ).fetchall()
 
     def get_unsynchronized_count(self) -> int:
-        return self.get_count("pair_state = 'unsynchronized'")
+        return self.get_counters()["unsynchronized"]
 
     def get_conflict_count(self) -> int:
-        return self.get_count("pair_state = 'conflicted'")
+        return self.get_counters()["conflicted"]
 
-    def get_error_count(self, *, threshold: int = 3) -> int:
+    def get_error_count(self, *, threshold: int = COUNTERS_ERROR_THRESHOLD) -> int:
+        if threshold == COUNTERS_ERROR_THRESHOLD:
+            return self.get_counters()["errors"]
         return self.get_count(f"error_count > {threshold}")
 
-    def get_syncing_count(self, *, threshold: int = 3) -> int:
-        count = self.get_count(
-            "     pair_state != 'synchronized' "
-            " AND pair_state != 'conflicted' "
-            " AND pair_state != 'unsynchronized' "
-            f"AND error_count < {threshold}"
-        )
+    def get_syncing_count(self, *, threshold: int = COUNTERS_ERROR_THRESHOLD) -> int:
+        if threshold == COUNTERS_ERROR_THRESHOLD:
+            count = self.get_counters()["syncing"]
+        else:
+            count = self.get_count(
+                "     pair_state != 'synchronized' "
+                " AND pair_state != 'conflicted' "
+                " AND pair_state != 'unsynchronized' "
+                f"AND error_count < {threshold}"
+            )
         if self._items_count != count:
             log.debug(
                 f"Cache syncing count updated from {self._items_count} to {count}"
@@ -1151,12 +1305,15 @@ def get_syncing_count(self, *, threshold: int = 3) -> int:
         return count
 
     def get_sync_count(self, *, filetype: str = None) -> int:
-        conditions = {"file": "AND folderish = 0", "folder": "AND folderish = 1"}
-        condition = conditions.get(filetype or "", "")
-        return self.get_count(f"pair_state = 'synchronized' {condition}")
+        counters = self.get_counters()
+        if filetype == "file":
+            return counters["synced_files"]
+        if filetype == "folder":
+            return counters["synced_folders"]
+        return counters["synced"]
 
     def get_dt_items_count(self) -> int:
-        return self.get_count("local_state = 'direct'")
+        return self.get_counters()["direct"]
 
     def get_count(self, condition: str, *, table: str = "States") -> int:
         query = f"SELECT COUNT(*) as count FROM {table}"
@@ -1166,37 +1323,70 @@ def get_count(self, condition: str, *, table: str = "States") -> int:
         return int(c.execute(query).fetchone().count)
 
     def get_global_size(self) -> int:
-        c = self._get_read_connection().cursor()
-        total = (
-            c.execute(
-                "SELECT SUM(size) as sum"
-                "  FROM States"
-                " WHERE folderish = 0"
-                "   AND pair_state = 'synchronized'"
-            )
-            .fetchone()
-            .sum
-        )
-        # `total` may be `None` if there is not synced files,
-        # so we ensure to have an int at the end
-        return total or 0
+        return self.get_counters()["synced_size"]
 
-    def get_unsynchronizeds(self) -> DocPairs:
+    def get_unsynchronizeds(self, *, after: int = 0, size: int = -1) -> DocPairs:
+        """See get_conflicts() for the paging arguments."""
         c = self._get_read_connection().cursor()
         return c.execute(
             "SELECT * FROM States WHERE pair_state = 'unsynchronized'"
+            " AND id > ? ORDER BY id LIMIT ?",
+            (after, size),
         ).fetchall()
 
-    def get_conflicts(self) -> DocPairs:
+    def get_conflicts(self, *, after: int = 0, size: int = -1) -> DocPairs:
+        """
+        Results are ordered by ID and can be paged: only rows with an ID greater
+        than *after* are returned, at most *size* of them (-1 means no limit).
+        """
         c = self._get_read_connection().cursor()
         return c.execute(
             "SELECT * FROM States WHERE pair_state = 'conflicted'"
+            " AND id > ? ORDER BY id LIMIT ?",
+            (after, size),
         ).fetchall()
 
-    def get_errors(self, *, limit: int = 3) -> DocPairs:
+    def get_errors(self, *, limit: int = 3, after: int = 0, size: int = -1) -> DocPairs:
+        """See get_conflicts() for the paging arguments."""
         c = self._get_read_connection().cursor()
         return c.execute(
-            "SELECT * FROM States WHERE error_count > ?", (limit,)
+            "SELECT * FROM States WHERE error_count > ? AND id > ? ORDER BY id LIMIT ?",
+            (limit, after, size),
+        ).fetchall()
+
+    def get_new_remote_children_names(self, ref: str, /) -> Set[str]:
+        """Names of remote children of *ref* not yet created locally."""
+        c = self._get_read_connection().cursor()
+        c.row_factory = None
+        return {
+            name
+            for name, in c.execute(
+                "SELECT remote_name"
+                "  FROM States"
+                " WHERE remote_parent_ref = ?"
+                "   AND remote_state = 'created'"
+                "   AND local_state = 'unknown'",
+                (ref,),
+            )
+        }
+
+    def get_locally_changed_pairs(self, row_id: int, /, *, limit: int) -> DocPairs:
+        """
+        Pairs changed locally and known remotely, queued from *row_id*.
+        Only the columns describing the recorded remote state are selected.
+        """
+        c = self._get_read_connection().cursor()
+        return c.execute(
+            "SELECT id, folderish, pair_state, remote_ref, remote_parent_ref,"
+            "       remote_name, remote_digest, last_remote_updated"
+            "  FROM States"
+            " WHERE id >= ?"
+            "   AND pair_state LIKE 'locally%'"
+            "   AND remote_ref IS NOT NULL"
+            "   AND remote_ref != ''"
+            " ORDER BY id"
+            " LIMIT ?",
+            (row_id, limit),
         ).fetchall()
 
     def get_local_children(self, path: Path, /) -> DocPairs:
@@ -1251,6 +1441,31 @@ def get_state_from_remote_with_path(
         ).fetchone()
         return doc_pair
 
+    def get_preflight(self, doc_pair: DocPair, /) -> Preflight:
+        """
+        Return the parent pair of *doc_pair*, as get_normal_state_from_remote() would,
+        and the status of its download and upload in a single statement.
+        Processors check those before handling every pair.
+        """
+        c = self._get_read_connection().cursor()
+        row: DocPair = c.execute(
+            "SELECT p.*,"
+            "       (SELECT status FROM Downloads WHERE doc_pair = :id)"
+            "           AS preflight_download,"
+            "       (SELECT status FROM Uploads"
+            "         WHERE doc_pair = :id AND is_direct_transfer = 0)"
+            "           AS preflight_upload"
+            "  FROM (SELECT 1)"
+            "  LEFT JOIN States p ON p.remote_ref = :parent_ref"
+            " LIMIT 1",
+            {"id": doc_pair.id, "parent_ref": doc_pair.remote_parent_ref},
+        ).fetchone()
+        return Preflight(
+            row if row["id"] is not None else None,
+            _transfer_status(row["preflight_download"]),
+            _transfer_status(row["preflight_upload"]),
+        )
+
     def get_states_from_remote(self, ref: str, /) -> DocPairs:
         c = self._get_read_connection().cursor()
         return c.execute("SELECT * FROM States WHERE remote_ref = ?", (ref,)).fetchall()
@@ -1533,8 +1748,9 @@ def insert_remote_state(
     def queue_children(self, row: DocPair, /) -> None:
         with self.lock:
             c = self._get_write_connection().cursor()
-            children: List[DocPair] = c.execute(
-                "SELECT *"
+            c.row_factory = _queue_item
+            children: List[QueueItem] = c.execute(
+                "SELECT id, folderish, pair_state"
                 "  FROM States"
                 " WHERE remote_parent_ref = ?"
                 "    OR local_parent_path = ?"
@@ -1921,7 +2137,7 @@ def is_path_scanned(self, path: str, /) -> bool:
 
     def is_filter(self, path: str, /) -> bool:
         path = self._clean_filter_path(path)
-        return any(path.startswith(_filter) for _filter in self._filters)
+        return self._filters.covers(path)
 
     def get_filters(self) -> Filters:
         c = self._get_read_connection().cursor()
@@ -1947,7 +2163,8 @@ def add_filter(self, path: str, /) -> None:
 
             # TODO: Add this path as remotely_deleted?
 
-            self._filters = self.get_filters()
+            # Deleted subfilters are covered by the new one
+            self._filters.add(path)
             self.get_syncing_count()
 
     def remove_filter(self, path: str, /) -> None:
@@ -1956,9 +2173,92 @@ def remove_filter(self, path: str, /) -> None:
         with self.lock:
             c = self._get_write_connection().cursor()
             c.execute("DELETE FROM Filters WHERE path LIKE ?", (f"{path}%",))
-            self._filters = self.get_filters()
+            self._filters = PathTrie(self.get_filters())
             self.get_syncing_count()
 
+    @staticmethod
+    def _folder_tree_key(ref: str, /) -> str:
+        """
+        Folder pickers use document UIDs while the remote watcher uses file system
+        item IDs ("factory#repository#uid"): only keep the UID. The top level is "".
+        """
+        return ref.rsplit("#", 1)[-1]
+
+    def get_folder_tree(
+        self, kind: str, parent: str, /
+    ) -> Optional[Tuple[List[Dict[str, Any]], int]]:
+        """Return cached children of the *parent* folder and their refresh time."""
+        c = self._get_read_connection().cursor()
+        row = c.execute(
+            "SELECT children, last_refresh FROM FolderTreeCache"
+            " WHERE kind = ? AND parent = ?",
+            (kind, self._folder_tree_key(parent)),
+        ).fetchone()
+        return (json.loads(row.children), row.last_refresh) if row else None
+
+    def set_folder_tree(
+        self, kind: str, parent: str, children: List[Dict[str, Any]], /
+    ) -> None:
+        """Save children of the *parent* folder, fetched from the server."""
+        key = self._folder_tree_key(parent)
+        # Links to children allow to find entries listing a given folder
+        links = {
+            self._folder_tree_key(child.get("uid") or child.get("id") or "")
+            for child in children
+        }
+        links.discard("")
+        with self.lock:
+            c = self._get_write_connection().cursor()
+            c.execute(
+                "INSERT OR REPLACE INTO FolderTreeCache"
+                " (kind, parent, children, last_refresh) VALUES (?, ?, ?, ?)",
+                (kind, key, json.dumps(children), int(time())),
+            )
+            c.execute(
+                "DELETE FROM FolderTreeLinks WHERE kind = ? AND parent = ?",
+                (kind, key),
+            )
+            c.executemany(
+                "INSERT INTO FolderTreeLinks (kind, parent, child) VALUES (?, ?, ?)",
+                [(kind, key, child) for child in links],
+            )
+
+    def invalidate_folder_tree(self, refs: Iterable[str], /) -> int:
+        """
+        Forget cached children of the *refs* folders, and of folders listing one of them.
+        Return the number of dropped entries.
+        """
+        count = 0
+        with self.lock:
+            c = self._get_write_connection().cursor()
+            for key in {self._folder_tree_key(ref) for ref in refs}:
+                # Entries of the folder, in every tree, and entries listing it.
+                # Deletions always match the primary keys, kind first.
+                entries = {(kind, key) for kind in FOLDERS_CACHE_KINDS}
+                entries.update(
+                    (row.kind, row.parent)
+                    for row in c.execute(
+                        "SELECT kind, parent FROM FolderTreeLinks WHERE child = ?",
+                        (key,),
+                    )
+                )
+                c.executemany(
+                    "DELETE FROM FolderTreeCache WHERE kind = ? AND parent = ?",
+                    entries,
+                )
+                count += c.rowcount
+                c.executemany(
+                    "DELETE FROM FolderTreeLinks WHERE kind = ? AND parent = ?",
+                    entries,
+                )
+        return count
+
+    def clear_folder_tree(self) -> None:
+        with self.lock:
+            c = self._get_write_connection().cursor()
+            c.execute("DELETE FROM FolderTreeCache")
+            c.execute("DELETE FROM FolderTreeLinks")
+
     def get_downloads(self) -> Generator[Download, None, None]:
         c = self._get_read_connection().cursor()
         for res in c.execute("SELECT * FROM Downloads").fetchall():
@@ -2254,6 +2554,37 @@ def decrease_session_counts(self, uid: int, /) -> Optional[Session]:
             self.sessionUpdated.emit(False)
             return session
 
+    def set_session_counts(self, uid: int, total: int, /) -> Optional[Session]:
+        """
+        Set the Session *total_items* and *planned_items* counts to *total*,
+        once all its items are planned.
+        Update the status if all files are uploaded.
+        """
+        with self.lock:
+            session = self.get_session(uid)
+            if not session:
+                return None
+
+            session.total_items = session.planned_items = total
+            if session.uploaded_items == session.total_items:
+                session.status = (
+                    TransferStatus.DONE
+                    if session.total_items
+                    else TransferStatus.CANCELLED
+                )
+                sql = (
+                    "UPDATE Sessions SET"
+                    " planned_items = ?, total = ?, status = ?, completed_on = CURRENT_TIMESTAMP"
+                    " WHERE uid = ?"
+                )
+            else:
+                sql = "UPDATE Sessions SET planned_items = ?, total = ?, status = ? WHERE uid = ?"
+
+            c = self._get_write_connection().cursor()
+            c.execute(sql, (total, total, session.status.value, session.uid))
+            self.sessionUpdated.emit(False)
+            return session
+
     def save_session_item(self, session_id: int, item: Dict[str, Any]) -> None:
         """Save the session uploaded item data into the SessionItems table."""
         with self.lock:
@@ -2276,6 +2607,114 @@ def get_session_items(self, session_id: int) -> List[Dict[str, Any]]:
             json.loads(res.data) for res in c.execute(sql, (session_id,)).fetchall()
         ]
 
+    # =========================================================================
+    # History retention
+    # =========================================================================
+
+    def clean_history(
+        self,
+        *,
+        days: Optional[int] = None,
+        archive: Optional[bool] = None,
+        batch: int = DB_MAINTENANCE_BATCH,
+    ) -> int:
+        """
+        Remove finished transfers history older than *days* (see HISTORY_RETENTION),
+        or move it to the archive database when *archive* is True.
+        Rows are handled by *batch*, releasing the lock in-between so that the
+        synchronization is never blocked for long. Return the number of rows.
+        """
+        days = Options.history_retention if days is None else days
+        if days <= 0:
+            return 0
+        archive = Options.history_archive if archive is None else archive
+        age = f"-{days} days"
+
+        if archive:
+            with self.lock:
+                c = self._get_write_connection().cursor()
+                c.execute("ATTACH DATABASE ? AS archive", (str(self.archive_path),))
+
+        count = 0
+        try:
+            for table, condition in HISTORY_RETENTION:
+                count += self._clean_table(
+                    table, condition, (age,) * condition.count("?"), archive, batch
+                )
+        finally:
+            if archive:
+                with self.lock:
+                    c = self._get_write_connection().cursor()
+                    c.execute("DETACH DATABASE archive")
+
+        if count:
+            action = "Archived" if archive else "Removed"
+            log.info(
+                f"{action} {count} rows of transfers history older than {days} days"
+            )
+        return count
+
+    @property
+    def archive_path(self) -> Path:
+        """Database where the expired history is moved to."""
+        return self.db.with_name(f"{self.db.name}.archive")
+
+    def _clean_table(
+        self,
+        table: str,
+        condition: str,
+        params: Tuple[str, ...],
+        archive: bool,
+        batch: int,
+        /,
+    ) -> int:
+        columns = ""
+        if archive:
+            with self.lock:
+                c = self._get_write_connection().cursor()
+                c.execute(
+                    f"CREATE TABLE IF NOT EXISTS archive.{table}"
+                    f" AS SELECT * FROM main.{table} WHERE 0"
+                )
+                archived = {
+                    row.name
+                    for row in c.execute(f"PRAGMA archive.table_info('{table}')")
+                }
+                columns = ", ".join(
+                    col for col in self._get_columns(c, table) if col in archived
+                )
+
+        count = 0
+        while True:
+            with self.lock:
+                c = self._get_write_connection().cursor()
+                rowids = [
+                    row[0]
+                    for row in c.execute(
+                        f"SELECT rowid FROM main.{table} WHERE {condition} LIMIT ?",
+                        (*params, batch),
+                    )
+                ]
+                if not rowids:
+                    break
+                selection = f"rowid IN ({', '.join('?' * len(rowids))})"
+                c.execute("BEGIN")
+                try:
+                    if archive:
+                        c.execute(
+                            f"INSERT INTO archive.{table} ({columns})"
+                            f" SELECT {columns} FROM main.{table} WHERE {selection}",
+                            rowids,
+                        )
+                    c.execute(f"DELETE FROM main.{table} WHERE {selection}", rowids)
+                except Exception:
+                    c.execute("ROLLBACK")
+                    raise
+                c.execute("COMMIT")
+            count += len(rowids)
+            sleep(DB_MAINTENANCE_PAUSE)
+        return count
+
     # =========================================================================
     # Direct Downloads CRUD
     # =========================================================================
@@ -2699,16 +3138,40 @@ def update_direct_download_progress(
         progress_percent: float,
         /,
     ) -> None:
-        """Update just the progress fields of a direct download."""
+        """
+        Update just the progress fields of a direct download.
+        A *total_bytes* of 0 means unknown: the stored total is kept.
+        """
         with self.lock:
             c = self._get_write_connection().cursor()
             sql = (
                 "UPDATE DirectDownloads SET "
-                "bytes_downloaded = ?, total_bytes = ?, progress_percent = ? "
+                "bytes_downloaded = ?, "
+                "total_bytes = COALESCE(NULLIF(?, 0), total_bytes), "
+                "progress_percent = ? "
                 "WHERE uid = ?"
             )
             c.execute(sql, (bytes_downloaded, total_bytes, progress_percent, uid))
 
+    def update_direct_download_size(
+        self,
+        uid: int,
+        total_bytes: int,
+        folder_count: int,
+        file_count: int,
+        /,
+    ) -> None:
+        """Update just the size fields of a direct download, once they are computed."""
+        with self.lock:
+            c = self._get_write_connection().cursor()
+            sql = (
+                "UPDATE DirectDownloads SET "
+                "doc_size = ?, total_bytes = ?, folder_count = ?, file_count = ? "
+                "WHERE uid = ?"
+            )
+            c.execute(sql, (total_bytes, total_bytes, folder_count, file_count, uid))
+            self.directDownloadUpdated.emit()
+
     def update_direct_download_status(
         self,
         uid: int,
@@ -2850,6 +3313,21 @@ def _get_upload_with_func(
         res = [u for u in func() if getattr(u, key) == value]
         return res[0] if res else None
 
+    def _transfer_changed(
+        self,
+        nature: str,
+        action: str,
+        /,
+        *,
+        uid: int = 0,
+        is_direct_transfer: bool = False,
+        **values: Any,
+    ) -> None:
+        """Notify the GUI of a row-level change of the transfers tables."""
+        self.transferChanged.emit(
+            TransferChange(nature, action, uid, is_direct_transfer, values)
+        )
+
     def save_download(self, download: Download, /) -> None:
         """New download."""
         with self.lock:
@@ -2870,7 +3348,7 @@ def save_download(self, download: Download, /) -> None:
                 download.url,
             )
             c.execute(sql, values)
-            self.transferUpdated.emit()
+            self._transfer_changed("download", "insert", uid=c.lastrowid)
 
     def save_upload(self, upload: Upload, /) -> None:
         """New upload."""
@@ -2904,10 +3382,12 @@ def save_upload(self, upload: Upload, /) -> None:
             # Important: update the upload UID attr
             upload.uid = int(c.execute("SELECT last_insert_rowid()").fetchone()[0])
 
-            if upload.is_direct_transfer:
-                self.directTransferUpdated.emit()
-            else:
-                self.transferUpdated.emit()
+            self._transfer_changed(
+                "upload",
+                "insert",
+                uid=upload.uid,
+                is_direct_transfer=upload.is_direct_transfer,
+            )
 
     def save_dt_upload(self, upload: Upload, /) -> None:
         """
@@ -2949,7 +3429,9 @@ def save_dt_upload(self, upload: Upload, /) -> None:
             res = self.get_dt_upload(uid=upload.uid)
             # Upload may be deleted right after creation by session cancel.
             upload.status = res.status if res else TransferStatus.CANCELLED
-            self.directTransferUpdated.emit()
+            self._transfer_changed(
+                "upload", "insert", uid=upload.uid, is_direct_transfer=True
+            )
 
     def update_upload(self, upload: Upload, /) -> None:
         """Update a upload."""
@@ -2997,10 +3479,14 @@ def pause_transfer(
                 query,
                 (TransferStatus.PAUSED.value, progress, uid),
             )
-            if is_direct_transfer:
-                self.directTransferUpdated.emit()
-            else:
-                self.transferUpdated.emit()
+            self._transfer_changed(
+                nature,
+                "update",
+                uid=uid,
+                is_direct_transfer=is_direct_transfer,
+                status=TransferStatus.PAUSED,
+                progress=progress,
+            )
 
     def suspend_transfers(self) -> None:
         with self.lock:
@@ -3018,8 +3504,8 @@ def suspend_transfers(self) -> None:
             if rows + c.rowcount == 0:
                 return
 
-            self.transferUpdated.emit()
-            self.directTransferUpdated.emit()
+            self._transfer_changed("download", "reset")
+            self._transfer_changed("upload", "reset")
 
     def resume_transfer(
         self, nature: str, uid: int, /, *, is_direct_transfer: bool = False
@@ -3035,10 +3521,13 @@ def resume_transfer(
                 query,
                 (TransferStatus.ONGOING.value, uid),
             )
-            if is_direct_transfer:
-                self.directTransferUpdated.emit()
-            else:
-                self.transferUpdated.emit()
+            self._transfer_changed(
+                nature,
+                "update",
+                uid=uid,
+                is_direct_transfer=is_direct_transfer,
+                status=TransferStatus.ONGOING,
+            )
 
     def resume_session(self, uid: int, /) -> None:
         """Resume all transfers for given session."""
@@ -3075,7 +3564,7 @@ def resume_session(self, uid: int, /) -> None:
             # Finally, push all transfers in the queue
             for doc_pair in rows:
                 self.queue_manager.push(doc_pair)
-            self.directTransferUpdated.emit()
+            self._transfer_changed("upload", "reset", is_direct_transfer=True)
 
     def pause_session(self, uid: int, /) -> None:
         """Pause all transfers for given session."""
@@ -3086,7 +3575,7 @@ def pause_session(self, uid: int, /) -> None:
                 "UPDATE Uploads SET status = ? WHERE doc_pair IN (SELECT id FROM States WHERE session = ?)",
                 (TransferStatus.PAUSED.value, uid),
             )
-            self.directTransferUpdated.emit()
+            self._transfer_changed("upload", "reset", is_direct_transfer=True)
 
     def cancel_session(self, uid: int, /) -> List[Dict[str, Any]]:
         """
@@ -3115,7 +3604,7 @@ def cancel_session(self, uid: int, /) -> List[Dict[str, Any]]:
                     uid,
                 ),
             )
-            self.directTransferUpdated.emit()
+            self._transfer_changed("upload", "reset", is_direct_transfer=True)
             self.sessionUpdated.emit(False)
             return batchs
 
@@ -3184,7 +3673,13 @@ def set_transfer_status(
                 query,
                 (transfer.status.value, transfer.uid),
             )
-            self.directTransferUpdated.emit()
+            self._transfer_changed(
+                nature,
+                "update",
+                uid=transfer.uid or 0,
+                is_direct_transfer=transfer.is_direct_transfer,
+                status=transfer.status,
+            )
 
     def remove_transfer(
         self,
@@ -3224,10 +3719,9 @@ def remove_transfer(
             if c.rowcount == 0:
                 return
 
-            if is_direct_transfer:
-                self.directTransferUpdated.emit()
-            else:
-                self.transferUpdated.emit()
+            self._transfer_changed(
+                nature, "remove", is_direct_transfer=is_direct_transfer
+            )
 
     @staticmethod
     def _escape(text: str, /) -> str:
@@ -0,0 +1,42 @@
+"""
+Migration to add the FolderTreeCache table, the remote folder tree used by folder pickers.
+"""
+
+from sqlite3 import Cursor
+
+from ..migration import MigrationInterface
+
+
+class MigrationFolderTreeCache(MigrationInterface):
+    """Migration to create the FolderTreeCache table."""
+
+    def upgrade(self, cursor: Cursor) -> None:
+        """
+        Create the FolderTreeCache table.
+        """
+        cursor.execute(
+            "CREATE TABLE IF NOT EXISTS FolderTreeCache ("
+            "    kind           VARCHAR     NOT NULL,"
+            "    parent         VARCHAR     NOT NULL,"
+            "    children       VARCHAR     NOT NULL,"
+            "    last_refresh   INTEGER     NOT NULL,"
+            "    PRIMARY KEY (kind, parent)"
+            ")"
+        )
+
+    def downgrade(self, cursor: Cursor) -> None:
+        """
+        Drop the FolderTreeCache table.
+        """
+        cursor.execute("DROP TABLE IF EXISTS FolderTreeCache")
+
+    @property
+    def version(self) -> int:
+        return 25
+
+    @property
+    def previous_version(self) -> int:
+        return 24
+
+
+migration = MigrationFolderTreeCache()
@@ -0,0 +1,38 @@
+"""
+Migration to add the StatesCounters table, materialized counters of the States table.
+"""
+
+from sqlite3 import Cursor
+
+from ...counters import compute_counters, create_triggers, store_counters
+from ..migration import MigrationInterface
+
+
+class MigrationStatesCounters(MigrationInterface):
+    """Migration to create the StatesCounters table and its triggers."""
+
+    def upgrade(self, cursor: Cursor) -> None:
+        """
+        Create the StatesCounters table, its triggers, and compute initial counters.
+        """
+        create_triggers(cursor)
+        store_counters(cursor, compute_counters(cursor))
+
+    def downgrade(self, cursor: Cursor) -> None:
+        """
+        Drop the StatesCounters table and its triggers.
+        """
+        for action in ("Insert", "Update", "Delete"):
+            cursor.execute(f"DROP TRIGGER IF EXISTS StatesCounters{action}")
+        cursor.execute("DROP TABLE IF EXISTS StatesCounters")
+
+    @property
+    def version(self) -> int:
+        return 26
+
+    @property
+    def previous_version(self) -> int:
+        return 25
+
+
+migration = MigrationStatesCounters()
@@ -0,0 +1,37 @@
+"""
+Migration to add the StatesToSync index, the pairs to handle ordered by local path.
+"""
+
+from sqlite3 import Cursor
+
+from ..migration import MigrationInterface
+
+
+class MigrationStatesToSyncIndex(MigrationInterface):
+    """Migration to create the StatesToSync partial index."""
+
+    def upgrade(self, cursor: Cursor) -> None:
+        """
+        Create the StatesToSync index, it only holds pairs to handle.
+        """
+        cursor.execute(
+            "CREATE INDEX IF NOT EXISTS StatesToSync ON States (local_path, id)"
+            " WHERE pair_state NOT IN ('synchronized', 'unsynchronized')"
+        )
+
+    def downgrade(self, cursor: Cursor) -> None:
+        """
+        Drop the StatesToSync index.
+        """
+        cursor.execute("DROP INDEX IF EXISTS StatesToSync")
+
+    @property
+    def version(self) -> int:
+        return 27
+
+    @property
+    def previous_version(self) -> int:
+        return 26
+
+
+migration = MigrationStatesToSyncIndex()
@@ -0,0 +1,46 @@
+"""
+Migration to add the FolderTreeLinks table, the children listed by FolderTreeCache entries.
+"""
+
+from sqlite3 import Cursor
+
+from ..migration import MigrationInterface
+
+
+class MigrationFolderTreeLinks(MigrationInterface):
+    """Migration to create the FolderTreeLinks table."""
+
+    def upgrade(self, cursor: Cursor) -> None:
+        """
+        Create the FolderTreeLinks table and its index on children.
+        Cached entries have no links yet, they are dropped and will be fetched again.
+        """
+        cursor.execute(
+            "CREATE TABLE IF NOT EXISTS FolderTreeLinks ("
+            "    kind     VARCHAR     NOT NULL,"
+            "    parent   VARCHAR     NOT NULL,"
+            "    child    VARCHAR     NOT NULL,"
+            "    PRIMARY KEY (kind, parent, child)"
+            ")"
+        )
+        cursor.execute(
+            "CREATE INDEX IF NOT EXISTS FolderTreeLinksChild ON FolderTreeLinks (child)"
+        )
+        cursor.execute("DELETE FROM FolderTreeCache")
+
+    def downgrade(self, cursor: Cursor) -> None:
+        """
+        Drop the FolderTreeLinks table.
+        """
+        cursor.execute("DROP TABLE IF EXISTS FolderTreeLinks")
+
+    @property
+    def version(self) -> int:
+        return 28
+
+    @property
+    def previous_version(self) -> int:
+        return 27
+
+
+migration = MigrationFolderTreeLinks()
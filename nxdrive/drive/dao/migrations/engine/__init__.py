@@ -8,6 +8,10 @@
     "0022_initial_migration",
     "0023_direct_downloads",
     "0024_add_scheduled_at",
+    "0025_folder_tree_cache",
+    "0026_states_counters",
+    "0027_states_to_sync_index",
+    "0028_folder_tree_links",
 ]  # Keep sorted
 
 
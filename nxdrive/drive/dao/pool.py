@@ -0,0 +1,122 @@
+"""
+Pool of read connections of a database.
+
+Each thread reading the database needs its own connection. Threads are often
+short-lived (executor workers, runnables of the Qt thread pool), and used to open
+a new connection each, losing its page cache and prepared statements on exit.
+Connections are now leased to threads for their lifetime: when a thread ends,
+its connection goes back to the pool and the next thread reuses it.
+
+The pool is bounded by the number of idle connections it keeps: leasing never
+blocks, as a thread holds its connection until its end, and connections released
+while the pool is full are closed.
+"""
+
+from contextlib import suppress
+from logging import getLogger
+from sqlite3 import Connection
+from threading import Lock
+from typing import Callable, Dict, List
+
+from ..constants import DB_POOL_SIZE
+
+__all__ = ("ConnectionPool",)
+
+log = getLogger(__name__)
+
+
+class Lease:
+    """Give the *connection* back to the *pool* when it is garbage collected."""
+
+    __slots__ = ("pool", "connection")
+
+    def __init__(self, pool: "ConnectionPool", connection: Connection, /) -> None:
+        self.pool = pool
+        self.connection = connection
+
+    def __del__(self) -> None:
+        # Called on thread exit, when its local storage is released
+        with suppress(Exception):
+            self.pool.release(self.connection)
+
+
+class ConnectionPool:
+    def __init__(
+        self, factory: Callable[[], Connection], /, *, size: int = DB_POOL_SIZE
+    ) -> None:
+        self._factory = factory
+        self.size = size
+        self._idle: List[Connection] = []
+        self._lock = Lock()
+        self._closed = False
+
+        self.created = 0
+        self.reused = 0
+        self.discarded = 0
+        self.in_use = 0
+
+    def acquire(self) -> Connection:
+        """Return an idle connection, or a new one if there is none."""
+        with self._lock:
+            self.in_use += 1
+            if self._idle:
+                self.reused += 1
+                return self._idle.pop()
+            self.created += 1
+
+        try:
+            return self._factory()
+        except Exception:
+            with self._lock:
+                self.in_use -= 1
+                self.created -= 1
+            raise
+
+    def lease(self) -> Lease:
+        """Acquire a connection, released when the returned lease is collected."""
+        return Lease(self, self.acquire())
+
+    def release(self, connection: Connection, /) -> None:
+        """Keep the *connection* for another thread, or close it if the pool is full."""
+        with self._lock:
+            self.in_use -= 1
+            keep = not self._closed and len(self._idle) < self.size
+            if keep:
+                self._idle.append(connection)
+            else:
+                self.discarded += 1
+
+        if not keep:
+            connection.close()
+
+    def close(self) -> None:
+        """Close idle connections; leased ones will be closed on release."""
+        with self._lock:
+            self._closed = True
+            idle, self._idle = self._idle, []
+
+        for connection in idle:
+            connection.close()
+        if idle:
+            log.debug(f"Closed {len(idle)} idle database connections")
+
+    def metrics(self) -> Dict[str, int]:
+        """
+        Return usage metrics of the pool.
+
+        - db_pool_size: maximum idle connections kept
+        - db_connections: connections opened since the start
+        - db_reused: connections leased again after a thread ended
+        - db_discarded: connections closed because the pool was full
+        - db_idle: connections waiting for a thread
+        - db_in_use: connections leased to living threads
+        """
+        with self._lock:
+            return {
+                "db_pool_size": self.size,
+                "db_connections": self.created,
+                "db_reused": self.reused,
+                "db_discarded": self.discarded,
+                "db_idle": len(self._idle),
+                "db_in_use": self.in_use,
+            }
@@ -4,22 +4,49 @@
 from os import fsync
 from pathlib import Path
 from shutil import copyfile
-
-__all__ = ("fix_db", "restore_backup", "save_backup")
+from time import monotonic, sleep
+
+from ..constants import (
+    DB_BACKUP_GENERATIONS,
+    DB_BACKUP_PAGES,
+    DB_BACKUP_PAUSE,
+    DB_CHECK_BUDGET,
+    DB_CHECK_PAUSE,
+)
+
+__all__ = (
+    "fix_db",
+    "is_readable",
+    "quick_check",
+    "restore_backup",
+    "save_backup",
+)
 
 log = getLogger(__name__)
 
+# Restarts of a step by step backup, because of concurrent writes, before copying
+# the whole database in one step
+BACKUP_MAX_RESTARTS = 3
+
+
+class BackupRestarted(Exception):
+    """The source database changed too many times during a step by step backup."""
 
-def is_healthy(database: Path, /) -> bool:
+
+def is_healthy(database: Path, /, *, quick: bool = False) -> bool:
     """
     Integrity check of the entire database.
     http://www.sqlite.org/pragma.html#pragma_integrity_check
+
+    The *quick* check skips the verification of indexes content, it is
+    much faster on big databases.
     """
 
-    log.info(f"Checking database integrity: {database!r}")
+    check = "quick_check" if quick else "integrity_check"
+    log.info(f"Checking database integrity ({check}): {database!r}")
     con = sqlite3.connect(str(database))
     try:
-        status = con.execute("PRAGMA integrity_check(1)").fetchone()
+        status = con.execute(f"PRAGMA {check}(1)").fetchone()
         return status[0] == "ok"
     finally:
         # According to the documentation:
@@ -28,6 +55,70 @@ def is_healthy(database: Path, /) -> bool:
         con.close()
 
 
+def is_readable(database: Path, /) -> bool:
+    """
+    Check that the *database* header and schema can be read. It is immediate,
+    the content is verified later by quick_check().
+    """
+    con = sqlite3.connect(str(database))
+    try:
+        con.execute("SELECT count(*) FROM sqlite_master").fetchone()
+        return True
+    except sqlite3.OperationalError:
+        raise
+    except sqlite3.DatabaseError:
+        log.warning(f"Cannot read the database {database!r}", exc_info=True)
+        return False
+    finally:
+        con.close()
+
+
+def quick_check(
+    database: Path,
+    /,
+    *,
+    budget: float = DB_CHECK_BUDGET,
+    pause: float = DB_CHECK_PAUSE,
+) -> bool:
+    """
+    Quick check of the *database*, table by table, while it is in use.
+    http://www.sqlite.org/pragma.html#pragma_quick_check
+
+    Tables are checked for *budget* seconds, then the database is released for
+    *pause* seconds. SQLite < 3.33 cannot check one table at a time: the whole
+    database is checked at once.
+    """
+    log.info(f"Checking database integrity (quick_check by table): {database!r}")
+    con = sqlite3.connect(str(database))
+    try:
+        if sqlite3.sqlite_version_info < (3, 33, 0):
+            checks = ["PRAGMA quick_check(1)"]
+        else:
+            tables = con.execute("SELECT name FROM sqlite_master WHERE type = 'table'")
+            checks = [
+                f"""PRAGMA quick_check("{name.replace('"', '""')}")"""
+                for name, in tables.fetchall()
+            ]
+
+        started = monotonic()
+        for index, check in enumerate(checks):
+            if index and monotonic() - started >= budget:
+                sleep(pause)
+                started = monotonic()
+            status = con.execute(check).fetchone()
+            if status[0] != "ok":
+                log.warning(f"{database!r} integrity error: {status[0]}")
+                return False
+        return True
+    except sqlite3.OperationalError:
+        raise
+    except sqlite3.DatabaseError:
+        log.warning(f"Cannot check the database {database!r}", exc_info=True)
+        return False
+    finally:
+        con.close()
+
+
 def dump(database: Path, dump_file: Path, /) -> None:
     """
     Dump the entire database content into `dump_file`.
@@ -139,37 +230,92 @@ def restore_backup(database: Path, /) -> bool:
     return True
 
 
-def save_backup(database: Path, /) -> bool:
+def _backup(source: Path, target: Path, /, *, pages: int, pause: float) -> None:
+    """
+    Copy the *source* database into *target* with the online backup API.
+
+    *pages* are copied at once, then the source is released for *pause* seconds.
+    Writes from other connections restart the copy from the start: when it
+    happens too often, the whole database is copied in one step. Readers do
+    not block writers in WAL mode, so it is still an online backup.
+    """
+    remaining_pages = -1
+    restarts = 0
+
+    def progress(status: int, remaining: int, total: int) -> None:
+        nonlocal remaining_pages, restarts
+        if remaining_pages != -1 and remaining >= remaining_pages:
+            restarts += 1
+            if restarts > BACKUP_MAX_RESTARTS:
+                raise BackupRestarted()
+        remaining_pages = remaining
+        sleep(pause)
+
+    src = sqlite3.connect(str(source))
+    try:
+        dst = sqlite3.connect(str(target))
+        try:
+            try:
+                src.backup(dst, pages=pages, progress=progress)
+            except BackupRestarted:
+                log.info(f"{source} is too busy, backing it up in one step")
+                src.backup(dst)
+        finally:
+            dst.close()
+    finally:
+        src.close()
+
+
+def save_backup(
+    database: Path,
+    /,
+    *,
+    generations: int = DB_BACKUP_GENERATIONS,
+    pages: int = DB_BACKUP_PAGES,
+    pause: float = DB_BACKUP_PAUSE,
+) -> bool:
     """
     Save a backup of a given database.
 
     For example, if the path is ~/.nuxeo-drive/manager.db,
     a corresponding ~/.nuxeo-drive/backups/manager.db_1234567890 file
     will be created, where the numbers are the current timestamp.
+
+    The backup is done while the database is in use (see _backup()) and verified
+    with a quick check. Only the last *generations* backups of the last 24 hours
+    are kept.
     """
 
     if not (database and database.is_file()):
         log.info("No database to backup")
         return False
-    if not is_healthy(database):
-        log.info(f"{database} is corrupted, won't backup")
-        return False
 
     backup_folder = database.with_name("backups")
     backup_folder.mkdir(exist_ok=True)
 
-    yesterday = int((datetime.now() - timedelta(days=1)).timestamp())
-    old_backups = [
-        b
-        for b in backup_folder.glob(f"{database.name}_*")
-        if int(b.name.split("_")[-1]) < yesterday
-    ]
-    # Remove older backups
-    for backup in old_backups:
-        log.debug(f"Removing old backup {backup}")
-        backup.unlink(missing_ok=True)
-
+    # Not matching the backups pattern, as long as it is not verified
+    partial = backup_folder / f"{database.name}.partial"
+    partial.unlink(missing_ok=True)
     backup = backup_folder / f"{database.name}_{int(datetime.now().timestamp())}"
     log.info(f"Creating backup {backup}")
-    copyfile(database, backup)
+    try:
+        _backup(database, partial, pages=pages, pause=pause)
+        if not is_healthy(partial, quick=True):
+            log.info(f"{database} is corrupted, won't backup")
+            return False
+        partial.replace(backup)
+    finally:
+        partial.unlink(missing_ok=True)
+
+    # Remove older backups
+    yesterday = int((datetime.now() - timedelta(days=1)).timestamp())
+    backups = sorted(
+        backup_folder.glob(f"{database.name}_*"),
+        key=lambda b: int(b.name.split("_")[-1]),
+        reverse=True,
+    )
+    for idx, old_backup in enumerate(backups):
+        if idx >= generations or int(old_backup.name.split("_")[-1]) < yesterday:
+            log.debug(f"Removing old backup {old_backup}")
+            old_backup.unlink(missing_ok=True)
     return True
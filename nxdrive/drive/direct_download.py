@@ -7,24 +7,28 @@
 """
 
 import os
+import re
 import shutil
 import time
 import uuid
 import zipfile
 from concurrent.futures import ThreadPoolExecutor
+from contextlib import suppress
 from dataclasses import dataclass, field
 from datetime import datetime
+from itertools import count
 from logging import getLogger
 from pathlib import Path
-from threading import Lock
-from typing import TYPE_CHECKING, Any, Dict, List, Optional
+from threading import Lock, Thread
+from typing import TYPE_CHECKING, Any, Callable, Dict, List, Optional, Set, Tuple
 
 from nxdrive.drive.constants import APP_NAME, DirectDownloadStatus
+from nxdrive.drive.engine.transfer_scheduler import DIRECT_DOWNLOAD, transfers
 from nxdrive.drive.engine.workers import Worker
 from nxdrive.drive.objects import DirectDownload as DirectDownloadRecord
 from nxdrive.drive.options import Options
 from nxdrive.drive.qt.imports import pyqtSignal, pyqtSlot
-from nxdrive.drive.utils import simplify_url
+from nxdrive.drive.utils import guess_mimetype, simplify_url
 
 if TYPE_CHECKING:
     from concurrent.futures import Future  # noqa
@@ -36,6 +40,12 @@
 
 log = getLogger(__name__)
 
+# How many times per second the progress of downloads is saved and sent to the GUI
+PROGRESS_FLUSH_RATE = 2
+
+# Longest wait for each background task when stopping, in seconds
+TASK_JOIN_TIMEOUT = 5.0
+
 
 # Re-export ``DownloadPaused`` so callers of the Direct-Download layer
 # (including the Nuxeo subclass) can grab both the worker class and the
@@ -45,7 +55,87 @@
 # the user pauses a mid-flight transfer and is caught in
 # :meth:`DirectDownload._run_doc`, which releases the executor thread
 # so the pool stays healthy while the record waits for a Resume click.
-from nxdrive.drive.exceptions import DownloadPaused  # noqa: E402
+from nxdrive.drive.exceptions import DownloadPaused, ThreadInterrupt  # noqa: E402
+
+# Files of those types are already compressed, deflating them again is a waste of CPU
+_STORED_MIMETYPE_PREFIXES = (
+    "audio/",
+    "image/",
+    "video/",
+    "application/vnd.oasis.opendocument.",
+    "application/vnd.openxmlformats-officedocument.",
+)
+_DEFLATED_MIMETYPES = (
+    "audio/wav",
+    "audio/x-wav",
+    "image/bmp",
+    "image/svg+xml",
+    "image/tiff",
+    "image/x-ms-bmp",
+)
+_STORED_MIMETYPES = (
+    "application/epub+zip",
+    "application/gzip",
+    "application/java-archive",
+    "application/vnd.rar",
+    "application/x-7z-compressed",
+    "application/x-bzip2",
+    "application/x-compressed",
+    "application/x-gzip",
+    "application/x-rar-compressed",
+    "application/x-xz",
+    "application/x-zip-compressed",
+    "application/zip",
+    "application/zstd",
+)
+
+
+def _compression_for(path: Path, /) -> int:
+    """Return the zip compression method to use for the given file."""
+    mimetype = guess_mimetype(path.name)
+    if mimetype in _DEFLATED_MIMETYPES:
+        return zipfile.ZIP_DEFLATED
+    if mimetype in _STORED_MIMETYPES or mimetype.startswith(_STORED_MIMETYPE_PREFIXES):
+        return zipfile.ZIP_STORED
+    return zipfile.ZIP_DEFLATED
+
+
+class _StreamingArchive:
+    """
+    Zip archive filled while the batch is still downloading.
+
+    The archive is written straight into the download destination, under
+    a ".part" name until :meth:`close` renames it. Each file is removed
+    from the batch folder as soon as it is in the archive, so a batch
+    never takes twice its size on disk. The archive does not survive an
+    application restart: the batch is then downloaded again.
+    """
+
+    def __init__(self, path: Path, /) -> None:
+        self.path = path
+        self.part = path.with_name(f"{path.name}.part")
+        self.lock = Lock()
+        self._zip = zipfile.ZipFile(self.part, "w", zipfile.ZIP_DEFLATED)
+
+    def add(self, file_path: Path, arcname: Path, /) -> None:
+        """Append *file_path* to the archive and delete it."""
+        with self.lock:
+            self._zip.write(
+                file_path, arcname, compress_type=_compression_for(file_path)
+            )
+        file_path.unlink(missing_ok=True)
+
+    def close(self) -> Path:
+        """Write the central directory and give the archive its final name."""
+        with self.lock:
+            self._zip.close()
+        return self.part.replace(self.path)
+
+    def discard(self) -> None:
+        """Drop a partial archive."""
+        with self.lock:
+            self._zip.close()
+        self.part.unlink(missing_ok=True)
 
 
 @dataclass
@@ -69,6 +159,9 @@ class _Batch:
     selected_items_str: str = ""
     finalized: bool = False
     lock: Lock = field(default_factory=Lock)
+    # Created on the first completed file of a batch that has to be archived
+    archive: Optional[_StreamingArchive] = None
+    archive_lock: Lock = field(default_factory=Lock)
 
 
 class DirectDownload(Worker):
@@ -124,9 +217,30 @@ def __init__(
         self._batches: Dict[str, _Batch] = {}
         self._batches_lock = Lock()
 
+        # Latest progress of each download, by record UID. Workers only set
+        # items (atomic), it is saved and sent to the GUI by _flush_progress().
+        # Values are numbered so that a flush never saves an older one than the
+        # last saved, flushes run from this thread and from workers.
+        self._progress: Dict[int, Tuple[Any, ...]] = {}
+        self._progress_seq = count(1)
+        self._flushed_seq: Dict[int, int] = {}
+        self._flush_lock = Lock()
+        self._last_progress_flush = 0.0
+        # Bytes of the files already downloaded by each folder record, the progress
+        # of its current file is added to it
+        self._downloaded: Dict[int, int] = {}
+
+        # Records paused or cancelled by the user, checked for each chunk
+        self._paused: Set[int] = set()
+        self._cancelled: Set[int] = set()
+
         # Ensure persisted active downloads are requeued only once per app run.
         self._resumed_persisted_downloads = False
 
+        # Background tasks of downloads, see _start_task(). Joined by stop().
+        self._tasks: Set[Thread] = set()
+        self._tasks_lock = Lock()
+
         # Ensure the download folder exists
         self._folder.mkdir(parents=True, exist_ok=True)
         log.info(f"Direct Download folder: {self._folder}")
@@ -284,6 +398,7 @@ def resume_persisted_downloads(self) -> None:
         self._resumed_persisted_downloads = True
 
         batches: Dict[str, List[Dict[str, Any]]] = {}
+        records: Dict[str, List[Tuple["Engine", int]]] = {}
         resumed_count = 0
 
         for engine in self._manager.engines.copy().values():
@@ -326,9 +441,16 @@ def resume_persisted_downloads(self) -> None:
                         "_batch_folder": record.zip_file,
                     }
                 )
+                records.setdefault(batch_key, []).append((engine, record.uid))
                 resumed_count += 1
 
-        for documents in batches.values():
+        for batch_key, documents in batches.items():
+            if not batch_key.startswith("single:") and self._discard_stale_archive(
+                batch_key
+            ):
+                # Files moved into that archive are downloaded again
+                for engine, uid in records[batch_key]:
+                    engine.dao.update_direct_download_progress(uid, 0, 0, 0.0)
             self._process_batch(documents)
 
         if resumed_count:
@@ -377,8 +499,8 @@ def _execute(self) -> None:
         """Idle loop.
 
         With the worker pool now driving downloads, this thread only
-        exists to honour pause/resume/stop through ``_interact``. It
-        does no work itself.
+        exists to honour pause/resume/stop through ``_interact``, and
+        to flush the progress of downloads at ``PROGRESS_FLUSH_RATE``.
         """
         while not self._stop:
             try:
@@ -387,6 +509,8 @@ def _execute(self) -> None:
                 # ``_interact`` raises ThreadInterrupt on stop — bail
                 # out cleanly instead of spamming the log.
                 return
+            if time.monotonic() - self._last_progress_flush >= 1 / PROGRESS_FLUSH_RATE:
+                self._flush_progress()
             time.sleep(0.1)
 
     # ------------------------------------------------------------------ batch processing
@@ -558,6 +682,9 @@ def _run_doc(self, doc: Dict[str, Any], batch: _Batch, /) -> None:
                 log.info(f"Download {record_uid} cancelled, skipping")
                 return
 
+            # Files of a folder are all walked again
+            self._downloaded.pop(record_uid, None)
+
             try:
                 self._update_download_status(
                     record_uid, DirectDownloadStatus.IN_PROGRESS
@@ -579,9 +706,17 @@ def _run_doc(self, doc: Dict[str, Any], batch: _Batch, /) -> None:
                             "continuing with placeholder metadata"
                         )
 
-                self._process_download(doc, batch.batch_folder)
+                with transfers.slot(
+                    engine.uid if engine else "",
+                    DIRECT_DOWNLOAD,
+                    interrupt=self._check_stop,
+                ):
+                    self._process_download(doc, batch.batch_folder)
                 outcome = "ok"
 
+            except ThreadInterrupt:
+                log.info(f"Download {record_uid} stopped, skipping")
+
             except DownloadPaused:
                 # Mid-transfer pause. Leave the record in PAUSED state
                 # (the DAO was updated when the user clicked pause) and
@@ -638,6 +773,9 @@ def _finalize_batch(self, batch: _Batch, /) -> None:
         """
         record_uids = list(batch.record_uids)
 
+        # Save the last progress before the final status
+        self._flush_progress()
+
         finalizable_uids: List[int] = []
         for uid in record_uids:
             record = self._get_download_record(uid)
@@ -649,6 +787,8 @@ def _finalize_batch(self, batch: _Batch, /) -> None:
             archive_path = self._create_zip_archive(batch.batch_folder)
         else:
             # Nothing transferred — just drop the (possibly empty) batch folder.
+            if batch.archive:
+                batch.archive.discard()
             self._cleanup_batch_folder(batch.batch_folder)
 
         for uid in finalizable_uids:
@@ -667,6 +807,12 @@ def _finalize_batch(self, batch: _Batch, /) -> None:
 
         with self._batches_lock:
             self._batches.pop(batch.batch_id, None)
+        with self._flush_lock:
+            for uid in record_uids:
+                self._flushed_seq.pop(uid, None)
+        for uid in record_uids:
+            self._downloaded.pop(uid, None)
+            self._cancelled.discard(uid)
 
         self.batchCompleted.emit(batch.successful, batch.failed)
 
@@ -680,6 +826,7 @@ def resume_download(self, record_uid: int, /) -> bool:
         Returns ``True`` when a task was submitted, ``False`` if the
         record could not be located or the engine went away.
         """
+        self._paused.discard(record_uid)
         record: Optional[DirectDownloadRecord] = self._get_download_record(record_uid)
         if record is None:
             log.warning(f"Cannot resume download {record_uid}: record not found")
@@ -719,14 +866,80 @@ def resume_download(self, record_uid: int, /) -> bool:
 
     # ------------------------------------------------------------------ zip / destination
 
+    def _file_downloaded(self, file_path: Path, /) -> None:
+        """
+        Hook to call once a file of a batch is fully downloaded.
+
+        When the batch will end up as a zip archive, the file is moved into
+        the archive right away instead of waiting for the whole batch.
+        A batch made of a single file is left as-is, it will be moved to
+        the destination folder by :meth:`_create_zip_archive`.
+
+        :param file_path: The downloaded file, inside a batch folder
+        """
+        try:
+            batch_id = file_path.relative_to(self._folder).parts[0]
+        except (ValueError, IndexError):
+            return
+
+        with self._batches_lock:
+            batch = self._batches.get(batch_id)
+        if batch is None:
+            return
+
+        arcname = file_path.relative_to(batch.batch_folder)
+        if len(batch.record_uids) == 1 and len(arcname.parts) == 1:
+            return
+
+        try:
+            with batch.archive_lock:
+                if batch.archive is None:
+                    batch.archive = self._new_archive(batch.batch_folder)
+            batch.archive.add(file_path, arcname)
+        except Exception:
+            # The file stays in the batch folder and will be archived at the end
+            log.warning(f"Cannot stream {file_path!r} into the archive", exc_info=True)
+
+    def _discard_stale_archive(self, batch_id: str, /) -> bool:
+        """
+        Delete the partial archive of a batch interrupted by an application restart.
+        Return True if there was one: the files it holds are not in the batch folder
+        anymore, and the archive cannot be completed as it has no central directory.
+        """
+        pattern = re.compile(rf"{re.escape(batch_id)}( \(\d+\))?\.zip\.part")
+        found = False
+        try:
+            for path in self._get_download_destination().glob("*.zip.part"):
+                if pattern.fullmatch(path.name):
+                    log.info(f"Deleting the stale partial archive {path!r}")
+                    path.unlink(missing_ok=True)
+                    found = True
+        except OSError:
+            log.warning(
+                f"Cannot delete partial archives of {batch_id!r}", exc_info=True
+            )
+        return found
+
+    def _new_archive(self, batch_folder: Path, /) -> _StreamingArchive:
+        """Start a new archive for the given batch in the download destination."""
+        zip_path = self._get_download_destination() / f"{batch_folder.name}.zip"
+        return _StreamingArchive(self._get_unique_path(zip_path))
+
     def _create_zip_archive(self, batch_folder: Path, /) -> Optional[Path]:
         """
-        Create a zip archive of the batch folder in the user's Downloads folder.
-        If only a single file exists in the batch folder, copy it directly instead.
+        Finalize the zip archive of the batch folder in the user's Downloads folder.
+        If only a single file exists in the batch folder, move it directly instead.
+
+        Files already streamed into the archive by :meth:`_file_downloaded` are
+        not in the batch folder anymore, only remaining ones are added here.
 
         :param batch_folder: The batch folder to archive
-        :return: Path to the created zip file or copied file, or None if failed
+        :return: Path to the created zip file or moved file, or None if failed
         """
+        with self._batches_lock:
+            batch = self._batches.get(batch_folder.name)
+        archive = batch.archive if batch else None
+
         try:
             # Determine the target download folder
             downloads_folder = self._get_download_destination()
@@ -734,19 +947,18 @@ def _create_zip_archive(self, batch_folder: Path, /) -> Optional[Path]:
             # Get all files in the batch folder (including in subdirectories)
             all_files = list(batch_folder.rglob("*"))
             files_only = [f for f in all_files if f.is_file()]
-            dirs_only = [f for f in all_files if f.is_dir()]
 
             # Check if it's a single file with no subdirectories
-            if len(files_only) == 1 and len(dirs_only) == 0:
-                # Single file case: copy file directly to Downloads folder
+            if not archive and len(files_only) == len(all_files) == 1:
+                # Single file case: move file directly to Downloads folder
                 source_file = files_only[0]
                 target_path = downloads_folder / source_file.name
 
                 # Handle duplicate filenames
                 target_path = self._get_unique_path(target_path)
 
-                # Copy the file
-                shutil.copy2(str(source_file), str(target_path))
+                # Move the file, this is a simple rename on the same file system
+                shutil.move(str(source_file), str(target_path))
 
                 log.info(
                     f"{source_file.name} downloaded successfully to {downloads_folder}"
@@ -756,27 +968,18 @@ def _create_zip_archive(self, batch_folder: Path, /) -> Optional[Path]:
 
                 return target_path
 
-            # Multiple files or folders: create zip archive
-            zip_filename = f"{batch_folder.name}.zip"
-            zip_path = downloads_folder / zip_filename
-
-            # Handle duplicate zip filenames
-            zip_path = self._get_unique_path(zip_path)
-
-            # Collect files to archive
-            archive_files = [f for f in batch_folder.rglob("*") if f.is_file()]
-
-            if not archive_files:
+            if not archive and not files_only:
                 log.warning("No files to archive - all downloads may have failed")
                 self._cleanup_batch_folder(batch_folder)
                 return None
 
-            # Create the zip archive
-            with zipfile.ZipFile(zip_path, "w", zipfile.ZIP_DEFLATED) as zipf:
-                for file_path in archive_files:
-                    # Calculate the archive name (relative path from batch folder)
-                    arcname = file_path.relative_to(batch_folder)
-                    zipf.write(file_path, arcname)
+            # Multiple files or folders: complete the zip archive
+            if not archive:
+                archive = self._new_archive(batch_folder)
+            for file_path in files_only:
+                # Calculate the archive name (relative path from batch folder)
+                archive.add(file_path, file_path.relative_to(batch_folder))
+            zip_path = archive.close()
 
             log.info(
                 f"Selected documents downloaded successfully to {downloads_folder}"
@@ -788,6 +991,9 @@ def _create_zip_archive(self, batch_folder: Path, /) -> Optional[Path]:
 
         except Exception as exc:
             log.info(f"Failed to download: {exc}")
+            if archive:
+                with suppress(Exception):
+                    archive.discard()
             return None
 
     def _get_download_destination(self) -> Path:
@@ -834,7 +1040,9 @@ def _create_download_record(
         """Create a database record for a download.  **Must be overridden.**"""
         raise NotImplementedError
 
-    def _calculate_folder_size(self, engine: "Engine", folder_id: str, /) -> tuple:
+    def _calculate_folder_size(
+        self, engine: "Engine", folder_id: str, /, *, path: str = ""
+    ) -> tuple:
         """Calculate folder size recursively.  **Must be overridden.**"""
         raise NotImplementedError
 
@@ -883,6 +1091,14 @@ def _get_download_record(self, uid: int, /) -> Optional[DirectDownloadRecord]:
             log.exception(f"Failed to get download record for {uid}")
         return None
 
+    def pause(self, uid: int, /) -> None:
+        """Stop the transfer of a record paused by the user, at its next chunk."""
+        self._paused.add(uid)
+
+    def cancel(self, uid: int, /) -> None:
+        """Stop the transfer of a record cancelled by the user, at its next chunk."""
+        self._cancelled.add(uid)
+
     def _is_single_download_cancelled(self, uid: int, /) -> bool:
         """Return True if this record has been cancelled. Non-blocking.
 
@@ -942,10 +1158,46 @@ def _update_download_progress(
         """
         Update the progress of a download.
 
+        This is called for every chunk by every worker: only the latest values
+        are kept in memory, see :meth:`_flush_progress` for the actual update.
+
         :param uid: The UID of the download record
         :param bytes_downloaded: Bytes downloaded so far
         :param total_bytes: Total bytes to download
         """
+        self._progress[uid] = (
+            next(self._progress_seq),
+            bytes_downloaded,
+            total_bytes,
+            filename,
+            emitted_bytes_downloaded,
+            emitted_total_bytes,
+        )
+
+    def _flush_progress(self) -> None:
+        """Save the latest progress of downloads and send it to the GUI."""
+        with self._flush_lock:
+            self._last_progress_flush = time.monotonic()
+
+            for uid in list(self._progress):
+                # A worker may update it again right after, it will be flushed next time
+                values = self._progress.pop(uid, None)
+                if values is None or values[0] <= self._flushed_seq.get(uid, 0):
+                    continue
+                self._flushed_seq[uid] = values[0]
+                self._save_download_progress(uid, *values[1:])
+
+    def _save_download_progress(
+        self,
+        uid: int,
+        bytes_downloaded: int,
+        total_bytes: int,
+        filename: Optional[str],
+        emitted_bytes_downloaded: Optional[int],
+        emitted_total_bytes: Optional[int],
+        /,
+    ) -> None:
+        """Save the progress of a download and emit ``downloadProgress``."""
         try:
             progress = (
                 (bytes_downloaded / total_bytes * 100) if total_bytes > 0 else 0.0
@@ -1052,9 +1304,37 @@ def _get_unique_path(self, path: Path, /) -> Path:
 
         return path
 
+    def _start_task(
+        self, target: Callable[..., None], /, *args: Any, name: str, **kwargs: Any
+    ) -> None:
+        """
+        Run *target* in a background thread, outside of the worker pool so that it
+        does not hold back downloads. It has to check ``_stop`` regularly.
+        """
+        if self._stop:
+            return
+
+        def run() -> None:
+            try:
+                target(*args, **kwargs)
+            finally:
+                with self._tasks_lock:
+                    self._tasks.discard(thread)
+
+        thread = Thread(target=run, name=name, daemon=True)
+        with self._tasks_lock:
+            self._tasks.add(thread)
+        thread.start()
+
+    def _check_stop(self) -> None:
+        """Raise ThreadInterrupt once the worker is stopped."""
+        if self._stop:
+            raise ThreadInterrupt()
+
     def stop(self) -> None:
         """Stop the worker."""
         self._stop = True
+        self._flush_progress()
 
         # Best-effort shutdown of the worker pool. Any in-flight
         # streaming download bails out via the per-chunk cancellation
@@ -1070,4 +1350,12 @@ def stop(self) -> None:
             except Exception:
                 log.exception("Failed to shutdown Direct Download executor")
 
+        # Background tasks may still use the database, that is about to be closed
+        with self._tasks_lock:
+            tasks = list(self._tasks)
+        for thread in tasks:
+            thread.join(timeout=TASK_JOIN_TIMEOUT)
+            if thread.is_alive():
+                log.warning(f"Background task {thread.name!r} is still running")
+
         super().stop()
@@ -0,0 +1,123 @@
+"""
+Size of the file processors pool, adapted to the observed throughput.
+
+Whether the bottleneck is the server latency, the disk or the database, a fixed
+number of processors is either too many (contention, errors) or too few (idle
+bandwidth). Every window, the controller looks at the completed items per
+second, the error rate and the queue depth, and applies AIMD: one processor
+more while there is a backlog and it helps, half of them less on errors or when
+the last increase made the throughput drop.
+"""
+
+from logging import getLogger
+from threading import Lock
+from time import monotonic
+from typing import Tuple
+
+from ..constants import (
+    AUTOSCALE_DECREASE,
+    AUTOSCALE_ERROR_RATE,
+    AUTOSCALE_INTERVAL,
+    AUTOSCALE_TOLERANCE,
+)
+from ..objects import Metrics
+
+__all__ = ("ProcessorAutoscaler",)
+
+log = getLogger(__name__)
+
+
+class ProcessorAutoscaler:
+    def __init__(
+        self, maximum: int, /, *, interval: float = AUTOSCALE_INTERVAL
+    ) -> None:
+        self.interval = interval
+        self._lock = Lock()
+        self.minimum = self.maximum = self.target = 0
+        self.resize(maximum)
+
+        self._window_start = monotonic()
+        self._done = 0
+        self._errors = 0
+        self._increased = False
+
+        # Observations of the last window, and what was decided from them
+        self.throughput = 0.0
+        self.error_rate = 0.0
+        self.decision = "start"
+
+    def __repr__(self) -> str:
+        return (
+            f"<{type(self).__name__} target={self.target}"
+            f" bounds=[{self.minimum}, {self.maximum}], decision={self.decision!r}>"
+        )
+
+    def resize(self, maximum: int, /) -> None:
+        """Set the upper bound, the pool starts at its full size."""
+        with self._lock:
+            self.maximum = max(0, maximum)
+            self.minimum = min(1, self.maximum)
+            self.target = self.maximum
+
+    def record_done(self) -> None:
+        with self._lock:
+            self._done += 1
+
+    def record_error(self) -> None:
+        with self._lock:
+            self._errors += 1
+
+    def evaluate(self, depth: int, /, *, now: float = None) -> Tuple[int, bool]:
+        """
+        Return the target size of the pool given the *depth* of the file queues,
+        and whether it grew. A new decision is taken once per window only.
+        """
+        if now is None:
+            now = monotonic()
+        with self._lock:
+            elapsed = now - self._window_start
+            if elapsed < self.interval:
+                return self.target, False
+
+            done, errors = self._done, self._errors
+            self._window_start, self._done, self._errors = now, 0, 0
+            previous = self.throughput
+            self.throughput = done / elapsed
+            self.error_rate = errors / (done + errors) if done + errors else 0.0
+
+            before = self.target
+            if self.error_rate > AUTOSCALE_ERROR_RATE:
+                self._decrease("errors")
+            elif self._increased and self.throughput < previous * (
+                1 - AUTOSCALE_TOLERANCE
+            ):
+                # One more processor made things worse: the server, the disk
+                # or the database is saturated
+                self._decrease("contention")
+            elif depth > self.target and self.target < self.maximum:
+                self.target += 1
+                self.decision = "increase"
+            else:
+                self.decision = "hold"
+            self._increased = self.target > before
+
+            if self.target != before:
+                log.info(
+                    f"File processors: {before} -> {self.target} ({self.decision},"
+                    f" {self.throughput:.2f} items/s, {self.error_rate:.0%} errors,"
+                    f" {depth} queued)"
+                )
+            return self.target, self._increased
+
+    def _decrease(self, reason: str, /) -> None:
+        self.target = max(self.minimum, int(self.target * AUTOSCALE_DECREASE))
+        self.decision = f"decrease ({reason})"
+
+    def get_metrics(self) -> Metrics:
+        return {
+            "processors_target": self.target,
+            "processors_max": self.maximum,
+            "processors_throughput": round(self.throughput, 2),
+            "processors_error_rate": round(self.error_rate, 3),
+            "processors_decision": self.decision,
+        }
@@ -1,8 +1,9 @@
 from logging import getLogger
 from pathlib import Path
-from threading import Lock
 from time import monotonic
-from typing import Dict, Generator
+from typing import Generator
+
+from .retry_scheduler import RetryScheduler
 
 __all__ = ("BlocklistQueue",)
 log = getLogger(__name__)
@@ -22,6 +23,11 @@ def __repr__(self) -> str:
     def __str__(self) -> str:
         return repr(self)
 
+    @property
+    def deadline(self) -> int:
+        """The monotonic time from which check() passes."""
+        return self._next_try + 1
+
     def check(self, cur_time: int, /) -> bool:
         return cur_time > self._next_try
 
@@ -39,8 +45,7 @@ class BlocklistQueue:
     def __init__(self, *, delay: int = 30) -> None:
         self._delay = delay
 
-        self._queue: Dict[Path, BlocklistItem] = {}
-        self._lock = Lock()
+        self._queue: RetryScheduler[Path, BlocklistItem] = RetryScheduler()
 
     def __repr__(self) -> str:
         return f"<{type(self).__name__} queue_size={len(self._queue)}>"
@@ -50,27 +55,21 @@ def __str__(self) -> str:
 
     def empty(self) -> bool:
         """Return True if the queue is empty, False otherwise."""
-        with self._lock:
-            return not bool(self._queue)
+        return not self._queue
 
     def push(self, path: Path, /) -> None:
-        with self._lock:
-            item = BlocklistItem(path, next_try=self._delay)
-            log.debug(f"Adding {item!r} for {self._delay} sec")
-            self._queue[path] = item
+        item = BlocklistItem(path, next_try=self._delay)
+        log.debug(f"Adding {item!r} for {self._delay} sec")
+        self._queue.schedule(path, item, item.deadline)
 
     def repush(self, item: BlocklistItem, /, *, increase_wait: bool = True) -> None:
         # Only used in tests, but it is more practical to keep there.
-        with self._lock:
-            item.increase(next_try=None if increase_wait else self._delay)
-            self._queue[item.path] = item
+        item.increase(next_try=None if increase_wait else self._delay)
+        self._queue.schedule(item.path, item, item.deadline)
 
     def get(self) -> Generator[BlocklistItem, None, None]:
-        with self._lock:
-            cur_time = int(monotonic())
-            for item in self._queue.copy().values():
-                if not item.check(cur_time):
-                    continue
-
-                log.debug(f"Releasing {item!r}")
-                yield self._queue.pop(item.path)
+        # Items are released one at a time, the caller may not consume them all
+        now = monotonic()
+        while (item := self._queue.pop_next(now=now)) is not None:
+            log.debug(f"Releasing {item!r}")
+            yield item
@@ -24,12 +24,15 @@
 import requests
 
 from nxdrive.drive.auth import Token
+from nxdrive.drive.client.bandwidth import DOWNLOAD, UPLOAD, limiter
 from nxdrive.drive.client.local import LocalClient
 from nxdrive.drive.client.local.base import LocalClientMixin
+from nxdrive.drive.client.pool import connection_metrics
 from nxdrive.drive.constants import LINUX, MAC, ROOT, DelAction, TransferStatus
 from nxdrive.drive.dao.engine import EngineDAO
 from nxdrive.drive.engine.processor import Processor
 from nxdrive.drive.engine.queue_manager import QueueManager
+from nxdrive.drive.engine.transfer_scheduler import transfers
 from nxdrive.drive.engine.watcher.local_watcher import LocalWatcher
 from nxdrive.drive.engine.workers import Worker
 from nxdrive.drive.exceptions import (
@@ -389,6 +392,11 @@ def set_ui(self, value: str, /, *, overwrite: bool = True) -> None:
         log.info(f"{name} preferences set to {value}")
         self.uiChanged.emit(self.uid)
 
+    def set_bandwidth_limit(self, direction: str, limit: int, /) -> None:
+        """Set the *direction* bandwidth limit of the engine, in KiB/s. 0 means unlimited."""
+        self.dao.update_config(f"bandwidth_{direction}_limit", limit)
+        limiter.set_limit(direction, limit, engine_uid=self.uid)
+
     def release_folder_lock(self) -> None:
         log.info("Local Folder unlocking")
         self._folder_lock = None
@@ -695,6 +703,8 @@ def unbind(self) -> None:
         self.manager.osi.unregister_folder_link(self.local_folder)
         self.dispose_db()
         self.manager.remove_engine_dbs(self.uid)
+        limiter.forget(self.uid)
+        transfers.forget(self.uid)
         try:
             shutil.rmtree(self.download_dir)
         except FileNotFoundError:
@@ -759,6 +769,12 @@ def _load_configuration(self) -> None:
             self.set_invalid_credentials(
                 reason="found no token in engine configuration"
             )
+        for direction in (DOWNLOAD, UPLOAD):
+            limiter.set_limit(
+                direction,
+                self.dao.get_int(f"bandwidth_{direction}_limit"),
+                engine_uid=self.uid,
+            )
 
     def _get_db_file(self) -> Path:
         return self.manager.get_engine_db(self.uid, self.type)
@@ -822,12 +838,15 @@ def retry_pair(self, row_id: int, /) -> None:
         state = self.dao.get_state_from_id(row_id)
         if state is None:
             return
+        # Else the queued pair would be skipped until the end of its block period
+        self.queue_manager.cancel_error(row_id)
         self.dao.reset_error(state)
 
     def ignore_pair(self, row_id: int, reason: str, /) -> None:
         state = self.dao.get_state_from_id(row_id)
         if state is None:
             return
+        self.queue_manager.cancel_error(row_id)
         self.dao.unsynchronize_state(state, reason, ignore=True)
         self.dao.reset_error(state, last_error=reason)
 
@@ -906,10 +925,13 @@ def get_metrics(self) -> Metrics:
             "sync_folders": self.dao.get_sync_count(filetype="folder"),
             "syncing": self.dao.get_syncing_count(),
             "unsynchronized_files": self.dao.get_unsynchronized_count(),
+            **connection_metrics(getattr(self.remote, "http_session", None)),
+            **transfers.get_metrics(engine_uid=self.uid),
+            **self.dao.get_metrics(),
         }
 
-    def get_conflicts(self) -> DocPairs:
-        return self.dao.get_conflicts()
+    def get_conflicts(self, *, after: int = 0, size: int = -1) -> DocPairs:
+        return self.dao.get_conflicts(after=after, size=size)
 
     def get_user_full_name(self, userid: str, /, *, cache_only: bool = False) -> str:
         """Return the display name for *userid*.
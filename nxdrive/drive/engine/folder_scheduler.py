@@ -0,0 +1,164 @@
+"""
+Folder pairs of one direction, handed out to several processors.
+
+A single processor per direction used to handle every folder, so creating a
+hierarchy of 50,000 folders was strictly sequential. Yet sibling folders whose
+parent exists have no ordering constraint between them. Here, a creation is
+handed out as soon as its parent is not in progress anymore: a parent taken out
+of the queue and not processed yet, be it handed out or set aside, holds back
+its children until it is done. Released children are handed out first.
+
+Other folder operations (moves, renamings, deletions) rely on the engine
+folder lock, a single one: they are handled one at a time by the main
+processor (owner 0), once the other processors are done with their folder.
+"""
+
+from collections import Counter, deque
+from logging import getLogger
+from threading import Condition
+from typing import Callable, Deque, Dict, Hashable, List, Optional, Tuple, Union
+
+from ..objects import DocPair, QueueItem
+
+__all__ = ("FolderScheduler",)
+
+log = getLogger(__name__)
+
+Item = Union[DocPair, QueueItem]
+Keyed = Tuple[Optional[Hashable], Item]
+
+# Folder pairs that can be handled concurrently, once their parent is
+CONCURRENT_STATES = {"locally_created", "remotely_created"}
+
+
+class FolderScheduler:
+    MAIN = 0
+
+    def __init__(
+        self,
+        pop: Callable[[], Optional[Item]],
+        wake: Callable[[], None],
+        resolve: Callable[[int], Optional[DocPair]],
+        /,
+    ) -> None:
+        self._pop = pop
+        self._wake = wake
+        self._resolve = resolve
+        self._condition = Condition()
+        # owner -> key of the folder it is processing
+        self._running: Dict[int, Optional[Hashable]] = {}
+        # Owner processing an exclusive operation
+        self._exclusive: Optional[int] = None
+        # Keys of the items taken out of the queue and not processed yet
+        self._taken: Dict[Hashable, int] = Counter()
+        # parent key -> creations waiting for it
+        self._waiting: Dict[Hashable, List[Keyed]] = {}
+        # Creations whose parent is processed
+        self._ready: Deque[Keyed] = deque()
+        # Exclusive operations waiting for the main processor
+        self._held: Deque[Keyed] = deque()
+
+    def __repr__(self) -> str:
+        return (
+            f"<{type(self).__name__} running={len(self._running)}"
+            f" waiting={len(self)}, held={len(self._held)}>"
+        )
+
+    def __len__(self) -> int:
+        """Items taken out of the queue and not handed out yet."""
+        with self._condition:
+            return (
+                len(self._held)
+                + len(self._ready)
+                + sum(map(len, self._waiting.values()))
+            )
+
+    @property
+    def blocked(self) -> bool:
+        """True while an exclusive operation is in progress or waiting."""
+        with self._condition:
+            return bool(self._held) or self._exclusive is not None
+
+    @property
+    def ready(self) -> int:
+        """Creations that can be handed out right away."""
+        with self._condition:
+            return len(self._ready)
+
+    def get(self, owner: int, /) -> Optional[Item]:
+        """
+        Item getter of the *owner* processor. Calling it means the previous item
+        of that processor is processed. None stops the processor.
+        """
+        self.done(owner)
+        main = owner == self.MAIN
+
+        while "There are folders to handle":
+            with self._condition:
+                if self._held or self._exclusive is not None:
+                    if not main:
+                        return None
+                    while self._running:
+                        self._condition.wait(1)
+                    if self._held:
+                        key, item = self._held.popleft()
+                        self._exclusive = owner
+                        self._running[owner] = key
+                        return item
+                if self._ready:
+                    key, item = self._ready.popleft()
+                    self._running[owner] = key
+                    return item
+
+            item = self._pop()
+            if item is None:
+                return None
+
+            key, parent_key = self._keys(item)
+            with self._condition:
+                if key is not None:
+                    self._taken[key] += 1
+
+                if item.pair_state not in CONCURRENT_STATES:
+                    if main and not self._running:
+                        self._exclusive = owner
+                        self._running[owner] = key
+                        return item
+                    # Wait for the ones in progress, the main processor will take it
+                    self._held.append((key, item))
+                    continue
+
+                if parent_key is not None and self._taken[parent_key]:
+                    log.debug(f"Parent of {item!r} is in progress, waiting for it")
+                    self._waiting.setdefault(parent_key, []).append((key, item))
+                    continue
+                self._running[owner] = key
+                return item
+
+    def done(self, owner: int, /) -> None:
+        """The *owner* processor is done with its item, release its children."""
+        released: List[Keyed] = []
+        with self._condition:
+            if owner == self._exclusive:
+                self._exclusive = None
+            if owner in self._running:
+                key = self._running.pop(owner)
+                if key is not None:
+                    self._taken[key] -= 1
+                    if self._taken[key] <= 0:
+                        del self._taken[key]
+                        released = self._waiting.pop(key, [])
+                        self._ready.extend(released)
+            self._condition.notify_all()
+
+        if released:
+            self._wake()
+
+    def _keys(self, item: Item, /) -> Tuple[Optional[Hashable], Optional[Hashable]]:
+        """Return the keys of the folder and of its parent, as seen by its children."""
+        doc_pair = item if isinstance(item, DocPair) else self._resolve(item.id)
+        if doc_pair is None:
+            return None, None
+        if doc_pair.pair_state == "remotely_created":
+            return doc_pair.remote_ref, doc_pair.remote_parent_ref
+        return doc_pair.local_path, doc_pair.local_parent_path
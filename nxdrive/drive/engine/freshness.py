@@ -0,0 +1,162 @@
+"""
+Bulk freshness checks of the remote state of locally changed pairs.
+
+Before pushing a local change, processors make sure the remote document did not
+change meanwhile. Done pair by pair, it costs one metadata request per file
+before any content moves. Instead, the first check resolves the remote state of
+the next queued locally changed pairs in one request, and processors only fall
+back on a dedicated request for documents that changed, vanished or could not
+be checked.
+"""
+
+from logging import getLogger
+from threading import Event, Lock
+from time import monotonic
+from typing import TYPE_CHECKING, Any, Dict, Optional, Tuple
+
+from ..constants import FRESHNESS_BATCH, FRESHNESS_TTL
+from ..objects import DocPair
+
+if TYPE_CHECKING:
+    from nxdrive.drive.engine.engine import Engine  # noqa
+
+    from ..dao.engine import EngineDAO  # noqa
+
+__all__ = ("FreshnessCache",)
+
+log = getLogger(__name__)
+
+# Remote state recorded on a pair when its freshness was checked
+Signature = Tuple[Any, ...]
+
+
+class FreshnessCache:
+    def __init__(
+        self,
+        engine: "Engine",
+        dao: "EngineDAO",
+        /,
+        *,
+        batch: int = FRESHNESS_BATCH,
+        ttl: float = FRESHNESS_TTL,
+    ) -> None:
+        self._engine = engine
+        self.dao = dao
+        self.batch = batch
+        self.ttl = ttl
+        self._lock = Lock()
+        # remote_ref -> (expiration, signature if the remote state is unchanged)
+        self._checked: Dict[str, Tuple[float, Optional[Signature]]] = {}
+        # remote_ref -> event set once the batch checking it is done
+        self._pending: Dict[str, Event] = {}
+
+        self.hits = 0
+        self.misses = 0
+        self.requests = 0
+
+    @staticmethod
+    def _signature(doc_pair: DocPair, /) -> Signature:
+        return (
+            doc_pair.remote_parent_ref,
+            doc_pair.remote_name,
+            doc_pair.remote_digest,
+            str(doc_pair.last_remote_updated or ""),
+        )
+
+    def is_fresh(self, doc_pair: DocPair, /) -> bool:
+        """
+        Return True if the remote document of *doc_pair* is known to be in the state
+        recorded on the pair. When False, the caller has to check it by itself.
+        A verdict is used once: processing the pair again needs a new check.
+        """
+        ref = doc_pair.remote_ref
+        if not ref:
+            return False
+
+        with self._lock:
+            now = monotonic()
+            entry = self._checked.pop(ref, None)
+            if entry and entry[0] < now:
+                entry = None
+            owner = not entry and ref not in self._pending
+            if owner:
+                self._pending[ref] = Event()
+            event = self._pending.get(ref)
+
+        if not entry and event:
+            if owner:
+                self._prefetch(doc_pair, now, event)
+            else:
+                # Part of the batch of another processor
+                event.wait()
+            with self._lock:
+                entry = self._checked.pop(ref, None)
+
+        fresh = bool(entry and entry[1] == self._signature(doc_pair))
+        with self._lock:
+            if fresh:
+                self.hits += 1
+            else:
+                self.misses += 1
+        return fresh
+
+    def _prefetch(self, doc_pair: DocPair, now: float, event: Event, /) -> None:
+        """
+        Check *doc_pair* and next queued locally changed pairs in one request.
+        The lock is not held during the request: other processors wait for the
+        *event* of the batch only if their pair is part of it.
+        """
+        pairs = {doc_pair.remote_ref: doc_pair}
+        unchanged = None
+        try:
+            candidates = self.dao.get_locally_changed_pairs(
+                doc_pair.id, limit=self.batch
+            )
+            with self._lock:
+                self._checked = {
+                    ref: entry
+                    for ref, entry in self._checked.items()
+                    if entry[0] >= now
+                }
+                for pair in candidates:
+                    if len(pairs) >= self.batch:
+                        break
+                    ref = pair.remote_ref
+                    if ref not in self._checked and ref not in self._pending:
+                        pairs[ref] = pair
+                        self._pending[ref] = event
+                self.requests += 1
+
+            unchanged = self._engine.remote.get_unchanged_refs(list(pairs.values()))
+        except Exception:
+            log.debug(
+                f"Bulk freshness check failed for {doc_pair!r}, checking items one by one",
+                exc_info=True,
+            )
+        finally:
+            with self._lock:
+                if unchanged is not None:
+                    expiration = now + self.ttl
+                    for ref, pair in pairs.items():
+                        signature = self._signature(pair) if ref in unchanged else None
+                        self._checked[ref] = (expiration, signature)
+                for ref in pairs:
+                    self._pending.pop(ref, None)
+            event.set()
+
+        if unchanged is not None:
+            log.debug(
+                f"Checked the freshness of {len(pairs)} remote documents,"
+                f" {len(unchanged)} unchanged"
+            )
+
+    def clear(self) -> None:
+        with self._lock:
+            self._checked.clear()
+
+    def get_metrics(self) -> Dict[str, int]:
+        return {
+            "freshness_hits": self.hits,
+            "freshness_misses": self.misses,
+            "freshness_requests": self.requests,
+        }
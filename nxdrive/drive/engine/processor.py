@@ -11,7 +11,7 @@
 from typing import TYPE_CHECKING, Callable, Dict, List, Optional
 
 from nxdrive.drive.engine.workers import EngineWorker
-from nxdrive.drive.objects import DocPair
+from nxdrive.drive.objects import DocPair, Preflight
 from nxdrive.drive.qt.imports import pyqtSignal
 
 if TYPE_CHECKING:
@@ -38,9 +38,24 @@ def __init__(self, engine: "Engine", item_getter: Callable, /) -> None:
         self.local = self.engine.local
         self.remote = self.engine.remote
         self._current_doc_pair: Optional[DocPair] = None
+        # Parent pairs read by the pre-flight checks, reused by the handler
+        # of the current pair and forgotten once it is processed
+        self._parents: Dict[str, Optional[DocPair]] = {}
 
     def get_current_pair(self) -> Optional[DocPair]:
         return self._current_doc_pair
 
+    def _preflight(self, doc_pair: DocPair, /) -> Preflight:
+        """Read the parent and the transfers of *doc_pair* before handling it."""
+        preflight: Preflight = self.dao.get_preflight(doc_pair)
+        self._parents[doc_pair.remote_parent_ref] = preflight.parent
+        return preflight
+
+    def _get_normal_state_from_remote_ref(self, ref: str, /) -> Optional[DocPair]:
+        if ref in self._parents:
+            return self._parents[ref]
+        # TODO Select the only states that is not a collection
+        return self.dao.get_normal_state_from_remote(ref)
+
     def _execute(self) -> None:
         raise NotImplementedError
@@ -1,17 +1,23 @@
 import time
 from contextlib import suppress
+from functools import partial
+from itertools import count
 from logging import getLogger
 from pathlib import Path
 from queue import Empty, Queue
 from threading import Lock
-from typing import TYPE_CHECKING, Callable, Dict, List, Optional, Union
+from typing import TYPE_CHECKING, Callable, Dict, List, Optional, Set, Tuple, Union
 
-from ..constants import WINDOWS
+from ..constants import FOLDER_PROCESSORS, QUEUE_REBUILD_PAGE, WINDOWS
 from ..exceptions import RemoteOngoingRequestError
-from ..objects import DocPair, Metrics
+from ..objects import DocPair, Metrics, QueueItem
 from ..options import Options
 from ..qt.imports import QObject, QThread, QTimer, pyqtSignal, pyqtSlot
+from .autoscaler import ProcessorAutoscaler
+from .folder_scheduler import FolderScheduler
+from .freshness import FreshnessCache
 from .processor import Processor
+from .retry_scheduler import RetryScheduler, backoff
 
 if TYPE_CHECKING:
     from nxdrive.drive.engine.engine import Engine  # noqa
@@ -24,19 +30,6 @@
 WINERROR_CODE_PROCESS_CANNOT_ACCESS_FILE = 32
 
 
-class QueueItem:
-    def __init__(self, row_id: int, folderish: bool, pair_state: str, /) -> None:
-        self.id = row_id
-        self.folderish = folderish
-        self.pair_state = pair_state
-
-    def __repr__(self) -> str:
-        return (
-            f"{type(self).__name__}[{self.id}](folderish={self.folderish!r}, "
-            f"state={self.pair_state!r})"
-        )
-
-
 class QueueManager(QObject):
     # Always create thread from the main thread
     newItem = pyqtSignal(object)
@@ -66,11 +59,28 @@ def __init__(
         self._local_file_thread = None
         self._remote_folder_thread = None
         self._remote_file_thread = None
+        # Folders of each direction, handled by their folder thread and helpers
+        wake = partial(self.newItem.emit, None)
+        self._local_folders = FolderScheduler(
+            self._get_local_folder, wake, self._get_pair
+        )
+        self._remote_folders = FolderScheduler(
+            self._get_remote_folder, wake, self._get_pair
+        )
+        # Folder helper threads, with their scheduler and owner id there
+        self._folder_pool: Dict[QThread, Tuple[FolderScheduler, int]] = {}
+        self._folder_owners = count(FolderScheduler.MAIN + 1)
         self._error_threshold: int = Options.max_errors
         self._error_interval = 60
+        # Size of the file processors pool, within the bounds of max_file_processors
+        self.autoscaler = ProcessorAutoscaler(0)
         self.set_max_processors(max_file_processors)
         self._processors_pool: List[QThread] = []
+        # Pool processors told to stop, but not finished yet
+        self._retiring: Set[QThread] = set()
         self._get_file_lock = Lock()
+        # Remote states of queued locally changed pairs, checked in bulk
+        self.freshness = FreshnessCache(engine, dao)
         # Should not operate on thread while we are inspecting them
         """
         This error required to add a lock for inspecting threads,
@@ -89,12 +99,16 @@ def __init__(
         self._thread_inspection = Lock()
 
         # ERROR HANDLING
-        self._error_lock = Lock()
-        self._on_error_queue: Dict[int, DocPair] = {}
+        # Pairs in error by row id, the timer fires at the next deadline only
+        self._retries: RetryScheduler[int, DocPair] = RetryScheduler()
         self._error_timer = QTimer()
+        self._error_timer.setSingleShot(True)
         self._error_timer.timeout.connect(self._on_error_timer)
         self.newError.connect(self._on_new_error)
         self.queueProcessing.connect(self.launch_processors)
+        # Pairs to handle at startup are queued page by page, see _refill()
+        self._rebuilding = False
+        self._rebuild_lock = Lock()
         # LAST ACTION
         self.dao.register_queue_manager(self)
 
@@ -113,6 +127,7 @@ def set_max_processors(self, max_file_processors: int, /) -> None:
         if max_file_processors < 2:
             max_file_processors = 2
         self._max_processors = max_file_processors - 2
+        self.autoscaler.resize(self._max_processors)
 
     def resume(self) -> None:
         log.info("Resuming queue")
@@ -150,6 +165,8 @@ def enable_local_folder_queue(self, value: bool, /, *, emit: bool = True) -> Non
         self._local_folder_enable = value
         if self._local_folder_thread is not None and not value:
             self._local_folder_thread.quit()
+        if not value:
+            self._quit_folder_helpers(self._local_folders)
         if value and emit:
             self.queueProcessing.emit()
 
@@ -164,9 +181,16 @@ def enable_remote_folder_queue(self, value: bool, /, *, emit: bool = True) -> No
         self._remote_folder_enable = value
         if self._remote_folder_thread is not None and not value:
             self._remote_folder_thread.quit()
+        if not value:
+            self._quit_folder_helpers(self._remote_folders)
         if value and emit:
             self.queueProcessing.emit()
 
+    def _quit_folder_helpers(self, scheduler: FolderScheduler, /) -> None:
+        for thread, (owner_scheduler, _) in self._folder_pool.copy().items():
+            if owner_scheduler is scheduler:
+                thread.quit()
+
     def push_ref(self, row_id: int, folderish: bool, pair_state: str, /) -> None:
         self.push(QueueItem(row_id, folderish, pair_state))
 
@@ -215,38 +239,50 @@ def push(self, state: Union[DocPair, QueueItem], /) -> None:
 
     @pyqtSlot()
     def _on_error_timer(self) -> None:
-        with self._error_lock:
-            cur_time = int(time.time())
-            for doc_pair in self._on_error_queue.copy().values():
-                if doc_pair.error_next_try < cur_time:
-                    queue_item = QueueItem(
-                        doc_pair.id, doc_pair.folderish, doc_pair.pair_state
-                    )
-                    del self._on_error_queue[doc_pair.id]
-                    log.info(f"End of block period, pushing doc_pair: {doc_pair!r}")
-                    self.push(queue_item)
-            if not self._on_error_queue:
-                self._error_timer.stop()
+        for doc_pair in self._retries.pop_due():
+            queue_item = QueueItem(doc_pair.id, doc_pair.folderish, doc_pair.pair_state)
+            log.info(f"End of block period, pushing doc_pair: {doc_pair!r}")
+            self.push(queue_item)
+        self._on_new_error()
 
     def _is_on_error(self, row_id: int) -> bool:
-        return row_id in self._on_error_queue
+        return row_id in self._retries
 
     @pyqtSlot()
     def _on_new_error(self) -> None:
-        self._error_timer.start(1000)
+        """(Re)arm the timer for the next deadline."""
+        delay = self._retries.next_delay()
+        if delay is None:
+            self._error_timer.stop()
+        else:
+            self._error_timer.start(int(delay * 1000) + 1)
+
+    def cancel_error(self, row_id: int, /) -> bool:
+        """Forget the pending retry of a pair, return True if there was one."""
+        return self._retries.cancel(row_id) is not None
 
     def get_errors_count(self) -> int:
-        return len(self._on_error_queue)
+        return len(self._retries)
 
     def get_error_threshold(self) -> int:
         return self._error_threshold
 
     def push_error(
-        self, doc_pair: DocPair, /, *, exception: Exception = None, interval: int = None
+        self,
+        doc_pair: DocPair,
+        /,
+        *,
+        exception: Exception = None,
+        interval: int = None,
+        failed: bool = False,
     ) -> None:
+        """
+        Retry *doc_pair* later. Only *failed* pairs are counted as errors by the
+        autoscaler: postponed ones are waiting for something, not failing.
+        """
         error_count = doc_pair.error_count
         err_code = WINERROR_CODE_PROCESS_CANNOT_ACCESS_FILE
-        emit_sig = doc_pair.id not in self._on_error_queue
+        emit_sig = doc_pair.id not in self._retries
 
         if (
             WINDOWS
@@ -261,29 +297,48 @@ def push_error(
         elif isinstance(exception, RemoteOngoingRequestError):
             emit_sig = False  # No notification as it is not an error on its own
 
+        if failed:
+            self.autoscaler.record_error()
         if error_count > self._error_threshold:
             self.newErrorGiveUp.emit(doc_pair.id)
             log.info(f"Giving up on pair {doc_pair!r}")
             return
 
         if interval is None:
-            interval = self._error_interval * error_count
+            interval = round(backoff(error_count, self._error_interval))
         doc_pair.error_next_try = interval + int(time.time())
 
         log.info(f"Temporary ignore pair for {interval}s: {doc_pair!r}")
         if not emit_sig:
             return
 
-        with self._error_lock:
-            self._on_error_queue[doc_pair.id] = doc_pair
-            try:
-                self.newError.emit(doc_pair.id)
-            except RuntimeError:
-                # RuntimeError: wrapped C/C++ object of type QueueManager has been deleted
-                # Happens on Windows when running old functional tests
-                pass
+        self._retries.schedule(doc_pair.id, doc_pair, time.monotonic() + interval)
+        try:
+            self.newError.emit(doc_pair.id)
+        except RuntimeError:
+            # RuntimeError: wrapped C/C++ object of type QueueManager has been deleted
+            # Happens on Windows when running old functional tests
+            pass
+
+    def set_rebuilding(self, value: bool, /) -> None:
+        """Set whether pairs to handle remain to be queued from the database."""
+        self._rebuilding = value
+
+    def _refill(self) -> None:
+        """Queue the next page of pairs to handle when the queues run low."""
+        if not self._rebuilding or self.get_overall_size() >= QUEUE_REBUILD_PAGE:
+            return
+        # One thread at a time, the others have enough items in the meantime
+        if not self._rebuild_lock.acquire(blocking=False):
+            return
+        try:
+            if self._rebuilding:
+                self._rebuilding = self.dao.queue_pairs_to_sync()
+        finally:
+            self._rebuild_lock.release()
 
     def _get_local_folder(self) -> Optional[DocPair]:
+        self._refill()
         if self._local_folder_queue.empty():
             return None
 
@@ -300,7 +355,11 @@ def _get_local_folder(self) -> Optional[DocPair]:
 
         return state
 
+    def _get_pair(self, row_id: int, /) -> Optional[DocPair]:
+        return self.dao.get_state_from_id(row_id)
+
     def _get_local_file(self) -> Optional[DocPair]:
+        self._refill()
         if self._local_file_queue.empty():
             return None
 
@@ -318,6 +377,7 @@ def _get_local_file(self) -> Optional[DocPair]:
         return state
 
     def _get_remote_folder(self) -> Optional[DocPair]:
+        self._refill()
         if self._remote_folder_queue.empty():
             return None
 
@@ -335,6 +395,7 @@ def _get_remote_folder(self) -> Optional[DocPair]:
         return state
 
     def _get_remote_file(self) -> Optional[DocPair]:
+        self._refill()
         if self._remote_file_queue.empty():
             return None
 
@@ -352,6 +413,7 @@ def _get_remote_file(self) -> Optional[DocPair]:
         return state
 
     def _get_file(self) -> Optional[DocPair]:
+        self._refill()
         with self._get_file_lock:
             if self._remote_file_queue.empty() and self._local_file_queue.empty():
                 return None
@@ -363,18 +425,47 @@ def _get_file(self) -> Optional[DocPair]:
             return self._get_file()
         return state
 
+    def _get_pooled_file(self) -> Optional[DocPair]:
+        """Item getter of the pool processors, the ones above the target size stop."""
+        depth = self._local_file_queue.qsize() + self._remote_file_queue.qsize()
+        target, grown = self.autoscaler.evaluate(depth)
+        if grown:
+            # Threads are created from the main thread
+            self.queueProcessing.emit()
+
+        thread = QThread.currentThread()
+        with self._get_file_lock:
+            if thread in self._retiring:
+                return None
+            if len(self._processors_pool) - len(self._retiring) > target:
+                self._retiring.add(thread)
+                return None
+        return self._get_file()
+
+    @pyqtSlot(object)
+    def _on_pair_synced(self, _: Metrics, /) -> None:
+        self.autoscaler.record_done()
+
     @pyqtSlot()
     def _thread_finished(self) -> None:
         with self._thread_inspection:
-            for thread in self._processors_pool:
+            for thread in self._processors_pool.copy():
                 if thread.isFinished():
                     thread.quit()
                     self._processors_pool.remove(thread)
+                    self._retiring.discard(thread)
+            for thread, (scheduler, owner) in self._folder_pool.copy().items():
+                if thread.isFinished():
+                    thread.quit()
+                    del self._folder_pool[thread]
+                    # Interrupted while processing a folder, its children can go
+                    scheduler.done(owner)
             if (
                 self._local_folder_thread is not None
                 and self._local_folder_thread.isFinished()
             ):
                 self._local_folder_thread = None
+                self._local_folders.done(FolderScheduler.MAIN)
             if (
                 self._local_file_thread is not None
                 and self._local_file_thread.isFinished()
@@ -385,6 +476,7 @@ def _thread_finished(self) -> None:
                 and self._remote_folder_thread.isFinished()
             ):
                 self._remote_folder_thread = None
+                self._remote_folders.done(FolderScheduler.MAIN)
             if (
                 self._remote_file_thread is not None
                 and self._remote_file_thread.isFinished()
@@ -406,11 +498,13 @@ def is_active(self) -> bool:
                 self._remote_file_thread is not None,
                 self._remote_folder_thread is not None,
                 len(self._processors_pool) > 0,
+                len(self._folder_pool) > 0,
             }
         )
 
     def _create_thread(self, item_getter: Callable, name: str, /) -> QThread:
         processor = self._engine.create_processor(item_getter)
+        processor.pairSyncEnded.connect(self._on_pair_synced)
         thread = self._engine.create_thread(processor, name)
         thread.finished.connect(self._thread_finished)
         thread.start()
@@ -419,6 +513,7 @@ def _create_thread(self, item_getter: Callable, name: str, /) -> QThread:
     def get_metrics(self) -> Metrics:
         metrics = {
             "is_paused": self.is_paused(),
+            "queue_rebuilding": self._rebuilding,
             "local_folder_queue": self._local_folder_queue.qsize(),
             "local_file_queue": self._local_file_queue.qsize(),
             "remote_folder_queue": self._remote_folder_queue.qsize(),
@@ -429,12 +524,17 @@ def get_metrics(self) -> Metrics:
             "local_folder_thread": self._local_folder_thread is not None,
             "error_queue": self.get_errors_count(),
             "additional_processors": len(self._processors_pool),
+            "folder_processors": len(self._folder_pool),
+            "waiting_folders": len(self._local_folders) + len(self._remote_folders),
+            **self.autoscaler.get_metrics(),
+            **self.freshness.get_metrics(),
         }
         metrics["total_queue"] = (
             metrics["local_folder_queue"]
             + metrics["local_file_queue"]
             + metrics["remote_folder_queue"]
             + metrics["remote_file_queue"]
+            + metrics["waiting_folders"]
         )
         return metrics
 
@@ -444,6 +544,8 @@ def get_overall_size(self) -> int:
             + self._local_file_queue.qsize()
             + self._remote_folder_queue.qsize()
             + self._remote_file_queue.qsize()
+            + len(self._local_folders)
+            + len(self._remote_folders)
         )
 
     @staticmethod
@@ -495,7 +597,7 @@ def get_processors_on(
             ):
                 res.append(self._remote_file_thread.worker)
             else:
-                for thread in self._processors_pool:
+                for thread in [*self._processors_pool, *self._folder_pool]:
                     if self.is_processing_file(thread, path, exact_match=exact_match):
                         res.append(thread.worker)
         return res
@@ -510,11 +612,29 @@ def has_file_processors_on(self, path: Path, /) -> bool:
 
             return any(
                 self.is_processing_file(thread, path)
-                for thread in self._processors_pool
+                for thread in [*self._processors_pool, *self._folder_pool]
+            )
+
+    def _launch_folder_helpers(
+        self, scheduler: FolderScheduler, queue: Queue, name: str, /
+    ) -> None:
+        """Start helpers of the folder thread, up to one per queued folder."""
+        if scheduler.blocked:
+            # A move or a deletion is waiting for the folder thread only
+            return
+
+        helpers = sum(owner is scheduler for owner, _ in self._folder_pool.values())
+        wanted = min(FOLDER_PROCESSORS - 1, queue.qsize() + scheduler.ready - 1)
+        for _ in range(wanted - helpers):
+            owner = next(self._folder_owners)
+            thread = self._create_thread(
+                partial(scheduler.get, owner), f"{name}-{owner}"
             )
+            self._folder_pool[thread] = (scheduler, owner)
 
     @pyqtSlot()
     def launch_processors(self) -> None:
+        self._refill()
         if (
             self._disable
             or self.is_paused()
@@ -523,6 +643,8 @@ def launch_processors(self) -> None:
                 and self._local_file_queue.empty()
                 and self._remote_folder_queue.empty()
                 and self._remote_file_queue.empty()
+                and not self._local_folders
+                and not self._remote_folders
             )
         ):
             if not self.is_active():
@@ -531,11 +653,16 @@ def launch_processors(self) -> None:
 
         if (
             self._local_folder_thread is None
-            and not self._local_folder_queue.empty()
+            and (not self._local_folder_queue.empty() or self._local_folders)
             and self._local_folder_enable
         ):
             self._local_folder_thread = self._create_thread(
-                self._get_local_folder, "LocalFolderProcessor"
+                partial(self._local_folders.get, FolderScheduler.MAIN),
+                "LocalFolderProcessor",
+            )
+        if self._local_folder_enable:
+            self._launch_folder_helpers(
+                self._local_folders, self._local_folder_queue, "LocalFolderProcessor"
             )
 
         if (
@@ -549,11 +676,16 @@ def launch_processors(self) -> None:
 
         if (
             self._remote_folder_thread is None
-            and not self._remote_folder_queue.empty()
+            and (not self._remote_folder_queue.empty() or self._remote_folders)
             and self._remote_folder_enable
         ):
             self._remote_folder_thread = self._create_thread(
-                self._get_remote_folder, "RemoteFolderProcessor"
+                partial(self._remote_folders.get, FolderScheduler.MAIN),
+                "RemoteFolderProcessor",
+            )
+        if self._remote_folder_enable:
+            self._launch_folder_helpers(
+                self._remote_folders, self._remote_folder_queue, "RemoteFolderProcessor"
             )
 
         if (
@@ -568,7 +700,7 @@ def launch_processors(self) -> None:
         if self._remote_file_queue.qsize() == 0 and self._local_file_queue.qsize() == 0:
             return
 
-        while len(self._processors_pool) < self._max_processors:
+        while len(self._processors_pool) - len(self._retiring) < self.autoscaler.target:
             self._processors_pool.append(
-                self._create_thread(self._get_file, "GenericProcessor")
+                self._create_thread(self._get_pooled_file, "GenericProcessor")
             )
@@ -0,0 +1,131 @@
+"""
+Items waiting for their next try, ordered by deadline.
+
+Pairs in error and blocklisted files used to be kept in dictionaries walked in
+full by a timer every second. With tens of thousands of failing items (an
+expired token, a server outage), that costs CPU and holds locks for nothing.
+A min-heap gives the next deadline in O(1), and releasing due items costs
+O(log n) each, so the timer can sleep until the next deadline.
+"""
+
+from heapq import heapify, heappop, heappush
+from itertools import count
+from random import uniform
+from threading import Lock
+from time import monotonic
+from typing import Dict, Generic, Hashable, List, Optional, Tuple, TypeVar
+
+from ..constants import RETRY_BACKOFF_MAX, RETRY_JITTER
+
+__all__ = ("RetryScheduler", "backoff")
+
+K = TypeVar("K", bound=Hashable)
+V = TypeVar("V")
+
+
+def backoff(
+    attempt: int,
+    base: float,
+    /,
+    *,
+    cap: float = RETRY_BACKOFF_MAX,
+    jitter: float = RETRY_JITTER,
+) -> float:
+    """
+    Return the delay before the try n°*attempt*: *base* doubled at each attempt,
+    up to *cap*, and spread by +/- *jitter* so that items failing together are
+    not retried together.
+    """
+    delay = min(cap, base * 2 ** min(max(attempt - 1, 0), 32))
+    return delay * uniform(1 - jitter, 1 + jitter)
+
+
+class RetryScheduler(Generic[K, V]):
+    def __init__(self) -> None:
+        self._lock = Lock()
+        # (deadline, sequence, key), a cancelled or rescheduled entry stays in the
+        # heap until it reaches the top, or until the heap is compacted
+        self._heap: List[Tuple[float, int, K]] = []
+        # key -> (sequence of its live heap entry, value)
+        self._items: Dict[K, Tuple[int, V]] = {}
+        self._sequence = count()
+
+    def __repr__(self) -> str:
+        return f"<{type(self).__name__} items={len(self._items)}>"
+
+    def __contains__(self, key: object, /) -> bool:
+        return key in self._items
+
+    def __len__(self) -> int:
+        return len(self._items)
+
+    def get(self, key: K, /) -> Optional[V]:
+        item = self._items.get(key)
+        return item[1] if item else None
+
+    def values(self) -> List[V]:
+        with self._lock:
+            return [value for _, value in self._items.values()]
+
+    def schedule(self, key: K, value: V, deadline: float, /) -> None:
+        """
+        Schedule *value* at *deadline*, on the monotonic clock.
+        It replaces any previous schedule of *key*.
+        """
+        with self._lock:
+            sequence = next(self._sequence)
+            self._items[key] = (sequence, value)
+            heappush(self._heap, (deadline, sequence, key))
+            self._compact()
+
+    def cancel(self, key: K, /) -> Optional[V]:
+        """Forget *key* and return its value, if it was scheduled."""
+        with self._lock:
+            item = self._items.pop(key, None)
+            self._compact()
+        return item[1] if item else None
+
+    def pop_due(self, *, now: float = None) -> List[V]:
+        """Forget and return values whose deadline passed, earliest first."""
+        if now is None:
+            now = monotonic()
+        due: List[V] = []
+        with self._lock:
+            while (value := self._pop_next(now)) is not None:
+                due.append(value)
+        return due
+
+    def pop_next(self, *, now: float = None) -> Optional[V]:
+        """Forget and return the earliest value whose deadline passed, if any."""
+        with self._lock:
+            return self._pop_next(monotonic() if now is None else now)
+
+    def _pop_next(self, now: float, /) -> Optional[V]:
+        while self._heap and self._heap[0][0] <= now:
+            _, sequence, key = heappop(self._heap)
+            item = self._items.get(key)
+            if item and item[0] == sequence:
+                del self._items[key]
+                return item[1]
+        return None
+
+    def next_delay(self, *, now: float = None) -> Optional[float]:
+        """Return the seconds until the next deadline, None if nothing is scheduled."""
+        with self._lock:
+            while self._heap:
+                deadline, sequence, key = self._heap[0]
+                item = self._items.get(key)
+                if item and item[0] == sequence:
+                    return max(0.0, deadline - (monotonic() if now is None else now))
+                heappop(self._heap)
+        return None
+
+    def _compact(self) -> None:
+        """Drop stale entries once they outnumber live ones."""
+        if len(self._heap) > 2 * len(self._items) + 64:
+            self._heap = [
+                entry
+                for entry in self._heap
+                if self._items.get(entry[2], (None,))[0] == entry[1]
+            ]
+            heapify(self._heap)
@@ -0,0 +1,179 @@
+"""
+Process-wide slots for the work of all engines.
+
+Each engine has its own processors, and Direct Download its own workers: with
+several bound accounts, nothing bounded the number of concurrent transfers,
+and the busiest engine starved the others. Every job now takes a slot before
+running, there are at most `max-transfers` slots for the whole application.
+
+Waiting jobs are served by weighted fair queuing, where a flow is a job class
+of an engine: an engine gets its share whatever the number of jobs it queues,
+and interactive classes have bigger weights than bulk ones. On top of that,
+half of the slots are split evenly across the engines that have jobs: an engine
+below that minimum is served first.
+"""
+
+from contextlib import contextmanager
+from itertools import count
+from logging import getLogger
+from threading import Condition
+from typing import Callable, Dict, Iterator, Optional, Tuple
+
+from ..objects import Metrics
+from ..options import Options
+
+__all__ = (
+    "DIRECT_DOWNLOAD",
+    "DIRECT_EDIT",
+    "DIRECT_TRANSFER",
+    "SYNC",
+    "TransferScheduler",
+    "transfers",
+)
+
+log = getLogger(__name__)
+
+# Job classes and their weight in the fair queuing
+SYNC = "sync"
+DIRECT_EDIT = "direct_edit"
+DIRECT_TRANSFER = "direct_transfer"
+DIRECT_DOWNLOAD = "direct_download"
+WEIGHTS = {SYNC: 4, DIRECT_EDIT: 4, DIRECT_TRANSFER: 2, DIRECT_DOWNLOAD: 2}
+
+# Part of the slots split evenly across engines with jobs
+ENGINE_SHARE = 0.5
+
+# Longest wait between two checks of the slots, to apply limit changes quickly
+MAX_WAIT = 1.0
+
+
+class TransferScheduler:
+    def __init__(self) -> None:
+        self._condition = Condition()
+        # Slots taken, by engine and by (engine, job class)
+        self._engines: Dict[str, int] = {}
+        self._running: Dict[Tuple[str, str], int] = {}
+        # Waiting jobs: ticket -> (engine, job class, start tag, finish tag)
+        self._waiting: Dict[int, Tuple[str, str, float, float]] = {}
+        # Last finish tag of each flow, and the virtual time
+        self._finish: Dict[Tuple[str, str], float] = {}
+        self._vtime = 0.0
+        self._tickets = count()
+
+    def __repr__(self) -> str:
+        return (
+            f"<{type(self).__name__} running={sum(self._engines.values())}"
+            f"/{self.limit}, waiting={len(self._waiting)}>"
+        )
+
+    @property
+    def limit(self) -> int:
+        return max(1, int(Options.max_transfers))
+
+    def acquire(
+        self,
+        engine_uid: str,
+        job: str,
+        /,
+        *,
+        interrupt: Optional[Callable[[], None]] = None,
+    ) -> None:
+        """
+        Wait for a slot for a *job* of the given *engine_uid*.
+        *interrupt* is called between two checks of the slots, outside of the lock:
+        it raises ThreadInterrupt when the caller is stopped, to give up waiting.
+        """
+        flow = (engine_uid, job)
+        with self._condition:
+            start = max(self._vtime, self._finish.get(flow, 0.0))
+            finish = start + 1 / WEIGHTS[job]
+            self._finish[flow] = finish
+            ticket = next(self._tickets)
+            self._waiting[ticket] = (engine_uid, job, start, finish)
+
+        try:
+            while "Waiting for a slot":
+                with self._condition:
+                    if self._next() == ticket:
+                        del self._waiting[ticket]
+                        self._vtime = max(self._vtime, start)
+                        self._engines[engine_uid] = self._engines.get(engine_uid, 0) + 1
+                        self._running[flow] = self._running.get(flow, 0) + 1
+                        # The next waiter may be eligible too
+                        self._condition.notify_all()
+                        return
+                    self._condition.wait(MAX_WAIT)
+                if interrupt:
+                    interrupt()
+        except BaseException:
+            with self._condition:
+                self._waiting.pop(ticket, None)
+                # The next waiter may be eligible now that this one gave up
+                self._condition.notify_all()
+            raise
+
+    def release(self, engine_uid: str, job: str, /) -> None:
+        flow = (engine_uid, job)
+        with self._condition:
+            if not self._running.get(flow):
+                log.warning(f"Releasing a slot never acquired by {flow}")
+                return
+            self._running[flow] -= 1
+            if not self._running[flow]:
+                del self._running[flow]
+            self._engines[engine_uid] -= 1
+            if not self._engines[engine_uid]:
+                del self._engines[engine_uid]
+            self._condition.notify_all()
+
+    @contextmanager
+    def slot(
+        self,
+        engine_uid: str,
+        job: str,
+        /,
+        *,
+        interrupt: Optional[Callable[[], None]] = None,
+    ) -> Iterator[None]:
+        self.acquire(engine_uid, job, interrupt=interrupt)
+        try:
+            yield
+        finally:
+            self.release(engine_uid, job)
+
+    def forget(self, engine_uid: str, /) -> None:
+        """Drop the fair queuing state of a removed engine."""
+        with self._condition:
+            for flow in [flow for flow in self._finish if flow[0] == engine_uid]:
+                del self._finish[flow]
+
+    def _next(self) -> Optional[int]:
+        """Return the ticket of the waiting job to serve now, if a slot is free."""
+        if not self._waiting or sum(self._engines.values()) >= self.limit:
+            return None
+
+        engines = set(self._engines)
+        engines.update(engine_uid for engine_uid, *_ in self._waiting.values())
+        minimum = max(1, int(self.limit * ENGINE_SHARE / len(engines)))
+
+        best: Optional[Tuple[bool, float, int]] = None
+        for ticket, (engine_uid, _, _, finish) in self._waiting.items():
+            key = (self._engines.get(engine_uid, 0) >= minimum, finish, ticket)
+            if best is None or key < best:
+                best = key
+        return best[2] if best else None
+
+    def get_metrics(self, *, engine_uid: str = "") -> Metrics:
+        with self._condition:
+            metrics = {
+                "transfers_limit": self.limit,
+                "transfers_running": sum(self._engines.values()),
+                "transfers_waiting": len(self._waiting),
+            }
+            if engine_uid:
+                metrics["transfers_engine"] = self._engines.get(engine_uid, 0)
+        return metrics
+
+
+# The process-wide scheduler
+transfers = TransferScheduler()
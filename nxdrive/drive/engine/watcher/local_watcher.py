@@ -367,8 +367,7 @@ def _scan_recursive(self, info: FileInfo, /, *, recursive: bool = True) -> None:
         remote_children: Set[str] = set()
         parent_remote_id = client.get_remote_id(info.path)
         if parent_remote_id:
-            pairs_ = dao.get_new_remote_children(parent_remote_id)
-            remote_children = {pair.remote_name for pair in pairs_}
+            remote_children = dao.get_new_remote_children_names(parent_remote_id)
 
         # recursively update children
         for child_info in fs_children_info:
@@ -223,7 +223,7 @@ def giveup_error(
             incr=self.engine.queue_manager.get_error_threshold() + 1,
         )
         # Push it to generate the error notification
-        self.engine.queue_manager.push_error(doc_pair, exception=exception)
+        self.engine.queue_manager.push_error(doc_pair, exception=exception, failed=True)
         metrics = {
             SYNC_ERROR_LABEL: error.lower(),
             SYNC_ACTION: doc_pair.pair_state,
@@ -236,7 +236,7 @@ def increase_error(
         details = str(exception) if exception else None
         log.info(f"Increasing error [{error}] ({details}) for {doc_pair!r}")
         self.dao.increase_error(doc_pair, error, details=details)
-        self.engine.queue_manager.push_error(doc_pair, exception=exception)
+        self.engine.queue_manager.push_error(doc_pair, exception=exception, failed=True)
 
     def remove_void_transfers(self, doc_pair: DocPair, /) -> None:
         """Remove uploads and downloads on the target doc pair."""
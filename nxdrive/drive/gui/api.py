@@ -392,32 +392,53 @@ def show_metadata(self, uid: str, ref: str, /) -> None:
             self.application.show_metadata(path)
 
     @pyqtSlot(str, result=list)
-    def get_unsynchronizeds(self, uid: str, /) -> List[Dict[str, Any]]:
+    def get_unsynchronizeds(
+        self, uid: str, /, *, after: int = 0, size: int = -1
+    ) -> List[Dict[str, Any]]:
         result = []
         engine = self._get_engine(uid)
         if engine:
-            for conflict in engine.dao.get_unsynchronizeds():
+            for conflict in engine.dao.get_unsynchronizeds(after=after, size=size):
                 result.append(self._export_formatted_state(uid, state=conflict))
         return result
 
     @pyqtSlot(str, result=list)
-    def get_conflicts(self, uid: str, /) -> List[Dict[str, Any]]:
+    def get_conflicts(
+        self, uid: str, /, *, after: int = 0, size: int = -1
+    ) -> List[Dict[str, Any]]:
         result = []
         engine = self._get_engine(uid)
         if engine:
-            for conflict in engine.get_conflicts():
+            for conflict in engine.get_conflicts(after=after, size=size):
                 result.append(self._export_formatted_state(uid, state=conflict))
         return result
 
     @pyqtSlot(str, result=list)
-    def get_errors(self, uid: str, /) -> List[Dict[str, Any]]:
+    def get_errors(
+        self, uid: str, /, *, after: int = 0, size: int = -1
+    ) -> List[Dict[str, Any]]:
         result = []
         engine = self._get_engine(uid)
         if engine:
-            for error in engine.dao.get_errors():
+            for error in engine.dao.get_errors(after=after, size=size):
                 result.append(self._export_formatted_state(uid, state=error))
         return result
 
+    @pyqtSlot(str, result=int)
+    def get_unsynchronizeds_count(self, uid: str, /) -> int:
+        engine = self._get_engine(uid)
+        return engine.dao.get_unsynchronized_count() if engine else 0
+
+    @pyqtSlot(str, result=int)
+    def get_conflicts_count(self, uid: str, /) -> int:
+        engine = self._get_engine(uid)
+        return engine.dao.get_conflict_count() if engine else 0
+
+    @pyqtSlot(str, result=int)
+    def get_errors_count(self, uid: str, /) -> int:
+        engine = self._get_engine(uid)
+        return engine.dao.get_error_count() if engine else 0
+
     @pyqtSlot(result=list)
     def get_features_list(self) -> List[List[str]]:
         """Return the list of declared features with their value, title and translation key."""
@@ -568,6 +589,10 @@ def pause_direct_download(self, engine_uid: str, uid: int, /) -> None:
             return
         engine.dao.update_direct_download_status(uid, DirectDownloadStatus.PAUSED)
 
+        worker = getattr(self._manager, "direct_download", None)
+        if worker is not None:
+            worker.pause(uid)
+
     @pyqtSlot(str, int)
     def resume_direct_download(self, engine_uid: str, uid: int, /) -> None:
         """Resume a paused direct download.
@@ -605,6 +630,10 @@ def cancel_direct_download(self, engine_uid: str, uid: int, /) -> None:
             return
         engine.dao.update_direct_download_status(uid, DirectDownloadStatus.CANCELLED)
 
+        worker = getattr(self._manager, "direct_download", None)
+        if worker is not None:
+            worker.cancel(uid)
+
     @pyqtSlot()
     def open_help(self) -> None:
         self.application.hide_systray()
@@ -3,6 +3,7 @@
 import os
 import webbrowser
 from contextlib import suppress
+from dataclasses import replace
 from functools import partial
 from logging import getLogger
 from math import sqrt
@@ -29,6 +30,7 @@
 from nxdrive.drive.feature import Beta, DisabledFeatures, Feature
 from nxdrive.drive.gui.api import QMLDriveApi
 from nxdrive.drive.gui.custom_window import CustomWindow
+from nxdrive.drive.gui.event_bus import EventBus
 from nxdrive.drive.gui.folders_dialog import DialogMixin, DocumentsDialog, FoldersDialog
 from nxdrive.drive.gui.systray import DriveSystrayIcon, SystrayWindow
 from nxdrive.drive.gui.view import (
@@ -42,11 +44,13 @@
     FeatureModel,
     FileModel,
     LanguageModel,
+    PagedFileModel,
     TasksModel,
     TransferModel,
 )
 from nxdrive.drive.metrics.constants import CRASHED_HIT, CRASHED_TRACE
 from nxdrive.drive.notification import Notification
+from nxdrive.drive.objects import TransferChange
 from nxdrive.drive.options import Options
 from nxdrive.drive.qt import constants as qt
 from nxdrive.drive.qt.imports import (
@@ -120,6 +124,20 @@
 log = getLogger(__name__)
 
 
+def _merge_transfer_changes(
+    pending: TransferChange, change: TransferChange, /
+) -> TransferChange:
+    """Successive updates of a transfer: keep the latest value of each column."""
+    return replace(change, values={**pending.values, **change.values})
+
+
+def _merge_session_events(
+    pending: Tuple[EngineDAO, bool], event: Tuple[EngineDAO, bool], /
+) -> Tuple[EngineDAO, bool]:
+    """A forced refresh must not be lost."""
+    return event[0], pending[1] or event[1]
+
+
 class Application(QApplication):
     """Main Drive application controlled by a system tray icon + menu"""
 
@@ -327,17 +345,18 @@ def init_gui(self) -> None:
             Feature.document_type_selection
         )
         self.tasks_management_feature_model = FeatureModel(Feature.tasks_management)
-        self.conflicts_model = FileModel(self.translate)
-        self.errors_model = FileModel(self.translate)
+        self.conflicts_model = PagedFileModel(self.translate)
+        self.errors_model = PagedFileModel(self.translate)
         self.engine_model = EngineModel(self)
         self.synchronization_feature_model = FeatureModel(
             Feature.synchronization, restart_needed=True
         )
         self.transfer_model = TransferModel(self.translate)
         self.file_model = FileModel(self.translate)
-        self.ignoreds_model = FileModel(self.translate)
+        self.ignoreds_model = PagedFileModel(self.translate)
         self.language_model = LanguageModel()
         self.tasks_model = TasksModel(self.translate)
+        self._init_event_bus()
 
         self.add_engines(list(self.manager.engines.values()))
         self.engine_model.statusChanged.connect(self.update_status)
@@ -1113,7 +1132,7 @@ def change_systray_icon(self) -> None:
             invalid_credentials &= engine.has_invalid_credentials()
             paused &= engine.is_paused()
             offline &= engine.is_offline()
-            conflict |= bool(engine.get_conflicts())
+            conflict |= bool(engine.get_conflicts(size=1))
 
         if offline:
             new_state = "error"
@@ -1138,10 +1157,17 @@ def change_systray_icon(self) -> None:
         self.set_icon_state(new_state)
 
     def refresh_conflicts(self, uid: str, /) -> None:
-        """Update the content of the conflicts/errors window."""
-        self.conflicts_model.add_files(self.api.get_conflicts(uid))
-        self.errors_model.add_files(self.api.get_errors(uid))
-        self.ignoreds_model.add_files(self.api.get_unsynchronizeds(uid))
+        """Update the content of the conflicts/errors window, only loaded pages are fetched."""
+        api = self.api
+        self.conflicts_model.set_source(
+            partial(api.get_conflicts, uid), api.get_conflicts_count(uid)
+        )
+        self.errors_model.set_source(
+            partial(api.get_errors, uid), api.get_errors_count(uid)
+        )
+        self.ignoreds_model.set_source(
+            partial(api.get_unsynchronizeds, uid), api.get_unsynchronizeds_count(uid)
+        )
 
     @pyqtSlot(object)
     def show_conflicts_resolution(self, engine: Engine, /) -> None:
@@ -1449,15 +1475,15 @@ def _connect_engine(self, engine: Engine, /) -> None:
         engine.newSyncEnded.connect(self.refresh_files)
         engine.syncStateCleared.connect(self._on_engine_state_cleared)
 
-        # Refresh the systray files list on each database update
-        engine.dao.transferUpdated.connect(partial(self.refresh_transfers, engine.dao))
-
         # Refresh ongoing Direct Transfer items at startup
         engine.started.connect(partial(self.refresh_direct_transfer_items, engine.dao))
 
-        # Refresh Direct Transfer items on each database update
-        engine.dao.directTransferUpdated.connect(
-            partial(self.refresh_direct_transfer_items, engine.dao)
+        # Apply row-level changes of transfers to the systray files list
+        # and to Direct Transfer items.
+        # Database signals are directly posted to the event bus from the emitting
+        # thread, so that the GUI thread is not flooded with queued signals.
+        engine.dao.transferChanged.connect(
+            partial(self.apply_transfer_change, engine.dao), qt.DirectConnection
         )
 
         # Refresh Direct Download items at startup
@@ -1473,21 +1499,16 @@ def _connect_engine(self, engine: Engine, /) -> None:
 
         # Refresh Direct Download items on each database update
         engine.dao.directDownloadUpdated.connect(
-            partial(self.refresh_active_direct_downloads_items, engine.dao)
-        )
-        engine.dao.directDownloadUpdated.connect(
-            partial(self.refresh_completed_direct_downloads_items, engine.dao)
-        )
-        engine.dao.directDownloadUpdated.connect(
-            partial(self.refresh_direct_download_monitoring_items, engine.dao)
+            partial(self._post_event, "direct_downloads", engine.dao),
+            qt.DirectConnection,
         )
 
         # Refresh ongoing Sessions items at startup
         engine.started.connect(partial(self.refresh_active_sessions_items, engine.dao))
 
-        # Refresh ongoing Sessions items on each database update
+        # Refresh ongoing and completed Sessions items on each database update
         engine.dao.sessionUpdated.connect(
-            partial(self.refresh_active_sessions_items, engine.dao)
+            partial(self._post_session_event, engine.dao), qt.DirectConnection
         )
 
         # Refresh completed Sessions items at startup
@@ -1500,11 +1521,6 @@ def _connect_engine(self, engine: Engine, /) -> None:
             partial(self.add_engines, list(self.manager.engines.values()))
         )
 
-        # Refresh completed Sessions items on each database update
-        engine.dao.sessionUpdated.connect(
-            partial(self.refresh_completed_sessions_items, engine.dao)
-        )
-
         engine.newSyncEnded.connect(self.manager.sentry_metrics.send_sync_event)
         engine.newSyncEnded.connect(engine.remote.metrics.push_sync_event)
 
@@ -2255,6 +2271,60 @@ def update_status(self, engine: Engine, /) -> None:
             sync_state, error_state, update_state
         )
 
+    def _init_event_bus(self) -> None:
+        """Database events are coalesced and delivered at most once per frame."""
+        bus = self.event_bus = EventBus()
+        bus.subscribe("transfers", self.refresh_transfers)
+        bus.subscribe("direct_transfer_items", self.refresh_direct_transfer_items)
+        bus.subscribe(
+            "transfer_update",
+            self._apply_transfer_update,
+            merge=_merge_transfer_changes,
+        )
+        bus.subscribe("sessions", self._refresh_sessions, merge=_merge_session_events)
+        bus.subscribe("direct_downloads", self.refresh_active_direct_downloads_items)
+        bus.subscribe("direct_downloads", self.refresh_completed_direct_downloads_items)
+        bus.subscribe("direct_downloads", self.refresh_direct_download_monitoring_items)
+
+    def _post_event(self, topic: str, dao: EngineDAO, /) -> None:
+        """Called from the thread emitting the database signal."""
+        self.event_bus.post(topic, dao, key=dao)
+
+    def _post_session_event(self, dao: EngineDAO, force: bool, /) -> None:
+        """Called from the thread emitting the database signal."""
+        self.event_bus.post("sessions", (dao, force), key=dao)
+
+    def _refresh_sessions(self, event: Tuple[EngineDAO, bool], /) -> None:
+        dao, force = event
+        self.refresh_active_sessions_items(dao)
+        self.refresh_completed_sessions_items(dao, force)
+
+    def apply_transfer_change(self, dao: EngineDAO, change: TransferChange, /) -> None:
+        """
+        Post a row-level change of the transfers tables, it is called from the thread
+        emitting the database signal.
+        Updates of displayed rows will be done in place, without querying the database.
+        Other changes may impact which rows are displayed, lists will then be refreshed.
+        """
+        bus = self.event_bus
+        if change.action == "update" and change.uid:
+            key = (dao, change.nature, change.uid, change.is_direct_transfer)
+            bus.post("transfer_update", change, key=key)
+            return
+
+        if change.is_direct_transfer or change.action == "reset":
+            bus.post("direct_transfer_items", dao, key=dao)
+        if not change.is_direct_transfer:
+            bus.post("transfers", dao, key=dao)
+
+    def _apply_transfer_update(self, change: TransferChange, /) -> None:
+        if change.is_direct_transfer:
+            self.direct_transfer_model.update_item(change.uid, change.values)
+        else:
+            self.transfer_model.update_transfer(
+                change.nature, change.uid, change.values
+            )
+
     @pyqtSlot(object)
     def refresh_transfers(self, dao: EngineDAO, /) -> None:
         transfers = self.api.get_transfers(dao)
@@ -0,0 +1,106 @@
+"""
+Coalescing bus between the database and the GUI.
+
+Database signals can be emitted thousands of times per second under heavy
+synchronization, and each of them used to trigger a GUI slot, most of the time
+querying the database again. The bus stores events posted from any thread,
+keeps only the latest one per topic and key, and delivers them to the GUI
+thread at most once per frame.
+"""
+
+from logging import getLogger
+from threading import Lock
+from typing import Any, Callable, Dict, Hashable, List, Optional, Tuple
+
+from ..qt.imports import QObject, QTimer, pyqtSignal, pyqtSlot
+
+__all__ = ("EventBus",)
+
+log = getLogger(__name__)
+
+# Delay between two deliveries, in milliseconds (60 frames per second)
+FRAME_INTERVAL = 1000 // 60
+
+
+class EventBus(QObject):
+    """
+    Events are posted under a *topic* and an optional *key*. Until the next
+    delivery, a new event replaces the pending one with the same topic and key
+    (or is merged with it when the topic has a merge function): intermediate
+    values are dropped. Subscribers of a topic are then called once per key,
+    in the GUI thread.
+    """
+
+    _wakeUp = pyqtSignal()
+
+    def __init__(
+        self, *, interval: int = FRAME_INTERVAL, parent: QObject = None
+    ) -> None:
+        super().__init__(parent)
+
+        self._lock = Lock()
+        self._pending: Dict[Tuple[str, Hashable], Any] = {}
+        self._subscribers: Dict[str, List[Callable[[Any], Any]]] = {}
+        self._mergers: Dict[str, Callable[[Any, Any], Any]] = {}
+
+        self._timer = QTimer(self)
+        self._timer.setSingleShot(True)
+        self._timer.setInterval(interval)
+        self._timer.timeout.connect(self.flush)
+
+        # Queued when posting from another thread: the timer is started in the GUI thread
+        self._wakeUp.connect(self._schedule)
+
+    def subscribe(
+        self,
+        topic: str,
+        slot: Callable[[Any], Any],
+        /,
+        *,
+        merge: Optional[Callable[[Any, Any], Any]] = None,
+    ) -> None:
+        """
+        Call *slot* with the payload of each delivered event of the *topic*.
+        *merge(pending, new)* is used to combine events with the same key,
+        by default the latest one wins.
+        """
+        self._subscribers.setdefault(topic, []).append(slot)
+        if merge:
+            self._mergers[topic] = merge
+
+    def post(self, topic: str, payload: Any = None, /, *, key: Hashable = None) -> None:
+        """Queue an event, this is thread-safe and does not block."""
+        with self._lock:
+            wake_up = not self._pending
+            event = (topic, key)
+            if event in self._pending and topic in self._mergers:
+                payload = self._mergers[topic](self._pending[event], payload)
+            self._pending[event] = payload
+
+        # Only the first event of a frame wakes up the GUI thread
+        if wake_up:
+            self._wakeUp.emit()
+
+    @property
+    def pending(self) -> int:
+        """Number of events waiting for the next delivery."""
+        with self._lock:
+            return len(self._pending)
+
+    @pyqtSlot()
+    def _schedule(self) -> None:
+        if not self._timer.isActive():
+            self._timer.start()
+
+    @pyqtSlot()
+    def flush(self) -> None:
+        """Deliver pending events, in the order they were first posted."""
+        with self._lock:
+            events, self._pending = self._pending, {}
+
+        for (topic, _), payload in events.items():
+            for slot in self._subscribers.get(topic, []):
+                try:
+                    slot(payload)
+                except Exception:
+                    log.exception(f"Error while delivering a {topic!r} event")
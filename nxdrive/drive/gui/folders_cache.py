@@ -0,0 +1,80 @@
+"""
+Persistent cache of remote folder trees, used by the Direct Transfer and filters dialogs.
+
+Children of expanded folders are saved in the engine database. When a dialog is
+opened again, cached children are displayed right away and they are refreshed in the
+background once older than FOLDERS_CACHE_TTL. The remote watcher drops the entries
+of folders it receives changes for.
+"""
+
+import json
+from logging import getLogger
+from time import time
+from typing import TYPE_CHECKING, Any, List, Optional, Tuple
+
+from ..constants import FOLDERS_CACHE_TTL
+from .folders_model import Documents
+
+if TYPE_CHECKING:
+    from ..dao.engine import EngineDAO  # noqa
+
+__all__ = ("FoldersCache",)
+
+log = getLogger(__name__)
+
+
+class FoldersCache:
+    """Cached children of the folders of a tree view client, for one engine."""
+
+    def __init__(
+        self, dao: "EngineDAO", client: Any, /, *, ttl: int = FOLDERS_CACHE_TTL
+    ) -> None:
+        self.dao = dao
+        self.client = client
+        self.kind: str = client.cache_kind
+        self.ttl = ttl
+
+    @staticmethod
+    def _key(info: Optional[Documents], /) -> Optional[str]:
+        """The top level is cached under "", documents without UID are not cached."""
+        return info.get_id() if info else ""
+
+    def get(
+        self, info: Optional[Documents], /
+    ) -> Optional[Tuple[List[Documents], bool]]:
+        """
+        Return cached children of *info* (the top level when None),
+        and whether they are recent enough to not be refreshed.
+        """
+        key = self._key(info)
+        if key is None:
+            return None
+        entry = self.dao.get_folder_tree(self.kind, key)
+        if not entry:
+            return None
+
+        data, last_refresh = entry
+        children = [self.client.from_dict(child, parent=info) for child in data]
+        return children, time() - last_refresh < self.ttl
+
+    def is_fresh(self, info: Documents, /) -> bool:
+        """Return True if children of *info* are cached and recent enough."""
+        key = self._key(info)
+        if key is None:
+            return False
+        entry = self.dao.get_folder_tree(self.kind, key)
+        return bool(entry) and time() - entry[1] < self.ttl
+
+    def set(self, info: Optional[Documents], children: List[Documents], /) -> bool:
+        """Save children of *info*. Return True if they changed since the last save."""
+        key = self._key(info)
+        if key is None:
+            return True
+
+        # Normalize the data the same way it will be loaded back
+        data: List[Any] = json.loads(
+            json.dumps([child.as_dict() for child in children])
+        )
+        entry = self.dao.get_folder_tree(self.kind, key)
+        self.dao.set_folder_tree(self.kind, key, data)
+        return not entry or entry[0] != data
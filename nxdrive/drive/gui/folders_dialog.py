@@ -1,12 +1,14 @@
 import os
 import webbrowser
+from contextlib import suppress
 from datetime import datetime, timezone
 from logging import getLogger
 from pathlib import Path
-from typing import TYPE_CHECKING, Dict, List, Optional, Union
+from typing import TYPE_CHECKING, Dict, List, Optional, Set, Tuple, Union
 
 from nxdrive.drive import server_type as _st
 from nxdrive.drive.engine.engine import Engine
+from nxdrive.drive.engine.workers import Runner
 from nxdrive.drive.gui.folders_model import FilteredDoc, FilteredDocuments
 
 from ..constants import APP_NAME, INVALID_CHARS
@@ -32,12 +34,14 @@
     QRegularExpressionValidator,
     QSize,
     Qt,
+    QThreadPool,
     QVBoxLayout,
     pyqtSignal,
 )
 from ..translator import Translator
-from ..utils import find_icon, get_tree_list, sizeof_fmt
+from ..utils import find_icon, get_direct_transfer_tree, sizeof_fmt
 from .constants import get_known_types_translations
+from .folders_cache import FoldersCache
 from .folders_treeview import DocumentTreeView, FolderTreeView
 from .multi_folder_dialog import MultiFolderDialog
 from .schedule_dialog import ScheduleDialog
@@ -162,7 +166,9 @@ def get_tree_view(self) -> Union[QLabel, DocumentTreeView]:
         filters = self.engine.dao.get_filters()
         remote = self.engine.remote
         client = FilteredDocuments(remote, filters)
-        tree_view = DocumentTreeView(self, client)
+        tree_view = DocumentTreeView(
+            self, client, folders_cache=FoldersCache(self.engine.dao, client)
+        )
         tree_view.noRoots.connect(self._handle_no_roots)
         return tree_view
 
@@ -289,6 +295,9 @@ class FoldersDialog(DialogMixin):
 
     newCtxTransfer = pyqtSignal(list)
 
+    # Emitted from the thread pool when a local folder has been sized
+    directoryScanned = pyqtSignal(object, int, int, int, list)
+
     def __init__(
         self,
         application: "Application",
@@ -304,7 +313,12 @@ def __init__(
         self.remote_folder = QLineEdit(self)
 
         self.path: Optional[Path] = None
+        # Selected local paths, and the size and count of what they will upload.
+        # The content of folders is listed by the engine when planning the transfer.
         self.paths: Dict[Path, int] = {}
+        self.counts: Dict[Path, int] = {}
+        self._scanning: Set[Path] = set()
+        self.skipped_items: List[str] = []
 
         self.remote_folder_ref = self.engine.dao.get_config(
             "dt_last_remote_location_ref", default=""
@@ -366,6 +380,8 @@ def __init__(
 
         self.vertical_layout.addLayout(h_button_layout)
 
+        self.directoryScanned.connect(self._directory_scanned)
+
         # Compute overall size and count, and check the button state
         self._process_additionnal_local_paths([str(path)] if path else [])
 
@@ -387,7 +403,7 @@ def keyPressEvent(self, a0: QKeyEvent | None) -> None:
     @property
     def overall_count(self) -> int:
         """Compute total number of files and folders."""
-        return len(self.paths.keys())
+        return sum(self.counts.values())
 
     @property
     def overall_size(self) -> int:
@@ -677,6 +693,8 @@ def accept(self) -> None:
             paused=paused,
             schedule_delay=self.scheduled_delay,
             scheduled_at=scheduled_at,
+            walk=True,
+            count=self.overall_count,
         )
 
     def button_ok_state(self) -> None:
@@ -684,18 +702,18 @@ def button_ok_state(self) -> None:
 
         # Required criteria:
         #   - at least 1 local path or a new folder to create
+        #   - all selected folders are sized
         #   - a selected remote path
+        ready = bool(self.paths) and not self._scanning
         if hasattr(self, "upload_now_button"):
-            self.upload_now_button.setEnabled(bool(self.paths))
+            self.upload_now_button.setEnabled(ready)
         if hasattr(self, "upload_later_button"):
-            self.upload_later_button.setEnabled(
-                bool(self.paths) and not (self.scheduled_time)
-            )
+            self.upload_later_button.setEnabled(ready and not (self.scheduled_time))
         self.new_folder_button.setEnabled(
             bool(self.remote_folder_ref) and bool(self.tree_view.current)
         )
         self.cbDocType.setEnabled(
-            bool(self.paths)
+            ready
             and bool(self.tree_view.current)
             and bool(Feature.document_type_selection)
         )
@@ -737,7 +755,12 @@ def get_tree_view(self) -> FolderTreeView:
                 f"{self.engine.type!r}"
             )
         client = folders_cls(self.engine.remote)
-        return FolderTreeView(self, client, self.selected_folder)
+        return FolderTreeView(
+            self,
+            client,
+            self.selected_folder,
+            folders_cache=FoldersCache(self.engine.dao, client),
+        )
 
     def _files_display(self) -> str:
         """Return the original file or folder to upload and the count of others to proceed."""
@@ -753,6 +776,7 @@ def _process_additionnal_local_paths(self, paths: List[str], /) -> None:
         """Append more local paths to the upload queue."""
 
         self.local_path_msg_lbl.setText("")
+        self.skipped_items = []
 
         # Retrieve size limits
         file_limit_mb = Options.direct_transfer_file_upper_limit
@@ -761,8 +785,7 @@ def _process_additionnal_local_paths(self, paths: List[str], /) -> None:
         file_limit = file_limit_mb * 1024 * 1024 if file_limit_mb else None
         folder_limit = folder_limit_mb * 1024 * 1024 if folder_limit_mb else None
 
-        current_total_size = sum(self.paths.values())
-        skipped_items: list[str] = []
+        current_total_size = self.overall_size
 
         # Check multiple file size limit if applicable
         all_are_files = all(Path(p).is_file() for p in paths if p)
@@ -792,22 +815,21 @@ def _process_additionnal_local_paths(self, paths: List[str], /) -> None:
                 continue
 
             # Prevent uploading the same file twice
-            if path in self.paths.keys():
+            if self._is_selected(path):
                 continue
 
             initial_total_size = current_total_size
 
             if path.is_dir():
-                current_total_size = self._process_directory(
+                # Sized in the background, see _directory_scanned()
+                self._process_directory(path, file_limit)
+            else:
+                current_total_size = self._process_file(
                     path,
                     current_total_size,
                     file_limit,
                     folder_limit,
-                    skipped_items,
-                )
-            else:
-                current_total_size = self._process_file(
-                    path, current_total_size, file_limit, folder_limit, skipped_items
+                    self.skipped_items,
                 )
 
             self.last_local_selected_location = path.parent
@@ -817,11 +839,22 @@ def _process_additionnal_local_paths(self, paths: List[str], /) -> None:
                 if not self.path:
                     self.path = path
 
+        self._update_local_paths()
+
+    def _is_selected(self, path: Path, /) -> bool:
+        """Return True if *path*, or one of its parent folders, is already selected."""
+        selected = self.paths.keys() | self._scanning
+        return path in selected or any(parent in selected for parent in path.parents)
+
+    def _update_local_paths(self) -> None:
+        """Display the selected local paths, their size and skipped items."""
         # Show skipped items if any
-        if skipped_items:
-            self.local_path_msg_lbl.setText(self._skipped_items_summary(skipped_items))
+        if self.skipped_items:
+            self.local_path_msg_lbl.setText(
+                self._skipped_items_summary(self.skipped_items)
+            )
             log.warning(
-                "Skipped items due to size limit: [%s]", ", ".join(skipped_items)
+                "Skipped items due to size limit: [%s]", ", ".join(self.skipped_items)
             )
         else:
             self.local_path_msg_lbl.setText("")
@@ -835,48 +868,64 @@ def _process_additionnal_local_paths(self, paths: List[str], /) -> None:
 
         self.button_ok_state()
 
-    def _process_directory(
-        self,
-        path: Path,
-        current_total_size: int,
-        file_limit: int | None,
-        folder_limit: int | None,
-        skipped_items: list[str],
-    ) -> int:
-        try:
-            files_with_sizes = list(get_tree_list(path))
-            total_dir_size = sum(size for _, size in files_with_sizes)
-
-            # Skip whole folder if folder size exceeds the limit
-            if folder_limit and total_dir_size > folder_limit:
-                skipped_items.append(path.name)
-                return current_total_size
-
-            # Skip if adding this folder would exceed the total size limit
-            if folder_limit and (current_total_size + total_dir_size) > folder_limit:
-                skipped_items.append(path.name)
-                return current_total_size
-
-            for file_path, size in files_with_sizes:
-                # ignoring zero byte files [NXDRIVE-2925]
-                if file_path.is_file() and self.get_size(file_path) == 0:
-                    continue
-
-                if file_limit and size > file_limit:
-                    skipped_items.append(file_path.name)
-                    continue
+    def _process_directory(self, path: Path, file_limit: int | None, /) -> None:
+        """Size the *path* folder in a thread of the pool, not to freeze the GUI."""
+        pool = QThreadPool.globalInstance()
+        if not pool:
+            log.error(f"Cannot get the global thread pool to size {path!r}")
+            return
 
-                self.paths[file_path] = size
-                current_total_size += size
+        self._scanning.add(path)
+        pool.start(Runner(self._scan_directory, path, file_limit or 0))
 
+    def _scan_directory(self, path: Path, file_limit: int, /) -> None:
+        """
+        Count and size what will be uploaded from the *path* folder.
+        Called from a thread of the pool, only totals are sent back to the dialog.
+        """
+        count = size = 0
+        skipped: List[Tuple[Path, int]] = []
+        try:
+            for _, file_size in get_direct_transfer_tree(
+                path, file_limit=file_limit, skipped=skipped
+            ):
+                count += 1
+                size += file_size
         except OSError:
             log.warning(f"Error scanning directory {path!r}", exc_info=True)
         except Exception:
             log.error(
-                f"Unexpected error in _process_directory() for {path!r}", exc_info=True
+                f"Unexpected error in _scan_directory() for {path!r}", exc_info=True
             )
 
-        return current_total_size
+        total = size + sum(file_size for _, file_size in skipped)
+        with suppress(RuntimeError):
+            # RuntimeError: wrapped C/C++ object of type FoldersDialog has been deleted
+            # May happen if the window was closed in the meantime.
+            self.directoryScanned.emit(
+                path, count, size, total, [file.name for file, _ in skipped]
+            )
+
+    def _directory_scanned(
+        self, path: Path, count: int, size: int, total: int, skipped: List[str], /
+    ) -> None:
+        """Add the sized *path* folder to the upload queue, if it fits the limits."""
+        self._scanning.discard(path)
+
+        folder_limit_mb = Options.direct_transfer_folder_upper_limit
+        folder_limit = folder_limit_mb * 1024 * 1024 if folder_limit_mb else None
+
+        # Skip whole folder if adding it would exceed the total size limit
+        if folder_limit and self.overall_size + total > folder_limit:
+            self.skipped_items.append(path.name)
+        elif count:
+            self.skipped_items.extend(skipped)
+            self.paths[path] = size
+            self.counts[path] = count
+            if size and not self.path:
+                self.path = path
+
+        self._update_local_paths()
 
     def _process_file(
         self,
@@ -903,6 +952,7 @@ def _process_file(
                 return current_total_size
 
             self.paths[path] = file_size
+            self.counts[path] = 1
             return current_total_size + file_size
 
         except OSError:
@@ -3,7 +3,7 @@
 
 from nxdrive.drive.gui.folders_model import Doc, Documents, FilteredDoc
 
-from ..constants import USER_WORKSPACE
+from ..constants import FOLDERS_PREFETCH_MAX, USER_WORKSPACE
 from ..qt import constants as qt
 from ..qt.imports import QRunnable, QStandardItem, QStandardItemModel, Qt, QVariant
 from ..translator import Translator
@@ -38,43 +38,93 @@ def __init__(
             self.info = self.item.data(qt.UserRole)
 
     def run(self) -> None:
-        """Fetch children of a given item."""
+        """Fetch children of a given item.
+        Cached children are displayed first, and refreshed only when they are outdated.
+        """
         item, info = self.item, self.info
         if info:
             if info.get_id() in self.tree.cache and not self.force_refresh:
                 self.tree.set_loading_cursor(False)
                 self.handle_already_cached()
                 return
-            elif info.get_id() not in self.tree.cache:
-                self.tree.cache.append(info.get_id())
-        try:
+            self.tree.cache.add(info.get_id())
+
+        folders_cache = self.tree.folders_cache
+        cached: List[Documents] = []
+        if folders_cache and not self.force_refresh:
             if info:
-                if not info.is_expandable() and not info.get_path().startswith(
-                    USER_WORKSPACE
-                ):
-                    children = []
-                else:
-                    children = list(self.tree.client.get_children(info))
-            else:
-                children = list(self.tree.client.get_top_documents())
+                info.children = []
+            entry = folders_cache.get(info)
+            if entry:
+                cached, fresh = entry
+                self.display(cached)
+                if fresh:
+                    self.prefetch(cached)
+                    return
+
+        try:
+            children = self.fetch(info)
         except Exception:
             path = info.get_path() if info else "root"
             log.warning(f"Error while retrieving documents on {path!r}", exc_info=True)
             self.tree.set_loading_cursor(False)
-            if item:
+            if item and not cached:
                 item.removeRows(0, item.rowCount())
                 item.appendRow(
                     QStandardItem(Translator.get("LOADING_ERROR") + " \U0001f937")
                 )
             return
 
+        if not folders_cache or folders_cache.set(info, children) or not cached:
+            self.display(children)
+        elif info:
+            # Nothing changed, keep documents already displayed
+            info.children = cached
+
+        if folders_cache:
+            self.prefetch(children)
+
+    def fetch(self, info: Optional[Documents], /) -> List[Documents]:
+        """Fetch children of *info* (top level documents when None) from the server."""
+        if not info:
+            return list(self.tree.client.get_top_documents())
+        if not info.is_expandable() and not info.get_path().startswith(USER_WORKSPACE):
+            return []
+        info.children = []
+        return list(self.tree.client.get_children(info))
+
+    def display(self, children: List[Documents], /) -> None:
+        """Display children of the item."""
         # Used with the filters window only
-        if not info and not children and hasattr(self.tree, "noRoots"):
+        if not self.info and not children and hasattr(self.tree, "noRoots"):
             self.tree.noRoots.emit(True)
 
         self.fill_tree(children)
         self.tree.set_loading_cursor(False)
 
+    def prefetch(self, children: List[Documents], /) -> None:
+        """Fetch and cache children of subfolders in advance,
+        they will be displayed instantly when expanded.
+        """
+        folders_cache = self.tree.folders_cache
+        count = 0
+        for child in children:
+            if count >= FOLDERS_PREFETCH_MAX:
+                break
+            if not (child.folderish() and child.selectable()):
+                continue
+            if folders_cache.is_fresh(child):
+                continue
+
+            count += 1
+            try:
+                folders_cache.set(child, self.fetch(child))
+            except Exception:
+                log.debug(f"Cannot prefetch children of {child!r}", exc_info=True)
+            finally:
+                # Documents will be recreated from the cache when the item is expanded
+                child.children = []
+
     def add_loading_subitem(self, item: QStandardItem, /) -> None:
         """Add "Loading..." entry in advance for when the user will click on an item to expand it."""
         load_item = QStandardItem(Translator.get("LOADING"))
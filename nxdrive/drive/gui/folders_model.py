@@ -5,7 +5,7 @@
 """
 
 from logging import getLogger
-from typing import Any, Iterator, List, Union
+from typing import Any, Dict, Iterator, List, Union
 
 from nxdrive.drive.objects import Filters, RemoteFileInfo
 from nxdrive.drive.options import Options
@@ -149,6 +149,15 @@ def selectable(self) -> bool:
         """
         return "Read" in self.doc.contextParameters["permissions"]
 
+    def as_dict(self) -> Dict[str, Any]:
+        """The document's data, as saved in the folder tree cache."""
+        data = {
+            key: getattr(self.doc, key, None)
+            for key in ("uid", "title", "path", "type", "facets", "contextParameters")
+        }
+        data["expandable"] = self.expandable
+        return data
+
 
 class FilteredDoc(FileInfo):
     """A document. Used by the filters feature."""
@@ -203,6 +212,16 @@ def is_dirty(self) -> bool:
         """The document's state has changed and need to be updated."""
         return self.old_state != self.state
 
+    def as_dict(self) -> Dict[str, Any]:
+        """The document's data, as saved in the folder tree cache."""
+        return {
+            "id": self.fs_info.uid,
+            "parentId": self.fs_info.parent_uid,
+            "path": self.fs_info.path,
+            "name": self.fs_info.name,
+            "folder": self.fs_info.folderish,
+        }
+
 
 class FoldersOnlyBase:
     """Abstract base for server-specific folder tree providers.
@@ -212,6 +231,9 @@ class FoldersOnlyBase:
     and ``get_children``.
     """
 
+    # Name of the tree in the folder tree cache
+    cache_kind = "folders"
+
     def __init__(self, remote: Any, /) -> None:
         self.remote = remote
 
@@ -223,10 +245,19 @@ def get_children(self, parent: "Documents", /) -> Iterator["Documents"]:
         """Fetch children of a given *parent*."""
         raise NotImplementedError
 
+    def from_dict(
+        self, data: Dict[str, Any], /, *, parent: "Documents" = None
+    ) -> "Documents":
+        """Recreate a document from the folder tree cache."""
+        return Doc(data, data.get("expandable", True), True, parent=parent)
+
 
 class FilteredDocuments:
     """Display all documents (files and folders) of all sync roots. Used by the filters feature."""
 
+    # Name of the tree in the folder tree cache
+    cache_kind = "documents"
+
     def __init__(self, remote: Any, filters: Filters, /) -> None:
         self.remote = remote
         self.filters = tuple(filters)
@@ -249,6 +280,7 @@ def get_item_state(self, path: str, /) -> Qt.CheckState:
 
     def get_top_documents(self) -> Iterator["Documents"]:
         """Fetch all sync roots."""
+        self.roots = []
         root_info = self.remote.get_filesystem_root_info()
         for sync_root in self.remote.get_fs_children(root_info.uid, filtered=False):
             root = FilteredDoc(sync_root, self.get_item_state(sync_root.path))
@@ -260,5 +292,15 @@ def get_children(self, parent: "Documents", /) -> Iterator["Documents"]:
         for info in self.remote.get_fs_children(parent.get_id(), filtered=False):
             yield FilteredDoc(info, self.get_item_state(info.path), parent=parent)
 
+    def from_dict(
+        self, data: Dict[str, Any], /, *, parent: "Documents" = None
+    ) -> "Documents":
+        """Recreate a document from the folder tree cache."""
+        info = RemoteFileInfo.from_dict(data)
+        doc = FilteredDoc(info, self.get_item_state(info.path), parent=parent)
+        if not parent:
+            self.roots.append(doc)
+        return doc
+
 
 Documents = Union[Doc, FilteredDoc]
@@ -1,5 +1,5 @@
 from logging import getLogger
-from typing import TYPE_CHECKING, Any, List, Union
+from typing import TYPE_CHECKING, Any, List, Optional, Set, Union
 
 from nxdrive.drive.gui.folders_model import FilteredDocuments
 
@@ -15,6 +15,7 @@
     QTreeView,
     pyqtSignal,
 )
+from .folders_cache import FoldersCache
 from .folders_loader import DocumentContentLoader, FolderContentLoader
 
 if TYPE_CHECKING:
@@ -29,7 +30,12 @@ class TreeViewMixin(QTreeView):
     """The base class of a tree view."""
 
     def __init__(
-        self, parent: "DialogMixin", client: Union[Any, FilteredDocuments], /
+        self,
+        parent: "DialogMixin",
+        client: Union[Any, FilteredDocuments],
+        /,
+        *,
+        folders_cache: Optional[FoldersCache] = None,
     ) -> None:
         super().__init__(parent)
         self.setHeaderHidden(True)
@@ -37,7 +43,10 @@ def __init__(
         self.parent = parent
         self.client = client
 
-        self.cache: List[str] = []
+        # UIDs of documents whose children were loaded by this view
+        self.cache: Set[str] = set()
+        # Children persisted across views, see FoldersCache
+        self.folders_cache = folders_cache
         self.root_item = QStandardItemModel()
         self.setModel(self.root_item)
 
@@ -99,8 +108,15 @@ class DocumentTreeView(TreeViewMixin):
     # The content's loader for synced documents
     loader = DocumentContentLoader
 
-    def __init__(self, parent: "DocumentsDialog", client: FilteredDocuments, /) -> None:
-        super().__init__(parent, client)
+    def __init__(
+        self,
+        parent: "DocumentsDialog",
+        client: FilteredDocuments,
+        /,
+        *,
+        folders_cache: Optional[FoldersCache] = None,
+    ) -> None:
+        super().__init__(parent, client, folders_cache=folders_cache)
 
         # When an item is changed, update its eventual parents and children states
         self.root_item.itemChanged.connect(self.resolve_item)
@@ -189,8 +205,10 @@ def __init__(
         client: Any,
         selected_folder: str = None,
         /,
+        *,
+        folders_cache: Optional[FoldersCache] = None,
     ) -> None:
-        super().__init__(parent, client)
+        super().__init__(parent, client, folders_cache=folders_cache)
 
         # Actions to do when a folder is selected
         selection_model = self.selectionModel()
@@ -1,11 +1,16 @@
 from datetime import date, datetime
 from functools import partial
+from operator import itemgetter
 from typing import TYPE_CHECKING, Any, Callable, Dict, List, Tuple
 
 from dateutil import parser
 from dateutil.tz import tzlocal
 
-from ..constants import DT_ACTIVE_SESSIONS_MAX_ITEMS, DT_MONITORING_MAX_ITEMS
+from ..constants import (
+    DT_ACTIVE_SESSIONS_MAX_ITEMS,
+    DT_MONITORING_MAX_ITEMS,
+    FILES_PAGE_SIZE,
+)
 from ..options import Options
 from ..qt import constants as qt
 from ..qt.imports import (
@@ -37,11 +42,82 @@
     "FeatureModel",
     "FileModel",
     "LanguageModel",
+    "PagedFileModel",
     "TasksModel",
     "TransferModel",
 )
 
 
+def _sync_rows(
+    model: QAbstractListModel,
+    rows: List[Dict[str, Any]],
+    new_rows: List[Dict[str, Any]],
+    key: Callable[[Dict[str, Any]], Any],
+    /,
+    *,
+    keep: Tuple[str, ...] = (),
+) -> None:
+    """
+    Make *rows* equal to *new_rows* by notifying only the rows that were removed,
+    moved, inserted or changed: views do not have to reset and render everything again.
+    Values of the *keep* keys are not stored in the database, they are kept from
+    current rows.
+    """
+    parent = QModelIndex()
+    new_keys = {key(row) for row in new_rows}
+
+    for idx in reversed(range(len(rows))):
+        if key(rows[idx]) not in new_keys:
+            model.beginRemoveRows(parent, idx, idx)
+            del rows[idx]
+            model.endRemoveRows()
+
+    for idx, new_row in enumerate(new_rows):
+        new_key = key(new_row)
+        if idx >= len(rows) or key(rows[idx]) != new_key:
+            current = next(
+                (pos for pos in range(idx + 1, len(rows)) if key(rows[pos]) == new_key),
+                None,
+            )
+            if current is None:
+                model.beginInsertRows(parent, idx, idx)
+                rows.insert(idx, new_row)
+                model.endInsertRows()
+                continue
+            model.beginMoveRows(parent, current, current, parent, idx)
+            rows.insert(idx, rows.pop(current))
+            model.endMoveRows()
+
+        old_row = rows[idx]
+        kept = {k: old_row[k] for k in keep if k in old_row and k not in new_row}
+        if kept:
+            new_row = {**new_row, **kept}
+        if new_row != old_row:
+            rows[idx] = new_row
+            index = model.index(idx, 0)
+            model.dataChanged.emit(index, index, [])
+
+
+def _update_row(
+    model: QAbstractListModel,
+    rows: List[Dict[str, Any]],
+    key: Callable[[Dict[str, Any]], Any],
+    wanted: Any,
+    values: Dict[str, Any],
+    /,
+) -> bool:
+    """Update *values* of the row identified by *wanted*. Return False if it is not displayed."""
+    for idx, row in enumerate(rows):
+        if key(row) != wanted:
+            continue
+        if any(row.get(name) != value for name, value in values.items()):
+            row.update(values)
+            index = model.index(idx, 0)
+            model.dataChanged.emit(index, index, [])
+        return True
+    return False
+
+
 class EngineModel(QAbstractListModel):
     engineChanged = pyqtSignal()
     statusChanged = pyqtSignal(object)
@@ -200,18 +276,28 @@ def roleNames(self) -> Dict[int, bytes]:
     def count(self) -> int:
         return self.rowCount()
 
+    @staticmethod
+    def _key(row: Dict[str, Any], /) -> Tuple[Any, Any]:
+        # Downloads and uploads are stored in different tables, their UIDs may collide
+        return row.get("transfer_type"), row.get("uid")
+
     def set_transfers(
         self, transfers: List[Dict[str, Any]], /, *, parent: QModelIndex = QModelIndex()
     ) -> None:
-        self.beginRemoveRows(parent, 0, self.rowCount() - 1)
-        self.transfers.clear()
-        self.endRemoveRows()
-
-        self.beginInsertRows(parent, 0, len(transfers) - 1)
-        self.transfers.extend(transfers)
-        self.endInsertRows()
+        count = self.rowCount()
+        _sync_rows(
+            self, self.transfers, transfers, self._key, keep=("speed", "finalizing")
+        )
+        if self.rowCount() != count:
+            self.fileChanged.emit()
 
-        self.fileChanged.emit()
+    def update_transfer(
+        self, transfer_type: str, uid: int, values: Dict[str, Any], /
+    ) -> bool:
+        """Apply *values* to a displayed transfer. Return False if it is not displayed."""
+        return _update_row(
+            self, self.transfers, self._key, (transfer_type, uid), values
+        )
 
     def get_progress(self, row: Dict[str, Any], /) -> str:
         """Return a nicely formatted line to know the transfer progression.
@@ -361,16 +447,30 @@ def update_items(
         parent: QModelIndex = QModelIndex(),
     ) -> None:
         """Update items with *updated_items*."""
-        # Edit the first rows of the list with real datas from updated_items.
-        for row, n_item in enumerate(updated_items):
-            self.edit_item(row, n_item)
-
-        # Use the shadow_item for the rest of the list if updated_items is too short.
-        for x in range(len(updated_items), len(self.items)):
-            self.edit_item(x, self.shadow_item)
+        # Edit the first rows of the list with real datas from updated_items,
+        # and use the shadow_item for the rest of the list if it is too short.
+        # Only rows that actually changed are notified.
+        for row in range(len(self.items)):
+            n_item = (
+                updated_items[row] if row < len(updated_items) else self.shadow_item
+            )
+            if "finalizing" not in n_item:
+                n_item["finalizing"] = False
+            if n_item != self.items[row]:
+                self.edit_item(row, n_item)
 
         self.fileChanged.emit()
 
+    def update_item(self, uid: int, values: Dict[str, Any], /) -> bool:
+        """Apply *values* to a displayed item. Return False if it is not displayed."""
+        return _update_row(
+            self,
+            self.items,
+            lambda item: None if item.get("shadow") else item.get("uid"),
+            uid,
+            values,
+        )
+
     def data(self, index: QModelIndex, role: int, /) -> Any:
         row = self.items[index.row()]
         if role == self.STATUS:
@@ -1287,6 +1387,67 @@ def flags(self, index: QModelIndex, /) -> Qt.ItemFlag:
         return qt.ItemIsEditable | qt.ItemIsEnabled | qt.ItemIsSelectable
 
 
+class PagedFileModel(FileModel):
+    """
+    Files are loaded by pages, only when views need them (see fetchMore()).
+    The total count is cached, it is what the `count` property returns.
+    """
+
+    fileChanged = pyqtSignal()
+
+    def __init__(
+        self,
+        translate: Callable,
+        /,
+        *,
+        page_size: int = FILES_PAGE_SIZE,
+        parent: QObject = None,
+    ) -> None:
+        super().__init__(translate, parent=parent)
+        self.page_size = page_size
+        self.total = 0
+        self._fetch: Callable[..., List[Dict[str, Any]]] = lambda **_: []
+
+    def set_source(
+        self, fetch: Callable[..., List[Dict[str, Any]]], total: int, /
+    ) -> None:
+        """
+        Change the source of files: *fetch(after=ID, size=N)* returns at most N files
+        with an ID greater than the given one, ordered by ID. *total* is the count
+        of files.
+        Already loaded pages are loaded again and only changes are notified.
+        """
+        self._fetch = fetch
+        size = max(self.page_size, self.rowCount())
+        files = fetch(after=0, size=size) if total else []
+        _sync_rows(self, self.files, files, itemgetter("id"))
+        if total != self.total:
+            self.total = total
+            self.fileChanged.emit()
+
+    def canFetchMore(self, parent: QModelIndex = QModelIndex(), /) -> bool:
+        return self.rowCount() < self.total
+
+    def fetchMore(self, parent: QModelIndex = QModelIndex(), /) -> None:
+        after = self.files[-1]["id"] if self.files else 0
+        files = self._fetch(after=after, size=self.page_size)
+        if not files:
+            # The cached count is outdated
+            self.total = self.rowCount()
+            self.fileChanged.emit()
+            return
+
+        first = self.rowCount()
+        self.beginInsertRows(parent, first, first + len(files) - 1)
+        self.files.extend(files)
+        self.endInsertRows()
+
+    def get_count(self) -> int:
+        return self.total
+
+    count = pyqtProperty("int", get_count, notify=fileChanged)
+
+
 class LanguageModel(QAbstractListModel):
     NAME_ROLE = qt.UserRole + 1
     TAG_ROLE = qt.UserRole + 2
@@ -3,6 +3,7 @@
 import shutil
 import sqlite3
 import uuid
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timezone
 from logging import getLogger
 from pathlib import Path, PurePath
@@ -26,6 +27,7 @@
     APP_NAME,
     APP_VERSION,
     DEFAULT_CHANNEL,
+    ENGINE_START_WORKERS,
     NO_SPACE_ERRORS,
     STARTUP_PAGE_CONNECTION_TIMEOUT,
     WINDOWS,
@@ -666,23 +668,35 @@ def stop(self) -> None:
         self.stopped.emit()
 
     def start_engines(self) -> None:
-        """Start all engines."""
-        for engine in self.engines.copy().values():
-            if self.is_paused:
-                continue
-
-            try:
-                engine.start()
-            except MissingXattrSupport as exc:
-                log.warning(f"Could not start {engine}: {exc}")
-            except Exception:
-                log.exception(f"Could not start {engine}")
+        """
+        Start all engines. Each one checks its local folder, its transfers and
+        conflicts before starting its workers: they are started concurrently.
+        """
+        engines = [] if self.is_paused else list(self.engines.copy().values())
+        if len(engines) > 1:
+            with ThreadPoolExecutor(
+                max_workers=min(len(engines), ENGINE_START_WORKERS),
+                thread_name_prefix="EngineStart",
+            ) as executor:
+                list(executor.map(self._start_engine, engines))
+        else:
+            for engine in engines:
+                self._start_engine(engine)
 
         if self.direct_download:
             self.direct_download.resume_persisted_downloads()
         if Feature.direct_transfer:
             self._init_direct_transfer_resumption()
 
+    @staticmethod
+    def _start_engine(engine: Engine, /) -> None:
+        try:
+            engine.start()
+        except MissingXattrSupport as exc:
+            log.warning(f"Could not start {engine}: {exc}")
+        except Exception:
+            log.exception(f"Could not start {engine}")
+
     def start(self) -> None:
         self._started = True
 
@@ -1333,6 +1347,8 @@ def remove_engine_dbs(self, uid: str, engine_type: str = "") -> None:
             main_db,
             main_db.with_suffix(".db-shm"),
             main_db.with_suffix(".db-wal"),
+            main_db.with_suffix(".db-clean"),
+            main_db.with_suffix(".db-repair"),
         ):
             try:
                 file.unlink(missing_ok=True)
@@ -312,6 +312,42 @@ def update_state(self, local_state: str, remote_state: str) -> None:
 DocPairs = List[DocPair]
 
 
+class QueueItem(NamedTuple):
+    """
+    Compact projection of a States row, enough to dispatch a pair to a processor.
+
+    Hot paths (queue manager, processors dispatch, queue rebuilds) select only
+    those columns and get a tuple: no per-instance dictionary, and unlike
+    a DocPair, no reference to the whole row with its paths and digests.
+    """
+
+    id: int
+    folderish: bool
+    pair_state: str
+
+    def __repr__(self) -> str:
+        return (
+            f"{type(self).__name__}[{self.id}](folderish={self.folderish!r}, "
+            f"state={self.pair_state!r})"
+        )
+
+
+class Preflight(NamedTuple):
+    """
+    What a processor checks before handling a pair, read in a single statement:
+    the parent pair and the status of the pair download and upload, if any.
+    """
+
+    parent: Optional[DocPair]
+    download: Optional[TransferStatus]
+    upload: Optional[TransferStatus]
+
+    @staticmethod
+    def is_paused(status: Optional[TransferStatus], /) -> bool:
+        """Return True if a transfer exists and is not being processed."""
+        return status not in (None, TransferStatus.ONGOING, TransferStatus.DONE)
+
+
 class EngineDef(Row):
     local_folder: Path
     engine: str
@@ -374,6 +410,20 @@ def token_callback(self, batch: Any, _: Dict[str, Any]) -> None:
         self.is_dirty = True
 
 
+@dataclass
+class TransferChange:
+    """
+    Row-level change of the Downloads or Uploads tables.
+    It lets GUI models apply the change instead of reloading whole lists.
+    """
+
+    nature: str  # "download" or "upload"
+    action: str  # "insert", "update", "remove", or "reset" when several rows changed
+    uid: int = 0
+    is_direct_transfer: bool = False
+    values: Dict[str, Any] = field(default_factory=dict)  # Updated columns
+
+
 @dataclass
 class Session:
     uid: int
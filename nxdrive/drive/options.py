@@ -270,6 +270,10 @@ class MetaOptions(type):
     options: Dict[str, Tuple[Any, str]] = {
         "alfresco_excluded_top_folders": ("", "default"),
         "alfresco_force_sync_top_folders": ("", "default"),
+        "bandwidth_download_limit": (0, "default"),
+        "bandwidth_interactive_share": (20, "default"),
+        "bandwidth_schedule": ("", "default"),
+        "bandwidth_upload_limit": (0, "default"),
         "big_file": (300, "default"),
         "browser_startup_page": ("", "default"),
         "ca_bundle": (None, "default"),
@@ -298,6 +302,8 @@ class MetaOptions(type):
         "feature_systray_history": (-1, "default"),
         "force_locale": (None, "default"),
         "handshake_timeout": (60, "default"),
+        "history_archive": (False, "default"),
+        "history_retention": (90, "default"),
         "home": (__home, "default"),
         "ignored_files": (__files, "default"),
         "ignored_prefixes": (__prefixes, "default"),
@@ -310,6 +316,7 @@ class MetaOptions(type):
         "log_level_console": (DEFAULT_LOG_LEVEL_CONSOLE, "default"),
         "log_level_file": (DEFAULT_LOG_LEVEL_FILE, "default"),
         "max_errors": (3, "default"),
+        "max_transfers": (20, "default"),
         "nxdrive_home": (_get_nxdrive_home(__home), "default"),
         "nofscheck": (False, "default"),
         "oauth2_authorization_endpoint": (None, "default"),
@@ -701,6 +708,49 @@ def validate_direct_download_max_workers(value: int) -> int:
     return value
 
 
+def validate_max_transfers(value: int, /) -> int:
+    if value < 1:
+        raise ValueError("'max_transfers' must be a positive integer (>= 1)")
+    return value
+
+
+def validate_bandwidth_limit(value: int, /) -> int:
+    if value >= 0:
+        return int(value)
+    raise ValueError("Bandwidth limit must be 0 (unlimited) or a positive integer")
+
+
+def validate_bandwidth_interactive_share(value: int, /) -> int:
+    if 0 <= value <= 90:
+        return int(value)
+    raise ValueError("'bandwidth_interactive_share' must be between 0 and 90")
+
+
+def validate_bandwidth_schedule(value: str, /) -> str:
+    """The schedule is empty (always active), or a "HH:MM-HH:MM" local time window."""
+    if not value:
+        return ""
+    try:
+        start, end = value.split("-")
+        for moment in (start, end):
+            hours, minutes = moment.split(":")
+            if not (0 <= int(hours) <= 23 and 0 <= int(minutes) <= 59):
+                raise ValueError()
+    except ValueError:
+        raise ValueError(
+            f"'bandwidth_schedule' must be formatted as HH:MM-HH:MM (got {value!r})"
+        )
+    return value.strip()
+
+
+def validate_history_retention(value: int, /) -> int:
+    if value >= 0:
+        return int(value)
+    raise ValueError(
+        "'history_retention' must be 0 (keep forever) or a positive integer"
+    )
+
+
 def _callback_synchronization_enabled(new_value: bool) -> None:
     log.warning(
         "The option is deprecated since 5.2.0 and will be removed in a future release."
@@ -719,10 +769,15 @@ def _callback_synchronization_enabled(new_value: bool) -> None:
 
 Options.callbacks["synchronization_enabled"] = _callback_synchronization_enabled
 
+Options.checkers["bandwidth_download_limit"] = validate_bandwidth_limit
+Options.checkers["bandwidth_interactive_share"] = validate_bandwidth_interactive_share
+Options.checkers["bandwidth_schedule"] = validate_bandwidth_schedule
+Options.checkers["bandwidth_upload_limit"] = validate_bandwidth_limit
 Options.checkers["chunk_limit"] = validate_chunk_limit
 Options.checkers["chunk_size"] = validate_chunk_size
 Options.checkers["client_version"] = validate_client_version
 Options.checkers["deletion_behavior"] = _validate_deletion_behavior
+Options.checkers["history_retention"] = validate_history_retention
 Options.checkers["sync_root_max_level"] = validate_sync_root_max_level_limits
 Options.checkers["tmp_file_limit"] = validate_tmp_file_limit
 Options.checkers["ca_bundle"] = validate_ca_bundle_path
@@ -735,3 +790,4 @@ def _callback_synchronization_enabled(new_value: bool) -> None:
     validate_direct_transfer_folder_upper_limit
 )
 Options.checkers["direct_download_max_workers"] = validate_direct_download_max_workers
+Options.checkers["max_transfers"] = validate_max_transfers
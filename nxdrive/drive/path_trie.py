@@ -0,0 +1,55 @@
+"""
+Set of folder paths matched segment by segment.
+
+Sync filters are checked for every remote item seen by scans and changes.
+Testing each filter as a string prefix costs O(filters) per item, which adds up
+when thousands of folders are deselected. A trie of path segments answers in
+O(path depth), whatever the number of filters.
+"""
+
+from typing import Any, Dict, Iterable, List
+
+__all__ = ("PathTrie",)
+
+# Marks a node where a path ends, segments cannot be empty
+_END = ""
+
+
+class PathTrie:
+    def __init__(self, paths: Iterable[str] = (), /, *, casefold: bool = False) -> None:
+        self.casefold = casefold
+        self._root: Dict[str, Any] = {}
+        self._count = 0
+        for path in paths:
+            self.add(path)
+
+    def __len__(self) -> int:
+        return self._count
+
+    def __repr__(self) -> str:
+        return f"<{type(self).__name__} paths={self._count}, casefold={self.casefold}>"
+
+    def _segments(self, path: str, /) -> List[str]:
+        if self.casefold:
+            path = path.casefold()
+        return [segment for segment in path.split("/") if segment]
+
+    def add(self, path: str, /) -> None:
+        """Add *path*, it will cover itself and all its descendants."""
+        node = self._root
+        for segment in self._segments(path):
+            node = node.setdefault(segment, {})
+        if _END not in node:
+            node[_END] = True
+            self._count += 1
+
+    def covers(self, path: str, /) -> bool:
+        """Return True if *path* is, or is a descendant of, an added path."""
+        node = self._root
+        for segment in self._segments(path):
+            if _END in node:
+                return True
+            node = node.get(segment)
+            if node is None:
+                return False
+        return _END in node
@@ -18,7 +18,13 @@
 
 
 class DatabaseBackupWorker(PollWorker):
-    """Class for making backups of the manager and engine databases."""
+    """
+    Class for making backups of the manager and engine databases.
+    Expired transfers history is cleaned, materialized States counters are checked
+    against the table (and rebuilt if they drifted) and free pages are reclaimed before.
+    Databases not closed properly are checked on the first run, corrupted ones
+    are left as is until they are repaired at the next start.
+    """
 
     def __init__(self, manager: "Manager", /):
         """Backup every hour."""
@@ -32,11 +38,15 @@ def _poll(self) -> bool:
         if not self.manager:
             return False
 
-        if self.manager.dao:
+        if self.manager.dao and self.manager.dao.check_integrity():
+            self.manager.dao.incremental_vacuum()
             self.manager.dao.save_backup()
 
         for engine in self.manager.engines.copy().values():
-            if engine.dao:
+            if engine.dao and engine.dao.check_integrity():
+                engine.dao.clean_history()
+                engine.dao.check_counters()
+                engine.dao.incremental_vacuum()
                 engine.dao.save_backup()
 
         return True
@@ -31,6 +31,7 @@
 Checked = Qt.CheckState.Checked
 ConnectedState = QAbstractSocket.SocketState.ConnectedState
 Critical = QMessageBox.Icon.Critical
+DirectConnection = Qt.ConnectionType.DirectConnection
 Drawer = Qt.WindowType.Drawer
 Fixed = QSizePolicy.Policy.Fixed
 FixedPixelWidth = QTextEdit.LineWrapMode.FixedPixelWidth
@@ -5,9 +5,9 @@
 from tempfile import gettempdir
 from typing import TYPE_CHECKING, Any, Dict, Optional, Union
 
-import requests
 import yaml
 
+from ..client.pool import shared_session
 from ..constants import APP_NAME, CONNECTION_ERROR, NO_SPACE_ERRORS
 from ..engine.workers import PollWorker
 from ..feature import Feature
@@ -185,7 +185,7 @@ def _download(self, version: str, /) -> str:
         try:
             # Note: I do not think we should pass the `verify` kwarg here
             # because updates are critical and must be stored on a secured server.
-            req = requests.get(url, headers=headers, stream=True)
+            req = shared_session().get(url, headers=headers, stream=True)
             req.raise_for_status()
             size = int(req.headers["content-length"])
 
@@ -215,7 +215,7 @@ def _fetch_versions(self) -> None:
         try:
             # Note: I do not think we should pass the `verify` kwarg here
             # because updates are critical and must be stored on a secured server.
-            with requests.get(url, headers=headers) as resp:
+            with shared_session().get(url, headers=headers) as resp:
                 resp.raise_for_status()
                 content = resp.text
         except Exception as exc:
@@ -7,6 +7,7 @@
 """
 
 import base64
+import errno
 import hashlib
 import mimetypes
 import os
@@ -14,6 +15,8 @@
 import re
 import stat
 import sys
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
 from configparser import DEFAULTSECT, ConfigParser
 from copy import deepcopy
 from datetime import datetime, timezone
@@ -41,6 +44,7 @@
     APP_NAME,
     DOC_UID_REG,
     FILE_BUFFER_SIZE,
+    LINUX,
     MAC,
     UNACCESSIBLE_HASH,
     WINDOWS,
@@ -345,42 +349,41 @@ def get_default_local_folder(name: str = APP_NAME) -> Path:
     return increment_local_folder(folder, name)
 
 
-def get_tree_list(path: Path, /) -> Generator[Tuple[Path, int], None, None]:
-    """
-    Determine local paths and their size from a given *path*.
-    Each entry will yield a tuple (local_path, size).
+def _is_ignored_for_direct_transfer(name: str, /) -> bool:
+    name = name.lower()
+    return name.startswith(Options.ignored_prefixes) or name.endswith(
+        Options.ignored_suffixes
+    )
 
-    Note: this function cannot be decorated with lru_cache().
+
+def _scan_directory(
+    path: Path, /
+) -> Optional[Tuple[List[Tuple[Path, int]], List[Path]]]:
+    """
+    List one level of the given *path* for Direct Transfer.
+    Return None if the folder has to be skipped, else a tuple (files, folders).
     """
     try:
         it = os.scandir(path)
     except OSError:
         log.warning(f"Cannot browse {path!r}")
-        return
-
-    # Check that the path can be processed
-    path_lower = path.name.lower()
-    if path_lower.startswith(Options.ignored_prefixes) or path_lower.endswith(
-        Options.ignored_suffixes
-    ):
-        log.debug(f"Ignored path for Direct Transfer: {str(path)!r}")
-        return
+        return None
 
-    if path.is_symlink():
-        log.debug(f"Ignored symlink path for Direct Transfer: {str(path)!r}")
-        return
+    with it:
+        # Check that the path can be processed
+        if _is_ignored_for_direct_transfer(path.name):
+            log.debug(f"Ignored path for Direct Transfer: {str(path)!r}")
+            return None
 
-    # First, yield the folder itself
-    yield path, 0
+        if path.is_symlink():
+            log.debug(f"Ignored symlink path for Direct Transfer: {str(path)!r}")
+            return None
 
-    # Then, yield its children
-    with it:
+        files: List[Tuple[Path, int]] = []
+        folders: List[Path] = []
         for entry in it:
             # Check the path can be processed
-            entry_lower = entry.name.lower()
-            if entry_lower.startswith(Options.ignored_prefixes) or entry_lower.endswith(
-                Options.ignored_suffixes
-            ):
+            if _is_ignored_for_direct_transfer(entry.name):
                 log.debug(f"Ignored path for Direct Transfer: {entry.path!r}")
                 continue
 
@@ -395,10 +398,75 @@ def get_tree_list(path: Path, /) -> Generator[Tuple[Path, int], None, None]:
                 continue
 
             if is_dir:
-                yield from get_tree_list(Path(entry.path))
+                folders.append(Path(entry.path))
             elif entry.is_file():
-                file = Path(entry.path)
-                yield file, file.stat().st_size
+                files.append((Path(entry.path), entry.stat().st_size))
+
+    return files, folders
+
+
+def get_tree_list(
+    path: Path, /, *, workers: int = 4
+) -> Generator[Tuple[Path, int], None, None]:
+    """
+    Determine local paths and their size from a given *path*.
+    Each entry will yield a tuple (local_path, size), folders have a size of 0.
+
+    Folders are listed concurrently by *workers* threads, and entries are yielded
+    as soon as they are known, in breadth-first order: a folder always comes
+    before its children.
+
+    Note: this function cannot be decorated with lru_cache().
+    """
+    with ThreadPoolExecutor(
+        max_workers=max(1, workers), thread_name_prefix="TreeList"
+    ) as executor:
+        pending = deque([(path, executor.submit(_scan_directory, path))])
+        try:
+            while pending:
+                folder, future = pending.popleft()
+                result = future.result()
+                if result is None:
+                    continue
+
+                files, folders = result
+
+                # First, yield the folder itself
+                yield folder, 0
+
+                # Then, yield its files and schedule the listing of its sub-folders
+                yield from files
+                pending.extend(
+                    (sub_folder, executor.submit(_scan_directory, sub_folder))
+                    for sub_folder in folders
+                )
+        finally:
+            # Stop as soon as possible when the caller did not consume everything
+            executor.shutdown(wait=False, cancel_futures=True)
+
+
+def get_direct_transfer_tree(
+    path: Path,
+    /,
+    *,
+    file_limit: int = 0,
+    skipped: Optional[List[Tuple[Path, int]]] = None,
+) -> Generator[Tuple[Path, int], None, None]:
+    """
+    Same as get_tree_list(), without what the Direct Transfer does not upload:
+    empty files [NXDRIVE-2925], and files bigger than *file_limit* bytes.
+    The latter are appended to the *skipped* list, when given.
+    """
+    for file_path, size in get_tree_list(path):
+        if not size:
+            # Folders have a size of 0 too, only check those entries
+            if file_path.is_file():
+                continue
+        elif file_limit and size > file_limit:
+            if skipped is not None:
+                skipped.append((file_path, size))
+            continue
+        yield file_path, size
 
 
 @lru_cache(maxsize=32)
@@ -663,6 +731,92 @@ def safe_rename(src: Path, dst: Path, /) -> None:
             raise
 
 
+# FICLONE ioctl request, _IOW(0x94, 9, int) from linux/fs.h
+FICLONE = 0x40049409
+
+# Errors meaning the file system or the kernel does not support a copy method
+_CLONE_UNSUPPORTED = {
+    errno.EBADF,
+    errno.EINVAL,
+    errno.ENOSYS,
+    errno.ENOTSUP,
+    errno.ENOTTY,
+    errno.EOPNOTSUPP,
+    errno.EPERM,
+    errno.EXDEV,
+}
+
+
+def _copy_file_range(src: int, dst: int, size: int, /) -> None:
+    """Copy *size* bytes in the kernel, the file system may share blocks."""
+    offset = 0
+    while offset < size:
+        copied = os.copy_file_range(src, dst, size - offset, offset, offset)
+        if not copied:
+            # Some file systems report nothing to copy, the next method is tried
+            raise OSError(errno.ENOTSUP, f"Short copy: {offset} of {size} bytes")
+        offset += copied
+
+
+def _sendfile(src: int, dst: int, size: int, /) -> None:
+    """Copy *size* bytes in the kernel, without going through user space."""
+    offset = 0
+    while offset < size:
+        sent = os.sendfile(dst, src, offset, size - offset)
+        if not sent:
+            raise OSError(errno.ENOTSUP, f"Short copy: {offset} of {size} bytes")
+        offset += sent
+
+
+def clone_file(src: Path, dst: Path, /) -> str:
+    """
+    Copy the content of *src* to *dst*, without metadata, like shutil.copyfile().
+
+    On GNU/Linux, the cheapest method supported by the file system is used:
+    a reflink sharing blocks between both files on Btrfs or XFS (no data is
+    copied until one of them is modified), then copy_file_range() and sendfile()
+    copying data in the kernel. Other OSes use shutil.copyfile().
+
+    Return the method used: "reflink", "copy_file_range", "sendfile" or "copy".
+    """
+    import shutil
+
+    if not LINUX:
+        shutil.copyfile(src, dst)
+        return "copy"
+
+    import fcntl
+    from contextlib import suppress
+
+    with open(src, "rb") as fsrc:
+        with suppress(FileNotFoundError):
+            if os.path.samefile(src, dst):
+                raise shutil.SameFileError(f"{src!r} and {dst!r} are the same file")
+
+        size = os.fstat(fsrc.fileno()).st_size
+        with open(dst, "wb") as fdst:
+            src_fd, dst_fd = fsrc.fileno(), fdst.fileno()
+            for method, func in (
+                ("reflink", lambda: fcntl.ioctl(dst_fd, FICLONE, src_fd)),
+                ("copy_file_range", lambda: _copy_file_range(src_fd, dst_fd, size)),
+                ("sendfile", lambda: _sendfile(src_fd, dst_fd, size)),
+            ):
+                try:
+                    func()
+                except OSError as exc:
+                    if exc.errno not in _CLONE_UNSUPPORTED:
+                        raise
+                    # Start again from scratch with the next method
+                    fdst.seek(0)
+                    fdst.truncate()
+                else:
+                    return method
+
+            fsrc.seek(0)
+            shutil.copyfileobj(fsrc, fdst, FILE_BUFFER_SIZE)
+    return "copy"
+
+
 @lru_cache(maxsize=16)
 def find_resource(folder: str, /, *, file: str = "") -> Path:
     """Find the FS path of a directory in various OS binary packages."""
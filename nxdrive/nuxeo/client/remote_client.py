@@ -14,6 +14,7 @@
     Dict,
     List,
     Optional,
+    Set,
     Tuple,
     Type,
     Union,
@@ -31,6 +32,8 @@
 
 from nxdrive.drive import server_type as _st
 from nxdrive.drive.auth import Token, get_auth
+from nxdrive.drive.client.bandwidth import DOWNLOAD, UPLOAD, is_interactive, throttle
+from nxdrive.drive.client.pool import mount_pooled_adapters
 from nxdrive.drive.client.proxy import Proxy
 from nxdrive.drive.constants import (
     APP_NAME,
@@ -39,6 +42,7 @@
     TIMEOUT,
     TOKEN_PERMISSION,
     TX_TIMEOUT,
+    WORKSPACE_ROOT,
     TransferStatus,
 )
 from nxdrive.drive.engine.activity import (
@@ -68,7 +72,13 @@
 )
 from nxdrive.drive.metrics.poll_metrics import CustomPollMetrics
 from nxdrive.drive.metrics.utils import current_os, user_agent
-from nxdrive.drive.objects import Download, Metrics, RemoteFileInfo, SubTypeEnricher
+from nxdrive.drive.objects import (
+    DocPair,
+    Download,
+    Metrics,
+    RemoteFileInfo,
+    SubTypeEnricher,
+)
 from nxdrive.drive.options import Options
 from nxdrive.drive.qt.imports import QApplication
 from nxdrive.drive.utils import (
@@ -122,6 +132,7 @@ def __init__(
         timeout: int = Options.timeout,
         verify: bool = True,
         cert: Tuple[str] = None,
+        max_processors: int = 0,
     ) -> None:
         if token:
             self.auth = get_auth(url, token, device_id=device_id)
@@ -147,6 +158,13 @@ def __init__(
             cert=cert,
         )
 
+        # Share keep-alive connections between processors and Direct Download workers
+        mount_pooled_adapters(
+            self.client._session,
+            max_processors=max_processors,
+            max_retries=self.client.retries,
+        )
+
         self.client.headers.update(
             {
                 "X-User-Id": user_id,
@@ -205,6 +223,11 @@ def __repr__(self) -> str:
         )
         return f"<{type(self).__name__} {attrs}>"
 
+    @property
+    def http_session(self) -> requests.Session:
+        """The HTTP session used for all requests to the server."""
+        return self.client._session
+
     @property
     def custom_global_metrics(self) -> Metrics:
         """Get up-to-date custom global metrics.
@@ -276,6 +299,14 @@ def transfer_end_callback(self, uploader: Uploader, /) -> None:
                     # Reset the last transferred chunk speed to skip its display in the systray
                     action.last_chunk_transfer_speed = 0
                     raise DownloadPaused(download.uid or -1)
+
+                # Respect the bandwidth limits
+                throttle(
+                    DOWNLOAD,
+                    action.chunk_size or action.size,
+                    engine_uid=download.engine or "",
+                    interactive=is_interactive(action.size),
+                )
         elif isinstance(action, UploadAction):
             # Get the current upload and check if it is still ongoing
             upload = self.dao.get_upload(doc_pair=action.doc_pair, path=action.filepath)
@@ -287,6 +318,14 @@ def transfer_end_callback(self, uploader: Uploader, /) -> None:
                 action.last_chunk_transfer_speed = 0
                 raise UploadPaused(upload.uid or -1)
 
+            # Respect the bandwidth limits
+            throttle(
+                UPLOAD,
+                action.chunk_size or action.size,
+                engine_uid=action.engine,
+                interactive=is_interactive(action.size, bulk=action.is_direct_transfer),
+            )
+
         # Update the transfer start timer for the next iteration
         if duration > 1_000_000_000:
             action.chunk_transfer_start_time_ns = monotonic_ns()
@@ -496,8 +535,17 @@ def download(
 
                 self.check_integrity(digest, action)
             else:
-                with memoryview(resp.content) as view, file_out.open(mode="wb") as f:
-                    f.write(view)
+                interactive = is_interactive(size)
+                with file_out.open(mode="wb") as f:
+                    # Respect the bandwidth limits while the body is received
+                    for chunk in resp.iter_content(FILE_BUFFER_SIZE):
+                        throttle(
+                            DOWNLOAD,
+                            len(chunk),
+                            engine_uid=download.engine or "",
+                            interactive=interactive,
+                        )
+                        f.write(chunk)
                     # Force write of file to disk
                     f.flush()
                     os.fsync(f.fileno())
@@ -676,6 +724,49 @@ def get_fs_info(
 
         return remote_item
 
+    def get_unchanged_refs(self, pairs: List[DocPair], /) -> Set[str]:
+        """
+        Return the file system item IDs of *pairs* whose document is still in the
+        recorded state: same parent, name and digest, and not trashed.
+        All documents are fetched with one NXQL query on their UID, the last part
+        of the file system item ID. Others (sync roots, changed, deleted or
+        unknown documents) have to be checked with get_fs_info().
+        """
+        by_uid = {pair.remote_ref.rsplit("#", 1)[-1]: pair for pair in pairs}
+        by_uid.pop("", None)
+        if not by_uid:
+            return set()
+
+        uids = ", ".join(f"'{self.escape(uid)}'" for uid in by_uid)
+        query = (
+            f"SELECT * FROM Document WHERE ecm:uuid IN ({uids})"
+            f" {self._get_trash_condition()} AND ecm:isVersion = 0"
+        )
+        entries = self.query(query, page_size=len(by_uid))["entries"]
+
+        unchanged = set()
+        for doc in entries:
+            pair = by_uid.get(doc["uid"])
+            if not pair or pair.remote_ref.startswith(WORKSPACE_ROOT):
+                continue
+
+            props = doc.get("properties") or {}
+            if pair.folderish:
+                name, digest = props.get("dc:title"), None
+            else:
+                blob = props.get("file:content") or {}
+                name, digest = blob.get("name"), blob.get("digest")
+            name = unicodedata.normalize("NFC", name or "")
+            parent_uid = (pair.remote_parent_ref or "").rsplit("#", 1)[-1]
+
+            if (
+                doc.get("parentRef") == parent_uid
+                and name == pair.remote_name
+                and digest == pair.remote_digest
+            ):
+                unchanged.add(pair.remote_ref)
+        return unchanged
+
     def get_filesystem_root_info(self) -> RemoteFileInfo:
         toplevel_folder = self.execute(command="NuxeoDrive.GetTopLevelFolder")
         return RemoteFileInfo.from_dict(toplevel_folder)
@@ -5,11 +5,15 @@
 and adds Nuxeo server operations (document fetching, NXQL queries, blob download).
 """
 
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timezone
+from functools import partial
 from logging import getLogger
 from pathlib import Path
+from time import monotonic
 from typing import TYPE_CHECKING, Any, Dict, List, Optional
 
+from nxdrive.drive.client.bandwidth import DOWNLOAD, throttle
 from nxdrive.drive.constants import DirectDownloadStatus
 from nxdrive.drive.direct_download import (
     DirectDownload as _DirectDownloadBase,
@@ -18,6 +22,7 @@
 from nxdrive.drive.objects import DirectDownload as DirectDownloadRecord
 from nxdrive.drive.options import Options  # backward compatibility for tests
 from nxdrive.drive.utils import safe_filename
+from nxdrive.nuxeo.client.remote_client import Remote
 
 if TYPE_CHECKING:
     from nxdrive.drive.manager import Manager  # noqa
@@ -27,6 +32,11 @@
 
 log = getLogger(__name__)
 
+# Folders listed concurrently when sizing a folder without NXQL aggregates
+FOLDER_SIZE_WORKERS = 4
+
+_LENGTH = "file:content/length"
+
 
 class DirectDownload(_DirectDownloadBase):
     """
@@ -185,10 +195,11 @@ def _enrich_record(
             doc_name = doc_info.get("properties", {}).get("dc:title", record.doc_name)
 
             if is_folder:
-                doc_size, subfolder_count, file_count = self._calculate_folder_size(
-                    engine, doc_id
-                )
-                folder_count = subfolder_count + 1
+                # Sizing a big folder takes time: it is computed in the background
+                # so that the download starts right away.
+                doc_size = 0
+                folder_count = 1
+                file_count = 0
             else:
                 props = doc_info.get("properties", {})
                 file_content = props.get("file:content")
@@ -205,17 +216,106 @@ def _enrich_record(
             record.folder_count = folder_count
             record.file_count = file_count
             engine.dao.update_direct_download(record)
+
+            if is_folder:
+                self._start_task(
+                    self._update_folder_size,
+                    record_uid,
+                    engine,
+                    doc_id,
+                    path=doc_info.get("path", ""),
+                    name=f"DirectDownloadSize-{record_uid}",
+                )
         except Exception as exc:
             log.exception(f"Could not enrich record {record_uid} for {doc_id}: {exc}")
 
+    def _update_folder_size(
+        self, record_uid: int, engine: "Engine", folder_id: str, /, *, path: str = ""
+    ) -> None:
+        """Compute the size of a folder being downloaded and save it in its record."""
+        start = monotonic()
+        total_size, subfolder_count, file_count = self._calculate_folder_size(
+            engine, folder_id, path=path
+        )
+        if self._stop:
+            return
+
+        log.debug(
+            f"Folder {folder_id!r} sized in {monotonic() - start:.2f} sec: "
+            f"{total_size:,} bytes, {subfolder_count:,} folders, {file_count:,} files"
+        )
+        try:
+            engine.dao.update_direct_download_size(
+                record_uid, total_size, subfolder_count + 1, file_count
+            )
+        except Exception:
+            log.exception(f"Could not save the size of record {record_uid}")
+
     def _calculate_folder_size(
-        self, engine: "Engine", folder_id: str, /
+        self, engine: "Engine", folder_id: str, /, *, path: str = ""
     ) -> tuple[int, int, int]:
         """
         Calculate the total size of all files in a folder recursively.
 
+        The server computes it in one go when the folder *path* is known and
+        NXQL aggregates are supported, else the tree is listed in parallel.
+
         :param engine: The engine to use for API calls
         :param folder_id: The document ID of the folder
+        :param path: The path of the folder on the server, if known
+        :return: Tuple of (total_size_bytes, folder_count, file_count)
+        """
+        if path:
+            totals = self._aggregate_folder_size(engine, path)
+            if totals is not None:
+                return totals
+        return self._list_folder_size(engine, folder_id)
+
+    def _aggregate_folder_size(
+        self, engine: "Engine", path: str, /
+    ) -> Optional[tuple[int, int, int]]:
+        """
+        Calculate the size of a folder using NXQL aggregates.
+
+        :return: Tuple of (total_size_bytes, folder_count, file_count), or None
+            if the server does not support aggregates
+        """
+        where = (
+            f"FROM Document WHERE ecm:path STARTSWITH '{Remote.escape(path)}' "
+            "AND ecm:isVersion = 0 AND ecm:isTrashed = 0"
+        )
+        try:
+            files = engine.remote.execute(
+                command="Repository.ResultSetQuery",
+                query=f"SELECT COUNT(ecm:uuid), SUM({_LENGTH}) {where} "
+                "AND ecm:mixinType != 'Folderish'",
+            )
+            folders = engine.remote.execute(
+                command="Repository.ResultSetQuery",
+                query=f"SELECT COUNT(ecm:uuid) {where} "
+                "AND ecm:mixinType = 'Folderish'",
+            )
+            files_row = files["entries"][0]
+            folders_row = folders["entries"][0]
+            return (
+                int(files_row[f"SUM({_LENGTH})"] or 0),
+                int(folders_row["COUNT(ecm:uuid)"]),
+                int(files_row["COUNT(ecm:uuid)"]),
+            )
+        except Exception:
+            log.debug(
+                f"NXQL aggregates not available to size {path!r}, listing the folder",
+                exc_info=True,
+            )
+            return None
+
+    def _list_folder_size(
+        self, engine: "Engine", folder_id: str, /
+    ) -> tuple[int, int, int]:
+        """
+        Calculate the size of a folder by listing its tree, one level at a time.
+        Folders of a same level are listed in parallel.
+
         :return: Tuple of (total_size_bytes, folder_count, file_count)
         """
         total_size = 0
@@ -223,57 +323,56 @@ def _calculate_folder_size(
         file_count = 0
 
         try:
-            children = self._get_children(engine, folder_id)
-
-            for child in children:
-                child_is_folderish = "Folderish" in child.get("facets", [])
-
-                if child_is_folderish:
-                    # Count this subfolder
-                    folder_count += 1
-                    # Recursively calculate subfolder size
-                    child_id = child.get("uid", "")
-                    (
-                        subfolder_size,
-                        subfolder_folders,
-                        subfolder_files,
-                    ) = self._calculate_folder_size(engine, child_id)
-                    total_size += subfolder_size
-                    folder_count += subfolder_folders
-                    file_count += subfolder_files
-                else:
-                    # Add file size
-                    props = child.get("properties", {})
-                    file_content = props.get("file:content")
-                    file_size = 0
-                    if file_content and isinstance(file_content, dict):
-                        # length is returned as string, convert to int
-                        file_size = int(file_content.get("length", 0) or 0)
-                    if file_size <= 0:
-                        child_id = child.get("uid", "")
-                        if child_id:
-                            try:
-                                child_info = engine.remote.get_info(child_id)
-                                blob = (
-                                    child_info.get_blob("file:content")
-                                    if child_info
-                                    else None
-                                )
-                                if blob:
-                                    file_size = int(getattr(blob, "size", 0) or 0)
-                            except Exception:
-                                log.debug(
-                                    f"Could not fetch blob size fallback for {child_id}",
-                                    exc_info=True,
-                                )
-                    total_size += file_size
-                    file_count += 1
+            with ThreadPoolExecutor(
+                max_workers=FOLDER_SIZE_WORKERS,
+                thread_name_prefix="DirectDownloadSize",
+            ) as executor:
+                level = [folder_id]
+                while level and not self._stop:
+                    next_level: List[str] = []
+                    unsized: List[str] = []
+                    for children in executor.map(
+                        partial(self._get_children, engine), level
+                    ):
+                        for child in children:
+                            if "Folderish" in child.get("facets", []):
+                                folder_count += 1
+                                next_level.append(child.get("uid", ""))
+                                continue
+
+                            file_count += 1
+                            props = child.get("properties", {})
+                            file_content = props.get("file:content")
+                            file_size = 0
+                            if file_content and isinstance(file_content, dict):
+                                # length is returned as string, convert to int
+                                file_size = int(file_content.get("length", 0) or 0)
+                            if file_size > 0:
+                                total_size += file_size
+                            elif child_id := child.get("uid", ""):
+                                unsized.append(child_id)
+
+                    total_size += sum(
+                        executor.map(partial(self._get_blob_size, engine), unsized)
+                    )
+                    level = next_level
 
         except Exception:
             log.exception(f"Failed to calculate folder size for {folder_id}")
+            return 0, 0, 0
 
         return total_size, folder_count, file_count
 
+    def _get_blob_size(self, engine: "Engine", doc_id: str, /) -> int:
+        """Fallback for documents listed without their blob length."""
+        try:
+            info = engine.remote.get_info(doc_id)
+            blob = info.get_blob("file:content") if info else None
+            return int(getattr(blob, "size", 0) or 0) if blob else 0
+        except Exception:
+            log.debug(f"Could not fetch blob size fallback for {doc_id}", exc_info=True)
+            return 0
+
     # ------------------------------------------------------------------ Nuxeo-specific download operations
 
     def _process_download(self, doc: Dict[str, str], batch_folder: Path, /) -> None:
@@ -576,6 +675,8 @@ def _download_note(
             size = target_path.stat().st_size
             self._update_download_progress(record_uid, size, size)
 
+        self._file_downloaded(target_path)
+
     def _download_file(
         self,
         engine: "Engine",
@@ -621,9 +722,8 @@ def _download_file(
                 folder_total_bytes = persisted_total_bytes
                 is_folder_record = bool(record.is_folder)
                 if is_folder_record:
-                    folder_progress_offset = max(
-                        0, int(record.bytes_downloaded or 0) - existing_size
-                    )
+                    # The database is only updated from time to time
+                    folder_progress_offset = self._downloaded.get(record_uid, 0)
 
         # For folder downloads, persisted total_bytes tracks the whole folder batch,
         # not each child file. Do not use it for per-file completion checks.
@@ -674,6 +774,10 @@ def _download_file(
                 log.debug(
                     f"File already complete from previous run (range EOF), skipping: {filename}"
                 )
+                if is_folder_record:
+                    self._downloaded[record_uid] = (
+                        folder_progress_offset + existing_size
+                    )
                 return
 
             resp.raise_for_status()
@@ -714,21 +818,23 @@ def _download_file(
                     if record_uid:
                         if self._stop:
                             return
-                        if self._is_single_download_cancelled(record_uid):
+                        if record_uid in self._cancelled:
                             log.info(f"Download cancelled for {filename}")
                             raise RuntimeError(f"Download cancelled for {filename}")
-                        if self._is_paused(record_uid):
+                        if record_uid in self._paused:
                             log.info(f"Download paused for {filename}")
                             raise DownloadPaused(record_uid)
 
                     f.write(chunk)
                     bytes_downloaded += len(chunk)
+                    throttle(DOWNLOAD, len(chunk), engine_uid=engine.uid)
 
-                    # Update progress
-                    if record_uid and total_bytes > 0:
+                    # Update progress. The folder size may still be computed,
+                    # a 0 total keeps it unknown but bytes are still reported.
+                    if record_uid and (total_bytes > 0 or is_folder_record):
                         reported_bytes_downloaded = bytes_downloaded
                         reported_total_bytes = total_bytes
-                        if is_folder_record and folder_total_bytes > 0:
+                        if is_folder_record:
                             reported_bytes_downloaded = (
                                 folder_progress_offset + bytes_downloaded
                             )
@@ -742,6 +848,10 @@ def _download_file(
                             emitted_total_bytes=total_bytes,
                         )
 
+            if is_folder_record:
+                self._downloaded[record_uid] = folder_progress_offset + bytes_downloaded
+            self._file_downloaded(target_path)
+
         except RuntimeError as e:
             if not str(e).startswith("Download cancelled"):
                 raise
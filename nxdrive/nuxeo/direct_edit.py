@@ -23,6 +23,7 @@
 from nxdrive.drive.direct_edit import DirectEdit as _DirectEditBase
 from nxdrive.drive.direct_edit import DriveFSEventHandler, _is_lock_file
 from nxdrive.drive.engine.activity import tooltip
+from nxdrive.drive.engine.transfer_scheduler import DIRECT_EDIT, transfers
 from nxdrive.drive.exceptions import DocumentAlreadyLocked, NotFound, ThreadInterrupt
 from nxdrive.drive.metrics.constants import (
     DE_CONFLICT_HIT,
@@ -31,6 +32,7 @@
     DE_SAVE_COUNT,
 )
 from nxdrive.drive.utils import (
+    clone_file,
     current_milli_time,
     force_decode,
     normalize_event_filename,
@@ -148,7 +150,7 @@ def _get_engine(
 
         return engine
 
-    def stop_client(self, uploader: Uploader, /) -> None:
+    def stop_client(self, uploader: Optional[Uploader] = None, /) -> None:
         if self._stop:
             raise ThreadInterrupt()
 
@@ -185,8 +187,8 @@ def _download(
         if pair:
             existing_file_path = engine.local.abspath(pair.local_path)
             try:
-                # copyfile() is used to prevent metadata copy
-                shutil.copyfile(existing_file_path, file_out)
+                # clone_file() is used to prevent metadata copy
+                clone_file(existing_file_path, file_out)
             except FileNotFoundError:
                 pair = None
             else:
@@ -199,46 +201,47 @@ def _download(
                     unset_path_readonly(file_out)
 
         if not pair:
-            if url:
-                try:
-                    for try_count in range(self._error_threshold):
-                        try:
-                            engine.remote.download(
-                                quote(url, safe="/:"),
-                                file_path,
-                                file_out,
-                                blob.digest,
-                                callback=callback or self.stop_client,
-                                is_direct_edit=True,
-                                engine_uid=engine.uid,
-                            )
-                            break
-                        except CorruptedFile:
+            with transfers.slot(engine.uid, DIRECT_EDIT, interrupt=self.stop_client):
+                if url:
+                    try:
+                        for try_count in range(self._error_threshold):
+                            try:
+                                engine.remote.download(
+                                    quote(url, safe="/:"),
+                                    file_path,
+                                    file_out,
+                                    blob.digest,
+                                    callback=callback or self.stop_client,
+                                    is_direct_edit=True,
+                                    engine_uid=engine.uid,
+                                )
+                                break
+                            except CorruptedFile:
+                                self.directEditError.emit(
+                                    "DIRECT_EDIT_CORRUPTED_DOWNLOAD_RETRY", []
+                                )
+
+                                # Remove the faultive tmp file
+                                file_out.unlink(missing_ok=True)
+
+                                # Wait before the next try
+                                delay = 5 * (try_count + 1)
+                                sleep(delay)
+                        else:
                             self.directEditError.emit(
-                                "DIRECT_EDIT_CORRUPTED_DOWNLOAD_RETRY", []
+                                "DIRECT_EDIT_CORRUPTED_DOWNLOAD_FAILURE", []
                             )
-
-                            # Remove the faultive tmp file
-                            file_out.unlink(missing_ok=True)
-
-                            # Wait before the next try
-                            delay = 5 * (try_count + 1)
-                            sleep(delay)
-                    else:
-                        self.directEditError.emit(
-                            "DIRECT_EDIT_CORRUPTED_DOWNLOAD_FAILURE", []
-                        )
-                        return None
-                finally:
-                    engine.dao.remove_transfer("download", path=file_path)
-            else:
-                engine.remote.get_blob(
-                    info,
-                    xpath=xpath,
-                    file_out=file_out,
-                    callback=self.stop_client,
-                    **kwargs,
-                )
+                            return None
+                    finally:
+                        engine.dao.remove_transfer("download", path=file_path)
+                else:
+                    engine.remote.get_blob(
+                        info,
+                        xpath=xpath,
+                        file_out=file_out,
+                        callback=self.stop_client,
+                        **kwargs,
+                    )
 
         return file_out
 
@@ -553,14 +556,17 @@ def _handle_upload_queue(self) -> None:
                     kwargs["void_op"] = True
                     cmd = "Blob.AttachOnDocument"
 
-                remote.upload(
-                    os_path,
-                    command=cmd,
-                    document=remote.check_ref(details.uid),
-                    engine_uid=engine.uid,
-                    is_direct_edit=True,
-                    **kwargs,
-                )
+                with transfers.slot(
+                    engine.uid, DIRECT_EDIT, interrupt=self.stop_client
+                ):
+                    remote.upload(
+                        os_path,
+                        command=cmd,
+                        document=remote.check_ref(details.uid),
+                        engine_uid=engine.uid,
+                        is_direct_edit=True,
+                        **kwargs,
+                    )
 
                 # The file is in the upload queue but not in the dict if it is pushed by the recovery system.
                 if ref not in self._file_metrics:
@@ -3,14 +3,24 @@
 and Nuxeo-specific credential handling.
 """
 
-import os
 from contextlib import suppress
 from datetime import datetime, timezone
 from logging import getLogger
 from pathlib import Path
 from threading import Thread
 from time import sleep
-from typing import TYPE_CHECKING, Any, Callable, Dict, Optional, Type, Union
+from typing import (
+    TYPE_CHECKING,
+    Any,
+    Callable,
+    Dict,
+    Generator,
+    List,
+    Optional,
+    Tuple,
+    Type,
+    Union,
+)
 
 from nuxeo.exceptions import Forbidden, HTTPError, Unauthorized
 from nuxeo.handlers.default import Uploader
@@ -50,6 +60,7 @@
 from nxdrive.drive.utils import (
     client_certificate,
     current_thread_id,
+    get_direct_transfer_tree,
     get_verify,
     grouper,
     set_path_readonly,
@@ -545,6 +556,7 @@ def init_remote(self) -> Remote:
             "proxy": self.manager.proxy,
             "verify": get_verify(),
             "cert": client_certificate(),
+            "max_processors": self._proc_count,
         }
         return self.remote_cls(*args, **kwargs)
 
@@ -714,6 +726,65 @@ def _create_remote_folder_with_enricher(
             self.directTransferNewFolderError.emit()
             return {}
 
+    @staticmethod
+    def _parents_first(
+        local_paths: Dict[Path, int], /
+    ) -> Generator[Tuple[Path, int, bool], None, None]:
+        """
+        Yield (path, size, is_dir) of *local_paths*, in their original order,
+        except that a path is always yielded after its parent folder when the
+        latter is part of the transfer too.
+        """
+        done = set()
+        waiting: Dict[Path, List[Tuple[Path, int]]] = {}
+
+        def release(path: Path, size: int, /) -> Generator[Any, None, None]:
+            stack = [(path, size)]
+            while stack:
+                path, size = stack.pop()
+                # Folders are sent with a size of 0, this spares a system call per file
+                is_dir = not size and path.is_dir()
+                yield path, size, is_dir
+                if is_dir:
+                    done.add(path)
+                    stack.extend(reversed(waiting.pop(path, [])))
+
+        for path, size in local_paths.items():
+            parent = path.parent
+            if parent in local_paths and parent not in done:
+                waiting.setdefault(parent, []).append((path, size))
+            else:
+                yield from release(path, size)
+
+        # Orphans: their parent was not a folder after all
+        while waiting:
+            for path, size in waiting.pop(next(iter(waiting))):
+                yield from release(path, size)
+
+    @staticmethod
+    def _walk(
+        local_paths: Dict[Path, int], /
+    ) -> Generator[Tuple[Path, int, bool], None, None]:
+        """
+        Yield (path, size, is_dir) of *local_paths* and of the whole content of
+        its folders, a folder always coming before its children. What the
+        Direct Transfer does not upload is skipped, as in the selection dialog.
+        """
+        file_limit = Options.direct_transfer_file_upper_limit * 1024 * 1024
+        folders = {path for path in local_paths if path.is_dir()}
+        for path, size in local_paths.items():
+            # Already part of a selected folder
+            if any(parent in folders for parent in path.parents):
+                continue
+
+            if path not in folders:
+                yield path, size, False
+                continue
+
+            for child, size in get_direct_transfer_tree(path, file_limit=file_limit):
+                # Empty files are skipped, only folders have a size of 0
+                yield child, size, not size
+
     def _direct_transfer(
         self,
         local_paths: Dict[Path, int],
@@ -732,8 +803,16 @@ def _direct_transfer(
         paused: bool = False,
         schedule_delay: Optional[int] = None,
         scheduled_at: Union[str, int] = 0,
+        walk: bool = False,
+        count: int = 0,
     ) -> None:
-        """Plan the Direct Transfer."""
+        """
+        Plan the Direct Transfer.
+
+        When *walk* is True, *local_paths* are the selected files and folders,
+        the content of folders is listed here while planning, and *count* is
+        the number of items expected in total.
+        """
 
         # Save last dt session infos for next times
         self._save_last_dt_session_infos(
@@ -759,6 +838,8 @@ def _direct_transfer(
                 )
             if not item:
                 return
+            # The new folder is not yet in cached children of the folder pickers
+            self.dao.invalidate_folder_tree((remote_parent_ref,))
             remote_parent_path = item["path"]
             remote_parent_ref = item["uid"]
 
@@ -766,7 +847,9 @@ def _direct_transfer(
         if not local_paths:
             return
 
-        all_paths = local_paths.keys()
+        # Uploaded folders will be created under the remote parent
+        self.dao.invalidate_folder_tree((remote_parent_ref,))
+
         doc_type = None
         if document_type == self.doc_container_type:
             doc_type = None
@@ -778,21 +861,48 @@ def _direct_transfer(
             cont_type = None
         else:
             cont_type = container_type
-        items = [
+
+        # The session is created first so that items can be queued as soon as
+        # they are planned: uploads start while the planning goes on.
+        if not (walk and count):
+            count = len(local_paths)
+        description = next(iter(local_paths)).name
+        if count > 1:
+            description = f"{description} (+{count - 1:,})"
+
+        status = TransferStatus.PAUSED if paused else TransferStatus.ONGOING
+        session_uid = self.dao.create_session(
+            remote_parent_path,
+            remote_parent_ref,
+            count,
+            self.uid,
+            description,
+            status=status,
+            scheduled_at=scheduled_at,
+        )
+
+        items = (
             (
                 path.as_posix(),
                 path.parent.as_posix(),
                 path.name,
-                path.is_dir(),
+                is_dir,
                 size,
                 remote_parent_path,
                 remote_parent_ref,
-                doc_type if not path.is_dir() else cont_type,
+                cont_type if is_dir else doc_type,
                 duplicate_behavior,
-                "todo" if path.parent in all_paths else "unknown",
+                # Children of a walked folder always have a known parent
+                (
+                    "todo"
+                    if path not in local_paths or path.parent in local_paths
+                    else "unknown"
+                ),
             )
-            for path, size in sorted(local_paths.items())
-        ]
+            for path, size, is_dir in (
+                self._walk(local_paths) if walk else self._parents_first(local_paths)
+            )
+        )
 
         # Add all paths into the database to plan the upload, by batch
         bsize = Options.database_batch_size
@@ -800,32 +910,23 @@ def _direct_transfer(
         log.debug(
             f" ... database_batch_size is {bsize}, duplicate_behavior is {duplicate_behavior!r}"
         )
-        current_max_row_id = -1
-        description = os.path.basename(items[0][0])
-        if len(items) > 1:
-            description = f"{description} (+{len(items) - 1:,})"
-
-        status = TransferStatus.PAUSED if paused else TransferStatus.ONGOING
-        session_uid = self.dao.create_session(
-            remote_parent_path,
-            remote_parent_ref,
-            len(items),
-            self.uid,
-            description,
-            status=status,
-            scheduled_at=scheduled_at,
-        )
-
+        planned = 0
         for batch_items in grouper(items, bsize):
             row_id = self.dao.plan_many_direct_transfer_items(batch_items, session_uid)
-            if current_max_row_id == -1:
-                current_max_row_id = row_id
+            planned += len(batch_items)
 
-        log.info(f" ... Planned {len(items):,} item(s) to Direct Transfer, let's gooo!")
+            # And add new pairs to the queue
+            if not paused:
+                self.dao.queue_many_direct_transfer_items(row_id)
+
+        if planned != count:
+            # The local tree changed since the selection
+            log.debug(f"Expected {count:,} item(s) to Direct Transfer, got {planned:,}")
+            self.handle_session_status(
+                self.dao.set_session_counts(session_uid, planned)
+            )
 
-        # And add new pairs to the queue
-        if not paused:
-            self.dao.queue_many_direct_transfer_items(current_max_row_id)
+        log.info(f" ... Planned {planned:,} item(s) to Direct Transfer, let's gooo!")
 
         if schedule_delay:
             self.startTimerSignal.emit(session_uid, schedule_delay)
@@ -896,6 +997,8 @@ def direct_transfer_async(
         paused: bool = False,
         schedule_delay: Optional[int] = None,
         scheduled_at: Union[str, int] = 0,
+        walk: bool = False,
+        count: int = 0,
     ) -> None:
         """Plan the Direct Transfer. Async to not freeze the GUI."""
         from nxdrive.drive.engine.workers import Runner
@@ -916,6 +1019,8 @@ def direct_transfer_async(
             paused=paused,
             schedule_delay=schedule_delay,
             scheduled_at=scheduled_at,
+            walk=walk,
+            count=count,
         )
         if self._threadpool:
             self._threadpool.start(runner)
@@ -32,6 +32,7 @@
     TransferStatus,
 )
 from nxdrive.drive.engine.processor import Processor as _ProcessorBase
+from nxdrive.drive.engine.transfer_scheduler import DIRECT_TRANSFER, SYNC, transfers
 from nxdrive.drive.exceptions import (
     DownloadPaused,
     DuplicationDisabledError,
@@ -46,6 +47,7 @@
 )
 from nxdrive.drive.objects import DocPair, RemoteFileInfo
 from nxdrive.drive.utils import (
+    clone_file,
     digest_status,
     is_generated_tmp_file,
     lock_path,
@@ -170,7 +172,12 @@ def _handle_doc_pair_sync(self, doc_pair: DocPair, sync_handler: Callable) -> No
                 return
 
         # TODO Update as the server don't take hash to avoid conflict yet
-        if doc_pair.pair_state.startswith("locally") and doc_pair.remote_ref:
+        # Remote states of queued pairs are checked in bulk, see FreshnessCache
+        if (
+            doc_pair.pair_state.startswith("locally")
+            and doc_pair.remote_ref
+            and not self.engine.queue_manager.freshness.is_fresh(doc_pair)
+        ):
             try:
                 remote_info = self.remote.get_fs_info(doc_pair.remote_ref)
                 if (
@@ -193,8 +200,10 @@ def _handle_doc_pair_sync(self, doc_pair: DocPair, sync_handler: Callable) -> No
             except NotFound:
                 doc_pair.remote_ref = ""
 
+        preflight = self._preflight(doc_pair)
+
         # NXDRIVE-842: parent is in disabled duplication error
-        parent_pair = self._get_normal_state_from_remote_ref(doc_pair.remote_parent_ref)
+        parent_pair = preflight.parent
         if parent_pair and parent_pair.last_error == "DEDUP":
             return
 
@@ -210,20 +219,12 @@ def _handle_doc_pair_sync(self, doc_pair: DocPair, sync_handler: Callable) -> No
             doc_pair.local_parent_path = parent_pair.local_path
 
         # Skip downloads in process
-        download = self.engine.dao.get_download(doc_pair=doc_pair.id)
-        if download and download.status not in (
-            TransferStatus.ONGOING,
-            TransferStatus.DONE,
-        ):
+        if preflight.is_paused(preflight.download):
             log.info(f"Download is paused for {doc_pair!r}")
             return
 
         # Skip uploads in process
-        upload = self.engine.dao.get_upload(doc_pair=doc_pair.id)
-        if upload and upload.status not in (
-            TransferStatus.ONGOING,
-            TransferStatus.DONE,
-        ):
+        if preflight.is_paused(preflight.upload):
             log.info(f"Upload is paused for {doc_pair!r}")
             return
 
@@ -333,9 +334,15 @@ def _execute(self) -> None:
                 }
 
                 if doc_pair.local_state == "direct":
-                    self._handle_doc_pair_dt(doc_pair, sync_handler)
+                    with transfers.slot(
+                        self.engine.uid, DIRECT_TRANSFER, interrupt=self._interact
+                    ):
+                        self._handle_doc_pair_dt(doc_pair, sync_handler)
                 else:
-                    self._handle_doc_pair_sync(doc_pair, sync_handler)
+                    with transfers.slot(
+                        self.engine.uid, SYNC, interrupt=self._interact
+                    ):
+                        self._handle_doc_pair_sync(doc_pair, sync_handler)
             except ThreadInterrupt:
                 self.engine.queue_manager.push(doc_pair)
                 raise
@@ -492,6 +499,7 @@ def _execute(self) -> None:
                 self._handle_pair_handler_exception(doc_pair, handler_name, exc)
             finally:
                 self.dao.release_state(self.thread_id)
+                self._parents.clear()
 
             self._interact()
 
@@ -752,10 +760,6 @@ def _synchronize_locally_modified(self, doc_pair: DocPair, /) -> None:
             self.dao.update_remote_state(doc_pair, fs_item_info, versioned=False)
         self._synchronize_if_not_remotely_dirty(doc_pair, remote_info=fs_item_info)
 
-    def _get_normal_state_from_remote_ref(self, ref: str, /) -> Optional[DocPair]:
-        # TODO Select the only states that is not a collection
-        return self.dao.get_normal_state_from_remote(ref)
-
     def _postpone_pair(
         self,
         doc_pair: DocPair,
@@ -1214,8 +1218,9 @@ def _download_content(self, doc_pair: DocPair, file_path: Path, /) -> Path:
         if pair:
             locker = unlock_path(file_out)
             try:
-                # copyfile() is used to prevent metadata copy
-                shutil.copyfile(self.local.abspath(pair.local_path), file_out)
+                # clone_file() is used to prevent metadata copy, and to share
+                # blocks with the duplicate when the file system supports it
+                method = clone_file(self.local.abspath(pair.local_path), file_out)
             except (FileNotFoundError, IsADirectoryError):
                 # IsADirectoryError may raise if the local path stored in DB is pointing
                 #     to an obsolete path. And for whatever reason, that path points to
@@ -1223,6 +1228,7 @@ def _download_content(self, doc_pair: DocPair, file_path: Path, /) -> Path:
                 # Let's re-download the file.
                 pass
             else:
+                log.debug(f"Reused local duplicate {pair.local_path!r} ({method})")
                 return file_out
             finally:
                 lock_path(file_out, locker)
@@ -3,7 +3,7 @@
 from logging import getLogger
 from operator import attrgetter, itemgetter
 from time import monotonic
-from typing import TYPE_CHECKING, Any, Dict, Optional, Set, Tuple
+from typing import TYPE_CHECKING, Any, Dict, List, Optional, Set, Tuple
 
 from nuxeo.exceptions import BadQuery, HTTPError, Unauthorized
 
@@ -711,6 +711,16 @@ def _force_remote_scan(
                 doc_pair, remote_info, force_recursion=force_recursion, moved=moved
             )
 
+    @staticmethod
+    def _changed_folders(changes: List[Dict[str, Any]], /) -> Set[str]:
+        """References of changed documents and of their parents."""
+        refs = set()
+        for change in changes:
+            refs.add(change["fileSystemItemId"])
+            if parent_ref := (change.get("fileSystemItem") or {}).get("parentId"):
+                refs.add(parent_ref)
+        return refs
+
     @tooltip("Handle remote changes")
     def _update_remote_states(self) -> None:
         """Incrementally update the state of documents from a change summary"""
@@ -723,6 +733,7 @@ def _update_remote_states(self) -> None:
             remote_path = "/"
             self.dao.add_path_to_scan(remote_path)
             self.dao.update_config("remote_need_full_scan", remote_path)
+            self.dao.clear_folder_tree()
             return
 
         if not summary.get("fileSystemChanges"):
@@ -738,6 +749,9 @@ def _update_remote_states(self) -> None:
         self.empty_polls = 0
         self.changesFound.emit(len(sorted_changes))
 
+        # Cached children of changed folders are outdated in folder pickers
+        self.dao.invalidate_folder_tree(self._changed_folders(sorted_changes))
+
         # Scan events and update the related pair states
         refreshed: Set[str] = set()
         delete_queue = []
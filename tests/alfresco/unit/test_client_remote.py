@@ -469,6 +469,60 @@ def test_missing_raises_not_found(self, _client_patch) -> None:
             remote.get_fs_info("missing-id")
 
 
+class TestGetUnchangedRefs:
+    def test_one_search_for_all_pairs(self, _client_patch) -> None:
+        remote = _build_remote(_client_patch)
+        remote.client.base_url = "https://alfresco.example.com"
+        pairs = [
+            MagicMock(remote_ref="n1", last_remote_updated="2024-01-02 03:04:05"),
+            MagicMock(remote_ref="n2", last_remote_updated="2024-01-02 03:04:05"),
+            MagicMock(remote_ref="n3", last_remote_updated="2024-01-02 03:04:05"),
+        ]
+        resp = MagicMock()
+        resp.json.return_value = {
+            "list": {
+                "entries": [
+                    {"entry": {"id": "n1", "modifiedAt": "2024-01-02T03:04:05.600Z"}},
+                    {"entry": {"id": "n2", "modifiedAt": "2024-01-02T03:09:00.000Z"}},
+                ]
+            }
+        }
+        remote.client.session.post.return_value = resp
+
+        # n2 was modified, n3 is not found: both need a dedicated check
+        assert remote.get_unchanged_refs(pairs) == {"n1"}
+        remote.client.session.post.assert_called_once()
+        url = remote.client.session.post.call_args[0][0]
+        assert url == (
+            "https://alfresco.example.com"
+            "/alfresco/api/-default-/public/search/versions/1/search"
+        )
+        body = remote.client.session.post.call_args[1]["json"]
+        assert body["query"]["query"].count("ID:") == 3
+        assert 'ID:"workspace://SpacesStore/n3"' in body["query"]["query"]
+        # The index lags behind changes, the database is queried
+        assert body["queryConsistency"] == "TRANSACTIONAL"
+        remote.client.search.afts.assert_not_called()
+
+    def test_search_error_is_raised(self, _client_patch) -> None:
+        import requests
+
+        remote = _build_remote(_client_patch)
+        remote.client.base_url = "https://alfresco.example.com"
+        resp = MagicMock()
+        resp.raise_for_status.side_effect = requests.HTTPError("400")
+        remote.client.session.post.return_value = resp
+
+        # Nothing is reported unchanged, all pairs are checked one by one
+        with pytest.raises(requests.HTTPError):
+            remote.get_unchanged_refs([MagicMock(remote_ref="n1")])
+
+    def test_no_pairs(self, _client_patch) -> None:
+        remote = _build_remote(_client_patch)
+        assert remote.get_unchanged_refs([]) == set()
+        remote.client.session.post.assert_not_called()
+
+
 class TestGetFsChildren:
     def test_filters_excluded_top_folders(self, _client_patch) -> None:
         remote = _build_remote(_client_patch)
@@ -25,6 +25,7 @@ def _make_engine(**overrides):
     engine.server_url = "https://acs.example.com/"
     engine._remote_token = None
     engine._remote_password = "secret"
+    engine._proc_count = 10
     engine._web_authentication = False
     engine._alfresco_ticket = ""
     engine._stopped = False
@@ -177,6 +178,7 @@ def test_creates_remote_with_expected_args(self):
         assert call_kwargs[1]["alfresco_ticket"] == "TICKET-ABC"
         assert call_kwargs[1]["password"] == "secret"
         assert call_kwargs[1]["upload_callback"] == engine.suspend_client
+        assert call_kwargs[1]["max_processors"] == 10
 
 
 # ------------------------------------------------------------------ _on_remote_token_refreshed
@@ -13,6 +13,7 @@
 
 from nxdrive.alfresco.engine.processor import AlfrescoProcessor
 from nxdrive.drive.constants import TransferStatus
+from nxdrive.drive.objects import Preflight
 
 
 @pytest.fixture
@@ -25,6 +26,7 @@ def mock_engine():
     engine.remote = Mock()
     engine.queue_manager = Mock()
     engine.queue_manager.get_error_threshold = Mock(return_value=3)
+    engine.queue_manager.freshness.is_fresh.return_value = False
     engine.get_metadata_url = Mock(return_value="http://alfresco/metadata")
     engine.get_remote_url = Mock(return_value="http://alfresco/remote")
     return engine
@@ -92,6 +94,7 @@ def proc():
     engine.remote = Mock()
     engine.queue_manager = Mock()
     engine.queue_manager.get_error_threshold = Mock(return_value=3)
+    engine.queue_manager.freshness.is_fresh.return_value = False
     engine.download_dir = Path("/tmp/downloads")
     item_getter = Mock(return_value=None)
     p = AlfrescoProcessor(engine, item_getter)
@@ -127,7 +130,10 @@ def test_increases_and_postpones(self, proc) -> None:
         proc.dao.increase_error.assert_called_once_with(
             pair, "SOME_ERROR", details="test"
         )
-        proc.engine.queue_manager.push_error.assert_called_once()
+        proc.engine.queue_manager.push_error.assert_called_once_with(
+            pair, exception=exc, failed=True
+        )
+        assert pair.error_count == 1
 
 
 class TestGiveupError:
@@ -199,6 +205,16 @@ def test_network_error_returns_false(self, proc) -> None:
         proc.remote.get_fs_info.side_effect = OSError("network")
         assert proc._remote_has_drifted(pair) is False
 
+    def test_fresh_node_is_not_fetched(self, proc) -> None:
+        pair = Mock()
+        pair.remote_ref = "abc"
+        pair.folderish = False
+        freshness = proc.engine.queue_manager.freshness
+        freshness.is_fresh.return_value = True
+        assert proc._remote_has_drifted(pair) is False
+        freshness.is_fresh.assert_called_once_with(pair)
+        proc.remote.get_fs_info.assert_not_called()
+
 
 class TestMarkConflicted:
     def test_calls_force_sync(self, proc) -> None:
@@ -1247,6 +1263,7 @@ def proc(self, mock_engine):
         p.pairSyncStarted = Mock()
         p.pairSyncEnded = Mock()
         p._current_metrics = {}
+        p.dao.get_preflight.return_value = Preflight(None, None, None)
         # Ensure soft_locks dict exists
         AlfrescoProcessor.soft_locks = {}
         # On macOS, get_remote_id for FinderInfo returns a string
@@ -1261,7 +1278,6 @@ def test_parent_missing_no_parent_pair_removes_state(self, proc):
         pair.pair_state = "locally_created"
         pair.id = 1
         proc.local.exists.return_value = False
-        proc.dao.get_normal_state_from_remote.return_value = None
         proc.local.get_remote_id.return_value = ""
         handler = Mock()
 
@@ -1279,7 +1295,7 @@ def test_parent_missing_same_path_removes_state(self, proc):
         proc.local.exists.side_effect = lambda p: p != Path("/parent")
         parent_pair = Mock()
         parent_pair.local_path = Path("/parent")
-        proc.dao.get_normal_state_from_remote.return_value = parent_pair
+        proc.dao.get_preflight.return_value = Preflight(parent_pair, None, None)
         proc.local.get_remote_id.return_value = ""
         handler = Mock()
 
@@ -1297,10 +1313,7 @@ def test_parent_missing_different_path_updates_parent(self, proc):
         proc.local.exists.side_effect = lambda p: p != Path("/old-parent")
         parent_pair = Mock()
         parent_pair.local_path = Path("/new-parent")
-        proc.dao.get_normal_state_from_remote.return_value = parent_pair
-        mock_engine = proc.engine
-        mock_engine.dao.get_download.return_value = None
-        mock_engine.dao.get_upload.return_value = None
+        proc.dao.get_preflight.return_value = Preflight(parent_pair, None, None)
         proc.local.get_remote_id.return_value = ""
         handler = Mock()
         handler.__name__ = "test_handler"
@@ -1319,9 +1332,9 @@ def test_paused_download_skips(self, proc):
         pair.pair_state = "locally_created"
         pair.local_name = "file.txt"
         pair.id = 1
-        download = Mock()
-        download.status = TransferStatus.PAUSED
-        proc.engine.dao.get_download.return_value = download
+        proc.dao.get_preflight.return_value = Preflight(
+            None, TransferStatus.PAUSED, None
+        )
         proc.local.get_remote_id.return_value = ""
         handler = Mock()
 
@@ -1335,10 +1348,9 @@ def test_paused_upload_skips(self, proc):
         pair.pair_state = "locally_created"
         pair.local_name = "file.txt"
         pair.id = 1
-        proc.engine.dao.get_download.return_value = None
-        upload = Mock()
-        upload.status = TransferStatus.SUSPENDED
-        proc.engine.dao.get_upload.return_value = upload
+        proc.dao.get_preflight.return_value = Preflight(
+            None, None, TransferStatus.SUSPENDED
+        )
         proc.local.get_remote_id.return_value = ""
         handler = Mock()
 
@@ -1352,8 +1364,6 @@ def test_locally_modified_drift_marks_conflicted(self, proc):
         pair.pair_state = "locally_modified"
         pair.local_name = "file.txt"
         pair.id = 1
-        proc.engine.dao.get_download.return_value = None
-        proc.engine.dao.get_upload.return_value = None
         proc._remote_has_drifted = Mock(return_value=True)
         proc.local.get_remote_id.return_value = ""
         handler = Mock()
@@ -1369,8 +1379,6 @@ def test_normal_sync_calls_handler(self, proc):
         pair.pair_state = "remotely_created"
         pair.local_name = "file.txt"
         pair.id = 1
-        proc.engine.dao.get_download.return_value = None
-        proc.engine.dao.get_upload.return_value = None
         proc._remote_has_drifted = Mock(return_value=False)
         proc.local.get_remote_id.return_value = ""
         handler = Mock()
@@ -1391,8 +1399,6 @@ def test_sync_result_deleted_skips_status(self, proc):
         pair.pair_state = "remotely_created"
         pair.local_name = "file.txt"
         pair.id = 1
-        proc.engine.dao.get_download.return_value = None
-        proc.engine.dao.get_upload.return_value = None
         proc.local.get_remote_id.return_value = ""
         handler = Mock()
         handler.__name__ = "test_handler"
@@ -20,7 +20,8 @@ def create_mock_tree(self):
         mock_invisible_root = MagicMock()
         mock_model.invisibleRootItem.return_value = mock_invisible_root
         mock_tree.root_item = mock_model
-        mock_tree.cache = []
+        mock_tree.cache = set()
+        mock_tree.folders_cache = None
         mock_tree.client = MagicMock()
         mock_tree._invisible_root = mock_invisible_root  # Store for assertions
         return mock_tree
@@ -71,7 +72,7 @@ def test_run_method_with_cached_item(self):
         mock_item.data.return_value = mock_info
 
         # Add item to cache
-        mock_tree.cache = ["cached_id"]
+        mock_tree.cache = {"cached_id"}
 
         loader = self.create_loader(mock_tree, item=mock_item)
 
@@ -92,7 +93,7 @@ def test_run_method_with_force_refresh(self):
         mock_item.data.return_value = mock_info
 
         # Add item to cache
-        mock_tree.cache = ["cached_id"]
+        mock_tree.cache = {"cached_id"}
 
         loader = self.create_loader(mock_tree, item=mock_item, force_refresh=True)
 
@@ -251,7 +252,8 @@ def create_mock_tree(self):
         mock_invisible_root = MagicMock()
         mock_model.invisibleRootItem.return_value = mock_invisible_root
         mock_tree.root_item = mock_model
-        mock_tree.cache = []
+        mock_tree.cache = set()
+        mock_tree.folders_cache = None
         mock_tree.client = MagicMock()
         mock_tree._invisible_root = mock_invisible_root  # Store for assertions
         return mock_tree
@@ -347,7 +349,8 @@ def create_mock_tree(self):
         mock_invisible_root = MagicMock()
         mock_model.invisibleRootItem.return_value = mock_invisible_root
         mock_tree.root_item = mock_model
-        mock_tree.cache = []
+        mock_tree.cache = set()
+        mock_tree.folders_cache = None
         mock_tree.client = MagicMock()
         mock_tree.filled = MagicMock()  # Signal for when tree is filled
         mock_tree._invisible_root = mock_invisible_root  # Store for assertions
@@ -423,7 +426,8 @@ def test_error_recovery_and_user_feedback(self):
         mock_invisible_root = MagicMock()
         mock_model.invisibleRootItem.return_value = mock_invisible_root
         mock_tree.model.return_value = mock_model
-        mock_tree.cache = []
+        mock_tree.cache = set()
+        mock_tree.folders_cache = None
         mock_tree.client = MagicMock()
 
         mock_item = MagicMock()
@@ -213,6 +213,9 @@ def get_local_children(self, path: Path):
     def get_new_remote_children(self, id: str):
         return self.doc_pairs
 
+    def get_new_remote_children_names(self, id: str):
+        return {pair.remote_name for pair in self.doc_pairs}
+
     def get_normal_state_from_remote(self, ref: str):
         return self.doc_pairs[0]
 
@@ -604,11 +607,22 @@ def width(self):
         return 0
 
 
+class Mock_Freshness:
+    def is_fresh(self, doc_pair):
+        return False
+
+
 class Mock_Queue_Manager:
     def __init__(self) -> None:
-        pass
+        self.freshness = Mock_Freshness()
 
-    def push_error(self, doc_pair, exception: Exception = None, interval: int = None):
+    def push_error(
+        self,
+        doc_pair,
+        exception: Exception = None,
+        interval: int = None,
+        failed: bool = False,
+    ):
         pass
 
 
@@ -652,6 +666,9 @@ def get_fs_info(self, fs_item_id, parent_fs_item_id=""):
     def get_fs_item(self, fs_item_id, parent_fs_item_id: str = None):
         self.fs_item
 
+    def get_unchanged_refs(self, pairs):
+        return set()
+
     def get_info(
         self, ref, raise_if_missing: bool = True, fetch_parent_uid: bool = True
     ):
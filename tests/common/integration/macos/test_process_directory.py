@@ -44,7 +44,7 @@ def _process_directory(
     mock_path = Mock()
     skipped_items = []
 
-    with patch("nxdrive.drive.gui.folders_dialog.get_tree_list") as mock_get_tree:
+    with patch("nxdrive.drive.utils.get_tree_list") as mock_get_tree:
         mock_file = Mock()
         mock_file.is_file.return_value = True
         mock_files = [(mock_file, 0)]
@@ -83,7 +83,7 @@ def _process_directory(
     mock_path = Mock()
     skipped_items = []
 
-    with patch("nxdrive.drive.gui.folders_dialog.get_tree_list") as mock_get_tree:
+    with patch("nxdrive.drive.utils.get_tree_list") as mock_get_tree:
         mock_get_tree.side_effect = OSError("Permission denied")
 
         result = dialog._process_directory(mock_path, 100, None, None, skipped_items)
@@ -118,7 +118,7 @@ def _process_directory(
     mock_path = Mock()
     skipped_items = []
 
-    with patch("nxdrive.drive.gui.folders_dialog.get_tree_list") as mock_get_tree:
+    with patch("nxdrive.drive.utils.get_tree_list") as mock_get_tree:
         mock_get_tree.side_effect = ValueError("Unexpected error")
 
         result = dialog._process_directory(mock_path, 100, None, None, skipped_items)
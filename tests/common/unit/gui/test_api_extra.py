@@ -247,6 +247,22 @@ def test_state_lists_metadata_and_feature_export(api_env):
         assert api.get_conflicts("missing") == []
         assert api.get_errors("missing") == []
 
+        # Paging arguments are given to the database
+        api.get_errors("engine-1", after=42, size=10)
+        dao.get_errors.assert_called_with(after=42, size=10)
+        api.get_conflicts("engine-1", after=42, size=10)
+        engine.get_conflicts.assert_called_with(after=42, size=10)
+
+    dao.get_conflict_count.return_value = 3
+    dao.get_error_count.return_value = 2
+    dao.get_unsynchronized_count.return_value = 1
+    assert api.get_conflicts_count("engine-1") == 3
+    assert api.get_errors_count("engine-1") == 2
+    assert api.get_unsynchronizeds_count("engine-1") == 1
+    assert api.get_conflicts_count("missing") == 0
+    assert api.get_errors_count("missing") == 0
+    assert api.get_unsynchronizeds_count("missing") == 0
+
     api.show_metadata("engine-1", "folder/document.txt")
     application.hide_systray.assert_called_once_with()
     engine.local.abspath.assert_called_once_with(Path("folder/document.txt"))
@@ -372,6 +388,9 @@ class Option:
         call(2, DirectDownloadStatus.IN_PROGRESS),
         call(3, DirectDownloadStatus.CANCELLED),
     ]
+    manager.direct_download.pause.assert_called_once_with(1)
+    manager.direct_download.resume_download.assert_called_once_with(2)
+    manager.direct_download.cancel.assert_called_once_with(3)
     manager.engines = {}
     api.pause_direct_download("missing", 1)
     api.resume_direct_download("missing", 2)
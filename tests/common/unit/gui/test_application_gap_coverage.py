@@ -6,8 +6,10 @@
 
 import pytest
 
+from nxdrive.drive.constants import TransferStatus
 from nxdrive.drive.gui import application as application_module
 from nxdrive.drive.gui.application import Application
+from nxdrive.drive.objects import TransferChange
 from nxdrive.drive.options import Options
 from nxdrive.drive.qt.imports import Qt
 
@@ -580,3 +582,69 @@ def test_refresh_files_rejects_non_engine_sender(monkeypatch):
     with patch.object(application_module.log, "error") as log_error:
         application.refresh_files({})
     log_error.assert_called_once()
+
+
+def test_apply_transfer_change(qapp):
+    dao = object()
+    application = make_application(
+        transfer_model=SimpleNamespace(update_transfer=Mock()),
+        direct_transfer_model=SimpleNamespace(update_item=Mock()),
+        refresh_transfers=Mock(),
+        refresh_direct_transfer_items=Mock(),
+        refresh_active_sessions_items=Mock(),
+        refresh_completed_sessions_items=Mock(),
+        refresh_active_direct_downloads_items=Mock(),
+        refresh_completed_direct_downloads_items=Mock(),
+        refresh_direct_download_monitoring_items=Mock(),
+    )
+    application._init_event_bus()
+    paused = {"status": TransferStatus.PAUSED, "progress": 10.0}
+    ongoing = {"status": TransferStatus.ONGOING}
+
+    # Updates are merged, then applied in place without querying the database
+    for values in (paused, ongoing):
+        application.apply_transfer_change(
+            dao, TransferChange("download", "update", 1, False, values)
+        )
+        application.apply_transfer_change(
+            dao, TransferChange("upload", "update", 2, True, values)
+        )
+    application.event_bus.flush()
+    merged = {"status": TransferStatus.ONGOING, "progress": 10.0}
+    application.transfer_model.update_transfer.assert_called_once_with(
+        "download", 1, merged
+    )
+    application.direct_transfer_model.update_item.assert_called_once_with(2, merged)
+    application.refresh_transfers.assert_not_called()
+    application.refresh_direct_transfer_items.assert_not_called()
+
+    # Other changes refresh the impacted list, once per frame
+    application.apply_transfer_change(dao, TransferChange("upload", "insert", 3))
+    application.apply_transfer_change(dao, TransferChange("upload", "remove"))
+    application.event_bus.flush()
+    application.refresh_transfers.assert_called_once_with(dao)
+    application.refresh_direct_transfer_items.assert_not_called()
+
+    application.apply_transfer_change(
+        dao, TransferChange("upload", "remove", is_direct_transfer=True)
+    )
+    application.event_bus.flush()
+    application.refresh_direct_transfer_items.assert_called_once_with(dao)
+    application.refresh_transfers.assert_called_once()
+
+    application.apply_transfer_change(dao, TransferChange("upload", "reset"))
+    application.event_bus.flush()
+    assert application.refresh_direct_transfer_items.call_count == 2
+    assert application.refresh_transfers.call_count == 2
+
+    # Sessions events: a forced refresh is not lost
+    application._post_session_event(dao, True)
+    application._post_session_event(dao, False)
+    application._post_event("direct_downloads", dao)
+    application._post_event("direct_downloads", dao)
+    application.event_bus.flush()
+    application.refresh_active_sessions_items.assert_called_once_with(dao)
+    application.refresh_completed_sessions_items.assert_called_once_with(dao, True)
+    application.refresh_active_direct_downloads_items.assert_called_once_with(dao)
+    application.refresh_completed_direct_downloads_items.assert_called_once_with(dao)
+    application.refresh_direct_download_monitoring_items.assert_called_once_with(dao)
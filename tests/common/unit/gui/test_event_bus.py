@@ -0,0 +1,96 @@
+"""Unit tests for the coalescing event bus."""
+
+from threading import Thread
+from time import monotonic
+
+from nxdrive.drive.gui.event_bus import EventBus
+
+
+def _wait_for(qapp, predicate, timeout=5.0):
+    deadline = monotonic() + timeout
+    while not predicate() and monotonic() < deadline:
+        qapp.processEvents()
+    return predicate()
+
+
+def test_latest_event_wins(qapp):
+    bus = EventBus()
+    calls = []
+    bus.subscribe("progress", calls.append)
+
+    for value in range(10):
+        bus.post("progress", value, key="file1")
+    bus.post("progress", "other", key="file2")
+    assert bus.pending == 2
+
+    bus.flush()
+    assert calls == [9, "other"]
+    assert not bus.pending
+
+
+def test_merge_and_order(qapp):
+    bus = EventBus()
+    calls = []
+    bus.subscribe("update", calls.append, merge=lambda old, new: {**old, **new})
+    bus.subscribe("refresh", lambda payload: calls.append(("refresh", payload)))
+
+    bus.post("update", {"status": "paused", "progress": 1}, key=1)
+    bus.post("refresh", "dao", key="dao")
+    bus.post("update", {"status": "ongoing"}, key=1)
+
+    bus.flush()
+    assert calls == [{"status": "ongoing", "progress": 1}, ("refresh", "dao")]
+
+
+def test_subscriber_error_does_not_stop_delivery(qapp):
+    bus = EventBus()
+    calls = []
+    bus.subscribe("topic", lambda _: 1 / 0)
+    bus.subscribe("topic", calls.append)
+
+    bus.post("topic", "payload")
+    bus.flush()
+    assert calls == ["payload"]
+
+
+def test_delivered_by_the_timer(qapp):
+    bus = EventBus(interval=1)
+    calls = []
+    bus.subscribe("topic", calls.append)
+
+    bus.post("topic", "payload")
+    assert not calls
+    assert _wait_for(qapp, lambda: calls == ["payload"])
+
+
+def test_storm_of_updates(qapp):
+    """10k updates posted by several threads: slots are called once per key."""
+    bus = EventBus(interval=60_000)
+    calls = []
+    wake_ups = []
+    bus.subscribe("progress", calls.append)
+    bus._wakeUp.connect(lambda: wake_ups.append(1))
+
+    def storm(thread: int) -> None:
+        for idx in range(2_500):
+            bus.post("progress", (thread, idx), key=(thread, idx % 10))
+
+    threads = [Thread(target=storm, args=(thread,)) for thread in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    qapp.processEvents()
+
+    # The GUI thread was woken up only once for the 10k events
+    assert len(wake_ups) == 1
+
+    bus.flush()
+    assert len(calls) == 40
+    # Intermediate values were dropped
+    assert sorted(calls)[:10] == [(0, idx) for idx in range(2_490, 2_500)]
+
+    # Following events wake up the GUI thread again
+    bus.post("progress", "new")
+    qapp.processEvents()
+    assert len(wake_ups) == 2
@@ -0,0 +1,221 @@
+"""Unit tests for the persistent folder tree cache of the folder pickers."""
+
+from unittest.mock import Mock
+
+import pytest
+
+from nxdrive.drive.constants import FOLDERS_PREFETCH_MAX
+from nxdrive.drive.gui import folders_loader
+from nxdrive.drive.gui.folders_cache import FoldersCache
+from nxdrive.drive.gui.folders_loader import FolderContentLoader
+from nxdrive.drive.gui.folders_model import (
+    Doc,
+    FilteredDoc,
+    FilteredDocuments,
+    FoldersOnlyBase,
+)
+from nxdrive.drive.objects import RemoteFileInfo
+from nxdrive.drive.qt import constants as qt
+from nxdrive.drive.qt.imports import QStandardItemModel
+
+TREE = {
+    "": ["ws1", "ws2"],
+    "ws1": ["folder1", "folder2"],
+    "ws2": [],
+    "folder1": ["sub1"],
+    "folder2": [],
+    "sub1": [],
+}
+
+
+class Folders(FoldersOnlyBase):
+    """Serve folders from a dict, and record server calls."""
+
+    def __init__(self, tree, /) -> None:
+        super().__init__(Mock())
+        self.tree = tree
+        self.calls = []
+
+    @staticmethod
+    def _doc(uid, parent=None):
+        data = {
+            "uid": uid,
+            "title": uid.title(),
+            "path": f"/{uid}",
+            "type": "Folder",
+            "facets": ["Folderish"],
+            "contextParameters": {"permissions": ["AddChildren", "Read"]},
+        }
+        return Doc(data, True, True, parent=parent)
+
+    def get_top_documents(self):
+        self.calls.append("")
+        for uid in self.tree[""]:
+            yield self._doc(uid)
+
+    def get_children(self, parent, /):
+        uid = parent.get_id()
+        self.calls.append(uid)
+        if uid not in self.tree:
+            raise ValueError(uid)
+        for child in self.tree[uid]:
+            yield self._doc(child, parent)
+
+
+@pytest.fixture(autouse=True)
+def translator(monkeypatch):
+    monkeypatch.setattr(folders_loader.Translator, "get", lambda label: label)
+
+
+@pytest.fixture
+def dao(engine_dao):
+    with engine_dao("engine_migration.db") as dao:
+        yield dao
+
+
+def make_tree(dao, tree=TREE, /, **kwargs):
+    view = Mock()
+    view.root_item = QStandardItemModel()
+    view.cache = set()
+    view.client = Folders(dict(tree))
+    view.folders_cache = FoldersCache(dao, view.client, **kwargs)
+    return view
+
+
+def labels(item):
+    return [item.child(row).text() for row in range(item.rowCount())]
+
+
+def expand(view, label, /):
+    root = view.root_item.invisibleRootItem()
+    item = next(
+        root.child(row)
+        for row in range(root.rowCount())
+        if root.child(row).text() == label
+    )
+    FolderContentLoader(view, item=item).run()
+    return item
+
+
+def test_warm_start_does_not_hit_the_server(qapp, dao):
+    view = make_tree(dao)
+    FolderContentLoader(view).run()
+    assert labels(view.root_item.invisibleRootItem()) == ["Ws1", "Ws2"]
+    # The next level was prefetched
+    assert view.client.calls == ["", "ws1", "ws2"]
+
+    # The dialog is opened again
+    view = make_tree(dao)
+    FolderContentLoader(view).run()
+    assert labels(view.root_item.invisibleRootItem()) == ["Ws1", "Ws2"]
+    assert not view.client.calls
+
+    ws1 = expand(view, "Ws1")
+    assert labels(ws1) == ["Folder1", "Folder2"]
+    assert [child.get_id() for child in ws1.data(qt.UserRole).children] == [
+        "folder1",
+        "folder2",
+    ]
+    # Only the prefetch of the next level reached the server
+    assert view.client.calls == ["folder1", "folder2"]
+
+
+def test_outdated_children_are_refreshed(qapp, dao):
+    view = make_tree(dao, ttl=-1)
+    FolderContentLoader(view).run()
+    assert view.filled.emit.call_count == 1
+
+    # Nothing changed on the server: the tree is not filled again
+    view = make_tree(dao, ttl=-1)
+    FolderContentLoader(view).run()
+    assert view.client.calls[0] == ""
+    assert view.filled.emit.call_count == 1
+
+    # A new workspace was created
+    view = make_tree(dao, {**TREE, "": ["ws1", "ws2", "ws3"], "ws3": []}, ttl=-1)
+    FolderContentLoader(view).run()
+    assert view.filled.emit.call_count == 2
+    assert labels(view.root_item.invisibleRootItem()) == ["Ws1", "Ws2", "Ws3"]
+
+
+def test_invalidated_children_are_fetched(qapp, dao):
+    view = make_tree(dao)
+    FolderContentLoader(view).run()
+    expand(view, "Ws1")
+    view.client.calls.clear()
+
+    # The remote watcher received an event about folder2
+    dao.invalidate_folder_tree(["defaultFileSystemItemFactory#default#folder2"])
+
+    # Children of ws1 are fetched again, by the prefetch of the next level
+    view = make_tree(dao, {**TREE, "ws1": ["folder1"]})
+    FolderContentLoader(view).run()
+    assert view.client.calls == ["ws1"]
+    ws1 = expand(view, "Ws1")
+    assert labels(ws1) == ["Folder1"]
+    assert view.client.calls == ["ws1"]
+
+
+def test_cached_children_are_kept_on_error(qapp, dao):
+    view = make_tree(dao, ttl=-1)
+    FolderContentLoader(view).run()
+
+    view = make_tree(dao, {}, ttl=-1)
+    FolderContentLoader(view).run()
+    assert labels(view.root_item.invisibleRootItem()) == ["Ws1", "Ws2"]
+
+
+def test_force_refresh_skips_the_cache(qapp, dao):
+    view = make_tree(dao)
+    FolderContentLoader(view).run()
+    ws1 = expand(view, "Ws1")
+    view.client.calls.clear()
+
+    view.client.tree["ws1"] = ["folder1", "folder2", "folder3"]
+    view.client.tree["folder3"] = []
+    FolderContentLoader(view, item=ws1, force_refresh=True).run()
+    assert view.client.calls[0] == "ws1"
+    assert labels(ws1) == ["Folder1", "Folder2", "Folder3"]
+    assert len(ws1.data(qt.UserRole).children) == 3
+
+
+def test_prefetch_is_limited(qapp, dao):
+    children = [f"folder{idx:03}" for idx in range(FOLDERS_PREFETCH_MAX * 2)]
+    view = make_tree(dao, {"": children, **{uid: [] for uid in children}})
+    FolderContentLoader(view).run()
+    assert len(view.client.calls) == 1 + FOLDERS_PREFETCH_MAX
+
+    # The rest is prefetched next time
+    view.client.calls.clear()
+    view.cache.clear()
+    FolderContentLoader(view).run()
+    assert view.client.calls == children[FOLDERS_PREFETCH_MAX:]
+
+
+def test_filtered_documents_round_trip(dao):
+    client = FilteredDocuments(Mock(), ["/root/filtered/"])
+    infos = [
+        RemoteFileInfo.from_dict(
+            {
+                "id": f"fs#default#{name}",
+                "parentId": "top#",
+                "path": f"/root/{name}",
+                "name": name,
+                "folder": True,
+            }
+        )
+        for name in ("filtered", "synced")
+    ]
+    roots = [FilteredDoc(info, client.get_item_state(info.path)) for info in infos]
+    cache = FoldersCache(dao, client)
+    assert cache.set(None, roots)
+    assert not cache.set(None, roots)
+
+    children, fresh = cache.get(None)
+    assert fresh
+    assert [child.get_path() for child in children] == [
+        "/root/filtered",
+        "/root/synced",
+    ]
+    assert [child.state for child in children] == [qt.Unchecked, qt.Checked]
+    assert client.roots == children
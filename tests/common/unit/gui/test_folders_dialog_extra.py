@@ -3,7 +3,7 @@
 from datetime import datetime, timedelta, timezone
 from pathlib import Path
 from types import SimpleNamespace
-from unittest.mock import MagicMock, patch
+from unittest.mock import ANY, MagicMock, patch
 
 import pytest
 
@@ -19,6 +19,7 @@
     QKeyEvent,
     QModelIndex,
     Qt,
+    QThreadPool,
     QTreeView,
     pyqtSignal,
 )
@@ -207,6 +208,8 @@ def test_open_menu_no_item_and_missing_action(qapp, application, engine, tree_vi
 
 def test_get_tree_view_uses_registered_client(qapp, application, engine):
     class Client:
+        cache_kind = "folders"
+
         def __init__(self, remote):
             self.remote = remote
 
@@ -232,7 +235,10 @@ def __init__(self, remote):
         client = tree_cls.call_args.args[1]
         assert isinstance(client, Client)
         assert client.remote is engine.remote
-        tree_cls.assert_called_once_with(dialog, client, "/chosen")
+        tree_cls.assert_called_once_with(dialog, client, "/chosen", folders_cache=ANY)
+        folders_cache = tree_cls.call_args.kwargs["folders_cache"]
+        assert folders_cache.dao is engine.dao
+        assert folders_cache.client is client
     finally:
         dialog.deleteLater()
         qapp.processEvents()
@@ -323,6 +329,8 @@ def test_accept_dispatches_selected_types_and_schedule(
             paused=True,
             schedule_delay=42,
             scheduled_at="2030-01-02T03:04:05+00:00",
+            walk=True,
+            count=1,
         )
     finally:
         close_widget(dialog, qapp)
@@ -450,7 +458,35 @@ def test_process_file_limits_and_errors(qapp, application, engine, tree_view, tm
         close_widget(dialog, qapp)
 
 
-def test_process_directory_limits_children_and_errors(
+def test_process_directory_sizes_in_the_background(
+    qapp, application, engine, tree_view, tmp_path
+):
+    folder = tmp_path / "folder"
+    folder.mkdir()
+    (folder / "small.txt").write_bytes(b"12")
+    (folder / "sub").mkdir()
+    (folder / "sub" / "other.txt").write_bytes(b"345")
+    dialog = make_dialog(qapp, application, engine, tree_view)
+    try:
+        dialog._process_additionnal_local_paths([str(folder), str(folder / "sub")])
+        assert dialog._scanning == {folder}
+        assert not dialog.upload_now_button.isEnabled()
+
+        QThreadPool.globalInstance().waitForDone()
+        qapp.processEvents()
+
+        # Only totals are kept, the content is listed by the engine
+        assert dialog.paths == {folder: 5}
+        assert dialog.counts == {folder: 4}
+        assert not dialog._scanning
+        assert dialog.path == folder
+        assert dialog.local_path.text() == f"{folder} (+3)"
+        assert dialog.upload_now_button.isEnabled()
+    finally:
+        close_widget(dialog, qapp)
+
+
+def test_scan_directory_limits_children_and_errors(
     qapp, application, engine, tree_view, tmp_path
 ):
     folder = tmp_path / "folder"
@@ -462,32 +498,37 @@ def test_process_directory_limits_children_and_errors(
     large.write_bytes(b"12345")
     empty.touch()
     dialog = make_dialog(qapp, application, engine, tree_view)
+    scanned = MagicMock()
+    dialog.directoryScanned.connect(scanned)
+    original_folder_limit = Options.direct_transfer_folder_upper_limit
     try:
-        skipped = []
-        assert dialog._process_directory(folder, 0, 3, None, skipped) == 2
-        assert dialog.paths[folder] == 0
-        assert dialog.paths[small] == 2
-        assert large not in dialog.paths
-        assert empty not in dialog.paths
-        assert skipped == ["large.txt"]
-
-        dialog.paths.clear()
-        skipped.clear()
-        assert dialog._process_directory(folder, 7, None, 6, skipped) == 7
-        assert skipped == ["folder"]
-
+        dialog._scan_directory(folder, 3)
+        scanned.assert_called_once_with(folder, 2, 2, 7, ["large.txt"])
+        assert dialog.paths == {folder: 2}
+        assert dialog.counts == {folder: 2}
+        assert dialog.skipped_items == ["large.txt"]
+
+        # Skip whole folder if adding it would exceed the total size limit
+        Options.direct_transfer_folder_upper_limit = 1
         dialog.paths.clear()
-        skipped.clear()
-        assert dialog._process_directory(folder, 1, None, 7, skipped) == 1
-        assert skipped == ["folder"]
-
-        with patch.object(dialog_module, "get_tree_list", side_effect=OSError("scan")):
-            assert dialog._process_directory(folder, 4, None, None, []) == 4
-        with patch.object(
-            dialog_module, "get_tree_list", side_effect=RuntimeError("unexpected")
-        ):
-            assert dialog._process_directory(folder, 4, None, None, []) == 4
+        dialog.counts.clear()
+        dialog.skipped_items.clear()
+        dialog._directory_scanned(folder, 2, 2, 1024 * 1024 + 1, [])
+        assert dialog.paths == {}
+        assert dialog.skipped_items == ["folder"]
+        Options.direct_transfer_folder_upper_limit = 0
+
+        scanned.reset_mock()
+        for error in (OSError("scan"), RuntimeError("unexpected")):
+            with patch.object(
+                dialog_module, "get_direct_transfer_tree", side_effect=error
+            ):
+                dialog._scan_directory(folder, 0)
+            scanned.assert_called_once_with(folder, 0, 0, 0, [])
+            scanned.reset_mock()
+        assert dialog.paths == {}
     finally:
+        Options.direct_transfer_folder_upper_limit = original_folder_limit
         close_widget(dialog, qapp)
 
 
@@ -28,7 +28,8 @@ def _make_tree_view(self, root_item=_UNSET, client=_UNSET):
             tree = TreeViewMixin.__new__(TreeViewMixin)
             tree.parent = MagicMock()
             tree.client = MagicMock() if client is _UNSET else client
-            tree.cache = []
+            tree.cache = set()
+            tree.folders_cache = None
             tree.root_item = MagicMock() if root_item is _UNSET else root_item
             tree.load_children = MagicMock()
             return tree
@@ -131,7 +132,8 @@ def _make_tree_view(self, client=_UNSET):
             tree = TreeViewMixin.__new__(TreeViewMixin)
             tree.parent = MagicMock()
             tree.client = MagicMock() if client is _UNSET else client
-            tree.cache = []
+            tree.cache = set()
+            tree.folders_cache = None
             tree.root_item = MagicMock()
             tree.loader = MagicMock()
             tree.set_loading_cursor = MagicMock()
@@ -266,7 +268,8 @@ def _make_folder_tree(root_item=_UNSET, current=_UNSET, selected_folder=None):
         tree = FolderTreeView.__new__(FolderTreeView)
         tree.parent = MagicMock()
         tree.client = MagicMock()
-        tree.cache = []
+        tree.cache = set()
+        tree.folders_cache = None
         tree.root_item = MagicMock() if root_item is _UNSET else root_item
         tree.current = MagicMock() if current is _UNSET else current
         tree.selected_folder = selected_folder
@@ -24,7 +24,9 @@ def make_folder_tree(*, selected_folder=None):
 
 
 def test_folder_tree_constructor_handles_missing_selection_model(monkeypatch):
-    monkeypatch.setattr(tree_module.TreeViewMixin, "__init__", lambda self, *_a: None)
+    monkeypatch.setattr(
+        tree_module.TreeViewMixin, "__init__", lambda self, *_a, **_kw: None
+    )
     monkeypatch.setattr(tree_module.FolderTreeView, "selectionModel", lambda self: None)
     with patch.object(tree_module.log, "error") as log_error:
         tree_module.FolderTreeView(Mock(), Mock())
@@ -104,7 +106,8 @@ def make_loader_tree():
     root_model = QStandardItemModel()
     tree = Mock()
     tree.root_item = root_model
-    tree.cache = []
+    tree.cache = set()
+    tree.folders_cache = None
     tree.client = Mock()
     tree.filled = Mock()
     return tree
@@ -188,6 +191,7 @@ def test_folders_dialog_accept_default_container_type():
         cbContainerType=Mock(),
         cb=Mock(),
         paths={},
+        overall_count=0,
         remote_folder=Mock(),
         remote_folder_ref="ref",
         remote_folder_title="title",
@@ -16,6 +16,7 @@
     FeatureModel,
     FileModel,
     LanguageModel,
+    PagedFileModel,
     TasksModel,
     TransferModel,
 )
@@ -66,6 +67,34 @@ def tr(key, values=None):
     return tr
 
 
+def _transfer(uid, /, *, transfer_type="upload", progress=0.0):
+    return {
+        "uid": uid,
+        "name": f"file{uid}.txt",
+        "status": TransferStatus.ONGOING,
+        "progress": progress,
+        "transfer_type": transfer_type,
+        "engine": "engine1",
+        "is_direct_edit": False,
+        "filesize": 1024,
+    }
+
+
+def _record_signals(model):
+    """Count structural and data notifications sent to views."""
+    calls = {"reset": 0, "inserted": 0, "removed": 0, "moved": 0, "changed": []}
+    model.modelReset.connect(lambda: calls.__setitem__("reset", calls["reset"] + 1))
+    model.rowsInserted.connect(
+        lambda *_: calls.__setitem__("inserted", calls["inserted"] + 1)
+    )
+    model.rowsRemoved.connect(
+        lambda *_: calls.__setitem__("removed", calls["removed"] + 1)
+    )
+    model.rowsMoved.connect(lambda *_: calls.__setitem__("moved", calls["moved"] + 1))
+    model.dataChanged.connect(lambda idx, *_: calls["changed"].append(idx.row()))
+    return calls
+
+
 class TestEngineModel:
     """Test cases for EngineModel class."""
 
@@ -531,6 +560,76 @@ def test_flags(self, translate_func):
         assert bool(flags & qt.ItemIsEnabled)
         assert bool(flags & qt.ItemIsSelectable)
 
+    def test_set_transfers_delta(self, translate_func):
+        """Only removed, moved, inserted and changed rows are notified."""
+        model = TransferModel(translate_func)
+        model.set_transfers([_transfer(1), _transfer(2), _transfer(3)])
+        calls = _record_signals(model)
+
+        # Same data: nothing to do
+        model.set_transfers([_transfer(1), _transfer(2), _transfer(3)])
+        assert calls == {
+            "reset": 0,
+            "inserted": 0,
+            "removed": 0,
+            "moved": 0,
+            "changed": [],
+        }
+
+        # 1 removed, 3 moved before 2 which progressed, 4 inserted
+        model.set_transfers([_transfer(3), _transfer(2, progress=50.0), _transfer(4)])
+        assert [row["uid"] for row in model.transfers] == [3, 2, 4]
+        assert model.transfers[1]["progress"] == 50.0
+        assert calls["reset"] == 0
+        assert calls["removed"] == 1
+        assert calls["moved"] == 1
+        assert calls["inserted"] == 1
+        assert calls["changed"] == [1]
+
+    def test_set_transfers_same_uid_different_type(self, translate_func):
+        model = TransferModel(translate_func)
+        model.set_transfers([_transfer(1), _transfer(1, transfer_type="download")])
+        assert model.count == 2
+
+    def test_set_transfers_keeps_speed(self, translate_func):
+        model = TransferModel(translate_func)
+        model.set_transfers([_transfer(1)])
+        model.transfers[0]["speed"] = 1024
+        calls = _record_signals(model)
+
+        model.set_transfers([_transfer(1)])
+        assert model.transfers[0]["speed"] == 1024
+        assert not calls["changed"]
+
+    def test_update_transfer(self, translate_func):
+        model = TransferModel(translate_func)
+        model.set_transfers([_transfer(1), _transfer(2)])
+        calls = _record_signals(model)
+
+        values = {"status": TransferStatus.PAUSED, "progress": 42.0}
+        assert model.update_transfer("upload", 2, values)
+        assert model.transfers[1]["status"] is TransferStatus.PAUSED
+        assert model.transfers[1]["progress"] == 42.0
+        assert calls["changed"] == [1]
+
+        # Not displayed
+        assert not model.update_transfer("download", 2, values)
+        assert not model.update_transfer("upload", 3, values)
+
+    def test_many_concurrent_updates_stay_row_level(self, translate_func):
+        """1k transfers updating their status: only their own row is notified."""
+        model = TransferModel(translate_func)
+        model.set_transfers([_transfer(uid) for uid in range(10)])
+        calls = _record_signals(model)
+
+        for uid in range(1000):
+            status = TransferStatus.PAUSED if uid % 2 else TransferStatus.ONGOING
+            model.update_transfer("upload", uid, {"status": status})
+
+        assert calls["reset"] == calls["inserted"] == calls["removed"] == 0
+        # Only displayed rows whose status changed
+        assert calls["changed"] == [1, 3, 5, 7, 9]
+
 
 class TestDirectTransferModel:
     """Test cases for DirectTransferModel class."""
@@ -784,6 +883,32 @@ def test_edit_item(self, translate_func):
         assert model.items[0]["status"] == TransferStatus.DONE
         assert model.items[0]["finalizing"] is False
 
+    def test_update_items_only_changed_rows(self, translate_func):
+        model = DirectTransferModel(translate_func)
+        items = [
+            {**_transfer(uid), "doc_pair": uid, "finalizing": False} for uid in range(3)
+        ]
+        model.set_items([item.copy() for item in items])
+        calls = _record_signals(model)
+
+        items[1]["progress"] = 60.0
+        model.update_items([item.copy() for item in items])
+
+        assert calls["changed"] == [1]
+        assert model.items[1]["progress"] == 60.0
+
+    def test_update_item(self, translate_func):
+        model = DirectTransferModel(translate_func)
+        model.set_items([{**_transfer(1), "doc_pair": 1}])
+        calls = _record_signals(model)
+
+        assert model.update_item(1, {"status": TransferStatus.PAUSED})
+        assert model.items[0]["status"] is TransferStatus.PAUSED
+
+        # Shadow items are copies of the first item, they are never updated
+        assert calls["changed"] == [0]
+        assert not model.update_item(2, {"status": TransferStatus.PAUSED})
+
 
 class TestActiveSessionModel:
     """Test cases for ActiveSessionModel class."""
@@ -1309,6 +1434,80 @@ def test_set_data(self, translate_func):
         assert model.files[0]["state"] == "error"
 
 
+class TestPagedFileModel:
+    """Test cases for PagedFileModel class."""
+
+    @staticmethod
+    def _source(count):
+        files = [{"id": idx, "name": f"file{idx}.txt"} for idx in range(1, count + 1)]
+        calls = []
+
+        def fetch(*, after=0, size=-1):
+            calls.append((after, size))
+            rows = [row for row in files if row["id"] > after]
+            return rows if size < 0 else rows[:size]
+
+        return files, fetch, calls
+
+    def test_lazy_loading(self, translate_func):
+        files, fetch, calls = self._source(250)
+        model = PagedFileModel(translate_func, page_size=100)
+
+        model.set_source(fetch, len(files))
+        # Only the first page is loaded, but the count is the total
+        assert model.rowCount() == 100
+        assert model.count == 250
+        assert calls == [(0, 100)]
+
+        assert model.canFetchMore(QModelIndex())
+        model.fetchMore(QModelIndex())
+        model.fetchMore(QModelIndex())
+        assert calls[1:] == [(100, 100), (200, 100)]
+        assert model.rowCount() == 250
+        assert not model.canFetchMore(QModelIndex())
+        assert [row["id"] for row in model.files] == list(range(1, 251))
+
+    def test_refresh_keeps_loaded_pages(self, translate_func):
+        files, fetch, calls = self._source(250)
+        model = PagedFileModel(translate_func, page_size=100)
+        model.set_source(fetch, len(files))
+        model.fetchMore(QModelIndex())
+        calls.clear()
+
+        # One file solved: loaded pages are fetched again, only changes are notified
+        del files[10]
+        removed, changed = [], []
+        model.rowsRemoved.connect(lambda *args: removed.append(args[1]))
+        model.dataChanged.connect(lambda *args: changed.append(args))
+        model.set_source(fetch, len(files))
+
+        assert calls == [(0, 200)]
+        assert removed == [10]
+        assert not changed
+        assert model.count == 249
+        # The next file took its place in loaded pages
+        assert model.rowCount() == 200
+        assert model.files[-1]["id"] == 201
+
+    def test_outdated_count(self, translate_func):
+        files, fetch, _ = self._source(5)
+        model = PagedFileModel(translate_func, page_size=100)
+        model.set_source(fetch, 10)
+        assert model.canFetchMore(QModelIndex())
+
+        model.fetchMore(QModelIndex())
+        assert model.count == 5
+        assert not model.canFetchMore(QModelIndex())
+
+    def test_empty(self, translate_func):
+        _, fetch, calls = self._source(0)
+        model = PagedFileModel(translate_func)
+        model.set_source(fetch, 0)
+        assert not calls
+        assert model.count == 0
+        assert not model.canFetchMore(QModelIndex())
+
+
 class TestLanguageModel:
     """Test cases for LanguageModel class."""
 
@@ -0,0 +1,83 @@
+"""Unit tests for the file processors pool autoscaling."""
+
+import pytest
+
+from nxdrive.drive.engine.autoscaler import ProcessorAutoscaler
+
+
+@pytest.fixture
+def autoscaler():
+    scaler = ProcessorAutoscaler(8, interval=5)
+    scaler._window_start = 0
+    return scaler
+
+
+def _window(scaler, now, /, *, done=0, errors=0, depth=100):
+    for _ in range(done):
+        scaler.record_done()
+    for _ in range(errors):
+        scaler.record_error()
+    return scaler.evaluate(depth, now=now)
+
+
+def test_bounds():
+    assert ProcessorAutoscaler(3).target == 3
+    scaler = ProcessorAutoscaler(0)
+    assert (scaler.minimum, scaler.maximum, scaler.target) == (0, 0, 0)
+
+    scaler.resize(4)
+    assert (scaler.minimum, scaler.maximum, scaler.target) == (1, 4, 4)
+
+
+def test_one_decision_per_window(autoscaler):
+    assert _window(autoscaler, 1, errors=50) == (8, False)
+    assert autoscaler.decision == "start"
+
+
+def test_multiplicative_decrease_on_errors(autoscaler):
+    assert _window(autoscaler, 5, done=10, errors=10) == (4, False)
+    assert autoscaler.decision == "decrease (errors)"
+    assert autoscaler.error_rate == 0.5
+
+    assert _window(autoscaler, 10, errors=1) == (2, False)
+    assert _window(autoscaler, 15, errors=1) == (1, False)
+    assert _window(autoscaler, 20, errors=1) == (1, False)
+
+
+def test_additive_increase_with_a_backlog(autoscaler):
+    _window(autoscaler, 5, errors=10)
+    assert autoscaler.target == 4
+
+    assert _window(autoscaler, 10, done=50) == (5, True)
+    assert autoscaler.throughput == 10
+    assert _window(autoscaler, 15, done=60) == (6, True)
+
+    # Nothing left to do
+    assert _window(autoscaler, 20, done=60, depth=0) == (6, False)
+    assert autoscaler.decision == "hold"
+
+
+def test_decrease_when_more_processors_do_not_help(autoscaler):
+    _window(autoscaler, 5, errors=10)
+    _window(autoscaler, 10, done=50)
+    assert autoscaler.target == 5
+
+    # The throughput dropped after the increase
+    assert _window(autoscaler, 15, done=30) == (2, False)
+    assert autoscaler.decision == "decrease (contention)"
+
+    # A drop not following an increase is not contention
+    assert _window(autoscaler, 20, done=10) == (3, True)
+
+
+def test_never_above_the_maximum(autoscaler):
+    for now in range(5, 50, 5):
+        _window(autoscaler, now, done=100)
+    assert autoscaler.target == 8
+    assert autoscaler.get_metrics() == {
+        "processors_target": 8,
+        "processors_max": 8,
+        "processors_throughput": 20.0,
+        "processors_error_rate": 0.0,
+        "processors_decision": "hold",
+    }
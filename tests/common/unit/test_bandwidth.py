@@ -0,0 +1,227 @@
+from datetime import datetime
+from time import monotonic
+
+import pytest
+
+from nxdrive.drive.client import bandwidth
+from nxdrive.drive.client.bandwidth import (
+    DOWNLOAD,
+    UPLOAD,
+    BandwidthLimiter,
+    TokenBucket,
+    _in_schedule,
+    is_interactive,
+)
+from nxdrive.drive.options import Options
+
+
+@pytest.fixture
+def sleeps(monkeypatch):
+    """Record sleeps instead of waiting, they move a fake clock forward."""
+    calls = []
+    clock = [monotonic()]
+
+    def sleep(delay):
+        calls.append(delay)
+        clock[0] += delay
+
+    monkeypatch.setattr(bandwidth, "sleep", sleep)
+    monkeypatch.setattr(bandwidth, "monotonic", lambda: clock[0])
+    return calls
+
+
+@pytest.fixture
+def limits():
+    yield
+    Options.bandwidth_download_limit = 0
+    Options.bandwidth_upload_limit = 0
+    Options.bandwidth_interactive_share = 20
+    Options.bandwidth_schedule = ""
+
+
+def test_token_bucket_unlimited():
+    bucket = TokenBucket()
+    assert bucket.reserve(1024**3) == 0.0
+    assert bucket.try_take(1024**3)
+
+
+def test_token_bucket_debt():
+    bucket = TokenBucket(1000)
+
+    # The burst is 1 second of data
+    assert bucket.reserve(1000) == 0.0
+    # Then the caller has to wait for the debt to be repaid
+    assert bucket.reserve(500) == pytest.approx(0.5, abs=0.05)
+    assert not bucket.try_take(1)
+
+
+def test_token_bucket_set_rate():
+    bucket = TokenBucket(1000)
+    bucket.set_rate(10)
+    assert bucket.rate == 10
+    assert bucket.reserve(20) == pytest.approx(1.0, abs=0.05)
+
+    bucket.set_rate(0)
+    assert bucket.reserve(1024) == 0.0
+
+
+def test_throttle_unlimited(sleeps):
+    limiter = BandwidthLimiter()
+    assert limiter.throttle(UPLOAD, 1024**3) == 0.0
+    assert limiter.throttle(DOWNLOAD, 1024**3) == 0.0
+    assert not sleeps
+
+
+def test_throttle_global_limit(sleeps, limits):
+    Options.bandwidth_download_limit = 100  # KiB/s
+    Options.bandwidth_interactive_share = 0
+    limiter = BandwidthLimiter()
+
+    # 1 second burst, then 300 KiB more take 3 seconds, slept by slices of 1 second
+    assert limiter.throttle(DOWNLOAD, 100 * 1024) == 0.0
+    assert limiter.throttle(DOWNLOAD, 300 * 1024) == pytest.approx(3.0, abs=0.05)
+    assert len(sleeps) == 3
+    assert max(sleeps) <= bandwidth.MAX_SLEEP
+
+    # Uploads are not limited
+    assert limiter.throttle(UPLOAD, 1024**2) == 0.0
+
+
+def test_throttle_limit_changed_at_runtime(sleeps, limits):
+    limiter = BandwidthLimiter()
+    assert limiter.throttle(UPLOAD, 1024**2) == 0.0
+
+    Options.bandwidth_upload_limit = 512
+    Options.bandwidth_interactive_share = 0
+    limiter.throttle(UPLOAD, 512 * 1024)
+    assert limiter.throttle(UPLOAD, 512 * 1024) == pytest.approx(1.0, abs=0.05)
+
+    Options.bandwidth_upload_limit = 0
+    assert limiter.throttle(UPLOAD, 1024**3) == 0.0
+
+
+def test_throttle_follows_limit_changes_while_waiting(sleeps, limits, monkeypatch):
+    Options.bandwidth_upload_limit = 100
+    Options.bandwidth_interactive_share = 0
+    limiter = BandwidthLimiter()
+    limiter.throttle(UPLOAD, 100 * 1024)
+
+    # 1,000 KiB at 100 KiB/s: 10 seconds, but the limit is raised after the first one
+    def raise_limit(delay):
+        Options.bandwidth_upload_limit = 1000
+        clock.append(clock[-1] + delay)
+        sleeps.append(delay)
+
+    clock = [bandwidth.monotonic()]
+    monkeypatch.setattr(bandwidth, "sleep", raise_limit)
+    monkeypatch.setattr(bandwidth, "monotonic", lambda: clock[-1])
+    assert limiter.throttle(UPLOAD, 1000 * 1024) == pytest.approx(1.9, abs=0.05)
+    assert sleeps[0] == bandwidth.MAX_SLEEP
+
+
+def test_lifted_engine_limit_releases_waiters(sleeps, monkeypatch):
+    limiter = BandwidthLimiter()
+    limiter.set_limit(UPLOAD, 10, engine_uid="engine1")
+    limiter.throttle(UPLOAD, 10 * 1024, engine_uid="engine1")
+
+    def lift(delay):
+        sleeps.append(delay)
+        limiter.set_limit(UPLOAD, 0, engine_uid="engine1")
+
+    monkeypatch.setattr(bandwidth, "sleep", lift)
+    assert limiter.throttle(UPLOAD, 100 * 1024, engine_uid="engine1") == 1.0
+    assert sleeps == [bandwidth.MAX_SLEEP]
+
+
+def test_throttle_interactive_share(sleeps, limits):
+    Options.bandwidth_upload_limit = 100
+    Options.bandwidth_interactive_share = 50
+    limiter = BandwidthLimiter()
+
+    # Bulk transfers consume their part of the limit, and go in debt
+    limiter.throttle(UPLOAD, 50 * 1024)
+    assert limiter.throttle(UPLOAD, 50 * 1024) > 0
+
+    # Interactive transfers still have their reserved part
+    assert limiter.throttle(UPLOAD, 20 * 1024, interactive=True) == 0.0
+    assert limiter.throttle(UPLOAD, 30 * 1024, interactive=True) == 0.0
+
+    # Once it is consumed, they wait in the bulk queue
+    assert limiter.throttle(UPLOAD, 1024, interactive=True) > 0
+
+
+def test_throttle_per_engine_limit(sleeps):
+    limiter = BandwidthLimiter()
+    limiter.set_limit(UPLOAD, 10, engine_uid="engine1")
+    assert limiter.get_limit(UPLOAD, engine_uid="engine1") == 10
+    assert limiter.get_limit(DOWNLOAD, engine_uid="engine1") == 0
+
+    limiter.throttle(UPLOAD, 10 * 1024, engine_uid="engine1")
+    assert limiter.throttle(UPLOAD, 10 * 1024, engine_uid="engine1") > 0
+
+    # Other engines and directions are not impacted
+    assert limiter.throttle(UPLOAD, 1024**2, engine_uid="engine2") == 0.0
+    assert limiter.throttle(DOWNLOAD, 1024**2, engine_uid="engine1") == 0.0
+
+    limiter.forget("engine1")
+    assert limiter.get_limit(UPLOAD, engine_uid="engine1") == 0
+    assert limiter.throttle(UPLOAD, 1024**2, engine_uid="engine1") == 0.0
+
+
+def test_throttle_outside_schedule(sleeps, limits, monkeypatch):
+    Options.bandwidth_upload_limit = 1
+    monkeypatch.setattr(bandwidth, "_in_schedule", lambda schedule: False)
+    limiter = BandwidthLimiter()
+    assert limiter.throttle(UPLOAD, 1024**2) == 0.0
+    assert limiter.throttle(UPLOAD, 1024**2) == 0.0
+
+
+@pytest.mark.parametrize(
+    "schedule, hour, expected",
+    [
+        ("", 3, True),
+        ("08:00-18:00", 7, False),
+        ("08:00-18:00", 8, True),
+        ("08:00-18:00", 18, False),
+        ("22:00-6:00", 23, True),
+        ("22:00-6:00", 3, True),
+        ("22:00-6:00", 12, False),
+    ],
+)
+def test_in_schedule(schedule, hour, expected):
+    now = datetime(2024, 1, 1, hour, 0)
+    assert _in_schedule(schedule, now=now) is expected
+
+
+@pytest.mark.parametrize("value", ["8", "08:00", "08:00-25:00", "a:b-c:d", "1-2-3"])
+def test_bad_schedule(value):
+    Options.set("bandwidth_schedule", value, setter="manual")
+    assert Options.bandwidth_schedule == ""
+
+
+def test_bad_limits():
+    Options.set("bandwidth_upload_limit", -1, setter="manual")
+    assert Options.bandwidth_upload_limit == 0
+    Options.set("bandwidth_interactive_share", 95, setter="manual")
+    assert Options.bandwidth_interactive_share == 20
+
+
+def test_throughput_is_limited(limits):
+    """Real sleeps: 3 chunks of 64 KiB at 64 KiB/s take about 2 seconds."""
+    Options.bandwidth_download_limit = 64
+    Options.bandwidth_interactive_share = 0
+    limiter = BandwidthLimiter()
+
+    start = monotonic()
+    for _ in range(3):
+        limiter.throttle(DOWNLOAD, 64 * 1024)
+    assert 1.8 <= monotonic() - start <= 3.0
+
+
+def test_is_interactive():
+    limit = Options.chunk_limit * 1024 * 1024
+    assert is_interactive(1)
+    assert is_interactive(limit)
+    assert not is_interactive(limit + 1)
+    assert not is_interactive(0)
+    assert not is_interactive(1, bulk=True)
@@ -80,12 +80,10 @@ def test_get_after_delay_returns_item(self):
         items = list(q.get())
         # With delay=0, _next_try equals the monotonic time at push.
         # get() checks cur_time > _next_try (strict >), so we need
-        # at least 1 second to pass. Instead, manipulate the item directly.
+        # at least 1 second to pass. Instead, reschedule the item directly.
         if not items:
-            # Access internal queue and force the item to be ready
-            with q._lock:
-                for item in q._queue.values():
-                    item._next_try = 0
+            for item in q._queue.values():
+                q._queue.schedule(item.path, item, 0)
             items = list(q.get())
         assert len(items) == 1
         assert items[0].path == Path("/tmp/f.txt")
@@ -95,9 +93,8 @@ def test_repush(self):
         q = BlocklistQueue(delay=0)
         q.push(Path("/tmp/f.txt"))
         # Force the item to be retrievable
-        with q._lock:
-            for item in q._queue.values():
-                item._next_try = 0
+        for item in q._queue.values():
+            q._queue.schedule(item.path, item, 0)
         items = list(q.get())
         assert len(items) == 1
         q.repush(items[0], increase_wait=False)
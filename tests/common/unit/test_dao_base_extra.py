@@ -1,39 +1,44 @@
-"""Tests for the error-handling wrappers around shared DAO backups."""
+"""Tests for the error-handling wrappers around shared DAO backups and checks."""
 
 import errno
+import sqlite3
+from sqlite3 import OperationalError
 from types import SimpleNamespace
 from unittest.mock import MagicMock, patch
 
 import pytest
 
 from nxdrive.drive.dao import base as dao_base
+from nxdrive.drive.dao.manager import ManagerDAO
 
 
 def make_dao(tmp_path):
     return SimpleNamespace(db=tmp_path / "shared.db", lock=MagicMock())
 
 
-@pytest.mark.parametrize(
-    "method_name, dependency_name",
-    [
-        ("restore_backup", "restore_backup"),
-        ("save_backup", "save_backup"),
-    ],
-)
-def test_backup_wrapper_calls_utility_while_holding_lock(
-    tmp_path, method_name, dependency_name
-):
+def test_restore_wrapper_calls_utility_while_holding_lock(tmp_path):
     dao = make_dao(tmp_path)
 
-    with patch.object(dao_base, dependency_name, return_value=True) as backup_utility:
-        result = getattr(dao_base.BaseDAO, method_name)(dao)
+    with patch.object(dao_base, "restore_backup", return_value=True) as utility:
+        result = dao_base.BaseDAO.restore_backup(dao)
 
     assert result is True
-    backup_utility.assert_called_once_with(dao.db)
+    utility.assert_called_once_with(dao.db)
     dao.lock.__enter__.assert_called_once_with()
     dao.lock.__exit__.assert_called_once_with(None, None, None)
 
 
+def test_save_wrapper_does_not_block_writers(tmp_path):
+    dao = make_dao(tmp_path)
+
+    with patch.object(dao_base, "save_backup", return_value=True) as utility:
+        result = dao_base.BaseDAO.save_backup(dao)
+
+    assert result is True
+    utility.assert_called_once_with(dao.db)
+    dao.lock.__enter__.assert_not_called()
+
+
 def test_restore_backup_reraises_no_space_error(tmp_path):
     dao = make_dao(tmp_path)
     error = OSError(errno.ENOSPC, "disk full")
@@ -106,3 +111,114 @@ def test_backup_wrapper_reports_unexpected_errors(
     assert error_type is RuntimeError
     assert reported_error is error
     assert traceback is not None
+
+
+def test_new_database_uses_incremental_vacuum(tmp_path):
+    dao = ManagerDAO(tmp_path / "manager.db")
+    try:
+        c = dao._get_read_connection()
+        assert c.execute("PRAGMA auto_vacuum").fetchone()[0] == 2
+        assert dao.incremental_vacuum() == 0
+    finally:
+        dao.dispose()
+
+
+def test_existing_database_switches_to_incremental_vacuum_in_background(tmp_path):
+    db = tmp_path / "manager.db"
+    ManagerDAO(db).dispose()
+    con = sqlite3.connect(str(db), isolation_level=None)
+    con.execute("PRAGMA auto_vacuum = NONE")
+    con.execute("VACUUM")
+    con.close()
+
+    dao = ManagerDAO(db)
+    try:
+        # No full VACUUM at startup
+        c = dao._get_write_connection()
+        assert c.execute("PRAGMA auto_vacuum").fetchone()[0] == 0
+
+        # The one-off switch is done by the first maintenance
+        assert dao.incremental_vacuum() == 0
+        assert c.execute("PRAGMA auto_vacuum").fetchone()[0] == 2
+    finally:
+        dao.dispose()
+
+
+def test_clean_shutdown_skips_the_integrity_check(tmp_path):
+    db = tmp_path / "manager.db"
+    ManagerDAO(db).dispose()
+    assert db.with_name("manager.db-clean").is_file()
+
+    with patch.object(dao_base, "fix_db") as fix_db, patch.object(
+        dao_base, "quick_check"
+    ) as check:
+        dao = ManagerDAO(db)
+        try:
+            # Until the next dispose()
+            assert not db.with_name("manager.db-clean").exists()
+            assert dao.check_integrity()
+        finally:
+            dao.dispose()
+
+    fix_db.assert_not_called()
+    check.assert_not_called()
+
+
+def test_unclean_shutdown_is_checked_at_startup_when_small(tmp_path):
+    db = tmp_path / "manager.db"
+    ManagerDAO(db).dispose()
+    db.with_name("manager.db-clean").unlink()
+
+    with patch.object(dao_base, "fix_db") as fix_db:
+        dao = ManagerDAO(db)
+        try:
+            assert dao.check_integrity()
+        finally:
+            dao.dispose()
+
+    fix_db.assert_called_once_with(db)
+
+
+def test_pending_check_survives_a_clean_shutdown(tmp_path, monkeypatch):
+    monkeypatch.setattr(dao_base, "DB_CHECK_SYNC_SIZE", 0)
+    db = tmp_path / "manager.db"
+    ManagerDAO(db).dispose()
+    db.with_name("manager.db-clean").unlink()
+
+    # Stopped before the background check
+    ManagerDAO(db).dispose()
+    assert not db.with_name("manager.db-clean").exists()
+
+    with patch.object(dao_base, "quick_check", return_value=True) as check:
+        dao = ManagerDAO(db)
+        assert dao.check_integrity()
+        dao.dispose()
+    check.assert_called_once_with(db)
+    assert db.with_name("manager.db-clean").is_file()
+
+
+def test_unclean_shutdown_is_checked_in_background(tmp_path, monkeypatch):
+    monkeypatch.setattr(dao_base, "DB_CHECK_SYNC_SIZE", 0)
+    db = tmp_path / "manager.db"
+    ManagerDAO(db).dispose()
+    db.with_name("manager.db-clean").unlink()
+
+    with patch.object(dao_base, "fix_db") as fix_db:
+        dao = ManagerDAO(db)
+        fix_db.assert_not_called()
+
+        # The database is busy, the check will be done later
+        with patch.object(dao_base, "quick_check", side_effect=OperationalError):
+            assert dao.check_integrity()
+        with patch.object(dao_base, "quick_check", return_value=False) as check:
+            assert not dao.check_integrity()
+            # Still corrupted, without checking it again, until the next start
+            assert not dao.check_integrity()
+        check.assert_called_once_with(db)
+        dao.dispose()
+        assert db.with_name("manager.db-repair").is_file()
+
+        # Corrupted: repaired at the next start
+        ManagerDAO(db).dispose()
+        fix_db.assert_called_once_with(db)
+        assert not db.with_name("manager.db-repair").exists()
@@ -0,0 +1,107 @@
+"""Unit tests for the pool of read connections of databases."""
+
+import sqlite3
+from threading import Thread
+
+import pytest
+
+from nxdrive.drive.dao.engine import EngineDAO
+from nxdrive.drive.dao.pool import ConnectionPool
+
+
+@pytest.fixture
+def dao(tmp_path):
+    instance = EngineDAO(tmp_path / "engine.db")
+    try:
+        yield instance
+    finally:
+        instance.dispose()
+
+
+def _read_in_threads(dao, count, /):
+    def read():
+        dao.get_config("whatever")
+
+    for _ in range(count):
+        thread = Thread(target=read)
+        thread.start()
+        thread.join()
+
+
+def test_connection_is_reused_by_next_threads(dao):
+    # The main thread holds its own connection
+    before = dao.get_metrics()
+    _read_in_threads(dao, 10)
+
+    metrics = dao.get_metrics()
+    assert metrics["db_connections"] == before["db_connections"] + 1
+    assert metrics["db_reused"] == before["db_reused"] + 9
+    assert metrics["db_idle"] == 1
+    assert metrics["db_in_use"] == before["db_in_use"]
+
+
+def test_pool_is_bounded():
+    closed = []
+
+    class Connection:
+        def close(self):
+            closed.append(self)
+
+    pool = ConnectionPool(Connection, size=2)
+    connections = [pool.acquire() for _ in range(3)]
+    assert pool.metrics()["db_in_use"] == 3
+
+    for connection in connections:
+        pool.release(connection)
+    assert closed == connections[-1:]
+    assert pool.metrics() == {
+        "db_pool_size": 2,
+        "db_connections": 3,
+        "db_reused": 0,
+        "db_discarded": 1,
+        "db_idle": 2,
+        "db_in_use": 0,
+    }
+
+    # Leased connections are closed on release once the pool is closed
+    lease = pool.lease()
+    pool.close()
+    assert len(closed) == 2
+    del lease
+    assert len(closed) == 3
+
+
+def test_read_connections_are_query_only(dao):
+    with pytest.raises(sqlite3.OperationalError, match="readonly"):
+        dao._get_read_connection().execute("DELETE FROM Configuration")
+
+    # Writes go through the main connection
+    dao.update_config("key", "value")
+    assert dao.get_config("key") == "value"
+
+
+def test_read_connections_are_tuned(dao):
+    conn = dao._get_read_connection()
+    assert conn.execute("PRAGMA query_only").fetchone()[0] == 1
+    assert conn.execute("PRAGMA cache_size").fetchone()[0] < 0
+    assert conn.execute("PRAGMA mmap_size").fetchone()[0] >= 0
+
+
+def test_row_factory_is_reset_on_reuse(dao):
+    def change_factory():
+        dao._get_read_connection().row_factory = None
+
+    thread = Thread(target=change_factory)
+    thread.start()
+    thread.join()
+
+    factories = []
+
+    def read():
+        factories.append(dao._get_read_connection().row_factory)
+
+    thread = Thread(target=read)
+    thread.start()
+    thread.join()
+    assert factories == [dao._state_factory]
+    assert dao.get_metrics()["db_reused"] == 1
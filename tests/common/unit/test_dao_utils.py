@@ -1,15 +1,20 @@
 """Tests for nxdrive/drive/dao/utils.py — fix_db, restore_backup, save_backup."""
 
 import sqlite3
+from datetime import datetime
 from pathlib import Path
+from threading import Event, Thread
 from unittest.mock import patch
 
 import pytest
 
+from nxdrive.drive.dao import utils
 from nxdrive.drive.dao.utils import (
     dump,
     fix_db,
     is_healthy,
+    is_readable,
+    quick_check,
     read,
     restore_backup,
     save_backup,
@@ -48,6 +53,54 @@ def test_is_healthy_corrupted_db(tmp_path):
         pass  # Some SQLite versions raise immediately
 
 
+# --------------------------------------------------------------------------
+# is_readable and quick_check
+# --------------------------------------------------------------------------
+
+
+def test_is_readable(tmp_db, tmp_path):
+    assert is_readable(tmp_db)
+
+    db = tmp_path / "corrupt.db"
+    db.write_bytes(b"this is not a valid sqlite file at all " * 100)
+    assert not is_readable(db)
+
+
+def test_quick_check_table_by_table(tmp_db, monkeypatch):
+    con = sqlite3.connect(str(tmp_db))
+    con.execute('CREATE TABLE "odd ""name""" (id INTEGER PRIMARY KEY)')
+    con.close()
+    pauses = []
+    monkeypatch.setattr(utils, "sleep", pauses.append)
+
+    # The database is released between tables, there is no time left
+    assert quick_check(tmp_db, budget=0, pause=0.5)
+    assert pauses == [0.5]
+
+
+def test_quick_check_old_sqlite(tmp_db, monkeypatch):
+    monkeypatch.setattr(utils.sqlite3, "sqlite_version_info", (3, 31, 1))
+    monkeypatch.setattr(utils, "sleep", lambda _: pytest.fail("No pause"))
+    assert quick_check(tmp_db, budget=0)
+
+
+def test_quick_check_corrupted_db(tmp_path):
+    db = tmp_path / "corrupt.db"
+    con = sqlite3.connect(str(db))
+    con.execute("CREATE TABLE t (id INTEGER PRIMARY KEY, name TEXT)")
+    con.executemany("INSERT INTO t (name) VALUES (?)", [("x" * 100,)] * 1_000)
+    con.commit()
+    con.close()
+
+    # Overwrite pages of the table, the schema is still readable
+    with db.open(mode="r+b") as f:
+        f.seek(4096 * 2)
+        f.write(b"\xff" * 4096 * 4)
+
+    assert is_readable(db)
+    assert not quick_check(db)
+
+
 # --------------------------------------------------------------------------
 # dump and read
 # --------------------------------------------------------------------------
@@ -247,3 +300,87 @@ def test_save_backup_removes_old_backups(tmp_db):
     # New backup should exist
     backups = list(backup_folder.glob(f"{tmp_db.name}_*"))
     assert len(backups) == 1
+
+
+def test_save_backup_keeps_generations(tmp_db):
+    backup_folder = tmp_db.with_name("backups")
+    backup_folder.mkdir()
+    now = int(datetime.now().timestamp())
+    for idx in range(1, 5):
+        (backup_folder / f"{tmp_db.name}_{now - idx * 60}").write_text("old")
+
+    assert save_backup(tmp_db, generations=3)
+
+    backups = sorted(backup_folder.glob(f"{tmp_db.name}_*"))
+    assert [int(b.name.split("_")[-1]) for b in backups] == [now - 120, now - 60, now]
+    assert not list(backup_folder.glob("*.partial"))
+
+
+def _wal_db(path, /, *, rows=2_000):
+    con = sqlite3.connect(str(path), isolation_level=None)
+    con.execute("PRAGMA journal_mode = WAL")
+    con.execute("CREATE TABLE t (id INTEGER PRIMARY KEY, name TEXT)")
+    con.executemany(
+        "INSERT INTO t (name) VALUES (?)", ((f"row {i}" * 20,) for i in range(rows))
+    )
+    return con
+
+
+def _rows_count(backup_folder, /):
+    (backup,) = backup_folder.glob("*.db_*")
+    con = sqlite3.connect(str(backup))
+    try:
+        assert con.execute("PRAGMA quick_check").fetchone()[0] == "ok"
+        return con.execute("SELECT COUNT(*) FROM t").fetchone()[0]
+    finally:
+        con.close()
+
+
+def test_save_backup_with_concurrent_writers(tmp_path):
+    db = tmp_path / "engine.db"
+    _wal_db(db).close()
+    stop = Event()
+    written = []
+
+    def writer():
+        con = sqlite3.connect(str(db), isolation_level=None, timeout=10)
+        try:
+            while not stop.is_set():
+                con.execute("INSERT INTO t (name) VALUES ('concurrent')")
+                written.append(1)
+        finally:
+            con.close()
+
+    threads = [Thread(target=writer) for _ in range(3)]
+    for thread in threads:
+        thread.start()
+    try:
+        assert save_backup(db, pages=8, pause=0.001)
+    finally:
+        stop.set()
+        for thread in threads:
+            thread.join()
+
+    # Writers were not blocked, and the backup is a consistent snapshot
+    assert written
+    assert 2_000 <= _rows_count(db.with_name("backups")) <= 2_000 + len(written)
+
+
+def test_save_backup_busy_database_in_one_step(tmp_path, monkeypatch):
+    db = tmp_path / "engine.db"
+    writer = _wal_db(db)
+    steps = []
+
+    def write_between_steps(pause):
+        # Each write restarts the step by step backup
+        steps.append(pause)
+        writer.execute("INSERT INTO t (name) VALUES ('restart')")
+
+    monkeypatch.setattr(utils, "sleep", write_between_steps)
+    try:
+        assert save_backup(db, pages=4)
+    finally:
+        writer.close()
+
+    assert len(steps) <= (utils.BACKUP_MAX_RESTARTS + 1) * 2
+    assert _rows_count(db.with_name("backups")) >= 2_000
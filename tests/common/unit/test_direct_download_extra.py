@@ -233,6 +233,46 @@ def test_resume_persisted_downloads_groups_batches_resets_progress_and_runs_once
     assert first.dao.get_direct_downloads.call_count == 1
 
 
+def test_stop_joins_background_tasks(direct_download):
+    from threading import Event
+    from time import sleep
+
+    started = Event()
+    done = []
+
+    def task(value, *, delay):
+        started.set()
+        # Background tasks check regularly if the worker is stopped
+        while not direct_download._stop:
+            sleep(delay)
+        done.append(value)
+
+    direct_download._start_task(task, 1, delay=0.01, name="Task-1")
+    assert started.wait(5)
+    assert len(direct_download._tasks) == 1
+
+    with patch.object(direct_download, "_flush_progress"):
+        direct_download.stop()
+    assert done == [1]
+    assert not direct_download._tasks
+
+    # No new task once stopped
+    direct_download._start_task(task, 2, delay=0.01, name="Task-2")
+    assert not direct_download._tasks
+
+
+def test_pause_and_cancel_are_in_memory_flags(direct_download):
+    direct_download.pause(1)
+    direct_download.cancel(2)
+    assert direct_download._paused == {1}
+    assert direct_download._cancelled == {2}
+
+    # Resumed by the user
+    direct_download._get_download_record = Mock(return_value=None)
+    assert not direct_download.resume_download(1)
+    assert not direct_download._paused
+
+
 def test_execute_is_a_stoppable_idle_loop(direct_download):
     interactions = 0
 
@@ -402,6 +442,162 @@ def test_archive_real_files_copy_zip_empty_and_duplicate(direct_download, tmp_pa
     assert not empty.exists()
 
 
+@pytest.mark.parametrize(
+    "name, stored",
+    [
+        ("photo.jpg", True),
+        ("movie.mp4", True),
+        ("archive.zip", True),
+        ("slides.pptx", True),
+        ("notes.txt", False),
+        ("scan.bmp", False),
+        ("drawing.svg", False),
+        ("unknown.bin", False),
+    ],
+)
+def test_archive_compression_depends_on_the_mimetype(name, stored):
+    import zipfile
+
+    from nxdrive.drive.direct_download import _compression_for
+
+    expected = zipfile.ZIP_STORED if stored else zipfile.ZIP_DEFLATED
+    assert _compression_for(Path(name)) == expected
+
+
+def test_archive_is_streamed_while_the_batch_downloads(direct_download, tmp_path):
+    import zipfile
+
+    from nxdrive.drive.direct_download import _Batch
+
+    destination = tmp_path / "downloads"
+    destination.mkdir()
+    direct_download._get_download_destination = Mock(return_value=destination)
+
+    batch_folder = direct_download.download_folder / "download_batch"
+    (batch_folder / "folder").mkdir(parents=True)
+    batch = _Batch("download_batch", batch_folder, record_uids=[1, 2])
+    direct_download._batches[batch.batch_id] = batch
+
+    text = batch_folder / "folder" / "a.txt"
+    text.write_text("a" * 1024, encoding="utf-8")
+    direct_download._file_downloaded(text)
+
+    # The file is moved into the archive, written in the destination right away
+    assert not text.exists()
+    assert (destination / "download_batch.zip.part").is_file()
+    assert not (destination / "download_batch.zip").exists()
+
+    image = batch_folder / "b.jpg"
+    image.write_bytes(b"jpg" * 1024)
+    direct_download._file_downloaded(image)
+    assert not image.exists()
+
+    # A file not streamed (e.g. already complete when resuming) is added at the end
+    (batch_folder / "c.txt").write_text("c", encoding="utf-8")
+
+    archive = direct_download._create_zip_archive(batch_folder)
+    assert archive == destination / "download_batch.zip"
+    assert not (destination / "download_batch.zip.part").exists()
+    assert not batch_folder.exists()
+
+    with zipfile.ZipFile(archive) as zip_file:
+        assert sorted(zip_file.namelist()) == ["b.jpg", "c.txt", "folder/a.txt"]
+        assert zip_file.getinfo("b.jpg").compress_type == zipfile.ZIP_STORED
+        assert zip_file.getinfo("folder/a.txt").compress_type == zipfile.ZIP_DEFLATED
+        assert zip_file.read("folder/a.txt") == b"a" * 1024
+
+
+def test_restart_discards_the_partial_archive(manager, tmp_path, sync_executor):
+    from nxdrive.drive.direct_download import _Batch
+
+    destination = tmp_path / "downloads"
+    destination.mkdir()
+
+    # A file of the batch is streamed into the archive, then the application quits
+    before = DirectDownload(manager, tmp_path / "staging", executor=sync_executor)
+    before._get_download_destination = Mock(return_value=destination)
+    batch_folder = before.download_folder / "download_batch"
+    batch_folder.mkdir()
+    batch = _Batch("download_batch", batch_folder, record_uids=[1, 2])
+    before._batches[batch.batch_id] = batch
+    done = batch_folder / "a.txt"
+    done.write_text("a", encoding="utf-8")
+    before._file_downloaded(done)
+    assert (destination / "download_batch.zip.part").is_file()
+    (destination / "download_batch_2.zip.part").touch()
+
+    engine = _engine(
+        [
+            _record(1, DirectDownloadStatus.IN_PROGRESS, batch="download_batch"),
+            _record(2, DirectDownloadStatus.IN_PROGRESS, batch="download_batch"),
+        ]
+    )
+    manager.engines = {"engine": engine}
+    after = DirectDownload(manager, tmp_path / "staging", executor=sync_executor)
+    after._get_download_destination = Mock(return_value=destination)
+    after._process_batch = Mock()
+    after.resume_persisted_downloads()
+
+    # The archived file is downloaded again, into a new archive
+    assert not (destination / "download_batch.zip.part").exists()
+    assert (destination / "download_batch_2.zip.part").is_file()
+    engine.dao.update_direct_download_progress.assert_has_calls(
+        [call(1, 0, 0, 0.0), call(2, 0, 0, 0.0)]
+    )
+    after._process_batch.assert_called_once()
+
+
+def test_single_file_batch_is_not_streamed(direct_download, tmp_path):
+    from nxdrive.drive.direct_download import _Batch
+
+    destination = tmp_path / "downloads"
+    destination.mkdir()
+    direct_download._get_download_destination = Mock(return_value=destination)
+
+    batch_folder = direct_download.download_folder / "download_single"
+    batch_folder.mkdir()
+    batch = _Batch("download_single", batch_folder, record_uids=[1])
+    direct_download._batches[batch.batch_id] = batch
+
+    file = batch_folder / "report.pdf"
+    file.write_bytes(b"pdf")
+    direct_download._file_downloaded(file)
+    assert file.is_file()
+    assert batch.archive is None
+
+    assert direct_download._create_zip_archive(batch_folder) == (
+        destination / "report.pdf"
+    )
+    assert not list(destination.glob("*.part"))
+
+
+def test_streamed_archive_is_discarded_when_nothing_completed(
+    direct_download, tmp_path
+):
+    from nxdrive.drive.direct_download import _Batch
+
+    destination = tmp_path / "downloads"
+    destination.mkdir()
+    direct_download._get_download_destination = Mock(return_value=destination)
+    direct_download._get_download_record = Mock(
+        return_value=_record(1, DirectDownloadStatus.FAILED)
+    )
+
+    batch_folder = direct_download.download_folder / "download_failed"
+    (batch_folder / "folder").mkdir(parents=True)
+    batch = _Batch("download_failed", batch_folder, record_uids=[1])
+    direct_download._batches[batch.batch_id] = batch
+
+    file = batch_folder / "folder" / "a.txt"
+    file.write_text("a", encoding="utf-8")
+    direct_download._file_downloaded(file)
+    assert batch.archive is not None
+
+    direct_download._finalize_batch(batch)
+    assert not list(destination.iterdir())
+    assert not batch_folder.exists()
+
+
 def test_download_destination_custom_and_fallback_are_isolated(
     direct_download, tmp_path
 ):
@@ -463,6 +659,7 @@ def test_database_helpers_swallow_dao_errors(direct_download, manager):
     direct_download._update_download_status(1, DirectDownloadStatus.FAILED)
     direct_download._update_download_path(1, "/tmp")
     direct_download._update_download_progress(1, 1, 2)
+    direct_download._flush_progress()
     assert direct_download._get_download_record(1) is None
 
 
@@ -511,6 +708,10 @@ def test_progress_persists_aggregate_and_emits_per_file_values(
         emitted_bytes_downloaded=5,
         emitted_total_bytes=20,
     )
+    # Nothing is saved until the next flush
+    engine.dao.update_direct_download_progress.assert_not_called()
+    assert not progress_events
+    direct_download._flush_progress()
 
     engine.dao.update_direct_download_progress.assert_called_once_with(
         11, 75, 100, 75.0
@@ -526,6 +727,120 @@ def test_progress_persists_aggregate_and_emits_per_file_values(
     ]
 
 
+def test_concurrent_flushes_never_save_an_older_progress(direct_download, monkeypatch):
+    from threading import Event, Thread
+
+    saved = []
+    entered, release = Event(), Event()
+
+    def save(uid, bytes_downloaded, *_):
+        if not saved:
+            entered.set()
+            release.wait(5)
+        saved.append(bytes_downloaded)
+
+    monkeypatch.setattr(direct_download, "_save_download_progress", save)
+    direct_download._update_download_progress(11, 5, 20)
+    first = Thread(target=direct_download._flush_progress)
+    first.start()
+    assert entered.wait(5)
+
+    # The worker flushes the final progress while the first flush is saving
+    direct_download._update_download_progress(11, 20, 20)
+    last = Thread(target=direct_download._flush_progress)
+    last.start()
+    last.join(0.2)
+    assert last.is_alive()
+
+    release.set()
+    first.join(5)
+    last.join(5)
+    assert saved == [5, 20]
+
+    # A value older than the saved one is skipped
+    direct_download._progress[11] = (0, 10, 20, None, None, None)
+    direct_download._flush_progress()
+    assert saved == [5, 20]
+
+
+def test_progress_benchmark_8_workers_10k_files(direct_download, manager):
+    """8 workers reporting the progress of 10,000 small files each: the cost
+    for workers is a dict update, the DAO is only hit once per download and flush.
+    """
+    from threading import Thread
+    from time import perf_counter
+
+    workers, files = 8, 10_000
+    engine = _engine()
+    engine.dao.get_direct_download.return_value = _record(
+        1, DirectDownloadStatus.IN_PROGRESS
+    )
+    manager.engines = {"engine": engine}
+
+    def worker(uid):
+        for index in range(1, files + 1):
+            direct_download._update_download_progress(
+                uid, index * 1024, files * 1024, filename=f"file-{index}.txt"
+            )
+
+    start = perf_counter()
+    threads = [Thread(target=worker, args=(uid,)) for uid in range(workers)]
+    for thread in threads:
+        thread.start()
+    flushes = 0
+    while any(thread.is_alive() for thread in threads):
+        direct_download._flush_progress()
+        flushes += 1
+    for thread in threads:
+        thread.join()
+    direct_download._flush_progress()
+    flushes += 1
+    elapsed = perf_counter() - start
+
+    writes = engine.dao.update_direct_download_progress.call_count
+    assert writes <= workers * flushes
+    assert writes < workers * files / 10
+    # The last progress of each download is always saved
+    last = {
+        c.args[0]: c.args[1]
+        for c in engine.dao.update_direct_download_progress.mock_calls
+    }
+    assert last == {uid: files * 1024 for uid in range(workers)}
+    print(
+        f"{workers * files:,} progress updates, {writes:,} DAO writes"
+        f" in {flushes:,} flushes, {elapsed:.2f} sec"
+    )
+
+
+def test_progress_is_flushed_at_a_fixed_rate(direct_download, monkeypatch):
+    from nxdrive.drive import direct_download as module
+
+    now = 0.0
+    flushes = []
+
+    def flush():
+        flushes.append(now)
+        direct_download._last_progress_flush = now
+
+    def clock():
+        return now
+
+    def tick(_):
+        nonlocal now
+        now += 0.125
+
+    monkeypatch.setattr(direct_download, "_flush_progress", flush)
+    monkeypatch.setattr(module.time, "monotonic", clock)
+    monkeypatch.setattr(module.time, "sleep", tick)
+    direct_download._last_progress_flush = -1.0
+    direct_download._interact = Mock(side_effect=[None] * 12 + [Exception("stop")])
+
+    direct_download._execute()
+
+    # 12 loops of 0.125 sec, flushes every 1 / PROGRESS_FLUSH_RATE sec
+    assert flushes == [0.0, 0.5, 1.0]
+
+
 def test_stop_sets_flag_and_delegates(direct_download):
     with patch(
         "nxdrive.drive.direct_download.Worker.stop", autospec=True
@@ -2,11 +2,20 @@
 from logging import getLogger
 from multiprocessing import RLock
 from pathlib import Path
+from threading import Thread
 from unittest.mock import Mock, patch
 from uuid import uuid4
 
-from nxdrive.drive.constants import TransferStatus
+import pytest
+
+from nxdrive.drive.constants import (
+    FOLDERS_CACHE_KINDS,
+    DirectDownloadStatus,
+    TransferStatus,
+)
 from nxdrive.drive.dao.migrations.migration import MigrationInterface
+from nxdrive.drive.gui.folders_model import FilteredDocuments, FoldersOnlyBase
+from nxdrive.drive.objects import Preflight
 
 from ...markers import windows_only
 
@@ -208,6 +217,22 @@ def test_conflicts(engine_dao):
         assert len(dao.get_conflicts()) == 3
 
 
+def test_conflicts_paging(engine_dao):
+    with engine_dao("engine_migration.db") as dao:
+        ids = [row.id for row in dao.get_conflicts()]
+        assert ids == sorted(ids)
+
+        first_page = dao.get_conflicts(size=2)
+        assert [row.id for row in first_page] == ids[:2]
+        second_page = dao.get_conflicts(after=first_page[-1].id, size=2)
+        assert [row.id for row in second_page] == ids[2:]
+        assert not dao.get_conflicts(after=ids[-1])
+
+        assert len(dao.get_errors(size=1)) == 1
+        assert not dao.get_errors(after=dao.get_errors()[0].id)
+        assert dao.get_unsynchronizeds(size=0) == []
+
+
 def test_corrupted_database(engine_dao):
     """DatabaseError: database disk image is malformed."""
     with engine_dao("corrupted_database.db") as dao:
@@ -601,7 +626,7 @@ def test_update_upload_requestid(engine_dao, upload):
     """Test to save upload and update reuqest_uid of existing row"""
     engine_dao.lock = RLock()
     with engine_dao("engine_migration_18.db") as dao:
-        engine_dao.directTransferUpdated = Mock()
+        engine_dao.transferChanged = Mock()
         # Save New upload
         engine_dao.save_upload(dao, upload)
 
@@ -710,8 +735,10 @@ def test_acquire_state_nonexistent_row(self, engine_dao):
             except Exception as e:
                 assert "Cannot acquire" in str(e)
 
-    def test_acquire_state_exception_releases_processor(self, engine_dao):
+    def test_acquire_state_exception_releases_processor(self, engine_dao, monkeypatch):
         """Test that exception during get_state_from_id releases processor."""
+        # get_state_from_id() is only called without UPDATE ... RETURNING
+        monkeypatch.setattr("nxdrive.drive.dao.engine._RETURNING", False)
         with engine_dao("engine_migration.db") as dao:
             dao.lock = RLock()
             thread_id = 444
@@ -742,6 +769,95 @@ def mock_get_state(*args, **kwargs):
             # Restore original method
             dao.get_state_from_id = original_method
 
+    def test_acquire_state_without_returning(self, engine_dao, monkeypatch):
+        """Test the two statements acquisition used before SQLite 3.35."""
+        monkeypatch.setattr("nxdrive.drive.dao.engine._RETURNING", False)
+        with engine_dao("engine_migration.db") as dao:
+            dao.lock = RLock()
+            state = dao.acquire_state(333, 7)
+            assert state.id == 7
+            assert state.processor == 333
+
+            with pytest.raises(sqlite3.OperationalError):
+                dao.acquire_state(222, 7)
+            dao.release_processor(333)
+
+
+def test_get_preflight(engine_dao):
+    with engine_dao("engine_migration.db") as dao:
+        dao.lock = RLock()
+        pair = dao.get_state_from_id(3)
+        preflight = dao.get_preflight(pair)
+        assert preflight.parent.id == 2
+        assert preflight.download is None
+        assert preflight.upload is None
+
+        c = dao._get_write_connection().cursor()
+        c.execute(
+            "INSERT INTO Downloads (path, status, doc_pair) VALUES ('a', ?, 3)",
+            (TransferStatus.PAUSED.value,),
+        )
+        # A Direct Transfer is not a synchronization upload
+        c.execute(
+            "INSERT INTO Uploads (path, status, doc_pair, is_direct_transfer)"
+            " VALUES ('a', ?, 3, 1)",
+            (TransferStatus.SUSPENDED.value,),
+        )
+        preflight = dao.get_preflight(pair)
+        assert preflight.download is TransferStatus.PAUSED
+        assert preflight.upload is None
+        assert Preflight.is_paused(preflight.download)
+        assert not Preflight.is_paused(preflight.upload)
+
+        # NXDRIVE-1901: unknown statuses are considered done
+        c.execute("UPDATE Uploads SET status = 5, is_direct_transfer = 0")
+        assert dao.get_preflight(pair).upload is TransferStatus.DONE
+
+        # The root has no parent
+        assert dao.get_preflight(dao.get_state_from_id(1)).parent is None
+
+
+def test_queue_pairs_to_sync_by_pages(engine_dao):
+    with engine_dao("engine_migration.db") as dao:
+        dao.lock = RLock()
+        c = dao._get_write_connection().cursor()
+        c.execute("UPDATE States SET pair_state = 'synchronized'")
+        rows = [
+            (100, "/z", "/", 1),
+            (101, "/z/child", "/z", 0),  # Handled with its parent
+            (102, "/a", "/", 0),
+            (103, "/a", "/", 0),  # Same path, ordered by id
+            (104, "/m", "/", 0),
+            (105, None, None, 0),  # NULL paths come first
+        ]
+        c.executemany(
+            "INSERT INTO States (id, remote_ref, local_path, local_parent_path,"
+            " folderish, pair_state, local_state, remote_state)"
+            " VALUES (?, 'ref-' || ?, ?, ?, ?, 'remotely_created', 'unknown', 'created')",
+            [(row[0], *row) for row in rows],
+        )
+        assert c.execute(
+            "SELECT name FROM sqlite_master WHERE type = 'index' AND name = 'StatesToSync'"
+        ).fetchone()
+
+        manager = Mock()
+        dao.register_queue_manager(manager)
+        # All of them in the first page
+        manager.set_rebuilding.assert_called_once_with(False)
+        pushed = [call.args[0] for call in manager.push_ref.call_args_list]
+        assert pushed == [105, 102, 103, 104, 100]
+
+        # Pages of 2 rows
+        manager.reset_mock()
+        dao._rebuild_after = None
+        assert dao.queue_pairs_to_sync(limit=2)
+        assert dao.queue_pairs_to_sync(limit=2)
+        assert dao.queue_pairs_to_sync(limit=2)
+        assert not dao.queue_pairs_to_sync(limit=2)
+        pushed = [call.args[0] for call in manager.push_ref.call_args_list]
+        assert pushed == [105, 102, 103, 104, 100]
+        assert not dao._rebuild_folders
+
 
 class TestReinitStates:
     """Test cases for EngineDAO.reinit_states method."""
@@ -1476,3 +1592,314 @@ def test_get_remote_children_only_direct_children(self, engine_dao):
             # Should only get direct child, not grandchild
             assert len(children) == 1
             assert children[0].remote_ref == child_ref
+
+
+def test_folder_tree_cache(engine_dao):
+    with engine_dao("engine_migration.db") as dao:
+        assert dao.get_folder_tree("folders", "") is None
+
+        dao.set_folder_tree("folders", "", [{"uid": "root-1"}])
+        dao.set_folder_tree("folders", "root-1", [{"uid": "folder-1"}])
+        dao.set_folder_tree("folders", "folder-1", [])
+        dao.set_folder_tree("documents", "root-1", [])
+        children, last_refresh = dao.get_folder_tree("folders", "root-1")
+        assert children == [{"uid": "folder-1"}]
+        assert last_refresh > 0
+
+        # File system item IDs and document UIDs share the same entries
+        assert dao.get_folder_tree(
+            "documents", "defaultSyncRootFolderItemFactory#default#root-1"
+        )
+
+        # The folder and the folder listing it are dropped, from all trees
+        assert (
+            dao.invalidate_folder_tree(
+                ["defaultFileSystemItemFactory#default#folder-1"]
+            )
+            == 2
+        )
+        assert dao.get_folder_tree("folders", "folder-1") is None
+        assert dao.get_folder_tree("folders", "root-1") is None
+        assert dao.get_folder_tree("documents", "root-1")
+        assert dao.get_folder_tree("folders", "")
+
+        # The top level folder item factory
+        dao.invalidate_folder_tree(
+            ["org.nuxeo.drive.service.impl.DefaultTopLevelFolderItemFactory#"]
+        )
+        assert dao.get_folder_tree("folders", "") is None
+
+        dao.clear_folder_tree()
+        assert dao.get_folder_tree("documents", "root-1") is None
+
+
+def test_folder_tree_links(engine_dao):
+    with engine_dao("engine_migration.db") as dao:
+        dao.set_folder_tree("folders", "root-1", [{"uid": "folder-1"}])
+        dao.set_folder_tree("documents", "root-1", [{"id": "ws#folder-1"}])
+
+        # Links follow the latest children
+        dao.set_folder_tree("folders", "root-1", [{"uid": "folder-2"}])
+        assert dao.invalidate_folder_tree(["folder-3"]) == 0
+        assert dao.invalidate_folder_tree(["folder-1"]) == 1
+        assert dao.get_folder_tree("folders", "root-1")
+        assert dao.get_folder_tree("documents", "root-1") is None
+        assert dao.invalidate_folder_tree(["folder-2"]) == 1
+        assert dao.get_folder_tree("folders", "root-1") is None
+
+        # Entries listing a folder are found with the index, not by scanning children
+        c = dao._get_read_connection().cursor()
+        plan = c.execute(
+            "EXPLAIN QUERY PLAN SELECT kind, parent FROM FolderTreeLinks WHERE child = ?",
+            ("folder-1",),
+        ).fetchall()
+        assert "FolderTreeLinksChild" in str([tuple(row) for row in plan])
+        assert not c.execute("SELECT * FROM FolderTreeLinks").fetchall()
+
+        # Entries are dropped by primary key, the tables are never scanned
+        for table in ("FolderTreeCache", "FolderTreeLinks"):
+            plan = c.execute(
+                f"EXPLAIN QUERY PLAN DELETE FROM {table} WHERE kind = ? AND parent = ?",
+                ("folders", "folder-1"),
+            ).fetchall()
+            assert "SCAN" not in str([tuple(row) for row in plan])
+
+
+def test_folder_tree_kinds():
+    """Every tree of the folder pickers is known when invalidating the cache."""
+    assert FoldersOnlyBase.cache_kind in FOLDERS_CACHE_KINDS
+    assert FilteredDocuments.cache_kind in FOLDERS_CACHE_KINDS
+
+
+def _aggregated_counters(dao):
+    """Counters computed the slow way, with aggregate queries."""
+    return {
+        "conflicts": dao.get_count("pair_state = 'conflicted'"),
+        "errors": dao.get_count("error_count > 3"),
+        "syncing": dao.get_count(
+            "pair_state NOT IN ('synchronized', 'conflicted', 'unsynchronized')"
+            " AND error_count < 3"
+        ),
+        "synced": dao.get_count("pair_state = 'synchronized'"),
+        "synced_files": dao.get_count("pair_state = 'synchronized' AND folderish = 0"),
+        "size": dao._get_read_connection()
+        .execute(
+            "SELECT SUM(size) FROM States"
+            " WHERE folderish = 0 AND pair_state = 'synchronized'"
+        )
+        .fetchone()[0]
+        or 0,
+        "direct": dao.get_count("local_state = 'direct'"),
+    }
+
+
+def _materialized_counters(dao):
+    return {
+        "conflicts": dao.get_conflict_count(),
+        "errors": dao.get_error_count(),
+        "syncing": dao.get_syncing_count(),
+        "synced": dao.get_sync_count(),
+        "synced_files": dao.get_sync_count(filetype="file"),
+        "size": dao.get_global_size(),
+        "direct": dao.get_dt_items_count(),
+    }
+
+
+def test_states_counters(engine_dao):
+    with engine_dao("engine_migration.db") as dao:
+        assert dao.check_counters()
+        assert _materialized_counters(dao) == _aggregated_counters(dao)
+
+        c = dao._get_write_connection().cursor()
+        ids = [row.id for row in c.execute("SELECT id FROM States").fetchall()]
+        c.execute(
+            "UPDATE States SET pair_state = 'synchronized', folderish = 0, size = 42"
+            " WHERE id = ?",
+            (ids[0],),
+        )
+        c.execute("UPDATE States SET pair_state = 'conflicted' WHERE id = ?", (ids[1],))
+        c.execute("UPDATE States SET error_count = 5 WHERE id = ?", (ids[2],))
+        c.execute("UPDATE States SET size = NULL WHERE id = ?", (ids[3],))
+        c.execute("DELETE FROM States WHERE id = ?", (ids[4],))
+        c.execute(
+            "INSERT INTO States (local_path, local_state, pair_state, folderish)"
+            " VALUES ('/dt', 'direct', 'direct_transfer', 0)"
+        )
+        assert _materialized_counters(dao) == _aggregated_counters(dao)
+        assert dao.check_counters()
+
+        # Counters are rebuilt when inconsistent
+        c.execute("UPDATE StatesCounters SET conflicted = 42")
+        assert dao.get_conflict_count() == 42
+        assert not dao.check_counters()
+        assert _materialized_counters(dao) == _aggregated_counters(dao)
+
+        dao.reinit_states()
+        assert not any(dao.get_counters().values())
+
+
+def test_states_counters_check_does_not_block_writers(engine_dao):
+    from nxdrive.drive.dao import engine as engine_module
+
+    with engine_dao("engine_migration.db") as dao:
+        c = dao._get_write_connection().cursor()
+        c.execute("UPDATE StatesCounters SET conflicted = conflicted + 42")
+        row_id = c.execute(
+            "SELECT id FROM States WHERE pair_state = 'synchronized'"
+        ).fetchone()[0]
+
+        def write():
+            with dao.lock:
+                dao._get_write_connection().execute(
+                    "UPDATE States SET pair_state = 'conflicted' WHERE id = ?",
+                    (row_id,),
+                )
+
+        def scan(cursor):
+            counters = compute_counters(cursor)
+            # States are updated before the check is done
+            writer = Thread(target=write)
+            writer.start()
+            writer.join(timeout=5)
+            assert not writer.is_alive()
+            return counters
+
+        compute_counters = engine_module.compute_counters
+        with patch.object(engine_module, "compute_counters", new=scan):
+            assert not dao.check_counters()
+        assert _materialized_counters(dao) == _aggregated_counters(dao)
+        assert dao.check_counters()
+
+
+def test_states_counters_other_threshold(engine_dao):
+    with engine_dao("engine_migration.db") as dao:
+        c = dao._get_write_connection().cursor()
+        c.execute("UPDATE States SET error_count = 2")
+        assert dao.get_error_count(threshold=1) == dao.get_count("error_count > 1")
+        assert dao.get_syncing_count(threshold=1) == 0
+
+
+def test_compact_projections(engine_dao):
+    with engine_dao("engine_migration.db") as dao:
+        c = dao._get_write_connection().cursor()
+        c.execute(
+            "INSERT INTO States (local_path, local_parent_path, remote_ref, folderish,"
+            "                    local_state, remote_state, pair_state)"
+            " VALUES ('/projection', '/', 'parent-ref', 1,"
+            "         'synchronized', 'synchronized', 'synchronized')"
+        )
+        parent = dao.get_state_from_id(c.lastrowid)
+        for name, pair_state in (("a", "locally_created"), ("b", "synchronized")):
+            c.execute(
+                "INSERT INTO States (local_path, local_parent_path, remote_parent_ref,"
+                "                    remote_name, folderish, local_state, remote_state,"
+                "                    pair_state)"
+                " VALUES (?, '/projection', 'parent-ref', ?, 0, 'unknown', 'created', ?)",
+                (f"/projection/{name}", name, pair_state),
+            )
+
+        # Only children needing a sync are queued
+        dao.queue_manager = Mock()
+        dao.queue_children(parent)
+        child_id = dao.get_state_from_local(Path("projection/a")).id
+        dao.queue_manager.push_ref.assert_called_once_with(
+            child_id, 0, "locally_created"
+        )
+
+        assert dao.get_new_remote_children_names("parent-ref") == {"a", "b"}
+        assert not dao.get_new_remote_children_names("unknown-ref")
+
+        # The connection row factory is untouched
+        assert dao.get_state_from_id(child_id).local_path == Path("projection/a")
+
+
+def _fill_history(dao, /):
+    c = dao._get_write_connection().cursor()
+    done, ongoing = TransferStatus.DONE.value, TransferStatus.ONGOING.value
+    for uid, status, completed_on in (
+        (1001, done, "2000-01-01 00:00:00"),
+        (1002, done, None),
+        (1003, ongoing, "2000-01-01 00:00:00"),
+    ):
+        c.execute(
+            "INSERT INTO Sessions (uid, status, total, completed_on) VALUES (?, ?, 1, ?)",
+            (uid, status, completed_on),
+        )
+        c.executemany(
+            "INSERT INTO SessionItems (session_id, data) VALUES (?, '{}')",
+            [(uid,)] * 5,
+        )
+    c.execute("UPDATE Sessions SET completed_on = CURRENT_TIMESTAMP WHERE uid = 1002")
+    c.execute(
+        "INSERT INTO DirectDownloads (doc_uid, doc_name, server_url, status, created_at)"
+        " VALUES ('old', 'old', 'url', ?, '2000-01-01 00:00:00'),"
+        "        ('new', 'new', 'url', ?, CURRENT_TIMESTAMP)",
+        (DirectDownloadStatus.COMPLETED.value, DirectDownloadStatus.COMPLETED.value),
+    )
+    c.execute(
+        "INSERT INTO Uploads (path, status, doc_pair) VALUES ('/orphan', ?, 424242)",
+        (TransferStatus.DONE.value,),
+    )
+
+
+def _history_uids(dao, /):
+    c = dao._get_read_connection().cursor()
+    return (
+        sorted(
+            row.uid for row in c.execute("SELECT uid FROM Sessions WHERE uid > 1000")
+        ),
+        c.execute(
+            "SELECT COUNT(*) FROM SessionItems WHERE session_id > 1000"
+        ).fetchone()[0],
+        sorted(row.doc_uid for row in c.execute("SELECT doc_uid FROM DirectDownloads")),
+        c.execute("SELECT COUNT(*) FROM Uploads WHERE path = '/orphan'").fetchone()[0],
+    )
+
+
+def test_clean_history(engine_dao):
+    with engine_dao("engine_migration.db") as dao:
+        _fill_history(dao)
+        assert dao.clean_history(days=0) == 0
+
+        # 1 session with 5 items, 1 Direct Download and 1 orphan upload
+        assert dao.clean_history(days=30, batch=2) == 8
+        sessions, items, downloads, orphans = _history_uids(dao)
+        assert sessions == [1002, 1003]
+        assert items == 10
+        assert "old" not in downloads
+        assert not orphans
+        assert not dao.archive_path.exists()
+
+        # Free pages are given back to the file system
+        assert (
+            dao._get_read_connection().execute("PRAGMA auto_vacuum").fetchone()[0] == 2
+        )
+        dao.incremental_vacuum()
+        assert (
+            not dao._get_read_connection()
+            .execute("PRAGMA freelist_count")
+            .fetchone()[0]
+        )
+
+
+def test_clean_history_to_archive(engine_dao):
+    with engine_dao("engine_migration.db") as dao:
+        _fill_history(dao)
+        try:
+            assert dao.clean_history(days=30, archive=True) == 8
+            assert dao.clean_history(days=30, archive=True) == 0
+
+            con = sqlite3.connect(str(dao.archive_path))
+            try:
+                assert con.execute("SELECT uid FROM Sessions").fetchall() == [(1001,)]
+                assert con.execute("SELECT COUNT(*) FROM SessionItems").fetchone() == (
+                    5,
+                )
+                assert con.execute(
+                    "SELECT doc_uid FROM DirectDownloads"
+                ).fetchall() == [("old",)]
+            finally:
+                con.close()
+            assert _history_uids(dao)[0] == [1002, 1003]
+        finally:
+            dao.archive_path.unlink(missing_ok=True)
@@ -938,8 +938,7 @@ def test_counts_partial_queries_filters_and_scan_paths(dao):
 
 
 def test_upload_download_crud_status_fallbacks_and_suspension(dao):
-    dao.transferUpdated = Mock()
-    dao.directTransferUpdated = Mock()
+    dao.transferChanged = Mock()
 
     download = Download(
         uid=None,
@@ -1015,14 +1014,11 @@ def test_upload_download_crud_status_fallbacks_and_suspension(dao):
     assert dao.get_download(uid=download.uid).status == TransferStatus.SUSPENDED
     assert dao.get_upload(uid=upload.uid).status == TransferStatus.SUSPENDED
     assert dao.get_dt_upload(uid=direct.uid).status == TransferStatus.SUSPENDED
-    dao.transferUpdated.emit.assert_called()
-    dao.directTransferUpdated.emit.assert_called()
+    dao.transferChanged.emit.assert_called()
 
-    dao.transferUpdated.reset_mock()
-    dao.directTransferUpdated.reset_mock()
+    dao.transferChanged.reset_mock()
     dao.suspend_transfers()
-    dao.transferUpdated.emit.assert_not_called()
-    dao.directTransferUpdated.emit.assert_not_called()
+    dao.transferChanged.emit.assert_not_called()
 
     dao.remove_transfer("upload")
     assert dao.get_upload(uid=upload.uid) is not None
@@ -1030,7 +1026,7 @@ def test_upload_download_crud_status_fallbacks_and_suspension(dao):
 
 def test_session_raw_items_pause_resume_cancel_and_schedule(dao):
     dao.sessionUpdated = Mock()
-    dao.directTransferUpdated = Mock()
+    dao.transferChanged = Mock()
     dao.queue_manager = Mock()
 
     ongoing = dao.create_session(
@@ -1144,6 +1140,22 @@ def test_direct_download_crud_and_every_status_transition(dao):
         25.0,
     )
 
+    # An unknown total (folder still being sized) keeps the stored one
+    dao.update_direct_download_progress(uid, 60, 0, 0.0)
+    updated = dao.get_direct_download(uid)
+    assert (updated.bytes_downloaded, updated.total_bytes) == (60, 200)
+
+    dao.update_direct_download_size(uid, 300, 4, 5)
+    updated = dao.get_direct_download(uid)
+    assert (
+        updated.doc_size,
+        updated.total_bytes,
+        updated.folder_count,
+        updated.file_count,
+        updated.bytes_downloaded,
+    ) == (300, 300, 4, 5, 60)
+    dao.update_direct_download_progress(uid, 50, 200, 25.0)
+
     dao.update_direct_download_status(uid, DirectDownloadStatus.IN_PROGRESS)
     assert dao.get_direct_download(uid).started_at is not None
     dao.update_direct_download_status(uid, DirectDownloadStatus.PAUSED)
@@ -8,7 +8,7 @@
 import pytest
 
 from nxdrive.drive.constants import TransferStatus
-from nxdrive.drive.objects import Download, Upload
+from nxdrive.drive.objects import Download, TransferChange, Upload
 
 
 class TestSaveDtUpload:
@@ -18,7 +18,7 @@ def test_save_dt_upload_basic(self, engine_dao):
         """Test saving a basic Direct Transfer upload."""
         with engine_dao("engine_migration_18.db") as dao:
             dao.lock = RLock()
-            dao.directTransferUpdated = Mock()
+            dao.transferChanged = Mock()
 
             # Create an upload object
             upload = Upload(
@@ -45,7 +45,8 @@ def test_save_dt_upload_basic(self, engine_dao):
             assert upload.uid > 0
 
             # Verify the signal was emitted
-            dao.directTransferUpdated.emit.assert_called_once()
+            dao.transferChanged.emit.assert_called_once()
+            assert dao.transferChanged.emit.call_args[0][0].is_direct_transfer
 
             # Verify the upload can be retrieved
             retrieved = dao.get_dt_upload(uid=upload.uid)
@@ -61,7 +62,7 @@ def test_save_dt_upload_batch_filtering(self, engine_dao):
         """Test that 'blobs' key is removed from batch when saving."""
         with engine_dao("engine_migration_18.db") as dao:
             dao.lock = RLock()
-            dao.directTransferUpdated = Mock()
+            dao.transferChanged = Mock()
 
             # Create an upload with blobs in batch
             upload = Upload(
@@ -106,7 +107,7 @@ def test_save_dt_upload_with_session_status(self, engine_dao):
         """Test that upload inherits status from linked session."""
         with engine_dao("engine_migration_16.db") as dao:
             dao.lock = RLock()
-            dao.directTransferUpdated = Mock()
+            dao.transferChanged = Mock()
 
             # Get an existing doc pair with a session
             # From the migration test, we know session 1 exists
@@ -141,7 +142,7 @@ def test_save_dt_upload_cancelled_when_state_removed(self, engine_dao):
         """Test that upload is CANCELLED when linked state doesn't exist."""
         with engine_dao("engine_migration_18.db") as dao:
             dao.lock = RLock()
-            dao.directTransferUpdated = Mock()
+            dao.transferChanged = Mock()
 
             # Create upload with non-existent doc_pair
             upload = Upload(
@@ -173,8 +174,7 @@ def test_pause_transfer_upload(self, engine_dao):
         """Test pausing an upload transfer."""
         with engine_dao("engine_migration_18.db") as dao:
             dao.lock = RLock()
-            dao.directTransferUpdated = Mock()
-            dao.transferUpdated = Mock()
+            dao.transferChanged = Mock()
 
             # Create and save an upload
             upload = Upload(
@@ -193,7 +193,7 @@ def test_pause_transfer_upload(self, engine_dao):
                 request_uid=str(uuid4()),
             )
             dao.save_dt_upload(upload)
-            dao.directTransferUpdated.reset_mock()
+            dao.transferChanged.reset_mock()
 
             # Pause the transfer
             progress = 45.5
@@ -205,15 +205,14 @@ def test_pause_transfer_upload(self, engine_dao):
             assert retrieved.progress == progress
 
             # Verify signal was emitted
-            dao.directTransferUpdated.emit.assert_called_once()
-            dao.transferUpdated.emit.assert_not_called()
+            dao.transferChanged.emit.assert_called_once()
+            assert dao.transferChanged.emit.call_args[0][0].is_direct_transfer
 
     def test_pause_transfer_non_direct_transfer(self, engine_dao):
         """Test pausing a non-direct transfer (regular sync)."""
         with engine_dao("engine_migration_18.db") as dao:
             dao.lock = RLock()
-            dao.directTransferUpdated = Mock()
-            dao.transferUpdated = Mock()
+            dao.transferChanged = Mock()
 
             # Create a regular upload (not direct transfer)
             upload = Upload(
@@ -264,14 +263,14 @@ def test_pause_transfer_non_direct_transfer(self, engine_dao):
             dao.pause_transfer("upload", upload.uid, progress, is_direct_transfer=False)
 
             # Verify the correct signal was emitted
-            dao.transferUpdated.emit.assert_called_once()
-            dao.directTransferUpdated.emit.assert_not_called()
+            dao.transferChanged.emit.assert_called_once()
+            assert not dao.transferChanged.emit.call_args[0][0].is_direct_transfer
 
     def test_pause_transfer_download(self, engine_dao):
         """Test pausing a download transfer."""
         with engine_dao("engine_migration_18.db") as dao:
             dao.lock = RLock()
-            dao.transferUpdated = Mock()
+            dao.transferChanged = Mock()
 
             # Create a download
             download = Download(
@@ -318,7 +317,8 @@ def test_pause_transfer_download(self, engine_dao):
             assert result[1] == progress
 
             # Verify signal was emitted
-            dao.transferUpdated.emit.assert_called_once()
+            dao.transferChanged.emit.assert_called_once()
+            assert not dao.transferChanged.emit.call_args[0][0].is_direct_transfer
 
 
 class TestResumeTransfer:
@@ -328,8 +328,7 @@ def test_resume_transfer_upload(self, engine_dao):
         """Test resuming a paused upload."""
         with engine_dao("engine_migration_18.db") as dao:
             dao.lock = RLock()
-            dao.directTransferUpdated = Mock()
-            dao.transferUpdated = Mock()
+            dao.transferChanged = Mock()
 
             # Create and save a paused upload
             upload = Upload(
@@ -383,14 +382,14 @@ def test_resume_transfer_upload(self, engine_dao):
             assert retrieved.status == TransferStatus.ONGOING
 
             # Verify correct signal was emitted
-            dao.directTransferUpdated.emit.assert_called_once()
-            dao.transferUpdated.emit.assert_not_called()
+            dao.transferChanged.emit.assert_called_once()
+            assert dao.transferChanged.emit.call_args[0][0].is_direct_transfer
 
     def test_resume_transfer_download(self, engine_dao):
         """Test resuming a paused download."""
         with engine_dao("engine_migration_18.db") as dao:
             dao.lock = RLock()
-            dao.transferUpdated = Mock()
+            dao.transferChanged = Mock()
 
             # Create a paused download
             download = Download(
@@ -434,14 +433,14 @@ def test_resume_transfer_download(self, engine_dao):
             assert result[0] == TransferStatus.ONGOING.value
 
             # Verify signal was emitted
-            dao.transferUpdated.emit.assert_called_once()
+            dao.transferChanged.emit.assert_called_once()
+            assert not dao.transferChanged.emit.call_args[0][0].is_direct_transfer
 
     def test_resume_transfer_non_direct_transfer_upload(self, engine_dao):
         """Test resuming a non-direct transfer upload."""
         with engine_dao("engine_migration_18.db") as dao:
             dao.lock = RLock()
-            dao.directTransferUpdated = Mock()
-            dao.transferUpdated = Mock()
+            dao.transferChanged = Mock()
 
             # Create regular upload (not direct transfer)
             upload = Upload(
@@ -491,8 +490,8 @@ def test_resume_transfer_non_direct_transfer_upload(self, engine_dao):
             dao.resume_transfer("upload", upload.uid, is_direct_transfer=False)
 
             # Verify correct signal was emitted
-            dao.transferUpdated.emit.assert_called_once()
-            dao.directTransferUpdated.emit.assert_not_called()
+            dao.transferChanged.emit.assert_called_once()
+            assert not dao.transferChanged.emit.call_args[0][0].is_direct_transfer
 
 
 class TestResumeSession:
@@ -503,7 +502,7 @@ def test_resume_session_basic(self, engine_dao):
         with engine_dao("engine_migration_16.db") as dao:
             dao.lock = RLock()
             dao.queue_manager = Mock()
-            dao.directTransferUpdated = Mock()
+            dao.transferChanged = Mock()
 
             # Session 1 exists in this database
             session_uid = 1
@@ -512,14 +511,14 @@ def test_resume_session_basic(self, engine_dao):
             dao.resume_session(session_uid)
 
             # Verify signal was emitted
-            dao.directTransferUpdated.emit.assert_called()
+            dao.transferChanged.emit.assert_called()
 
     def test_resume_session_updates_upload_status(self, engine_dao):
         """Test that resume_session updates uploads to ONGOING status."""
         with engine_dao("engine_migration_16.db") as dao:
             dao.lock = RLock()
             dao.queue_manager = Mock()
-            dao.directTransferUpdated = Mock()
+            dao.transferChanged = Mock()
 
             # Get a session
             session_uid = 1
@@ -591,20 +590,20 @@ def test_resume_session_without_queue_manager(self, engine_dao):
         with engine_dao("engine_migration_16.db") as dao:
             dao.lock = RLock()
             dao.queue_manager = None
-            dao.directTransferUpdated = Mock()
+            dao.transferChanged = Mock()
 
             # Should return early without error
             dao.resume_session(1)
 
             # Signal should not be emitted
-            dao.directTransferUpdated.emit.assert_not_called()
+            dao.transferChanged.emit.assert_not_called()
 
     def test_resume_session_multiple_uploads(self, engine_dao):
         """Test resuming a session with multiple uploads."""
         with engine_dao("engine_migration_16.db") as dao:
             dao.lock = RLock()
             dao.queue_manager = Mock()
-            dao.directTransferUpdated = Mock()
+            dao.transferChanged = Mock()
 
             session_uid = 1
 
@@ -672,7 +671,7 @@ class TestGetTransferStatus:
     def test_returns_upload_status(self, engine_dao):
         with engine_dao("engine_migration_18.db") as dao:
             dao.lock = RLock()
-            dao.transferUpdated = Mock()
+            dao.transferChanged = Mock()
             upload = Upload(
                 uid=None,
                 path=Path("/tmp/status-upload.txt"),
@@ -688,7 +687,7 @@ def test_returns_upload_status(self, engine_dao):
     def test_returns_download_status(self, engine_dao):
         with engine_dao("engine_migration_18.db") as dao:
             dao.lock = RLock()
-            dao.transferUpdated = Mock()
+            dao.transferChanged = Mock()
             download = Download(
                 uid=None,
                 path=Path("/tmp/status-download.txt"),
@@ -734,7 +733,7 @@ def test_set_transfer_status_upload_to_done(self, engine_dao):
         """Test setting upload transfer status to DONE."""
         with engine_dao("engine_migration_18.db") as dao:
             dao.lock = RLock()
-            dao.directTransferUpdated = Mock()
+            dao.transferChanged = Mock()
 
             # Create an ongoing upload
             upload = Upload(
@@ -753,7 +752,7 @@ def test_set_transfer_status_upload_to_done(self, engine_dao):
                 request_uid=str(uuid4()),
             )
             dao.save_dt_upload(upload)
-            dao.directTransferUpdated.reset_mock()
+            dao.transferChanged.reset_mock()
 
             # Change status to DONE
             upload.status = TransferStatus.DONE
@@ -764,13 +763,14 @@ def test_set_transfer_status_upload_to_done(self, engine_dao):
             assert retrieved.status == TransferStatus.DONE
 
             # Verify signal was emitted
-            dao.directTransferUpdated.emit.assert_called_once()
+            dao.transferChanged.emit.assert_called_once()
+            assert dao.transferChanged.emit.call_args[0][0].is_direct_transfer
 
     def test_set_transfer_status_upload_to_failed(self, engine_dao):
         """Test setting upload transfer status to CANCELLED."""
         with engine_dao("engine_migration_18.db") as dao:
             dao.lock = RLock()
-            dao.directTransferUpdated = Mock()
+            dao.transferChanged = Mock()
 
             # Create an ongoing upload
             upload = Upload(
@@ -789,7 +789,7 @@ def test_set_transfer_status_upload_to_failed(self, engine_dao):
                 request_uid=str(uuid4()),
             )
             dao.save_dt_upload(upload)
-            dao.directTransferUpdated.reset_mock()
+            dao.transferChanged.reset_mock()
 
             # Change status to CANCELLED
             upload.status = TransferStatus.CANCELLED
@@ -800,13 +800,14 @@ def test_set_transfer_status_upload_to_failed(self, engine_dao):
             assert retrieved.status == TransferStatus.CANCELLED
 
             # Verify signal was emitted
-            dao.directTransferUpdated.emit.assert_called_once()
+            dao.transferChanged.emit.assert_called_once()
+            assert dao.transferChanged.emit.call_args[0][0].is_direct_transfer
 
     def test_set_transfer_status_download(self, engine_dao):
         """Test setting download transfer status."""
         with engine_dao("engine_migration_18.db") as dao:
             dao.lock = RLock()
-            dao.directTransferUpdated = Mock()
+            dao.transferChanged = Mock()
 
             # Create a download
             download = Download(
@@ -851,13 +852,14 @@ def test_set_transfer_status_download(self, engine_dao):
             assert result[0] == TransferStatus.DONE.value
 
             # Verify signal was emitted
-            dao.directTransferUpdated.emit.assert_called_once()
+            dao.transferChanged.emit.assert_called_once()
+            assert not dao.transferChanged.emit.call_args[0][0].is_direct_transfer
 
     def test_set_transfer_status_suspended(self, engine_dao):
         """Test setting transfer status to SUSPENDED."""
         with engine_dao("engine_migration_18.db") as dao:
             dao.lock = RLock()
-            dao.directTransferUpdated = Mock()
+            dao.transferChanged = Mock()
 
             # Create an upload
             upload = Upload(
@@ -876,7 +878,7 @@ def test_set_transfer_status_suspended(self, engine_dao):
                 request_uid=str(uuid4()),
             )
             dao.save_dt_upload(upload)
-            dao.directTransferUpdated.reset_mock()
+            dao.transferChanged.reset_mock()
 
             # Change status to SUSPENDED
             upload.status = TransferStatus.SUSPENDED
@@ -887,13 +889,14 @@ def test_set_transfer_status_suspended(self, engine_dao):
             assert retrieved.status == TransferStatus.SUSPENDED
 
             # Verify signal was emitted
-            dao.directTransferUpdated.emit.assert_called_once()
+            dao.transferChanged.emit.assert_called_once()
+            assert dao.transferChanged.emit.call_args[0][0].is_direct_transfer
 
     def test_set_transfer_status_from_paused_to_ongoing(self, engine_dao):
         """Test changing transfer status from PAUSED to ONGOING."""
         with engine_dao("engine_migration_18.db") as dao:
             dao.lock = RLock()
-            dao.directTransferUpdated = Mock()
+            dao.transferChanged = Mock()
 
             # Create a paused upload
             upload = Upload(
@@ -918,7 +921,7 @@ def test_set_transfer_status_from_paused_to_ongoing(self, engine_dao):
             dao.set_transfer_status("upload", upload)
             assert dao.get_dt_upload(uid=upload.uid).status == TransferStatus.PAUSED
 
-            dao.directTransferUpdated.reset_mock()
+            dao.transferChanged.reset_mock()
 
             # Now change back to ONGOING
             upload.status = TransferStatus.ONGOING
@@ -929,7 +932,8 @@ def test_set_transfer_status_from_paused_to_ongoing(self, engine_dao):
             assert retrieved.status == TransferStatus.ONGOING
 
             # Verify signal was emitted
-            dao.directTransferUpdated.emit.assert_called_once()
+            dao.transferChanged.emit.assert_called_once()
+            assert dao.transferChanged.emit.call_args[0][0].is_direct_transfer
 
 
 class TestSetTransferDoc:
@@ -939,7 +943,7 @@ def test_set_transfer_doc_upload(self, engine_dao):
         """Test setting doc_pair for an upload transfer."""
         with engine_dao("engine_migration_18.db") as dao:
             dao.lock = RLock()
-            dao.directTransferUpdated = Mock()
+            dao.transferChanged = Mock()
 
             # Create an upload
             upload = Upload(
@@ -977,7 +981,7 @@ def test_set_transfer_doc_download(self, engine_dao):
         """Test setting doc_pair for a download transfer."""
         with engine_dao("engine_migration_18.db") as dao:
             dao.lock = RLock()
-            dao.transferUpdated = Mock()
+            dao.transferChanged = Mock()
 
             # Create a download
             download = Download(
@@ -1022,7 +1026,7 @@ def test_save_download_basic(self, engine_dao):
         """Test saving a basic download."""
         with engine_dao("engine_migration_18.db") as dao:
             dao.lock = RLock()
-            dao.transferUpdated = Mock()
+            dao.transferChanged = Mock()
 
             # Create a download object
             download = Download(
@@ -1041,7 +1045,8 @@ def test_save_download_basic(self, engine_dao):
             dao.save_download(download)
 
             # Verify the signal was emitted
-            dao.transferUpdated.emit.assert_called_once()
+            dao.transferChanged.emit.assert_called_once()
+            assert not dao.transferChanged.emit.call_args[0][0].is_direct_transfer
 
             # Verify the download was saved (get the last inserted row)
             conn = dao._get_read_connection()
@@ -1064,7 +1069,7 @@ def test_save_download_direct_edit(self, engine_dao):
         """Test saving a direct edit download."""
         with engine_dao("engine_migration_18.db") as dao:
             dao.lock = RLock()
-            dao.transferUpdated = Mock()
+            dao.transferChanged = Mock()
 
             # Create a direct edit download
             download = Download(
@@ -1094,7 +1099,7 @@ def test_save_download_different_statuses(self, engine_dao):
         """Test saving downloads with different statuses."""
         with engine_dao("engine_migration_18.db") as dao:
             dao.lock = RLock()
-            dao.transferUpdated = Mock()
+            dao.transferChanged = Mock()
 
             statuses = [
                 TransferStatus.ONGOING,
@@ -1133,7 +1138,7 @@ def test_remove_transfer_by_doc_pair(self, engine_dao):
         """Test removing transfer by doc_pair."""
         with engine_dao("engine_migration_18.db") as dao:
             dao.lock = RLock()
-            dao.directTransferUpdated = Mock()
+            dao.transferChanged = Mock()
 
             # Create an upload
             upload = Upload(
@@ -1152,7 +1157,7 @@ def test_remove_transfer_by_doc_pair(self, engine_dao):
                 request_uid=str(uuid4()),
             )
             dao.save_dt_upload(upload)
-            dao.directTransferUpdated.reset_mock()
+            dao.transferChanged.reset_mock()
 
             # Remove by doc_pair
             dao.remove_transfer("upload", doc_pair=100, is_direct_transfer=True)
@@ -1162,13 +1167,14 @@ def test_remove_transfer_by_doc_pair(self, engine_dao):
             assert result is None
 
             # Verify signal was emitted
-            dao.directTransferUpdated.emit.assert_called_once()
+            dao.transferChanged.emit.assert_called_once()
+            assert dao.transferChanged.emit.call_args[0][0].is_direct_transfer
 
     def test_remove_transfer_by_path(self, engine_dao):
         """Test removing transfer by path."""
         with engine_dao("engine_migration_18.db") as dao:
             dao.lock = RLock()
-            dao.transferUpdated = Mock()
+            dao.transferChanged = Mock()
 
             # Create a download
             download = Download(
@@ -1184,7 +1190,7 @@ def test_remove_transfer_by_path(self, engine_dao):
             )
             dao.save_download(download)
             download.uid = dao._get_write_connection().cursor().lastrowid
-            dao.transferUpdated.reset_mock()
+            dao.transferChanged.reset_mock()
 
             # Remove by path
             dao.remove_transfer("download", path=download.path)
@@ -1198,12 +1204,13 @@ def test_remove_transfer_by_path(self, engine_dao):
             assert result is None
 
             # Verify signal was emitted
-            dao.transferUpdated.emit.assert_called_once()
+            dao.transferChanged.emit.assert_called_once()
+            assert not dao.transferChanged.emit.call_args[0][0].is_direct_transfer
 
     def test_remove_transfer_binds_sql_like_path(self, engine_dao):
         with engine_dao("engine_migration_18.db") as dao:
             dao.lock = RLock()
-            dao.transferUpdated = Mock()
+            dao.transferChanged = Mock()
             path = Path("/tmp/file'; DROP TABLE States; --.txt")
             upload = Upload(
                 uid=None,
@@ -1228,7 +1235,7 @@ def test_remove_transfer_priority_doc_pair_over_path(self, engine_dao):
         """Test that doc_pair takes priority over path when both provided."""
         with engine_dao("engine_migration_18.db") as dao:
             dao.lock = RLock()
-            dao.directTransferUpdated = Mock()
+            dao.transferChanged = Mock()
 
             # Create two uploads with different doc_pairs
             upload1 = Upload(
@@ -1285,20 +1292,19 @@ def test_remove_transfer_no_match(self, engine_dao):
         """Test removing transfer that doesn't exist."""
         with engine_dao("engine_migration_18.db") as dao:
             dao.lock = RLock()
-            dao.transferUpdated = Mock()
+            dao.transferChanged = Mock()
 
             # Try to remove non-existent transfer
             dao.remove_transfer("download", doc_pair=999999)
 
             # Signal should not be emitted if nothing was removed
-            dao.transferUpdated.emit.assert_not_called()
+            dao.transferChanged.emit.assert_not_called()
 
     def test_remove_transfer_direct_transfer_signal(self, engine_dao):
         """Test correct signal emission for direct transfer."""
         with engine_dao("engine_migration_18.db") as dao:
             dao.lock = RLock()
-            dao.directTransferUpdated = Mock()
-            dao.transferUpdated = Mock()
+            dao.transferChanged = Mock()
 
             # Create a direct transfer upload
             upload = Upload(
@@ -1317,14 +1323,125 @@ def test_remove_transfer_direct_transfer_signal(self, engine_dao):
                 request_uid=str(uuid4()),
             )
             dao.save_dt_upload(upload)
-            dao.directTransferUpdated.reset_mock()
+            dao.transferChanged.reset_mock()
 
             # Remove with is_direct_transfer=True
             dao.remove_transfer("upload", doc_pair=300, is_direct_transfer=True)
 
             # Verify correct signal
-            dao.directTransferUpdated.emit.assert_called_once()
-            dao.transferUpdated.emit.assert_not_called()
+            dao.transferChanged.emit.assert_called_once()
+            assert dao.transferChanged.emit.call_args[0][0].is_direct_transfer
+
+
+class TestTransferChanged:
+    """Test cases for row-level transferChanged events."""
+
+    def test_transfer_changed_events(self, engine_dao):
+        with engine_dao("engine_migration_18.db") as dao:
+            dao.lock = RLock()
+            changes = []
+            dao.transferChanged = Mock()
+            dao.transferChanged.emit.side_effect = changes.append
+
+            upload = Upload(
+                uid=None,
+                path=Path("/tmp/upload_file.txt"),
+                status=TransferStatus.ONGOING,
+                engine="test-engine-uid",
+                filesize=1024,
+                batch={"batchId": str(uuid4())},
+                doc_pair=1,
+            )
+            dao.save_upload(upload)
+            dao.pause_transfer("upload", upload.uid, 12.5)
+            dao.resume_transfer("upload", upload.uid)
+            dao.suspend_transfers()
+            dao.remove_transfer("upload", doc_pair=1)
+
+            assert changes == [
+                TransferChange("upload", "insert", upload.uid),
+                TransferChange(
+                    "upload",
+                    "update",
+                    upload.uid,
+                    values={"status": TransferStatus.PAUSED, "progress": 12.5},
+                ),
+                TransferChange(
+                    "upload",
+                    "update",
+                    upload.uid,
+                    values={"status": TransferStatus.ONGOING},
+                ),
+                TransferChange("download", "reset"),
+                TransferChange("upload", "reset"),
+                TransferChange("upload", "remove"),
+            ]
+
+
+class TestSetSessionCounts:
+    """Test cases for EngineDAO.set_session_counts method."""
+
+    def _add_session(self, dao, uploaded, total):
+        cursor = dao._get_write_connection().cursor()
+        cursor.execute(
+            "INSERT INTO Sessions (remote_path, remote_ref, status, uploaded, total, "
+            "engine, created_on, description, planned_items) "
+            "VALUES (?, ?, ?, ?, ?, ?, CURRENT_TIMESTAMP, ?, ?)",
+            (
+                "/test/path",
+                "test-ref",
+                TransferStatus.ONGOING.value,
+                uploaded,
+                total,
+                "test-engine",
+                "Test Session",
+                total,
+            ),
+        )
+        return cursor.lastrowid
+
+    def test_set_session_counts_ongoing(self, engine_dao):
+        with engine_dao("engine_migration_16.db") as dao:
+            dao.lock = RLock()
+            dao.sessionUpdated = Mock()
+            session_uid = self._add_session(dao, 1, 3)
+
+            session = dao.set_session_counts(session_uid, 5)
+
+            assert session.status is TransferStatus.ONGOING
+            session = dao.get_session(session_uid)
+            assert session.total_items == session.planned_items == 5
+            dao.sessionUpdated.emit.assert_called_once_with(False)
+
+    def test_set_session_counts_to_done(self, engine_dao):
+        """All planned items were uploaded before the counts were fixed."""
+        with engine_dao("engine_migration_16.db") as dao:
+            dao.lock = RLock()
+            dao.sessionUpdated = Mock()
+            session_uid = self._add_session(dao, 2, 3)
+
+            dao.set_session_counts(session_uid, 2)
+
+            session = dao.get_session(session_uid)
+            assert session.status is TransferStatus.DONE
+            assert session.total_items == session.planned_items == 2
+            assert session.completed_on
+
+    def test_set_session_counts_to_cancelled(self, engine_dao):
+        """Nothing was left to upload."""
+        with engine_dao("engine_migration_16.db") as dao:
+            dao.lock = RLock()
+            dao.sessionUpdated = Mock()
+            session_uid = self._add_session(dao, 0, 3)
+
+            session = dao.set_session_counts(session_uid, 0)
+
+            assert session.status is TransferStatus.CANCELLED
+
+    def test_set_session_counts_unknown_session(self, engine_dao):
+        with engine_dao("engine_migration_16.db") as dao:
+            dao.lock = RLock()
+            assert dao.set_session_counts(999999, 1) is None
 
 
 class TestDecreaseSessionCounts:
@@ -387,6 +387,7 @@ def test_small_state_helpers_and_metrics(base_engine):
     base_engine.dao.get_sync_count.side_effect = [4, 5]
     base_engine.dao.get_syncing_count.return_value = 6
     base_engine.dao.get_unsynchronized_count.return_value = 7
+    base_engine.dao.get_metrics.return_value = {"db_connections": 8}
     conflicts = [object()]
     base_engine.dao.get_conflicts.return_value = conflicts
 
@@ -410,6 +411,15 @@ def test_small_state_helpers_and_metrics(base_engine):
         "sync_folders": 5,
         "syncing": 6,
         "unsynchronized_files": 7,
+        "http_pool_size": 0,
+        "http_connections": 0,
+        "http_requests": 0,
+        "http_reused": 0,
+        "transfers_limit": 20,
+        "transfers_running": 0,
+        "transfers_waiting": 0,
+        "transfers_engine": 0,
+        "db_connections": 8,
     }
 
 
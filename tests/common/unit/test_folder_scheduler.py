@@ -0,0 +1,143 @@
+"""Unit tests for the scheduler of folder pairs handled concurrently."""
+
+from queue import Empty, Queue
+from threading import Thread
+from types import SimpleNamespace
+from unittest.mock import Mock
+
+from nxdrive.drive.engine.folder_scheduler import FolderScheduler
+from nxdrive.drive.objects import QueueItem
+
+MAIN = FolderScheduler.MAIN
+
+# row id -> (local_path, local_parent_path)
+TREE = {
+    1: ("/a", "/"),
+    2: ("/b", "/"),
+    3: ("/a/c", "/a"),
+    4: ("/a/c/d", "/a/c"),
+    5: ("/a/c/d/e", "/a/c/d"),
+}
+
+
+def _scheduler(*items):
+    queue = Queue()
+    for item in items:
+        queue.put(item)
+
+    def pop():
+        try:
+            return queue.get_nowait()
+        except Empty:
+            return None
+
+    def resolve(row_id):
+        local_path, local_parent_path = TREE[row_id]
+        return SimpleNamespace(
+            pair_state="locally_created",
+            local_path=local_path,
+            local_parent_path=local_parent_path,
+        )
+
+    return FolderScheduler(pop, lambda: None, resolve), queue
+
+
+def _created(row_id):
+    return QueueItem(row_id, True, "locally_created")
+
+
+def test_siblings_are_handed_out_concurrently():
+    scheduler, _ = _scheduler(_created(1), _created(2))
+    assert scheduler.get(MAIN).id == 1
+    assert scheduler.get(1).id == 2
+    assert scheduler.get(2) is None
+
+
+def test_children_wait_for_their_parent():
+    scheduler, queue = _scheduler(_created(1), _created(3), _created(2))
+    assert scheduler.get(MAIN).id == 1
+
+    # The child of the folder in progress is set aside, its sibling is not
+    assert scheduler.get(1).id == 2
+    assert len(scheduler) == 1
+    assert queue.empty()
+
+    # The parent is processed: its child is handed out first
+    scheduler.done(MAIN)
+    assert scheduler.ready == 1
+    assert scheduler.get(2).id == 3
+    assert not scheduler
+
+
+def test_grandchildren_wait_for_a_waiting_parent():
+    scheduler, queue = _scheduler(_created(1), _created(3), _created(4))
+    scheduler._wake = Mock()
+    assert scheduler.get(MAIN).id == 1
+
+    # The child waits for its parent, the grandchild for the waiting child
+    assert scheduler.get(1) is None
+    assert len(scheduler) == 2
+    assert queue.empty()
+
+    scheduler.done(MAIN)
+    scheduler._wake.assert_called_once_with()
+    assert scheduler.get(1).id == 3
+    assert scheduler.get(2) is None
+
+    scheduler.done(1)
+    assert scheduler.get(2).id == 4
+    assert not scheduler
+
+
+def test_released_children_go_before_queued_ones():
+    scheduler, queue = _scheduler(_created(3), _created(4), _created(2), _created(5))
+    assert scheduler.get(MAIN).id == 3
+    assert scheduler.get(1).id == 2
+    assert queue.qsize() == 1
+
+    # The released child goes before its own child, still queued
+    scheduler.done(MAIN)
+    assert scheduler.get(MAIN).id == 4
+    assert scheduler.get(1) is None
+    assert scheduler.get(MAIN).id == 5
+
+
+def test_next_get_means_the_previous_item_is_processed():
+    scheduler, _ = _scheduler(_created(3), _created(4))
+    assert scheduler.get(1).id == 3
+    assert scheduler.get(2) is None
+    assert scheduler.get(1).id == 4
+
+
+def test_exclusive_operations_run_alone_on_the_main_processor():
+    moved = QueueItem(5, True, "locally_moved")
+    scheduler, _ = _scheduler(_created(1), moved, _created(2))
+    assert scheduler.get(1).id == 1
+
+    # Helpers stop at the move, the main processor waits for the creation
+    assert scheduler.get(2) is None
+    assert scheduler.blocked
+    assert len(scheduler) == 1
+
+    got = []
+    main = Thread(target=lambda: got.append(scheduler.get(MAIN)))
+    main.start()
+    main.join(0.2)
+    assert main.is_alive()
+
+    scheduler.done(1)
+    main.join(5)
+    assert got == [moved]
+    assert scheduler.get(1) is None
+
+    # The move is processed, creations go on concurrently
+    assert scheduler.get(MAIN).id == 2
+    assert not scheduler.blocked
+
+
+def test_unknown_pair_has_no_dependency():
+    scheduler, _ = _scheduler(_created(1))
+    scheduler._resolve = lambda row_id: None
+    assert scheduler.get(1).id == 1
+    scheduler.done(1)
+    assert not scheduler._running
@@ -0,0 +1,161 @@
+"""Unit tests for the bulk freshness checks of locally changed pairs."""
+
+from threading import Event, Thread
+from unittest.mock import Mock
+
+import pytest
+
+from nxdrive.drive.dao.engine import EngineDAO
+from nxdrive.drive.engine.freshness import FreshnessCache
+
+
+@pytest.fixture
+def dao(tmp_path):
+    instance = EngineDAO(tmp_path / "engine.db")
+    try:
+        yield instance
+    finally:
+        instance.dispose()
+
+
+def fill(dao, count, /, *, pair_state="locally_modified"):
+    c = dao._get_write_connection().cursor()
+    c.executemany(
+        "INSERT INTO States (local_path, local_parent_path, local_name, remote_ref,"
+        " remote_parent_ref, remote_name, remote_digest, folderish, pair_state)"
+        " VALUES (?, '/', ?, ?, 'parent', ?, 'digest', 0, ?)",
+        [
+            (f"/{name}", name, f"ref-{name}", name, pair_state)
+            for name in (f"{pair_state}{idx}" for idx in range(count))
+        ],
+    )
+    dao._get_write_connection().commit()
+    return c.execute(
+        "SELECT * FROM States WHERE pair_state = ? ORDER BY id", (pair_state,)
+    ).fetchall()
+
+
+def make_cache(dao, /, **kwargs):
+    engine = Mock()
+    engine.remote.get_unchanged_refs.side_effect = lambda pairs: {
+        pair.remote_ref for pair in pairs
+    }
+    return FreshnessCache(engine, dao, **kwargs), engine.remote
+
+
+def test_pairs_are_checked_in_bulk(dao):
+    pairs = fill(dao, 25)
+    cache, remote = make_cache(dao, batch=10)
+
+    assert all(cache.is_fresh(pair) for pair in pairs)
+    # 25 pairs checked with 3 requests
+    assert remote.get_unchanged_refs.call_count == 3
+    assert [len(call[0][0]) for call in remote.get_unchanged_refs.call_args_list] == [
+        10,
+        10,
+        5,
+    ]
+    assert cache.get_metrics() == {
+        "freshness_hits": 25,
+        "freshness_misses": 0,
+        "freshness_requests": 3,
+    }
+
+
+def test_changed_pairs_are_not_fresh(dao):
+    pairs = fill(dao, 3)
+    cache, remote = make_cache(dao)
+    remote.get_unchanged_refs.side_effect = lambda _: {
+        pairs[0].remote_ref,
+        pairs[1].remote_ref,
+    }
+    assert cache.is_fresh(pairs[0])
+
+    # The remote watcher updated the pair since the check
+    dao._get_write_connection().execute(
+        "UPDATE States SET remote_digest = 'new' WHERE id = ?", (pairs[1].id,)
+    )
+    dao._get_write_connection().commit()
+    assert not cache.is_fresh(dao.get_state_from_id(pairs[1].id))
+
+    # Changed remotely: the caller checks it by itself, without a new request
+    assert not cache.is_fresh(pairs[2])
+    assert remote.get_unchanged_refs.call_count == 1
+
+
+def test_verdicts_are_used_once_and_expire(dao):
+    pairs = fill(dao, 2)
+    cache, remote = make_cache(dao)
+
+    assert cache.is_fresh(pairs[0])
+    assert cache.is_fresh(pairs[0])
+    assert remote.get_unchanged_refs.call_count == 2
+
+    # The next pair was checked by the previous request
+    assert cache.is_fresh(pairs[1])
+    assert remote.get_unchanged_refs.call_count == 2
+
+    cache, remote = make_cache(dao, ttl=-1)
+    assert cache.is_fresh(pairs[0])
+    assert cache.is_fresh(pairs[1])
+    assert remote.get_unchanged_refs.call_count == 2
+
+
+def test_errors_fall_back_to_dedicated_checks(dao):
+    pairs = fill(dao, 2)
+    cache, remote = make_cache(dao)
+    remote.get_unchanged_refs.side_effect = ValueError("Mock'ed error")
+
+    assert not cache.is_fresh(pairs[0])
+    assert cache.get_metrics()["freshness_misses"] == 1
+
+
+def test_only_locally_changed_pairs_are_checked(dao):
+    fill(dao, 2, pair_state="remotely_modified")
+    pair = fill(dao, 1)[0]
+    cache, remote = make_cache(dao)
+
+    assert cache.is_fresh(pair)
+    assert [p.remote_ref for p in remote.get_unchanged_refs.call_args[0][0]] == [
+        pair.remote_ref
+    ]
+    assert not cache.is_fresh(Mock(remote_ref=""))
+
+
+def test_request_runs_without_the_lock(dao):
+    pairs = fill(dao, 3)
+    cache, remote = make_cache(dao, batch=2)
+    started, release = Event(), Event()
+
+    def get_unchanged_refs(batch):
+        refs = {pair.remote_ref for pair in batch}
+        if pairs[0].remote_ref in refs:
+            started.set()
+            assert release.wait(timeout=5)
+        return refs
+
+    remote.get_unchanged_refs.side_effect = get_unchanged_refs
+    results = {}
+
+    def check(pair):
+        results[pair.id] = cache.is_fresh(pair)
+
+    first = Thread(target=check, args=(pairs[0],))
+    first.start()
+    assert started.wait(timeout=5)
+
+    # Pairs outside of the pending batch are checked meanwhile
+    assert cache.is_fresh(pairs[2])
+
+    # Pairs of the pending batch wait for it, without a request of their own
+    second = Thread(target=check, args=(pairs[1],))
+    second.start()
+    second.join(timeout=0.2)
+    assert second.is_alive()
+
+    release.set()
+    first.join(timeout=5)
+    second.join(timeout=5)
+    assert results == {pairs[0].id: True, pairs[1].id: True}
+    assert remote.get_unchanged_refs.call_count == 2
+    assert not cache._pending
@@ -996,7 +996,7 @@ def test_scan_recursive(tmp_path):
     mock_dao.get_local_children.return_value = []
     mock_local.get_children_info.return_value = [child_info]
     mock_local.get_remote_id.side_effect = [None, None]  # parent, child
-    mock_dao.get_new_remote_children.return_value = []
+    mock_dao.get_new_remote_children_names.return_value = set()
 
     watcher._scan_recursive(parent_info2, recursive=False)
 
@@ -1023,7 +1023,7 @@ def test_scan_recursive(tmp_path):
     mock_dao.get_local_children.return_value = []
     mock_local.get_children_info.return_value = [child_info3]
     mock_local.get_remote_id.side_effect = [None, "remote123"]
-    mock_dao.get_new_remote_children.return_value = []
+    mock_dao.get_new_remote_children_names.return_value = set()
 
     # doc_pair doesn't exist in DB
     mock_dao.get_normal_state_from_remote.return_value = None
@@ -1064,7 +1064,7 @@ def test_scan_recursive(tmp_path):
     mock_dao.get_local_children.return_value = [existing_pair]
     mock_local.get_children_info.return_value = [child_info4]
     mock_local.get_remote_id.side_effect = [None, "remote456"]
-    mock_dao.get_new_remote_children.return_value = []
+    mock_dao.get_new_remote_children_names.return_value = set()
 
     watcher._scan_recursive(parent_info4, recursive=False)
 
@@ -1095,7 +1095,7 @@ def test_scan_recursive(tmp_path):
     mock_local.get_children_info.return_value = []  # No FS children
     mock_local.get_remote_id.side_effect = None  # Reset side_effect
     mock_local.get_remote_id.return_value = None
-    mock_dao.get_new_remote_children.return_value = []
+    mock_dao.get_new_remote_children_names.return_value = set()
 
     watcher._scan_recursive(parent_info5, recursive=False)  # Should mark as deleted
     assert watcher._metrics["delete_files"] == 1
@@ -1117,7 +1117,7 @@ def test_scan_recursive(tmp_path):
     mock_dao.get_local_children.return_value = []
     mock_local.get_children_info.return_value = []
     mock_local.get_remote_id.return_value = None
-    mock_dao.get_new_remote_children.return_value = []
+    mock_dao.get_new_remote_children_names.return_value = set()
 
     watcher._scan_recursive(parent_info6, recursive=True)
 
@@ -1137,13 +1137,10 @@ def test_scan_recursive(tmp_path):
     child_info7.path = Path("/parent7/remotechild.txt")
     child_info7.folderish = False
 
-    remote_pair = Mock()
-    remote_pair.remote_name = "remotechild.txt"
-
     mock_dao.get_local_children.return_value = []
     mock_local.get_children_info.return_value = [child_info7]
     mock_local.get_remote_id.side_effect = ["parent_remote", None]
-    mock_dao.get_new_remote_children.return_value = [remote_pair]
+    mock_dao.get_new_remote_children_names.return_value = {"remotechild.txt"}
 
     initial_new_files = watcher._metrics["new_files"]
     watcher._scan_recursive(parent_info7, recursive=False)
@@ -1168,7 +1165,7 @@ def test_scan_recursive(tmp_path):
     mock_dao.get_local_children.return_value = []
     mock_local.get_children_info.return_value = [child_info8]
     mock_local.get_remote_id.side_effect = [None, Exception("Test error")]
-    mock_dao.get_new_remote_children.return_value = []
+    mock_dao.get_new_remote_children_names.return_value = set()
 
     # Should not raise, just log and continue
     watcher._scan_recursive(parent_info8, recursive=False)
@@ -1199,7 +1196,7 @@ def get_children_side_effect(path):
     mock_dao.get_local_children.return_value = []
     mock_local.get_children_info.side_effect = get_children_side_effect
     mock_local.get_remote_id.side_effect = lambda path: None  # Always return None
-    mock_dao.get_new_remote_children.return_value = []
+    mock_dao.get_new_remote_children_names.return_value = set()
 
     # For folders, we just verify insert was called
     watcher._scan_recursive(parent_info9, recursive=False)
@@ -385,7 +385,7 @@ def test_scan_recursive_refreshes_racy_pair_and_recurses_into_folder(watcher):
     watcher.local.get_remote_id.side_effect = lambda path: (
         None if Path(path) == parent.path else "xattr-ref"
     )
-    watcher.dao.get_new_remote_children.return_value = []
+    watcher.dao.get_new_remote_children_names.return_value = set()
     watcher.dao.get_state_from_id.return_value = refreshed
 
     watcher._scan_recursive(parent)
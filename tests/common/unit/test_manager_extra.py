@@ -2,6 +2,7 @@
 from copy import deepcopy
 from datetime import datetime
 from pathlib import Path, PureWindowsPath
+from threading import Barrier
 from types import SimpleNamespace
 from unittest.mock import MagicMock, Mock, call, patch
 from urllib.parse import urlsplit
@@ -1100,6 +1101,22 @@ def test_stop_cleans_started_engines_downloads_and_os(manager_obj):
     assert seen == [True]
 
 
+def test_start_engines_concurrently(manager_obj):
+    started = Barrier(2, timeout=5)
+    manager_obj.engines = {uid: Mock() for uid in ("a", "b")}
+    for engine in manager_obj.engines.values():
+        engine.start.side_effect = started.wait
+    manager_obj.direct_download = None
+    Feature.direct_transfer = False
+
+    manager_obj.start_engines()
+
+    # Started one after the other, the first engine would break the barrier
+    assert not started.broken
+    for engine in manager_obj.engines.values():
+        engine.start.assert_called_once_with()
+
+
 def test_start_engines_isolates_failures_and_resumes_transfers(manager_obj):
     good = Mock()
     missing_xattr = Mock()
@@ -1849,7 +1866,10 @@ def test_engine_database_helpers_and_state(manager_obj, tmp_path):
     assert manager_obj.get_engine_db("nuxeo", "NXDRIVE") == tmp_path / "ndrive_nuxeo.db"
 
     main = manager_obj.get_engine_db("nuxeo", "NXDRIVE")
-    files = [main, main.with_suffix(".db-shm"), main.with_suffix(".db-wal")]
+    files = [
+        main.with_suffix(suffix)
+        for suffix in (".db", ".db-shm", ".db-wal", ".db-clean", ".db-repair")
+    ]
     for file in files:
         file.write_text("db", encoding="utf-8")
     manager_obj.remove_engine_dbs("nuxeo", "NXDRIVE")
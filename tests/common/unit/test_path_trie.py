@@ -0,0 +1,61 @@
+"""Unit tests for the trie of sync filters."""
+
+import pytest
+
+from nxdrive.drive.dao.engine import EngineDAO
+from nxdrive.drive.path_trie import PathTrie
+
+
+@pytest.mark.parametrize(
+    "path, covered",
+    [
+        ("/a/b", True),
+        ("/a/b/", True),
+        ("/a/b/c/file.txt", True),
+        ("/a", False),
+        ("/a/bc", False),
+        ("/a/c/b", False),
+        ("/x#factory#uid/y", True),
+        ("/x#factory#uid", False),
+        ("", False),
+    ],
+)
+def test_covers(path, covered):
+    trie = PathTrie(["/a/b/", "/x#factory#uid/y/"])
+    assert trie.covers(path) is covered
+
+
+def test_casefold():
+    trie = PathTrie(["/Company Home/IMAP Home"], casefold=True)
+    assert trie.covers("/company home/imap home/mails")
+    assert not PathTrie(["/Company Home/IMAP Home"]).covers("/company home/imap home")
+
+
+def test_add():
+    trie = PathTrie()
+    assert not len(trie)
+    assert not trie.covers("/a")
+
+    trie.add("/a/b")
+    trie.add("/a/b/")
+    trie.add("/a/b/c")
+    assert len(trie) == 2
+    assert trie.covers("/a/b/d")
+
+    # The root covers everything
+    trie.add("/")
+    assert trie.covers("/anything")
+
+
+def test_dao_filters_with_thousands_of_folders(tmp_path):
+    dao = EngineDAO(tmp_path / "engine.db")
+    try:
+        for idx in range(2_000):
+            dao.add_filter(f"/root#/folder{idx:05}")
+        assert dao.is_filter("/root#/folder01999/sub/file")
+        assert not dao.is_filter("/root#/folder02000/sub/file")
+
+        dao.remove_filter("/root#/folder01999")
+        assert not dao.is_filter("/root#/folder01999/sub/file")
+    finally:
+        dao.dispose()
@@ -58,6 +58,23 @@ def test_backup_worker_poll_success():
     w.manager.dao.save_backup.assert_called_once()
     engine1.dao.save_backup.assert_called_once()
     engine2.dao.save_backup.assert_called_once()
+    w.manager.dao.incremental_vacuum.assert_called_once_with()
+    for engine in (engine1, engine2):
+        engine.dao.clean_history.assert_called_once_with()
+        engine.dao.check_counters.assert_called_once_with()
+        engine.dao.incremental_vacuum.assert_called_once_with()
+
+
+def test_backup_worker_poll_skips_corrupted_engine_database():
+    w = _make_backup_worker()
+    w.manager.dao = MagicMock()
+    engine = MagicMock()
+    engine.dao.check_integrity.return_value = False
+    w.manager.engines.copy.return_value.values.return_value = [engine]
+
+    assert w._poll() is True
+    engine.dao.check_counters.assert_not_called()
+    engine.dao.save_backup.assert_not_called()
 
 
 def test_backup_worker_poll_no_manager():
@@ -0,0 +1,116 @@
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from threading import Thread
+from unittest.mock import Mock
+
+import pytest
+import requests
+from requests.adapters import DEFAULT_POOLSIZE
+
+from nxdrive.drive.client import pool
+from nxdrive.drive.client.pool import (
+    POOL_HEADROOM,
+    PooledHTTPAdapter,
+    PooledHTTPSAdapter,
+    connection_metrics,
+    mount_pooled_adapters,
+    pool_size,
+    shared_session,
+)
+from nxdrive.drive.options import Options
+
+
+class KeepAliveHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def do_GET(self):
+        body = b"ok"
+        self.send_response(200)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def server():
+    httpd = ThreadingHTTPServer(("127.0.0.1", 0), KeepAliveHandler)
+    thread = Thread(target=httpd.serve_forever, daemon=True)
+    thread.start()
+    try:
+        yield f"http://127.0.0.1:{httpd.server_address[1]}/"
+    finally:
+        httpd.shutdown()
+        httpd.server_close()
+
+
+def test_pool_size_from_processors_and_workers():
+    Options.direct_download_max_workers = 8
+    assert pool_size(max_processors=10) == 10 + 8 + POOL_HEADROOM
+    assert pool_size(max_processors=20) == 20 + 8 + POOL_HEADROOM
+
+    Options.direct_download_max_workers = 1
+    # Never below the requests default
+    assert pool_size() == max(DEFAULT_POOLSIZE, 1 + POOL_HEADROOM)
+    Options.direct_download_max_workers = 8
+
+
+def test_mount_pooled_adapters():
+    session = mount_pooled_adapters(requests.Session(), max_processors=4)
+
+    https = session.get_adapter("https://example.org")
+    http = session.get_adapter("http://example.org")
+    assert isinstance(https, PooledHTTPSAdapter)
+    assert isinstance(http, PooledHTTPAdapter)
+    assert https._pool_block is http._pool_block is True
+    assert https._pool_maxsize == http._pool_maxsize == pool_size(max_processors=4)
+
+
+def test_shared_session_is_a_singleton(monkeypatch):
+    monkeypatch.setattr(pool, "_SHARED_SESSION", None)
+    session = shared_session()
+    assert shared_session() is session
+    assert isinstance(session.get_adapter("https://example.org"), PooledHTTPSAdapter)
+
+
+def test_connection_metrics_without_session():
+    expected = {
+        "http_pool_size": 0,
+        "http_connections": 0,
+        "http_requests": 0,
+        "http_reused": 0,
+    }
+    assert connection_metrics(None) == expected
+    assert connection_metrics(Mock()) == expected
+
+
+def test_connection_reuse(server):
+    session = mount_pooled_adapters(requests.Session())
+    for _ in range(5):
+        with session.get(server) as resp:
+            assert resp.content == b"ok"
+
+    metrics = connection_metrics(session)
+    assert metrics["http_requests"] == 5
+    assert metrics["http_connections"] == 1
+    assert metrics["http_reused"] == 4
+
+
+def test_concurrent_requests_never_exceed_the_pool(server):
+    session = requests.Session()
+    session.mount("https://", PooledHTTPSAdapter(pool_maxsize=2))
+    session.mount("http://", PooledHTTPAdapter(pool_maxsize=2))
+
+    def get(_):
+        with session.get(server) as resp:
+            return resp.status_code
+
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        assert set(executor.map(get, range(40))) == {200}
+
+    metrics = connection_metrics(session)
+    assert metrics["http_pool_size"] == 2
+    assert metrics["http_requests"] == 40
+    assert metrics["http_connections"] <= 2
@@ -144,7 +144,6 @@ def test_push_parent_remotely_file(self, qm):
 
     def test_push_none_pair_state(self, qm):
         item = QueueItem(7, False, None)
-        item.pair_state = None
         qm.push(item)
         # Should be skipped, no queues populated
         assert qm._local_file_queue.empty()
@@ -396,8 +395,8 @@ class TestPushError:
     def test_push_error_normal(self, qm):
         doc = _make_doc_pair(row_id=100, error_count=1)
         qm.push_error(doc)
-        assert 100 in qm._on_error_queue
-        assert qm._on_error_queue[100] is doc
+        assert 100 in qm._retries
+        assert qm._retries.get(100) is doc
         qm.newError.emit.assert_called_once_with(100)
 
     def test_push_error_sets_error_next_try(self, qm):
@@ -405,21 +404,21 @@ def test_push_error_sets_error_next_try(self, qm):
         before = int(time.time())
         qm.push_error(doc)
         after = int(time.time())
-        # interval = 60 * error_count = 120
-        assert doc.error_next_try >= before + 120
-        assert doc.error_next_try <= after + 120
+        # interval = 60 * 2 ** (error_count - 1) = 120, +/- 10%
+        assert doc.error_next_try >= before + 108
+        assert doc.error_next_try <= after + 132
 
     def test_push_error_exceeded_threshold_gives_up(self, qm):
         doc = _make_doc_pair(row_id=102, error_count=qm._error_threshold + 1)
         qm.push_error(doc)
         qm.newErrorGiveUp.emit.assert_called_once_with(102)
-        assert 102 not in qm._on_error_queue
+        assert 102 not in qm._retries
 
     def test_push_error_at_threshold_not_gives_up(self, qm):
         doc = _make_doc_pair(row_id=103, error_count=qm._error_threshold)
         qm.push_error(doc)
         qm.newErrorGiveUp.emit.assert_not_called()
-        assert 103 in qm._on_error_queue
+        assert 103 in qm._retries
 
     @patch("nxdrive.drive.engine.queue_manager.WINDOWS", True)
     def test_push_error_windows_permission_error(self, qm):
@@ -430,7 +429,7 @@ def test_push_error_windows_permission_error(self, qm):
         qm.push_error(doc, exception=exc)
         # error_count is overridden to 1 for Windows PermissionError
         # so interval = 60 * 1 = 60
-        assert 104 in qm._on_error_queue
+        assert 104 in qm._retries
 
     def test_push_error_interval_override(self, qm):
         doc = _make_doc_pair(row_id=105, error_count=1)
@@ -442,7 +441,7 @@ def test_push_error_interval_override(self, qm):
     def test_push_error_duplicate_no_double_emit(self, qm):
         """Second push_error for the same doc_pair.id should not emit newError."""
         doc = _make_doc_pair(row_id=106, error_count=1)
-        qm._on_error_queue[106] = doc
+        qm._retries.schedule(106, doc, 0)
         qm.push_error(doc)
         qm.newError.emit.assert_not_called()
 
@@ -456,6 +455,15 @@ def test_push_error_remote_ongoing_request(self, qm):
         # emit_sig is set to False, so newError should not be called
         qm.newError.emit.assert_not_called()
 
+    def test_push_error_only_failures_are_counted(self, qm):
+        """Postponed pairs are not errors for the autoscaler."""
+        qm.autoscaler.record_error = Mock()
+        qm.push_error(_make_doc_pair(row_id=108), interval=60)
+        qm.autoscaler.record_error.assert_not_called()
+
+        qm.push_error(_make_doc_pair(row_id=109), failed=True)
+        qm.autoscaler.record_error.assert_called_once_with()
+
 
 # ─── _is_on_error Tests ──────────────────────────────────────────────────────
 
@@ -466,10 +474,97 @@ def test_not_on_error(self, qm):
 
     def test_on_error(self, qm):
         doc = _make_doc_pair(row_id=200)
-        qm._on_error_queue[200] = doc
+        qm._retries.schedule(200, doc, 0)
         assert qm._is_on_error(200) is True
 
 
+# ─── File processors pool ────────────────────────────────────────────────────
+
+
+class TestProcessorsPool:
+    def test_launch_up_to_the_target(self, qm):
+        qm._create_thread = Mock()
+        qm._local_file_queue.put(QueueItem(1, False, "locally_created"))
+        qm.autoscaler.target = 2
+
+        qm.launch_processors()
+        assert len(qm._processors_pool) == 2
+        qm._create_thread.assert_called_with(qm._get_pooled_file, "GenericProcessor")
+
+    def test_processors_above_the_target_stop(self, qm):
+        qm._local_file_queue.put(QueueItem(1, False, "locally_created"))
+        pool = qm._processors_pool = [Mock(), Mock(), Mock()]
+        qm.autoscaler.evaluate = Mock(return_value=(1, False))
+
+        with patch("nxdrive.drive.engine.queue_manager.QThread") as qthread:
+            qthread.currentThread.side_effect = pool
+            assert qm._get_pooled_file() is None
+            assert qm._get_pooled_file() is None
+            assert qm._retiring == {pool[0], pool[1]}
+            assert qm._get_pooled_file().id == 1
+
+    def test_only_retiring_processors_are_forgotten(self, qm):
+        retiring, other = Mock(), Mock()
+        retiring.isFinished.return_value = True
+        other.isFinished.return_value = False
+        qm._processors_pool = [retiring, other]
+        qm._retiring = {retiring}
+        qm._thread_finished()
+        assert qm._processors_pool == [other]
+        assert not qm._retiring
+
+        # A crashed processor, never told to stop, does not count as retiring
+        crashed, still = Mock(), Mock()
+        crashed.isFinished.return_value = True
+        still.isFinished.return_value = False
+        qm._processors_pool = [crashed, still, other]
+        qm._retiring = {still}
+        qm._thread_finished()
+        assert qm._processors_pool == [still, other]
+        assert qm._retiring == {still}
+
+    def test_growing_launches_processors(self, qm):
+        qm.autoscaler.evaluate = Mock(return_value=(3, True))
+        assert qm._get_pooled_file() is None
+        qm.queueProcessing.emit.assert_called_once()
+
+    def test_synced_pairs_and_errors_are_recorded(self, qm):
+        qm._on_pair_synced({})
+        qm.push_error(_make_doc_pair(row_id=4), failed=True)
+        assert qm.autoscaler._done == 1
+        assert qm.autoscaler._errors == 1
+        assert qm.get_metrics()["processors_target"] == 3
+
+
+# ─── _on_error_timer / cancel_error ──────────────────────────────────────────
+
+
+class TestErrorTimer:
+    def test_pushes_due_pairs_and_waits_for_the_next_one(self, qm):
+        qm.push = Mock()
+        qm._retries.schedule(1, _make_doc_pair(row_id=1), 0)
+        qm._retries.schedule(2, _make_doc_pair(row_id=2), time.monotonic() + 30)
+
+        qm._on_error_timer()
+        qm.push.assert_called_once_with(QueueItem(1, False, "locally_created"))
+        assert qm.get_errors_count() == 1
+        delay = qm._error_timer.start.call_args[0][0]
+        assert 29_000 < delay <= 30_001
+
+    def test_stops_when_nothing_is_left(self, qm):
+        qm.push = Mock()
+        qm._retries.schedule(1, _make_doc_pair(row_id=1), 0)
+
+        qm._on_error_timer()
+        qm._error_timer.stop.assert_called_once()
+
+    def test_cancel_error(self, qm):
+        qm.push_error(_make_doc_pair(row_id=3))
+        assert qm.cancel_error(3)
+        assert not qm._is_on_error(3)
+        assert not qm.cancel_error(3)
+
+
 # ─── get_errors_count / get_error_threshold ──────────────────────────────────
 
 
@@ -478,8 +573,8 @@ def test_get_errors_count_empty(self, qm):
         assert qm.get_errors_count() == 0
 
     def test_get_errors_count_with_errors(self, qm):
-        qm._on_error_queue[1] = _make_doc_pair(row_id=1)
-        qm._on_error_queue[2] = _make_doc_pair(row_id=2)
+        qm._retries.schedule(1, _make_doc_pair(row_id=1), 0)
+        qm._retries.schedule(2, _make_doc_pair(row_id=2), 0)
         assert qm.get_errors_count() == 2
 
     def test_get_error_threshold(self, qm):
@@ -524,7 +619,7 @@ def test_get_file_skips_on_error(self, qm):
         """Items on error should be skipped."""
         item = QueueItem(30, False, "locally_created")
         qm._local_file_queue.put(item)
-        qm._on_error_queue[30] = _make_doc_pair(row_id=30)
+        qm._retries.schedule(30, _make_doc_pair(row_id=30), 0)
         # Only one item, and it's on error, should recurse and return None
         result = qm._get_file()
         assert result is None
@@ -540,3 +635,80 @@ def test_get_file_only_local(self, qm):
         result = qm._get_file()
         assert result is not None
         assert result.id == 50
+
+
+# ─── Folder processors ───────────────────────────────────────────────────────
+
+
+class TestFolderProcessors:
+    def test_helpers_are_launched_for_queued_folders(self, qm):
+        qm._create_thread = Mock(side_effect=lambda *_: Mock())
+        for row_id in range(1, 11):
+            qm._remote_folder_queue.put(QueueItem(row_id, True, "remotely_created"))
+
+        qm.launch_processors()
+        assert qm._remote_folder_thread is not None
+        assert len(qm._folder_pool) == 3
+        assert qm.get_metrics()["folder_processors"] == 3
+
+        # Not more than the maximum
+        qm.launch_processors()
+        assert len(qm._folder_pool) == 3
+
+    def test_no_helper_while_an_exclusive_operation_waits(self, qm):
+        qm._create_thread = Mock()
+        qm._local_folder_queue.put(QueueItem(1, True, "locally_moved"))
+        qm._local_folder_queue.put(QueueItem(2, True, "locally_created"))
+        qm._local_folder_queue.put(QueueItem(3, True, "locally_created"))
+        assert qm._local_folders.get(1) is None
+
+        qm.launch_processors()
+        assert qm._local_folder_thread is not None
+        assert not qm._folder_pool
+        assert qm.get_overall_size() == 3
+
+    def test_finished_helper_releases_its_folder(self, qm):
+        qm._local_folders._wake = Mock()
+        qm.dao.get_state_from_id.side_effect = lambda row_id: Mock(
+            pair_state="locally_created",
+            local_path=f"/{row_id}" if row_id == 1 else "/1/2",
+            local_parent_path="/" if row_id == 1 else "/1",
+        )
+        qm._local_folder_queue.put(QueueItem(1, True, "locally_created"))
+        qm._local_folder_queue.put(QueueItem(2, True, "locally_created"))
+        assert qm._local_folders.get(1).id == 1
+        assert qm._local_folders.get(2) is None
+
+        thread = Mock()
+        thread.isFinished.return_value = True
+        qm._folder_pool[thread] = (qm._local_folders, 1)
+        qm._thread_finished()
+
+        assert not qm._folder_pool
+        assert qm._local_folders.ready == 1
+        qm._local_folders._wake.assert_called_once_with()
+        assert qm._local_folders.get(2).id == 2
+
+
+# ─── Startup queue rebuild ───────────────────────────────────────────────────
+
+
+class TestRebuild:
+    def test_next_page_is_queued_when_the_queues_run_low(self, qm):
+        qm.dao.queue_pairs_to_sync.return_value = False
+        qm.set_rebuilding(True)
+
+        assert qm._get_remote_file() is None
+        qm.dao.queue_pairs_to_sync.assert_called_once_with()
+        assert not qm.get_metrics()["queue_rebuilding"]
+
+        # Everything is queued
+        qm._get_remote_file()
+        qm.dao.queue_pairs_to_sync.assert_called_once_with()
+
+    def test_no_page_while_the_queues_are_full(self, qm):
+        qm.set_rebuilding(True)
+        with patch.object(qm, "get_overall_size", return_value=10_000):
+            qm.launch_processors()
+        qm.dao.queue_pairs_to_sync.assert_not_called()
+        assert qm._rebuilding
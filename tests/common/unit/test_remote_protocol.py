@@ -5,10 +5,10 @@
 """
 
 from pathlib import Path
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, List, Optional, Set
 
 from nxdrive.drive.client.remote_protocol import RemoteClientProtocol
-from nxdrive.drive.objects import RemoteFileInfo
+from nxdrive.drive.objects import DocPair, RemoteFileInfo
 
 
 class TestRemoteClientProtocolRuntimeCheckable:
@@ -35,6 +35,8 @@ def get_fs_info(
                 self, fs_item_id: str, /, *, parent_fs_item_id: str = None
             ) -> RemoteFileInfo: ...
 
+            def get_unchanged_refs(self, pairs: List[DocPair], /) -> Set[str]: ...
+
             def get_info(
                 self,
                 ref: str,
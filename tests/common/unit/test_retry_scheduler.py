@@ -0,0 +1,62 @@
+"""Unit tests for the heap of items to retry."""
+
+from time import monotonic
+
+import pytest
+
+from nxdrive.drive.engine.retry_scheduler import RetryScheduler, backoff
+
+
+def test_pop_due_earliest_first():
+    retries = RetryScheduler()
+    retries.schedule(1, "a", 30)
+    retries.schedule(2, "b", 10)
+    retries.schedule(3, "c", 20)
+
+    assert retries.pop_due(now=5) == []
+    assert retries.pop_due(now=25) == ["b", "c"]
+    assert len(retries) == 1
+    assert 1 in retries and 2 not in retries
+    assert retries.pop_next(now=30) == "a"
+    assert retries.pop_next(now=30) is None
+
+
+def test_reschedule_and_cancel():
+    retries = RetryScheduler()
+    retries.schedule(1, "a", 10)
+    retries.schedule(1, "a2", 50)
+    retries.schedule(2, "b", 20)
+
+    # The first schedule of 1 is stale
+    assert retries.next_delay(now=0) == 20
+    assert retries.pop_due(now=30) == ["b"]
+    assert retries.get(1) == "a2"
+
+    assert retries.cancel(1) == "a2"
+    assert retries.cancel(1) is None
+    assert retries.next_delay(now=0) is None
+    assert not retries
+
+
+def test_next_delay_is_never_negative():
+    retries = RetryScheduler()
+    retries.schedule("path", "item", monotonic() - 10)
+    assert retries.next_delay() == 0.0
+
+
+def test_stale_entries_are_compacted():
+    retries = RetryScheduler()
+    for idx in range(10_000):
+        retries.schedule(idx, idx, idx)
+        retries.cancel(idx)
+    assert len(retries._heap) <= 64
+    assert retries.next_delay() is None
+
+
+@pytest.mark.parametrize(
+    "attempt, expected", [(0, 60), (1, 60), (2, 120), (3, 240), (10, 3600), (99, 3600)]
+)
+def test_backoff(attempt, expected):
+    assert backoff(attempt, 60, jitter=0) == expected
+    for _ in range(100):
+        assert expected * 0.9 <= backoff(attempt, 60) <= expected * 1.1
@@ -224,6 +224,9 @@ def __init__(self):
     def _is_on_error(self, row_id):
         return row_id in self._on_error_ids
 
+    def _refill(self):
+        pass
+
 
 _GETTERS = [
     ("_get_local_folder", "_local_folder_queue"),
@@ -0,0 +1,141 @@
+"""Unit tests for the process-wide transfer slots."""
+
+from threading import Event, Thread
+from time import sleep
+
+import pytest
+
+from nxdrive.drive.engine.transfer_scheduler import (
+    DIRECT_DOWNLOAD,
+    DIRECT_TRANSFER,
+    SYNC,
+    TransferScheduler,
+)
+from nxdrive.drive.exceptions import ThreadInterrupt
+from nxdrive.drive.options import Options
+
+
+@pytest.fixture
+def scheduler():
+    Options.max_transfers = 2
+    yield TransferScheduler()
+    Options.max_transfers = 20
+
+
+def _waiters(scheduler, *flows):
+    """Start a thread waiting for a slot for each flow, in order."""
+    served = []
+    threads = []
+    for engine_uid, job in flows:
+
+        def run(engine_uid=engine_uid, job=job):
+            scheduler.acquire(engine_uid, job)
+            served.append((engine_uid, job))
+
+        thread = Thread(target=run, daemon=True)
+        thread.start()
+        threads.append(thread)
+        # Wait for it to be queued, to keep the order of arrival
+        while len(scheduler._waiting) < len(threads):
+            sleep(0.01)
+    return served, threads
+
+
+def _serve(scheduler, served, count, engine_uid, job):
+    """Release *count* slots one by one, waiting for each to be taken again."""
+    for _ in range(count):
+        expected = len(served) + 1
+        scheduler.release(engine_uid, job)
+        while len(served) < expected:
+            sleep(0.01)
+        engine_uid, job = served[-1]
+
+
+def test_slots_are_limited(scheduler):
+    with scheduler.slot("a", SYNC), scheduler.slot("a", SYNC):
+        served, threads = _waiters(scheduler, ("a", SYNC))
+        assert scheduler.get_metrics() == {
+            "transfers_limit": 2,
+            "transfers_running": 2,
+            "transfers_waiting": 1,
+        }
+        assert not served
+
+    threads[0].join(5)
+    assert served == [("a", SYNC)]
+    assert scheduler.get_metrics(engine_uid="a")["transfers_engine"] == 1
+    scheduler.release("a", SYNC)
+    assert not scheduler._engines
+
+
+def test_waiting_is_interruptible(scheduler):
+    stopped = Event()
+    errors = []
+
+    def interrupt():
+        if stopped.is_set():
+            raise ThreadInterrupt()
+
+    def run():
+        try:
+            scheduler.acquire("a", SYNC, interrupt=interrupt)
+        except ThreadInterrupt as exc:
+            errors.append(exc)
+
+    with scheduler.slot("a", SYNC), scheduler.slot("a", SYNC):
+        thread = Thread(target=run, daemon=True)
+        thread.start()
+        while not scheduler._waiting:
+            sleep(0.01)
+
+        stopped.set()
+        thread.join(5)
+        assert not thread.is_alive()
+        assert len(errors) == 1
+        assert not scheduler._waiting
+
+    assert not scheduler._engines
+
+
+def test_engines_share_the_slots(scheduler):
+    scheduler.acquire("busy", SYNC)
+    scheduler.acquire("busy", SYNC)
+
+    # The other engine arrives after many jobs of the busy one
+    flows = [("busy", SYNC)] * 4 + [("other", SYNC)]
+    served, _ = _waiters(scheduler, *flows)
+    _serve(scheduler, served, 1, "busy", SYNC)
+    assert served == [("other", SYNC)]
+    _serve(scheduler, served, 4, "other", SYNC)
+    assert not scheduler._waiting
+
+
+def test_weighted_fair_queuing_across_job_classes(scheduler):
+    Options.max_transfers = 1
+    scheduler.acquire("b", SYNC)
+
+    flows = [("a", DIRECT_DOWNLOAD)] * 3 + [("a", SYNC)] * 3
+    served, _ = _waiters(scheduler, *flows)
+    _serve(scheduler, served, 6, "b", SYNC)
+
+    # Sync jobs have twice the weight of Direct Download ones
+    assert served == [
+        ("a", SYNC),
+        ("a", DIRECT_DOWNLOAD),
+        ("a", SYNC),
+        ("a", SYNC),
+        ("a", DIRECT_DOWNLOAD),
+        ("a", DIRECT_DOWNLOAD),
+    ]
+
+
+def test_release_without_acquire(scheduler):
+    scheduler.release("a", DIRECT_TRANSFER)
+    assert scheduler.get_metrics()["transfers_running"] == 0
+
+
+def test_forget(scheduler):
+    with scheduler.slot("a", SYNC):
+        pass
+    scheduler.forget("a")
+    assert not scheduler._finish
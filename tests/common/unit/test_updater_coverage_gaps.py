@@ -66,7 +66,9 @@ def test_base_install_is_abstract():
 def test_download_reraises_connection_errors(monkeypatch):
     instance = _base_updater()
     error = RequestsConnectionError("offline")
-    monkeypatch.setattr(updater_base.requests, "get", Mock(side_effect=error))
+    monkeypatch.setattr(
+        updater_base, "shared_session", lambda: Mock(get=Mock(side_effect=error))
+    )
 
     with pytest.raises(RequestsConnectionError) as exc_info:
         updater_base.BaseUpdater._download(instance, "2.0")
@@ -77,7 +79,9 @@ def test_download_reraises_connection_errors(monkeypatch):
 def test_download_wraps_non_connection_errors(monkeypatch):
     instance = _base_updater()
     monkeypatch.setattr(
-        updater_base.requests, "get", Mock(side_effect=ValueError("bad response"))
+        updater_base,
+        "shared_session",
+        lambda: Mock(get=Mock(side_effect=ValueError("bad response"))),
     )
 
     with pytest.raises(UpdateError, match="Impossible to get"):
@@ -94,7 +98,9 @@ def _response(text: str) -> MagicMock:
 def test_fetch_versions_wraps_request_errors(monkeypatch):
     instance = _base_updater()
     monkeypatch.setattr(
-        updater_base.requests, "get", Mock(side_effect=RuntimeError("offline"))
+        updater_base,
+        "shared_session",
+        lambda: Mock(get=Mock(side_effect=RuntimeError("offline"))),
     )
 
     with pytest.raises(UpdateError, match="Impossible to get"):
@@ -103,7 +109,11 @@ def test_fetch_versions_wraps_request_errors(monkeypatch):
 
 def test_fetch_versions_wraps_yaml_errors(monkeypatch):
     instance = _base_updater()
-    monkeypatch.setattr(updater_base.requests, "get", Mock(return_value=_response("!")))
+    monkeypatch.setattr(
+        updater_base,
+        "shared_session",
+        lambda: Mock(get=Mock(return_value=_response("!"))),
+    )
     monkeypatch.setattr(
         updater_base.yaml,
         "safe_load",
@@ -117,7 +127,9 @@ def test_fetch_versions_wraps_yaml_errors(monkeypatch):
 def test_fetch_versions_normalizes_non_mapping_documents(monkeypatch):
     instance = _base_updater()
     monkeypatch.setattr(
-        updater_base.requests, "get", Mock(return_value=_response("- one\n- two"))
+        updater_base,
+        "shared_session",
+        lambda: Mock(get=Mock(return_value=_response("- one\n- two"))),
     )
 
     updater_base.BaseUpdater._fetch_versions(instance)
@@ -1,6 +1,7 @@
 import configparser
 import logging
 import os
+import shutil
 from collections import namedtuple
 from datetime import datetime
 from math import pow
@@ -15,7 +16,7 @@
 from nxdrive.drive.dao.utils import dump
 from nxdrive.drive.options import Options
 
-from ...markers import mac_only, not_windows, windows_only
+from ...markers import linux_only, mac_only, not_windows, windows_only
 
 BAD_HOSTNAMES = [
     "expired.badssl.com",
@@ -772,6 +773,30 @@ def test_get_tree_list_ignored_patterns(fs):
     assert tree == expected
 
 
+def test_get_direct_transfer_tree(fs):
+    # "fs" is the reference to the fake file system
+    fs.create_file("/fake/empty.txt")
+    fs.create_file("/fake/small.txt", contents="12")
+    fs.create_file("/fake/sub/large.txt", contents="12345")
+
+    skipped = []
+    tree = list(
+        nxdrive.drive.utils.get_direct_transfer_tree(
+            Path("/fake"), file_limit=3, skipped=skipped
+        )
+    )
+    assert tree == [
+        (Path("/fake"), 0),
+        (Path("/fake/small.txt"), 2),
+        (Path("/fake/sub"), 0),
+    ]
+    assert skipped == [(Path("/fake/sub/large.txt"), 5)]
+
+    # No limit
+    tree = list(nxdrive.drive.utils.get_direct_transfer_tree(Path("/fake/sub")))
+    assert tree == [(Path("/fake/sub"), 0), (Path("/fake/sub/large.txt"), 5)]
+
+
 @patch("pathlib.Path.is_dir")
 def test_get_tree_list_dir_raise_os_error(mock_path):
     mock_path.side_effect = OSError("Mock'ed OSError")
@@ -805,6 +830,33 @@ def is_dir():
     assert tree == expected
 
 
+@pytest.mark.parametrize("workers", [1, 4])
+def test_get_tree_list_parents_first(workers, tmp_path):
+    for folder in ("a/b/c", "a/d", "e/f/g/h"):
+        (tmp_path / folder).mkdir(parents=True)
+        (tmp_path / folder / "file.txt").write_bytes(b"data")
+
+    tree = list(nxdrive.drive.utils.get_tree_list(tmp_path, workers=workers))
+    paths = [path for path, _ in tree]
+
+    assert len(paths) == len(set(paths)) == 12
+    assert paths[0] == tmp_path
+    for path, size in tree:
+        if path != tmp_path:
+            assert paths.index(path.parent) < paths.index(path)
+        assert size == (0 if path.is_dir() else 4)
+
+
+def test_get_tree_list_stop_early(tmp_path):
+    for idx in range(50):
+        (tmp_path / f"folder{idx}").mkdir()
+
+    tree = nxdrive.drive.utils.get_tree_list(tmp_path)
+    assert next(tree) == (tmp_path, 0)
+    # Pending listings are cancelled
+    tree.close()
+
+
 @Options.mock()
 def test_if_frozen_decorator():
     @nxdrive.drive.utils.if_frozen
@@ -1166,6 +1218,83 @@ def test_safe_rename(tmp):
     assert dst.read_bytes() == b"qwerty"
 
 
+def test_clone_file(tmp_path):
+    src = tmp_path / "src.bin"
+    dst = tmp_path / "dst.bin"
+    data = os.urandom(1024 * 1024 + 1)
+    src.write_bytes(data)
+    os.chmod(src, 0o400)
+    dst.write_bytes(b"previous and longer content" * 100_000)
+
+    method = nxdrive.drive.utils.clone_file(src, dst)
+
+    assert method in {"reflink", "copy_file_range", "sendfile", "copy"}
+    assert dst.read_bytes() == data
+    # Metadata are not copied
+    assert os.stat(dst).st_mode != os.stat(src).st_mode
+
+    with pytest.raises(FileNotFoundError):
+        nxdrive.drive.utils.clone_file(tmp_path / "missing", dst)
+    with pytest.raises(shutil.SameFileError):
+        nxdrive.drive.utils.clone_file(src, src)
+    assert src.read_bytes() == data
+
+
+@linux_only
+def test_clone_file_fallbacks(tmp_path, monkeypatch):
+    import errno
+    import fcntl
+
+    src = tmp_path / "src.bin"
+    dst = tmp_path / "dst.bin"
+    data = os.urandom(1024 * 1024)
+    src.write_bytes(data)
+
+    def unsupported(*_):
+        raise OSError(errno.EOPNOTSUPP, "Operation not supported")
+
+    def partial_then_unsupported(fd_in, fd_out, count, *_):
+        # Some bytes are copied before the failure: they must not remain
+        os.write(fd_out, b"garbage")
+        raise OSError(errno.EXDEV, "Invalid cross-device link")
+
+    monkeypatch.setattr(fcntl, "ioctl", unsupported)
+    assert nxdrive.drive.utils.clone_file(src, dst) in {
+        "copy_file_range",
+        "sendfile",
+    }
+    assert dst.read_bytes() == data
+
+    monkeypatch.setattr(os, "copy_file_range", partial_then_unsupported)
+    assert nxdrive.drive.utils.clone_file(src, dst) == "sendfile"
+    assert dst.read_bytes() == data
+
+    monkeypatch.setattr(os, "sendfile", partial_then_unsupported)
+    assert nxdrive.drive.utils.clone_file(src, dst) == "copy"
+    assert dst.read_bytes() == data
+
+    # Nothing more copied before the end of the file: the copy is not truncated
+    def short_copy(fd_in, fd_out, count, *_):
+        if os.fstat(fd_out).st_size:
+            return 0
+        os.write(fd_out, data[:10])
+        return 10
+
+    monkeypatch.setattr(os, "copy_file_range", short_copy)
+    monkeypatch.setattr(os, "sendfile", lambda *_: 0)
+    assert nxdrive.drive.utils.clone_file(src, dst) == "copy"
+    assert dst.read_bytes() == data
+
+    # Other errors are not hidden
+    def no_space(*_):
+        raise OSError(errno.ENOSPC, "No space left on device")
+
+    monkeypatch.setattr(fcntl, "ioctl", no_space)
+    with pytest.raises(OSError) as exc:
+        nxdrive.drive.utils.clone_file(src, dst)
+    assert exc.value.errno == errno.ENOSPC
+
+
 @pytest.mark.parametrize(
     "size, result",
     [
@@ -282,7 +282,9 @@ def test_engine_worker_increase_error():
     exc = OSError("disk")
     ew.increase_error(doc_pair, "IO", exception=exc)
     ew.dao.increase_error.assert_called_once()
-    ew.engine.queue_manager.push_error.assert_called_once()
+    ew.engine.queue_manager.push_error.assert_called_once_with(
+        doc_pair, exception=exc, failed=True
+    )
 
 
 def test_engine_worker_increase_error_no_exception():
@@ -39,6 +39,9 @@ def buggy_db(database, *args, **kwargs):
 
     monkeypatch.setattr("nxdrive.drive.dao.base.fix_db", buggy_db)
 
+    # The database was closed properly, ask for a repair to call fix_db()
+    (home / "manager.db-repair").touch()
+
     # Before NXDRIVE-1574, there was an error when restoring the DB:
     #    AttributeError: 'ManagerDAO' object has no attribute '_lock'
     # This should not be the case anymore.
@@ -53,6 +56,7 @@ def restore_db(self):
 
     restored = False
     monkeypatch.setattr(BaseDAO, "restore_backup", restore_db)
+    (home / "manager.db-repair").touch()
 
     with manager_factory(home=home, with_engine=False) as manager:
         assert (home / "manager.db").exists()
@@ -4,7 +4,7 @@
 
 from pathlib import Path
 from typing import Any, Dict
-from unittest.mock import patch
+from unittest.mock import Mock, patch
 
 import pytest
 
@@ -41,10 +41,14 @@ def __init__(self) -> None:
         self.headers = {"Content-Length": 20000000}
         self.status = ""
         self.content = bytes()
+        self.engine = "engine"
 
     def mock_auth(self):
         return self
 
+    def iter_content(self, chunk_size):
+        return iter([self.content])
+
     def mock_verify(self):
         return self.verify
 
@@ -542,6 +546,67 @@ def test_get_fs_info(mock_get_item, mock_remote_dict, mock_is_root, mock_expand_
     assert isinstance(output, RemoteFileInfo)
 
 
+@patch("nxdrive.nuxeo.client.remote_client.Remote._get_trash_condition")
+@patch("nxdrive.nuxeo.client.remote_client.Remote.query")
+def test_get_unchanged_refs(mock_query, mock_trash):
+    remote_obj = Remote(
+        "dummy_url",
+        "dummy_user_id",
+        "dummy_device_id",
+        "dummy_version",
+        token="dummy_token",
+        repository="dummy_repository",
+    )
+    mock_trash.return_value = "AND ecm:isTrashed = 0"
+
+    def pair(
+        uid, name, digest, folderish=False, factory="defaultFileSystemItemFactory"
+    ):
+        return Mock(
+            remote_ref=f"{factory}#default#{uid}",
+            remote_parent_ref="defaultFileSystemItemFactory#default#parent",
+            remote_name=name,
+            remote_digest=digest,
+            folderish=folderish,
+        )
+
+    def doc(uid, props, parent="parent"):
+        return {"uid": uid, "parentRef": parent, "properties": props}
+
+    pairs = [
+        pair("file", "a.txt", "d1"),
+        pair("modified", "b.txt", "d1"),
+        pair("moved", "c.txt", "d1"),
+        pair("folder", "Folder", None, folderish=True),
+        pair("root", "Root", None, True, "defaultSyncRootFolderItemFactory"),
+        pair("deleted", "d.txt", "d1"),
+    ]
+    mock_query.return_value = {
+        "entries": [
+            doc("file", {"file:content": {"name": "a.txt", "digest": "d1"}}),
+            doc("modified", {"file:content": {"name": "b.txt", "digest": "d2"}}),
+            doc("moved", {"file:content": {"name": "c.txt", "digest": "d1"}}, "p2"),
+            doc("folder", {"dc:title": "Folder"}),
+            doc("root", {"dc:title": "Root"}),
+        ]
+    }
+
+    output = remote_obj.get_unchanged_refs(pairs)
+    assert output == {
+        "defaultFileSystemItemFactory#default#file",
+        "defaultFileSystemItemFactory#default#folder",
+    }
+
+    # All documents are checked with only one query
+    mock_query.assert_called_once()
+    query = mock_query.call_args[0][0]
+    assert (
+        "ecm:uuid IN ('file', 'modified', 'moved', 'folder', 'root', 'deleted')"
+        in query
+    )
+    assert mock_query.call_args[1] == {"page_size": 6}
+
+
 @patch("nxdrive.drive.dao.engine.EngineDAO.remove_transfer")
 @patch("nxdrive.nuxeo.client.remote_client.Remote.download")
 @patch("nxdrive.nuxeo.client.remote_client.Remote.get_fs_info")
@@ -1,6 +1,8 @@
 """Unit tests for nxdrive.nuxeo.direct_download module."""
 
 from pathlib import Path
+from threading import Event, Lock
+from time import sleep
 from unittest.mock import Mock, patch
 
 
@@ -147,6 +149,9 @@ def _make_dd(self):
 
         with patch.object(DirectDownload, "__init__", return_value=None):
             dd = DirectDownload.__new__(DirectDownload)
+        dd._stop = False
+        dd._tasks = set()
+        dd._tasks_lock = Lock()
         return dd
 
     def test_files_only(self):
@@ -219,6 +224,140 @@ def test_file_without_content(self):
         assert total == 0
         assert files == 1
 
+    def test_aggregate_query(self):
+        dd = self._make_dd()
+        engine = Mock()
+        engine.remote.execute.side_effect = [
+            {
+                "entries": [
+                    {"COUNT(ecm:uuid)": 50_000, "SUM(file:content/length)": 123456}
+                ]
+            },
+            {"entries": [{"COUNT(ecm:uuid)": 120}]},
+        ]
+        dd._get_children = Mock()
+
+        total, folders, files = dd._calculate_folder_size(
+            engine, "folder-1", path="/default-domain/workspaces/it's big"
+        )
+        assert (total, folders, files) == (123456, 120, 50_000)
+        dd._get_children.assert_not_called()
+
+        queries = [call.kwargs["query"] for call in engine.remote.execute.mock_calls]
+        assert all(
+            r"ecm:path STARTSWITH '/default-domain/workspaces/it\'s big'" in query
+            for query in queries
+        )
+        assert all(
+            call.kwargs["command"] == "Repository.ResultSetQuery"
+            for call in engine.remote.execute.mock_calls
+        )
+
+    def test_aggregate_not_supported_falls_back_to_listing(self):
+        dd = self._make_dd()
+        engine = Mock()
+        engine.remote.execute.side_effect = RuntimeError("unsupported")
+        children = [
+            {
+                "uid": "f1",
+                "facets": [],
+                "properties": {"file:content": {"length": "10"}},
+            },
+        ]
+        dd._get_children = Mock(return_value=children)
+
+        total, folders, files = dd._calculate_folder_size(
+            engine, "folder-1", path="/folder"
+        )
+        assert (total, folders, files) == (10, 0, 1)
+
+    def test_listing_is_done_level_by_level(self):
+        dd = self._make_dd()
+        engine = Mock()
+        tree = {
+            "root": [
+                {"uid": "a", "facets": ["Folderish"], "properties": {}},
+                {"uid": "b", "facets": ["Folderish"], "properties": {}},
+            ],
+            "a": [
+                {
+                    "uid": "a1",
+                    "facets": [],
+                    "properties": {"file:content": {"length": "1"}},
+                }
+            ],
+            "b": [
+                {"uid": "c", "facets": ["Folderish"], "properties": {}},
+                {"uid": "b1", "facets": [], "properties": {}},
+            ],
+            "c": [
+                {
+                    "uid": "c1",
+                    "facets": [],
+                    "properties": {"file:content": {"length": "100"}},
+                }
+            ],
+        }
+        dd._get_children = Mock(side_effect=lambda _, uid: tree[uid])
+        blob = Mock(size=10)
+        engine.remote.get_info.return_value.get_blob.return_value = blob
+
+        total, folders, files = dd._calculate_folder_size(engine, "root")
+        assert (total, folders, files) == (111, 3, 3)
+        engine.remote.get_info.assert_called_once_with("b1")
+
+    def test_folder_record_is_sized_in_the_background(self):
+        dd = self._make_dd()
+        engine = Mock()
+        record = Mock(total_bytes=0, doc_size=0, doc_name="folder")
+        engine.dao.get_direct_download.return_value = record
+        engine.remote.fetch.return_value = {
+            "facets": ["Folderish"],
+            "path": "/folder",
+            "properties": {"dc:title": "Folder"},
+        }
+        sized = Event()
+
+        def calculate(*args, **kwargs):
+            # The record is saved before the size is known
+            assert engine.dao.update_direct_download.called
+            sized.set()
+            return 1000, 2, 30
+
+        dd._calculate_folder_size = Mock(side_effect=calculate)
+
+        dd._enrich_record(7, {"doc_id": "folder-1"}, engine)
+        assert record.is_folder is True
+        assert record.total_bytes == 0
+
+        assert sized.wait(5)
+        for _ in range(50):
+            if engine.dao.update_direct_download_size.called:
+                break
+            sleep(0.1)
+        engine.dao.update_direct_download_size.assert_called_once_with(7, 1000, 3, 30)
+        dd._calculate_folder_size.assert_called_once_with(
+            engine, "folder-1", path="/folder"
+        )
+        for thread in list(dd._tasks):
+            thread.join(5)
+        assert not dd._tasks
+
+    def test_folder_size_is_not_saved_once_stopped(self):
+        dd = self._make_dd()
+        engine = Mock()
+        engine.remote.execute.side_effect = NotImplementedError
+        engine.remote.get_children.side_effect = AssertionError("not listed")
+
+        def stop(*_):
+            dd._stop = True
+            return []
+
+        dd._get_children = Mock(side_effect=stop)
+        dd._update_folder_size(7, engine, "folder-1")
+        dd._get_children.assert_called_once_with(engine, "folder-1")
+        engine.dao.update_direct_download_size.assert_not_called()
+
 
 class TestDirectDownloadCreateRecord:
     def _make_dd(self):
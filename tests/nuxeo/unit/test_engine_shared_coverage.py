@@ -173,6 +173,7 @@ def mock_engine(mock_manager, mock_dao, mock_remote, mock_queue_manager, tmp_pat
         engine, Engine
     )
     engine._create_remote_folder = Engine._create_remote_folder.__get__(engine, Engine)
+    engine._parents_first = Engine._parents_first
     engine._create_remote_folder_with_enricher = (
         Engine._create_remote_folder_with_enricher.__get__(engine, Engine)
     )
@@ -696,6 +697,60 @@ def test_direct_transfer_with_document_type(self, mock_engine, tmp_path):
 
         mock_engine.dao.plan_many_direct_transfer_items.assert_called_once()
 
+    def test_direct_transfer_queues_each_batch(self, mock_engine, tmp_path):
+        """Items are queued batch by batch, while the planning goes on."""
+        local_paths = {tmp_path: 0}
+        for idx in range(5):
+            local_paths[tmp_path / f"file{idx}.txt"] = 10
+        mock_engine.dao.plan_many_direct_transfer_items.side_effect = [10, 12, 14]
+
+        with patch("nxdrive.nuxeo.engine.engine.Options") as mock_options:
+            mock_options.database_batch_size = 2
+            mock_engine._direct_transfer(local_paths, "/remote", "ref", "Title")
+
+        assert mock_engine.dao.create_session.call_args[0][2] == 6
+        assert mock_engine.dao.plan_many_direct_transfer_items.call_count == 3
+        mock_engine.dao.queue_many_direct_transfer_items.assert_has_calls(
+            [call(10), call(12), call(14)]
+        )
+
+        # The folder comes first and children depend on it
+        items = mock_engine.dao.plan_many_direct_transfer_items.call_args_list[0][0][0]
+        assert items[0][0] == tmp_path.as_posix()
+        assert items[0][3] is True
+        assert items[1][3] is False
+        assert items[1][9] == "todo"
+
+    def test_direct_transfer_paused_does_not_queue(self, mock_engine, tmp_path):
+        file1 = tmp_path / "file1.txt"
+        file1.write_text("content1")
+
+        mock_engine._direct_transfer({file1: 8}, "/remote", "ref", "Title", paused=True)
+
+        mock_engine.dao.plan_many_direct_transfer_items.assert_called_once()
+        mock_engine.dao.queue_many_direct_transfer_items.assert_not_called()
+
+    def test_parents_first(self, tmp_path):
+        folder = tmp_path / "folder"
+        sub = folder / "sub"
+        sub.mkdir(parents=True)
+        file1 = sub / "file1.txt"
+        file2 = folder / "file2.txt"
+        lonely = tmp_path / "lonely.txt"
+
+        # Children before their parents, as the order is up to the caller
+        local_paths = {file1: 1, sub: 0, lonely: 3, file2: 2, folder: 0}
+        result = list(Engine._parents_first(local_paths))
+
+        assert [path for path, *_ in result] == [lonely, folder, sub, file1, file2]
+        assert dict((path, is_dir) for path, _, is_dir in result) == {
+            lonely: False,
+            folder: True,
+            sub: True,
+            file1: False,
+            file2: False,
+        }
+
 
 class TestHandleSessionStatus:
     """Test cases for Engine.handle_session_status method."""
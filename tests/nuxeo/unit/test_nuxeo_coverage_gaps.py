@@ -4,11 +4,12 @@
 import hashlib
 from pathlib import Path
 from types import SimpleNamespace
-from unittest.mock import MagicMock, Mock, patch
+from unittest.mock import MagicMock, Mock, call, patch
 
 import pytest
 from nuxeo.exceptions import CorruptedFile, HTTPError
 
+from nxdrive.drive.client.bandwidth import DOWNLOAD
 from nxdrive.drive.constants import TransferStatus
 from nxdrive.drive.engine.activity import DownloadAction, UploadAction
 from nxdrive.drive.exceptions import (
@@ -17,6 +18,7 @@
     ScrollDescendantsError,
     UploadPaused,
 )
+from nxdrive.drive.objects import Preflight
 from nxdrive.nuxeo.client.remote_client import Remote
 from nxdrive.nuxeo.engine.processor import Processor
 
@@ -38,6 +40,8 @@ def _processor():
     engine.dao = MagicMock()
     engine.local = MagicMock()
     engine.remote = MagicMock()
+    engine.queue_manager.freshness.is_fresh.return_value = False
+    engine.dao.get_preflight.return_value = Preflight(None, None, None)
     processor = Processor(engine, Mock(return_value=None))
     processor.thread_id = 17
     processor._current_doc_pair = None
@@ -183,6 +187,20 @@ def test_refresh_during_sync_can_report_remote_not_found(self):
         assert pair.remote_ref == ""
         processor.dao.remove_state.assert_called_once_with(pair)
 
+    def test_fresh_pair_skips_the_remote_check(self):
+        processor = _processor()
+        pair = _pair(pair_state="locally_modified", remote_ref="fresh")
+        processor.engine.queue_manager.freshness.is_fresh.return_value = True
+        processor._get_normal_state_from_remote_ref = Mock(return_value=None)
+        processor.engine.dao.get_download.return_value = None
+        processor.engine.dao.get_upload.return_value = None
+        sync_handler = Mock(__name__="sync_handler")
+
+        processor._handle_doc_pair_sync(pair, sync_handler)
+
+        processor.remote.get_fs_info.assert_not_called()
+        sync_handler.assert_called_once_with(pair)
+
     def test_unaccessible_digest_is_refreshed_and_postponed(self):
         from nxdrive.drive.constants import UNACCESSIBLE_HASH
 
@@ -568,7 +586,10 @@ def test_download_without_output_returns_response_content(self):
     def test_download_creates_transfer_record(self, tmp_path):
         remote = _remote()
         output = tmp_path / "small.bin"
-        response = SimpleNamespace(content=b"payload", headers={"Content-Length": "7"})
+        response = SimpleNamespace(
+            iter_content=lambda size: iter([b"payload"]),
+            headers={"Content-Length": "7"},
+        )
         remote.client.request.return_value = response
         remote.dao.get_download.return_value = None
         remote.check_integrity_simple = Mock()
@@ -590,13 +611,36 @@ def test_download_creates_transfer_record(self, tmp_path):
         assert saved.engine == "engine-1"
         assert saved.is_direct_edit is True
 
+    def test_small_download_is_throttled_while_streaming(self, tmp_path):
+        remote = _remote()
+        output = tmp_path / "small.bin"
+        remote.client.request.return_value = SimpleNamespace(
+            iter_content=lambda size: iter([b"pay", b"load"]),
+            headers={"Content-Length": "7"},
+        )
+        remote.dao.get_download.return_value = SimpleNamespace(
+            status=TransferStatus.ONGOING, engine="engine"
+        )
+        remote.check_integrity_simple = Mock()
+
+        with patch("nxdrive.nuxeo.client.remote_client.throttle") as throttle:
+            remote.download("/blob", Path("logical.bin"), output, "digest")
+
+        assert throttle.call_args_list == [
+            call(DOWNLOAD, 3, engine_uid="engine", interactive=True),
+            call(DOWNLOAD, 4, engine_uid="engine", interactive=True),
+        ]
+        assert output.read_bytes() == b"payload"
+
     def test_corrupted_download_removes_temporary_file(self, tmp_path):
         remote = _remote()
         output = tmp_path / "bad.bin"
-        response = SimpleNamespace(content=b"bad", headers={"Content-Length": "3"})
+        response = SimpleNamespace(
+            iter_content=lambda size: iter([b"bad"]), headers={"Content-Length": "3"}
+        )
         remote.client.request.return_value = response
         remote.dao.get_download.return_value = SimpleNamespace(
-            status=TransferStatus.ONGOING
+            status=TransferStatus.ONGOING, engine="engine"
         )
         remote.check_integrity_simple = Mock(
             side_effect=CorruptedFile(output, "expected", "actual")
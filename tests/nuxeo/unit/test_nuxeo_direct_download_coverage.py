@@ -1188,6 +1188,7 @@ def test_update_download_progress_success(self):
         dd = DirectDownload(self.manager, self.folder)
 
         dd._update_download_progress(1, 500, 1000)
+        dd._flush_progress()
         engine.dao.update_direct_download_progress.assert_called_once_with(
             1, 500, 1000, 50.0
         )
@@ -1201,6 +1202,7 @@ def test_update_download_progress_zero_total(self):
         dd = DirectDownload(self.manager, self.folder)
 
         dd._update_download_progress(1, 0, 0)
+        dd._flush_progress()
         engine.dao.update_direct_download_progress.assert_called_once_with(1, 0, 0, 0.0)
 
     def test_update_download_progress_no_record(self):
@@ -1211,6 +1213,7 @@ def test_update_download_progress_no_record(self):
         dd = DirectDownload(self.manager, self.folder)
 
         dd._update_download_progress(999, 100, 200)
+        dd._flush_progress()
 
     def test_update_download_progress_exception(self):
         """Test handles exception."""
@@ -1220,6 +1223,7 @@ def test_update_download_progress_exception(self):
         dd = DirectDownload(self.manager, self.folder)
 
         dd._update_download_progress(1, 100, 200)
+        dd._flush_progress()
 
 
 class TestDirectDownloadStop:
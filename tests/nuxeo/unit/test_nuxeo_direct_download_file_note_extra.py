@@ -180,7 +180,9 @@ def test_resumes_partial_download_and_reports_progress(
         )
         response.raise_for_status.assert_called_once_with()
         response.iter_content.assert_called_once_with(chunk_size=64 * 1024)
-        downloader._is_single_download_cancelled.assert_called_once_with(22)
+        # Pause and cancellation are in-memory flags
+        downloader._is_single_download_cancelled.assert_not_called()
+        downloader._is_paused.assert_not_called()
         downloader._update_download_progress.assert_called_once_with(
             22,
             6,
@@ -241,6 +243,8 @@ def test_folder_resume_reports_batch_and_child_progress(
             bytes_downloaded=23,
             is_folder=True,
         )
+        # Bytes of the previous files of the folder, the database may lag behind
+        downloader._downloaded[24] = 20
         response = make_response(b"++", status_code=206, content_length="2")
         engine.remote.client.request.return_value = response
 
@@ -263,6 +267,25 @@ def test_folder_resume_reports_batch_and_child_progress(
             emitted_total_bytes=5,
         )
         response.close.assert_called_once_with()
+        assert downloader._downloaded[24] == 25
+
+    def test_folder_progress_adds_up_the_files(self, downloader, engine, tmp_path):
+        downloader._get_download_record.return_value = SimpleNamespace(
+            total_bytes=100, bytes_downloaded=0, is_folder=True
+        )
+        for name in ("a.bin", "b.bin"):
+            engine.remote.client.request.return_value = make_response(
+                b"1234", b"56", content_length="6"
+            )
+            downloader._download_file(
+                engine, SERVER_URL, DOWNLOAD_URL, name, tmp_path, record_uid=29
+            )
+
+        reported = [
+            args[1] for args, _ in downloader._update_download_progress.call_args_list
+        ]
+        assert reported == [4, 6, 10, 12]
+        assert downloader._downloaded[29] == 12
 
     def test_range_eof_reuses_existing_file_and_closes_response(
         self, downloader, engine, tmp_path
@@ -309,7 +332,7 @@ def test_invalid_content_length_streams_without_progress(
         )
 
         assert (tmp_path / "unknown-size.bin").read_bytes() == b"payload"
-        downloader._is_single_download_cancelled.assert_called_once_with(26)
+        downloader._is_single_download_cancelled.assert_not_called()
         downloader._update_download_progress.assert_not_called()
         response.close.assert_called_once_with()
 
@@ -318,7 +341,7 @@ def test_cancelled_transfer_is_swallowed_and_response_is_closed(
     ):
         response = make_response(b"new", content_length="3")
         engine.remote.client.request.return_value = response
-        downloader._is_single_download_cancelled.return_value = True
+        downloader.cancel(27)
 
         downloader._download_file(
             engine,
@@ -23,6 +23,7 @@ def _make_engine():
     engine.server_url = "http://localhost:8080/nuxeo/"
     engine._remote_token = None
     engine._remote_password = None
+    engine._proc_count = 10
     engine._web_authentication = False
     engine._stopped = False
     engine._sync_started = False
@@ -852,6 +853,7 @@ def test_creates_remote(self):
         args = engine.remote_cls.call_args
         assert args[0][0] == engine.server_url
         assert args[0][1] == "admin"
+        assert args[1]["max_processors"] == 10
 
 
 # ------------------------------------------------------------------ handle_session_status
@@ -1389,6 +1391,74 @@ def test_new_folder_with_custom_type(self):
 
         engine._create_remote_folder_with_enricher.assert_called_once()
 
+    def test_walk_plans_folder_content_by_batch(self, tmp_path):
+        engine = _make_engine()
+        engine._save_last_dt_session_infos = MagicMock()
+        engine.dao.create_session.return_value = 1
+        engine.dao.plan_many_direct_transfer_items.side_effect = [10, 20]
+
+        folder = tmp_path / "folder"
+        (folder / "sub").mkdir(parents=True)
+        (folder / "a.txt").write_text("a")
+        (folder / "empty.txt").touch()
+        (folder / "sub" / "b.txt").write_text("bb")
+        f = tmp_path / "f.txt"
+        f.write_text("f")
+
+        with patch("nxdrive.nuxeo.engine.engine.Options") as mock_opts:
+            mock_opts.database_batch_size = 3
+            mock_opts.direct_transfer_file_upper_limit = 0
+            engine._direct_transfer(
+                {folder: 3, folder / "a.txt": 1, f: 1},
+                "/ws",
+                "ref-1",
+                "Workspace",
+                walk=True,
+                count=5,
+            )
+
+        assert engine.dao.create_session.call_args.args[2] == 5
+        batches = [
+            call.args[0]
+            for call in engine.dao.plan_many_direct_transfer_items.call_args_list
+        ]
+        assert [len(batch) for batch in batches] == [3, 2]
+        items = [item for batch in batches for item in batch]
+        # Folders come first, the selected file once only, the empty one never
+        assert [(item[0], item[3], item[4], item[-1]) for item in items] == [
+            (folder.as_posix(), True, 0, "unknown"),
+            ((folder / "a.txt").as_posix(), False, 1, "todo"),
+            ((folder / "sub").as_posix(), True, 0, "todo"),
+            ((folder / "sub" / "b.txt").as_posix(), False, 2, "todo"),
+            (f.as_posix(), False, 1, "unknown"),
+        ]
+        assert [
+            call.args for call in engine.dao.queue_many_direct_transfer_items.mock_calls
+        ] == [(10,), (20,)]
+        engine.dao.set_session_counts.assert_not_called()
+
+    def test_walk_fixes_session_counts_when_the_tree_changed(self, tmp_path):
+        engine = _make_engine()
+        engine._save_last_dt_session_infos = MagicMock()
+        engine.handle_session_status = MagicMock()
+        engine.dao.create_session.return_value = 1
+
+        folder = tmp_path / "folder"
+        folder.mkdir()
+        (folder / "a.txt").write_text("a")
+
+        with patch("nxdrive.nuxeo.engine.engine.Options") as mock_opts:
+            mock_opts.database_batch_size = 1000
+            mock_opts.direct_transfer_file_upper_limit = 0
+            engine._direct_transfer(
+                {folder: 1}, "/ws", "ref-1", "Workspace", walk=True, count=3
+            )
+
+        engine.dao.set_session_counts.assert_called_once_with(1, 2)
+        engine.handle_session_status.assert_called_once_with(
+            engine.dao.set_session_counts.return_value
+        )
+
 
 # ------------------------------------------------------------------ direct_transfer_async
 
@@ -14,6 +14,7 @@
     UploadCancelled,
     UploadPaused,
 )
+from nxdrive.drive.objects import Preflight
 
 
 def _make_processor():
@@ -29,6 +30,8 @@ def _make_processor():
     p.thread_id = 1
     p._current_doc_pair = None
     p._current_metrics = {}
+    p._parents = {}
+    p.dao.get_preflight.return_value = Preflight(None, None, None)
     # Reset class-level state
     Processor = type(p)
     Processor.soft_locks = {}
@@ -306,3 +306,40 @@ def test_success_calls_do_scan(self):
         w.scan_remote()
         w._get_changes.assert_called_once()
         w._do_scan_remote.assert_called_once_with(state, remote_info)
+
+
+def test_changes_invalidate_the_folder_tree():
+    w = _make_watcher()
+    w._get_changes = Mock(
+        return_value={
+            "fileSystemChanges": [
+                {
+                    "eventId": "documentCreated",
+                    "eventDate": 2,
+                    "fileSystemItemId": "fs#default#doc",
+                    "fileSystemItem": {
+                        "id": "fs#default#doc",
+                        "parentId": "fs#default#parent",
+                        "path": "/parent/doc",
+                        "name": "doc",
+                    },
+                },
+                {"eventId": "deleted", "eventDate": 1, "fileSystemItemId": "fs#gone"},
+            ]
+        }
+    )
+    w.dao.get_states_from_remote.return_value = []
+    w.dao.get_first_state_from_partial_remote.return_value = None
+    with patch.object(w, "filtered", return_value=False):
+        w._update_remote_states()
+
+    w.dao.invalidate_folder_tree.assert_called_once_with(
+        {"fs#default#doc", "fs#default#parent", "fs#gone"}
+    )
+
+
+def test_too_many_changes_clear_the_folder_tree():
+    w = _make_watcher()
+    w._get_changes = Mock(return_value={"hasTooManyChanges": True})
+    w._update_remote_states()
+    w.dao.clear_folder_tree.assert_called_once_with()
@@ -7,7 +7,7 @@
 
 from nxdrive.drive.constants import TransferStatus
 from nxdrive.drive.exceptions import NotFound, UploadCancelled, UploadPaused
-from nxdrive.drive.objects import DocPair, Session
+from nxdrive.drive.objects import DocPair, Preflight, Session
 from nxdrive.nuxeo.engine.processor import Processor
 
 
@@ -17,6 +17,7 @@ def mock_engine():
     engine = Mock()
     engine.uid = "test-engine-uid"
     engine.dao = Mock()
+    engine.dao.get_preflight.return_value = Preflight(None, None, None)
     engine.local = Mock()
     engine.remote = Mock()
     engine.queue_manager = Mock()
@@ -94,17 +95,15 @@ def test_handle_doc_pair_sync_parent_dedup_error(self, processor, doc_pair):
 
         parent_pair = Mock()
         parent_pair.last_error = "DEDUP"
+        processor.dao.get_preflight.return_value = Preflight(parent_pair, None, None)
 
-        with patch.object(
-            processor, "_get_normal_state_from_remote_ref", return_value=parent_pair
-        ):
-            with patch.object(processor.engine.manager.osi, "send_sync_status"):
-                with patch.object(processor.local, "get_remote_id", return_value=None):
-                    sync_handler = Mock()
-                    processor._handle_doc_pair_sync(doc_pair, sync_handler)
+        with patch.object(processor.engine.manager.osi, "send_sync_status"):
+            with patch.object(processor.local, "get_remote_id", return_value=None):
+                sync_handler = Mock()
+                processor._handle_doc_pair_sync(doc_pair, sync_handler)
 
-                    # Should not call sync_handler
-                    sync_handler.assert_not_called()
+                # Should not call sync_handler
+                sync_handler.assert_not_called()
 
     def test_handle_doc_pair_sync_parent_not_exists(self, processor, doc_pair):
         """Test handling when parent path doesn't exist and parent moved."""
@@ -113,96 +112,81 @@ def test_handle_doc_pair_sync_parent_not_exists(self, processor, doc_pair):
 
         parent_pair = Mock()
         parent_pair.local_path = Path("new_parent")
+        processor.dao.get_preflight.return_value = Preflight(parent_pair, None, None)
 
         with patch.object(processor.engine.manager.osi, "send_sync_status"):
             with patch.object(processor.local, "get_remote_id", return_value=None):
                 with patch.object(processor.local, "exists", return_value=False):
                     with patch.object(
                         processor,
-                        "_get_normal_state_from_remote_ref",
-                        return_value=parent_pair,
+                        "_lock_soft_path",
+                        return_value=Path("test"),
                     ):
-                        with patch.object(
-                            processor.dao, "get_download", return_value=None
-                        ):
+                        with patch.object(processor, "_unlock_soft_path"):
                             with patch.object(
-                                processor.dao, "get_upload", return_value=None
+                                processor.dao,
+                                "get_state_from_id",
+                                return_value=doc_pair,
                             ):
                                 with patch.object(
-                                    processor,
-                                    "_lock_soft_path",
-                                    return_value=Path("test"),
+                                    processor.local,
+                                    "abspath",
+                                    return_value=Path("/abs/test"),
                                 ):
-                                    with patch.object(processor, "_unlock_soft_path"):
-                                        with patch.object(
-                                            processor.dao,
-                                            "get_state_from_id",
-                                            return_value=doc_pair,
-                                        ):
-                                            with patch.object(
-                                                processor.local,
-                                                "abspath",
-                                                return_value=Path("/abs/test"),
-                                            ):
-                                                sync_handler = Mock(
-                                                    __name__="sync_handler"
-                                                )
-                                                processor._handle_doc_pair_sync(
-                                                    doc_pair, sync_handler
-                                                )
-
-                                                # Parent path should be updated
-                                                assert (
-                                                    doc_pair.local_parent_path
-                                                    == parent_pair.local_path
-                                                )
+                                    sync_handler = Mock(__name__="sync_handler")
+                                    processor._handle_doc_pair_sync(
+                                        doc_pair, sync_handler
+                                    )
+
+                                    # Parent path should be updated
+                                    assert (
+                                        doc_pair.local_parent_path
+                                        == parent_pair.local_path
+                                    )
+
+    def test_preflight_parent_is_reused_by_the_handler(self, processor, doc_pair):
+        """The parent read by the pre-flight query is not looked up again."""
+        parent_pair = Mock()
+        processor.dao.get_preflight.return_value = Preflight(parent_pair, None, None)
+
+        processor._preflight(doc_pair)
+        assert processor._get_normal_state_from_remote_ref("parent123") is parent_pair
+        processor.dao.get_normal_state_from_remote.assert_not_called()
+
+        # Forgotten once the pair is processed
+        processor._parents.clear()
+        processor._get_normal_state_from_remote_ref("parent123")
+        processor.dao.get_normal_state_from_remote.assert_called_once_with("parent123")
 
     def test_handle_doc_pair_sync_download_paused(self, processor, doc_pair):
         """Test handling when download is paused."""
-        download = Mock()
-        download.status = TransferStatus.PAUSED
+        processor.dao.get_preflight.return_value = Preflight(
+            None, TransferStatus.PAUSED, None
+        )
 
         with patch.object(processor.engine.manager.osi, "send_sync_status"):
             with patch.object(processor.local, "get_remote_id", return_value=None):
                 with patch.object(processor.local, "exists", return_value=True):
-                    with patch.object(
-                        processor,
-                        "_get_normal_state_from_remote_ref",
-                        return_value=None,
-                    ):
-                        with patch.object(
-                            processor.dao, "get_download", return_value=download
-                        ):
-                            sync_handler = Mock()
-                            processor._handle_doc_pair_sync(doc_pair, sync_handler)
+                    sync_handler = Mock()
+                    processor._handle_doc_pair_sync(doc_pair, sync_handler)
 
-                            # Should not call sync_handler when download is paused
-                            sync_handler.assert_not_called()
+                    # Should not call sync_handler when download is paused
+                    sync_handler.assert_not_called()
 
     def test_handle_doc_pair_sync_upload_paused(self, processor, doc_pair):
         """Test handling when upload is paused."""
-        upload = Mock()
-        upload.status = TransferStatus.PAUSED
+        processor.dao.get_preflight.return_value = Preflight(
+            None, None, TransferStatus.PAUSED
+        )
 
         with patch.object(processor.engine.manager.osi, "send_sync_status"):
             with patch.object(processor.local, "get_remote_id", return_value=None):
                 with patch.object(processor.local, "exists", return_value=True):
-                    with patch.object(
-                        processor,
-                        "_get_normal_state_from_remote_ref",
-                        return_value=None,
-                    ):
-                        with patch.object(
-                            processor.dao, "get_download", return_value=None
-                        ):
-                            with patch.object(
-                                processor.dao, "get_upload", return_value=upload
-                            ):
-                                sync_handler = Mock()
-                                processor._handle_doc_pair_sync(doc_pair, sync_handler)
+                    sync_handler = Mock()
+                    processor._handle_doc_pair_sync(doc_pair, sync_handler)
 
-                                # Should not call sync_handler when upload is paused
-                                sync_handler.assert_not_called()
+                    # Should not call sync_handler when upload is paused
+                    sync_handler.assert_not_called()
 
     def test_handle_doc_pair_sync_success(self, processor, doc_pair):
         """Test successful sync handling."""
@@ -211,42 +195,27 @@ def test_handle_doc_pair_sync_success(self, processor, doc_pair):
                 with patch.object(processor.local, "exists", return_value=True):
                     with patch.object(
                         processor,
-                        "_get_normal_state_from_remote_ref",
-                        return_value=None,
+                        "_lock_soft_path",
+                        return_value=Path("test"),
                     ):
-                        with patch.object(
-                            processor.dao, "get_download", return_value=None
-                        ):
+                        with patch.object(processor, "_unlock_soft_path"):
                             with patch.object(
-                                processor.dao, "get_upload", return_value=None
+                                processor.dao,
+                                "get_state_from_id",
+                                return_value=doc_pair,
                             ):
                                 with patch.object(
-                                    processor,
-                                    "_lock_soft_path",
-                                    return_value=Path("test"),
+                                    processor.local,
+                                    "abspath",
+                                    return_value=Path("/abs/test"),
                                 ):
-                                    with patch.object(processor, "_unlock_soft_path"):
-                                        with patch.object(
-                                            processor.dao,
-                                            "get_state_from_id",
-                                            return_value=doc_pair,
-                                        ):
-                                            with patch.object(
-                                                processor.local,
-                                                "abspath",
-                                                return_value=Path("/abs/test"),
-                                            ):
-                                                sync_handler = Mock(
-                                                    __name__="sync_handler"
-                                                )
-                                                processor._handle_doc_pair_sync(
-                                                    doc_pair, sync_handler
-                                                )
-
-                                                # Sync handler should be called
-                                                sync_handler.assert_called_once_with(
-                                                    doc_pair
-                                                )
+                                    sync_handler = Mock(__name__="sync_handler")
+                                    processor._handle_doc_pair_sync(
+                                        doc_pair, sync_handler
+                                    )
+
+                                    # Sync handler should be called
+                                    sync_handler.assert_called_once_with(doc_pair)
 
     def test_handle_doc_pair_sync_signals_emitted(self, processor, doc_pair):
         """Test that signals are emitted correctly."""
@@ -255,47 +224,34 @@ def test_handle_doc_pair_sync_signals_emitted(self, processor, doc_pair):
                 with patch.object(processor.local, "exists", return_value=True):
                     with patch.object(
                         processor,
-                        "_get_normal_state_from_remote_ref",
-                        return_value=None,
+                        "_lock_soft_path",
+                        return_value=Path("test"),
                     ):
-                        with patch.object(
-                            processor.dao, "get_download", return_value=None
-                        ):
+                        with patch.object(processor, "_unlock_soft_path"):
                             with patch.object(
-                                processor.dao, "get_upload", return_value=None
+                                processor.dao,
+                                "get_state_from_id",
+                                return_value=doc_pair,
                             ):
                                 with patch.object(
-                                    processor,
-                                    "_lock_soft_path",
-                                    return_value=Path("test"),
+                                    processor.local,
+                                    "abspath",
+                                    return_value=Path("/abs/test"),
                                 ):
-                                    with patch.object(processor, "_unlock_soft_path"):
+                                    with patch.object(
+                                        processor, "pairSyncStarted"
+                                    ) as mock_started:
                                         with patch.object(
-                                            processor.dao,
-                                            "get_state_from_id",
-                                            return_value=doc_pair,
-                                        ):
-                                            with patch.object(
-                                                processor.local,
-                                                "abspath",
-                                                return_value=Path("/abs/test"),
-                                            ):
-                                                with patch.object(
-                                                    processor, "pairSyncStarted"
-                                                ) as mock_started:
-                                                    with patch.object(
-                                                        processor, "pairSyncEnded"
-                                                    ) as mock_ended:
-                                                        sync_handler = Mock(
-                                                            __name__="sync_handler"
-                                                        )
-                                                        processor._handle_doc_pair_sync(
-                                                            doc_pair, sync_handler
-                                                        )
-
-                                                        # Both signals should be emitted
-                                                        mock_started.emit.assert_called_once()
-                                                        mock_ended.emit.assert_called_once()
+                                            processor, "pairSyncEnded"
+                                        ) as mock_ended:
+                                            sync_handler = Mock(__name__="sync_handler")
+                                            processor._handle_doc_pair_sync(
+                                                doc_pair, sync_handler
+                                            )
+
+                                            # Both signals should be emitted
+                                            mock_started.emit.assert_called_once()
+                                            mock_ended.emit.assert_called_once()
 
 
 class TestHandleDocPairDt:
@@ -0,0 +1,124 @@
+"""
+Throughput and disk usage of the local duplicates reuse: shutil.copyfile() against
+nxdrive.drive.utils.clone_file().
+
+By default, it creates a file system image (Btrfs, then XFS with reflinks, then
+ext4: the first one that can be formatted), mounts it on a loop device and copies
+a file of --size MiB --count times with both functions. It needs root privileges
+and mkfs.<type>. Use --dir to run it in an existing folder instead.
+
+Usage:
+
+    sudo python tools/scripts/bench_clone_file.py [--fs btrfs] [--size 512]
+    python tools/scripts/bench_clone_file.py --dir /mnt/data
+"""
+
+import argparse
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+from contextlib import contextmanager
+from pathlib import Path
+from time import perf_counter
+from typing import Callable, Generator, Iterable, Tuple
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[2]))
+
+from nxdrive.drive.utils import clone_file  # noqa: E402
+
+MKFS = {
+    "btrfs": ["mkfs.btrfs", "-q", "-f"],
+    "xfs": ["mkfs.xfs", "-q", "-f", "-m", "reflink=1"],
+    "ext4": ["mkfs.ext4", "-q", "-F"],
+}
+
+
+@contextmanager
+def loopback(fs_types: Iterable[str], size: int, /) -> Generator[Path, None, None]:
+    """Mount a *size* MiB image formatted with the first available file system."""
+    with tempfile.TemporaryDirectory() as tmp:
+        image, mount = Path(tmp) / "fs.img", Path(tmp) / "mnt"
+        mount.mkdir()
+        with image.open("wb") as f:
+            f.truncate(size * 1024**2)
+
+        for fs_type in fs_types:
+            if shutil.which(MKFS[fs_type][0]):
+                break
+        else:
+            raise SystemExit(f"None of {', '.join(fs_types)} can be formatted")
+
+        subprocess.run([*MKFS[fs_type], str(image)], check=True)
+        subprocess.run(["mount", "-o", "loop", str(image), str(mount)], check=True)
+        print(f"Mounted a {size:,} MiB {fs_type} image on {mount}")
+        try:
+            yield mount
+        finally:
+            subprocess.run(["umount", str(mount)], check=True)
+
+
+def used(folder: Path, /) -> int:
+    stats = os.statvfs(folder)
+    return (stats.f_blocks - stats.f_bfree) * stats.f_frsize
+
+
+def measure(
+    func: Callable[[Path, Path], object], src: Path, count: int, /
+) -> Tuple[float, int, str]:
+    """Return the duration (s), the disk usage (bytes) and the result of *count* copies."""
+    os.sync()
+    before = used(src.parent)
+    start = perf_counter()
+    for idx in range(count):
+        result = func(src, src.with_name(f"copy-{idx}"))
+    os.sync()
+    duration = perf_counter() - start
+    usage = used(src.parent) - before
+
+    for idx in range(count):
+        src.with_name(f"copy-{idx}").unlink()
+    return duration, usage, str(result)
+
+
+def bench(folder: Path, size: int, count: int, /) -> None:
+    src = folder / "source.bin"
+    with src.open("wb") as f:
+        for _ in range(size):
+            f.write(os.urandom(1024**2))
+
+    for name, func in (
+        ("shutil.copyfile()", shutil.copyfile),
+        ("clone_file()", clone_file),
+    ):
+        duration, usage, result = measure(func, src, count)
+        method = f" ({result})" if func is clone_file else ""
+        print(
+            f"{name + method:<36} {count} x {size:,} MiB in {duration:>7.3f} s"
+            f" {count * size / duration:>10,.0f} MiB/s"
+            f" {usage / 1024**2:>8,.0f} MiB used"
+        )
+    src.unlink()
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--dir", type=Path, help="existing folder to use")
+    parser.add_argument("--fs", choices=list(MKFS), action="append")
+    parser.add_argument("--size", type=int, default=512, help="file size in MiB")
+    parser.add_argument("--count", type=int, default=4)
+    args = parser.parse_args()
+
+    if args.dir:
+        bench(args.dir, args.size, args.count)
+        return 0
+
+    image_size = max(args.size * (args.count + 2) + 512, 1024)
+    with loopback(args.fs or list(MKFS), image_size) as folder:
+        bench(folder, args.size, args.count)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
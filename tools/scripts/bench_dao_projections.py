@@ -0,0 +1,136 @@
+"""
+Memory and throughput of the States projections used by hot paths.
+
+It fills a database with N pairs needing a synchronization (1 million by default),
+then compares, for the same columns consumed by the queue manager:
+
+- full rows: "SELECT *" wrapped in DocPair objects;
+- the compact projection: only "id, folderish, pair_state" as QueueItem tuples;
+- the queue rebuild done by EngineDAO.register_queue_manager().
+
+Usage:
+
+    python tools/scripts/bench_dao_projections.py [--rows 1000000]
+"""
+
+import argparse
+import sys
+import tempfile
+import tracemalloc
+from pathlib import Path
+from time import perf_counter
+from typing import Any, Callable, List, Tuple
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[2]))
+
+from nxdrive.drive.dao.engine import EngineDAO, _queue_item  # noqa: E402
+
+
+class QueueManager:
+    """Count pushed items, as the real queue manager would dispatch them."""
+
+    def __init__(self) -> None:
+        self.pushed = 0
+
+    def push_ref(self, row_id: int, folderish: bool, pair_state: str, /) -> None:
+        self.pushed += 1
+
+
+def fill(dao: EngineDAO, rows: int, /) -> None:
+    """Insert *rows* pairs, one folder every 100 files, with realistic columns."""
+    digest = "d41d8cd98f00b204e9800998ecf8427e" * 2
+
+    def states():
+        for idx in range(rows):
+            folder = f"/a rather long folder name to sync/folder {idx // 100:06}"
+            folderish = idx % 100 == 0
+            path = folder if folderish else f"{folder}/document {idx:07}.docx"
+            parent = folder.rsplit("/", 1)[0] if folderish else folder
+            yield (
+                path,
+                parent,
+                path.rsplit("/", 1)[1],
+                f"defaultFileSystemItemFactory#default#{idx:036}",
+                digest,
+                int(folderish),
+                "created",
+                "unknown",
+                "locally_created",
+            )
+
+    c = dao._get_write_connection().cursor()
+    c.executemany(
+        "INSERT INTO States (local_path, local_parent_path, local_name, remote_ref,"
+        " local_digest, folderish, local_state, remote_state, pair_state)"
+        " VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+        states(),
+    )
+    dao._get_write_connection().commit()
+
+
+def measure(func: Callable[[], Any], /) -> Tuple[Any, float, float]:
+    """Return the result, the duration (s) and the memory peak (MiB) of *func*."""
+    tracemalloc.start()
+    start = perf_counter()
+    result = func()
+    duration = perf_counter() - start
+    peak = tracemalloc.get_traced_memory()[1] / 1024**2
+    tracemalloc.stop()
+    return result, duration, peak
+
+
+def full_rows(dao: EngineDAO, /) -> List[Tuple[int, bool, str]]:
+    c = dao._get_read_connection().cursor()
+    rows = c.execute("SELECT * FROM States WHERE pair_state = 'locally_created'")
+    pairs = rows.fetchall()
+    return [(pair.id, pair.folderish, pair.pair_state) for pair in pairs]
+
+
+def projection(dao: EngineDAO, /) -> List[Tuple[int, bool, str]]:
+    c = dao._get_read_connection().cursor()
+    c.row_factory = _queue_item
+    items = c.execute(
+        "SELECT id, folderish, pair_state"
+        "  FROM States"
+        " WHERE pair_state = 'locally_created'"
+    ).fetchall()
+    return [(item.id, item.folderish, item.pair_state) for item in items]
+
+
+def queue_rebuild(dao: EngineDAO, /) -> int:
+    manager = QueueManager()
+    dao.register_queue_manager(manager)  # type: ignore
+    return manager.pushed
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        dao = EngineDAO(Path(tmp) / "bench.db")
+        try:
+            start = perf_counter()
+            fill(dao, args.rows)
+            print(f"Inserted {args.rows:,} rows in {perf_counter() - start:.2f} s")
+
+            for name, func in (
+                ("SELECT * as DocPair", full_rows),
+                ("Projection as QueueItem", projection),
+                ("register_queue_manager()", queue_rebuild),
+            ):
+                result, duration, peak = measure(lambda: func(dao))
+                count = result if isinstance(result, int) else len(result)
+                print(
+                    f"{name:<26} {count:>10,} items"
+                    f" {duration:>8.2f} s {args.rows / duration:>12,.0f} rows/s"
+                    f" {peak:>10.1f} MiB peak"
+                )
+        finally:
+            dao.dispose()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
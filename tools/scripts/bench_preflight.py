@@ -0,0 +1,119 @@
+"""
+Per-file database overhead of the processor pre-flight checks.
+
+It fills an engine database with --files pairs in --folders folders, and
+--transfers downloads and uploads, then times what a processor reads before
+handling every pair:
+
+    - before: acquire_processor() + get_state_from_id() + the parent
+      lookup + get_download() + get_upload()
+    - after: acquire_state() with UPDATE ... RETURNING + get_preflight()
+
+Usage:
+
+    python tools/scripts/bench_preflight.py [--files 20000] [--transfers 500]
+"""
+
+import argparse
+import sys
+import tempfile
+from pathlib import Path
+from time import perf_counter
+from typing import Callable
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[2]))
+
+from nxdrive.drive.constants import TransferStatus  # noqa: E402
+from nxdrive.drive.dao.engine import EngineDAO  # noqa: E402
+
+
+def fill(dao: EngineDAO, files: int, folders: int, transfers: int, /) -> None:
+    c = dao._get_write_connection().cursor()
+    c.executemany(
+        "INSERT INTO States (id, remote_ref, remote_parent_ref, local_path,"
+        " local_parent_path, folderish, pair_state, local_state, remote_state)"
+        " VALUES (?, ?, 'root', ?, '/', 1, 'synchronized', 'synchronized',"
+        " 'synchronized')",
+        [(idx + 1, f"folder-{idx}", f"/folder-{idx}") for idx in range(folders)],
+    )
+    c.executemany(
+        "INSERT INTO States (id, remote_ref, remote_parent_ref, local_path,"
+        " local_parent_path, folderish, pair_state, local_state, remote_state)"
+        " VALUES (?, ?, ?, ?, ?, 0, 'remotely_created', 'unknown', 'created')",
+        [
+            (
+                folders + idx + 1,
+                f"file-{idx}",
+                f"folder-{idx % folders}",
+                f"/folder-{idx % folders}/file-{idx}",
+                f"/folder-{idx % folders}",
+            )
+            for idx in range(files)
+        ],
+    )
+    for table, column in (("Downloads", "tmpname"), ("Uploads", "batch")):
+        c.executemany(
+            f"INSERT INTO {table} (path, status, doc_pair, {column})"
+            " VALUES (?, ?, ?, '{}')",
+            [
+                (f"/{table}/{idx}", TransferStatus.ONGOING.value, folders + idx + 1)
+                for idx in range(transfers)
+            ],
+        )
+
+
+def before(dao: EngineDAO, thread_id: int, row_id: int, /) -> None:
+    dao.acquire_processor(thread_id, row_id)
+    doc_pair = dao.get_state_from_id(row_id, from_write=True)
+    dao.get_normal_state_from_remote(doc_pair.remote_parent_ref)
+    dao.get_download(doc_pair=doc_pair.id)
+    dao.get_upload(doc_pair=doc_pair.id)
+
+
+def after(dao: EngineDAO, thread_id: int, row_id: int, /) -> None:
+    doc_pair = dao.acquire_state(thread_id, row_id)
+    dao.get_preflight(doc_pair)
+
+
+def measure(
+    func: Callable[[EngineDAO, int, int], None],
+    dao: EngineDAO,
+    first: int,
+    count: int,
+    /,
+) -> float:
+    """Return the average duration (µs) of *func* on *count* pairs."""
+    start = perf_counter()
+    for row_id in range(first, first + count):
+        func(dao, 42, row_id)
+    duration = perf_counter() - start
+
+    # Outside of the measure, releasing is not part of the pre-flight checks
+    dao.release_processor(42)
+    return duration / count * 1_000_000
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--files", type=int, default=20_000)
+    parser.add_argument("--folders", type=int, default=100)
+    parser.add_argument("--transfers", type=int, default=500)
+    parser.add_argument("--count", type=int, default=2_000, help="pairs to handle")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        dao = EngineDAO(Path(tmp) / "engine.db")
+        try:
+            fill(dao, args.files, args.folders, args.transfers)
+            first = args.folders + 1
+            count = min(args.count, args.files)
+            for name, func in (("before", before), ("after", after)):
+                duration = measure(func, dao, first, count)
+                print(f"{name:<8} {duration:>10,.1f} µs per file")
+        finally:
+            dao.dispose()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())